@@ -18,6 +18,25 @@ function updateStatus(target, status_type, content_formatter) {
     });
 }
 
+function followStatus(sections) {
+    var source = new EventSource("/status/stream");
+
+    source.addEventListener("online", function (event) {
+        if (!JSON.parse(event.data)) {
+            for (var i=0; i<sections.length; i++)
+                $(sections[i].target).html("<em>Request refused<em>, reason: Server offline");
+        }
+    });
+
+    $.each(sections, function (i, section) {
+        source.addEventListener(section.event, function (event) {
+            $(section.target).html(section.formatter(JSON.parse(event.data)));
+        });
+    });
+
+    return source;
+}
+
 function serverStatusFormatter(data) {
     return "<img src='" + (data.ResourceCPU ? okIMG : nokIMG) + "' class='icon'> CPU | <img src='" +
         (data.ResourceMem ? okIMG : nokIMG) + "' class='icon'> Memory | Uptime: " + data.ServerUpTime;
@@ -0,0 +1,50 @@
+"""Times the outlier filter of the normalisation on control position grids.
+
+The grids are the 32x48 control positions of 1536 plates, as produced by
+`get_reference_positions` on the normalisation path.
+
+Usage:
+
+    python dev/benchmark_outlier_filter.py [number of plates] [fraction of missing positions]
+"""
+import sys
+import timeit
+
+import numpy as np
+
+from scanomatic.data_processing.norm import apply_outlier_filter, get_reference_positions, Offsets
+
+
+def get_plates(n_plates, missing):
+
+    np.random.seed(42)
+    rows, columns = np.mgrid[0:64, 0:96]
+    plates = []
+    for _ in range(n_plates):
+        plate = 2 + 0.01 * rows + 0.005 * columns + np.random.normal(0, 0.05, rows.shape)
+        plate[np.random.random(plate.shape) < missing] = np.nan
+        plate[np.random.random(plate.shape) < 0.005] *= 3
+        plates.append(plate)
+    return np.array(plates)
+
+
+def main(n_plates=4, missing=0.05, repeats=10):
+
+    plates = get_plates(n_plates, missing)
+    offsets = [Offsets.LowerRight() for _ in range(n_plates)]
+    grids = [plate[1::2, 1::2].copy() for plate in plates]
+
+    filter_time = min(timeit.repeat(
+        lambda: apply_outlier_filter([grid.copy() for grid in grids]), number=1, repeat=repeats))
+    reference_time = min(timeit.repeat(
+        lambda: get_reference_positions(plates.copy(), offsets), number=1, repeat=repeats))
+
+    print "{0} plates, {1:.0%} missing".format(n_plates, missing)
+    print "apply_outlier_filter on 32x48 grids: {0:.4f}s".format(filter_time)
+    print "get_reference_positions on 64x96 plates: {0:.4f}s".format(reference_time)
+
+
+if __name__ == "__main__":
+
+    args = sys.argv[1:]
+    main(n_plates=int(args[0]) if args else 4, missing=float(args[1]) if len(args) > 1 else 0.05)
@@ -0,0 +1,112 @@
+"""Runs concurrent requests against the QC endpoints of a running UI server.
+
+The requests go to a fixture project of synthetic growth curves that is
+made in the projects root of the settings with `--make-project`. Compare
+e.g. `scan-o-matic --workers 1` with `scan-o-matic --workers 4`.
+
+Usage:
+
+    python dev/load_test_ui_server.py --make-project
+    python dev/load_test_ui_server.py [--url URL] [--concurrency N] [--requests N]
+"""
+import os
+import time
+import urllib2
+from argparse import ArgumentParser
+from threading import Thread, Lock
+
+import numpy as np
+
+from scanomatic.data_processing.phenotyper import Phenotyper
+from scanomatic.io.app_config import Config
+
+ENDPOINTS = (
+    "/api/results/phenotype/GenerationTime/0/{project}",
+    "/api/results/quality_index/0/{project}",
+    "/api/results/plate_curves/0/{project}",
+    "/api/results/curves/0/1/1/{project}",
+)
+
+
+def make_project(project, rows=16, columns=24, n_times=120):
+
+    path = os.path.join(Config().paths.projects_root, project)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    np.random.seed(42)
+    times = np.arange(n_times) / 3.
+    lags = np.random.uniform(2, 6, (rows, columns, 1))
+    rates = np.random.uniform(0.2, 0.5, (rows, columns, 1))
+    log2_curves = np.minimum(17 + np.clip(times - lags, 0, None) * rates, 23)
+    data = np.power(2, log2_curves + np.random.normal(0, 0.02, log2_curves.shape))
+
+    phenotyper = Phenotyper(data[None, ...], times)
+    phenotyper.extract_phenotypes()
+    phenotyper.save_state(path, ask_if_overwrite=False)
+    print "Fixture project saved in {0}".format(path)
+
+
+def run(url, project, concurrency, n_requests):
+
+    urls = [url + endpoint.format(project=project) for endpoint in ENDPOINTS]
+    timings = {endpoint: [] for endpoint in ENDPOINTS}
+    failures = []
+    lock = Lock()
+    remaining = [n_requests]
+
+    def worker():
+
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+                index = remaining[0] % len(urls)
+
+            start = time.time()
+            try:
+                urllib2.urlopen(urls[index]).read()
+            except urllib2.URLError as e:
+                with lock:
+                    failures.append((urls[index], e))
+                continue
+
+            with lock:
+                timings[ENDPOINTS[index]].append(time.time() - start)
+
+    start = time.time()
+    threads = [Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.time() - start
+
+    print "{0} requests, {1} concurrent, {2:.1f} requests/s, {3} failed".format(
+        n_requests, concurrency, (n_requests - len(failures)) / duration, len(failures))
+
+    for endpoint in ENDPOINTS:
+        if timings[endpoint]:
+            print "{0:<45} median {1:7.1f} ms  95% {2:7.1f} ms".format(
+                endpoint.split("/{")[0], np.median(timings[endpoint]) * 1000,
+                np.percentile(timings[endpoint], 95) * 1000)
+
+    for failed_url, error in failures[:5]:
+        print "Failed {0}: {1}".format(failed_url, error)
+
+
+if __name__ == "__main__":
+
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--url", default="http://localhost:{0}".format(Config().ui_server.port))
+    parser.add_argument("--project", default="ui_server_load_test")
+    parser.add_argument("--make-project", dest="make_project", default=False, action='store_true')
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.make_project:
+        make_project(args.project)
+    else:
+        run(args.url, args.project, args.concurrency, args.requests)
@@ -0,0 +1,225 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from scanomatic.io.logger import Logger
+from scanomatic.data_processing.phenotyper import Phenotyper, NormState, NormalizationMethod, \
+    path_has_saved_project_state, infer_phenotype_from_name
+
+_logger = Logger("Batch Normalization")
+
+
+def find_project_states(paths):
+    """Find the saved project states at or below each path
+
+    Args:
+        paths: Directories that either are saved project states or
+            that hold project states in their sub-directories.
+
+    Returns: list of project state directories, each listed once
+    """
+    projects = []
+
+    for path in paths:
+
+        path = os.path.abspath(path)
+        if path_has_saved_project_state(path):
+            candidates = [path]
+        else:
+            candidates = sorted(
+                directory for directory, _, _ in os.walk(path) if path_has_saved_project_state(directory))
+
+        for candidate in candidates:
+            if candidate not in projects:
+                projects.append(candidate)
+
+    return projects
+
+
+def _get_pool(processes, tasks):
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    processes = min(processes, tasks)
+    if processes < 2 or multiprocessing.current_process().daemon:
+        return None
+
+    return multiprocessing.Pool(processes, maxtasksperchild=1)
+
+
+def _map_projects(func, tasks, processes):
+    """Map tasks over projects in a bounded number of processes.
+
+    Each worker process only handles one project so at most `processes`
+    projects are loaded at any time.
+    """
+    pool = _get_pool(processes, len(tasks))
+
+    if pool is None:
+        for task in tasks:
+            yield func(task)
+        return
+
+    try:
+        for result in pool.imap_unordered(func, tasks):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _get_float(value):
+
+    return None if value is np.ma.masked or value is None or not np.isfinite(value) else float(value)
+
+
+def _normalize_project(task):
+
+    path, method_name = task
+
+    try:
+        phenotyper = Phenotyper.LoadFromState(path, compact=True)
+        phenotyper.normalize_phenotypes(method=NormalizationMethod[method_name])
+        phenotyper.save_normalization_state(path)
+
+        medians = {
+            phenotype.name: [_get_float(value) for value in phenotyper.get_reference_median(phenotype)]
+            for phenotype in phenotyper.phenotypes_that_normalize if phenotype in phenotyper}
+
+    except Exception:
+        _logger.exception("Could not normalize project {0}".format(path))
+        return path, None
+
+    return path, medians
+
+
+def _save_project(task):
+
+    path, save_data_names, reference_values = task
+
+    try:
+        phenotyper = Phenotyper.LoadFromState(path, compact=True)
+        reference_values = {
+            infer_phenotype_from_name(name): tuple(values) for name, values in reference_values.iteritems()}
+
+        for save_data_name in save_data_names:
+            phenotyper.save_phenotypes(
+                dir_path=path, save_data=NormState[save_data_name], ask_if_overwrite=False,
+                reference_values=reference_values)
+
+    except Exception:
+        _logger.exception("Could not save normalized phenotypes of project {0}".format(path))
+        return path, False
+
+    return path, True
+
+
+class ReferenceValues(object):
+    """Running means of the reference position medians of plates over many projects.
+
+    Only the sums and counts are kept so memory use doesn't depend on the
+    number of projects.
+
+    Args:
+        group_by_plate: Optional, if plates are only comparable to plates at
+            the same index in other projects. Default is that all plates
+            are comparable.
+    """
+    def __init__(self, group_by_plate=False):
+
+        self._group_by_plate = group_by_plate
+        self._sums = {}
+        self._counts = {}
+
+    def _get_group(self, phenotype, plate):
+
+        return phenotype, (plate if self._group_by_plate else None)
+
+    def add(self, medians):
+        """Add the reference position medians of a project
+
+        Args:
+            medians: dict of phenotype name to list of plate medians (`None` if missing)
+        """
+        for phenotype, plate_medians in medians.iteritems():
+            for plate, median in enumerate(plate_medians):
+
+                if median is None:
+                    continue
+
+                group = self._get_group(phenotype, plate)
+                self._sums[group] = self._sums.get(group, 0.) + median
+                self._counts[group] = self._counts.get(group, 0) + 1
+
+    def get(self, phenotype, plate):
+        """Mean of the comparable plate medians or `None` if there are none"""
+
+        group = self._get_group(phenotype, plate)
+        if not self._counts.get(group, 0):
+            return None
+        return self._sums[group] / self._counts[group]
+
+    def get_project_values(self, medians):
+        """The reference values of each phenotype for the plates of a project
+
+        Args:
+            medians: dict of phenotype name to list of plate medians of the project
+
+        Returns: dict of phenotype name to list of reference values per plate
+        """
+        return {phenotype: [self.get(phenotype, plate) for plate, _ in enumerate(plate_medians)]
+                for phenotype, plate_medians in medians.iteritems()}
+
+
+def normalize_projects(project_paths, method=NormalizationMethod.Log2Difference, group_by_plate=False,
+                       save_data=(NormState.NormalizedRelative, NormState.NormalizedAbsoluteNonBatched),
+                       processes=None):
+    """Normalize many projects and export them using common reference values.
+
+    In a first pass each project is loaded and normalized, its normalized
+    phenotypes are saved, and the medians of its plates' reference positions
+    are added to the running `ReferenceValues`. The growth data and
+    phenotypes of the projects are not changed. In a second pass the
+    phenotypes of every project are exported with the common reference
+    values. Both passes are run in parallel with each process loading one
+    project at a time.
+
+    Args:
+        project_paths: The saved project states, see `find_project_states`
+        method: Optional normalization method, default is `NormalizationMethod.Log2Difference`.
+        group_by_plate: Optional, if reference values are per plate index instead of
+            over all plates, default is `False`
+        save_data: Optional, the `NormState`s to export as csv
+        processes: Optional number of processes, default is one per cpu
+
+    Returns: tuple of the `ReferenceValues` and a dict of project paths to
+        if they were successfully normalized and exported
+
+    See Also:
+        NormState.NormalizedAbsoluteNonBatched: How the reference values are used
+    """
+    reference_values = ReferenceValues(group_by_plate=group_by_plate)
+    project_medians = {}
+    status = {}
+
+    for path, medians in _map_projects(
+            _normalize_project, [(path, method.name) for path in project_paths], processes):
+
+        status[path] = medians is not None
+        if medians is None:
+            continue
+
+        reference_values.add(medians)
+        project_medians[path] = medians
+        _logger.info("Normalized {0} ({1}/{2})".format(path, len(status), len(project_paths)))
+
+    tasks = [(path, tuple(s.name for s in save_data), reference_values.get_project_values(medians))
+             for path, medians in project_medians.iteritems()]
+
+    for path, saved in _map_projects(_save_project, tasks, processes):
+        status[path] = saved
+        _logger.info("Saved normalized phenotypes of {0}".format(path))
+
+    return reference_values, status
@@ -1,6 +1,7 @@
 import numpy as np
 from enum import Enum
 import json
+import multiprocessing
 from itertools import izip
 import os
 import shutil
@@ -23,6 +24,8 @@ from scanomatic.io.meta_data import MetaData2 as MetaData
 from scanomatic.image_analysis.image_basics import (
     load_image_to_numpy, Image_Transpose)
 from scanomatic.image_analysis.first_pass_image import FixtureImage
+from scanomatic.image_analysis.grid_cell import GridCell
+from scanomatic.models.analysis_model import COMPARTMENTS
 
 """ Data structure for CCC-jsons
 {
@@ -701,22 +704,12 @@ def set_colony_compressed_data(
     only_update_included = True
     if image is not None:
         only_update_included = False
-        background = mid50_mean(image[background_filter].ravel())
-        if np.isnan(background):
-            _logger.error(
-                "The background had too little information to make mid50 mean")
+        compressed = _get_compressed_colony(
+            image, blob_filter, background_filter)
+        if compressed is None:
             return False
 
-        colony = image[blob_filter].ravel() - background
-
-        values, counts = zip(
-            *{k: (colony == k).sum() for k in
-              np.unique(colony).tolist()}.iteritems())
-
-        if np.sum(counts) != blob_filter.sum():
-            _logger.error(
-                "Counting mismatch between compressed format and blob filter")
-            return False
+        values, counts = compressed
 
         image_data = get_image_json_from_ccc(identifier, image_identifier)
         plate = image_data[CCCImage.plates][plate_id]
@@ -761,6 +754,221 @@ def set_colony_compressed_data(
 
     return True
 
+
+def _get_compressed_colony(image, blob_filter, background_filter):
+
+    background = mid50_mean(image[background_filter].ravel())
+    if np.isnan(background):
+        _logger.error(
+            "The background had too little information to make mid50 mean")
+        return None
+
+    colony = image[blob_filter].ravel() - background
+
+    values, counts = zip(
+        *{k: (colony == k).sum() for k in
+          np.unique(colony).tolist()}.iteritems())
+
+    if np.sum(counts) != blob_filter.sum():
+        _logger.error(
+            "Counting mismatch between compressed format and blob filter")
+        return None
+
+    return values, counts
+
+
+@_validate_ccc_edit_request
+def set_colonies_compressed_data(
+        identifier, image_identifier, plate_id, colonies):
+    """Set the compressed data of several colonies of a plate
+
+    The calibration is only saved once, after all colonies are set.
+
+    Args:
+        identifier: The CCC identifier
+        image_identifier: The image identifier
+        plate_id: The plate index
+        colonies: list of (x, y, image, blob_filter, background_filter)
+
+    Returns: list of the (x, y) positions that were set
+    """
+    ccc = __CCC[identifier]
+    image_data = get_image_json_from_ccc(identifier, image_identifier)
+    plate = image_data[CCCImage.plates][plate_id]
+    compressed_data = plate[CCCPlate.compressed_ccc_data]
+    positions = []
+
+    for x, y, image, blob_filter, background_filter in colonies:
+
+        compressed = _get_compressed_colony(
+            image, blob_filter, background_filter)
+        if compressed is None:
+            continue
+
+        while len(compressed_data) <= x:
+            compressed_data.append([])
+
+        while len(compressed_data[x]) <= y:
+            compressed_data[x].append(
+                {CCCMeasurement.included: False,
+                 CCCMeasurement.source_value_counts: [],
+                 CCCMeasurement.source_values: []})
+
+        values, counts = compressed
+        compressed_data[x][y][CCCMeasurement.included] = True
+        compressed_data[x][y][CCCMeasurement.source_value_counts] = counts
+        compressed_data[x][y][CCCMeasurement.source_values] = values
+        positions.append((x, y))
+
+    _save_ccc_to_disk(ccc)
+
+    return positions
+
+
+def get_colony_image(plate_image, grid, grid_cell_size, x, y):
+    """Cut out a colony from a plate slice
+
+    Args:
+        plate_image: The plate slice
+        grid: The gridding of the plate
+        grid_cell_size: (height, width) of a grid cell
+        x: The position, as in the API
+        y: The position, as in the API
+
+    Returns: The colony image and the (y, x) pixel position of its center
+    """
+    h, w = grid_cell_size
+    px_y, px_x = grid[:, grid.shape[1] - y, x]
+
+    colony_im = plate_image[
+        int(round(px_y - h / 2)): int(round(px_y + h / 2) + 1),
+        int(round(px_x - w / 2)): int(round(px_x + w / 2) + 1)
+    ]
+
+    return colony_im, (px_y, px_x)
+
+
+def detect_colony(colony_im):
+    """Detect the blob and background of a grayscale calibrated colony
+
+    Args:
+        colony_im: The colony image
+
+    Returns: dict with the image and the blob and background filters
+    """
+    # first plate, upper left colony (just need something):
+    identifier = ["unknown_image", 0, [0, 0]]
+
+    grid_cell = GridCell(identifier, None, save_extra_data=False)
+    grid_cell.source = colony_im.astype(np.float64)
+
+    grid_cell.attach_analysis(
+        blob=True, background=True, cell=True,
+        run_detect=False)
+
+    grid_cell.detect(remember_filter=False)
+
+    return {
+        'image': grid_cell.source,
+        'blob': grid_cell.get_item(COMPARTMENTS.Blob).filter_array,
+        'background': grid_cell.get_item(
+            COMPARTMENTS.Background).filter_array,
+    }
+
+
+def _get_pool(processes, tasks):
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    processes = min(processes, tasks)
+    if processes < 2 or multiprocessing.current_process().daemon:
+        return None
+
+    return multiprocessing.Pool(processes)
+
+
+def detect_colonies(
+        identifier, image_identifier, plate_id, positions, processes=1):
+    """Detect several colonies of a plate
+
+    The grayscale transformed plate slice and the gridding are loaded
+    once and the colonies are detected, optionally in parallel worker
+    processes.
+
+    Args:
+        identifier: The CCC identifier
+        image_identifier: The image identifier
+        plate_id: The plate index
+        positions: list of (x, y) positions, as in the API
+        processes: Optional, number of worker processes, default is to
+            detect in the current process. `None` uses one per cpu. Avoid
+            worker processes in threaded servers, since forking copies
+            any locks held by other threads.
+
+    Returns: list with for each position either `None` if it is outside
+        the grid or a dict as by `detect_colony` also including the
+        `grid_position`.
+
+    Raises:
+        ValueError: If the plate slice, gridding or image is missing
+    """
+    plate_image = get_plate_slice(identifier, image_identifier, plate_id, True)
+    if plate_image is None:
+        raise ValueError("Image plate slice hasn't been prepared probably")
+
+    try:
+        grid = np.load(Paths().ccc_image_plate_grid_pattern.format(
+            identifier, image_identifier, plate_id))
+    except IOError:
+        raise ValueError("Gridding is missing")
+
+    image_json = get_image_json_from_ccc(identifier, image_identifier)
+    if not image_json or plate_id not in image_json[CCCImage.plates]:
+        raise ValueError("Image id not known or plate not know")
+
+    grid_cell_size = image_json[CCCImage.plates][plate_id][
+        CCCPlate.grid_cell_size]
+    transpose_polynomial = Image_Transpose(
+        sourceValues=image_json[CCCImage.grayscale_source_values],
+        targetValues=image_json[CCCImage.grayscale_target_values])
+
+    colony_images = []
+    grid_positions = []
+    for x, y in positions:
+        try:
+            colony_im, grid_position = get_colony_image(
+                plate_image, grid, grid_cell_size, x, y)
+        except IndexError:
+            colony_im = grid_position = None
+        else:
+            colony_im = transpose_polynomial(colony_im.astype(np.float64))
+        colony_images.append(colony_im)
+        grid_positions.append(grid_position)
+
+    tasks = [im for im in colony_images if im is not None]
+    pool = _get_pool(processes, len(tasks))
+    if pool is None:
+        detections = map(detect_colony, tasks)
+    else:
+        try:
+            detections = pool.map(detect_colony, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    detections = iter(detections)
+    results = []
+    for colony_im, grid_position in izip(colony_images, grid_positions):
+        if colony_im is None:
+            results.append(None)
+        else:
+            detection = next(detections)
+            detection['grid_position'] = grid_position
+            results.append(detection)
+
+    return results
+
 if not __CCC:
     __load_cccs()
 
@@ -0,0 +1,194 @@
+import multiprocessing
+from itertools import izip
+
+import numpy as np
+
+from scanomatic.io.logger import Logger
+from scanomatic.data_processing.growth_phenotypes import get_fit_r_square, CHAPMAN_RICHARDS_P0
+
+_logger = Logger("Chapman-Richards Fitter")
+
+GOOD_FIT = 0.95
+"""The fit (r-square) a curve must have to seed other fits"""
+SEED_STRIDE = 4
+"""Every n:th row and column is fitted first to seed the other fits"""
+CHUNK_SIZE = 24
+"""Number of curves fitted per task sent to the pool"""
+FIT_SIZE = 6
+"""The fit followed by the five model parameters"""
+
+
+def _fit_curves(task):
+
+    times, curves, seeds = task
+    return [np.hstack(get_fit_r_square(times, curve, seed)) for curve, seed in izip(curves, seeds)]
+
+
+def get_pool(processes=None):
+    """Get a process pool for fitting, if the current process can have one
+
+    Args:
+        processes: Optional number of processes, default is one per cpu
+
+    Returns: multiprocessing.Pool or `None` if fitting should be done in this process
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    if processes < 2:
+        return None
+
+    if multiprocessing.current_process().daemon:
+        _logger.info("Daemonic processes can't have children, fitting in current process")
+        return None
+
+    try:
+        return multiprocessing.Pool(processes)
+    except (OSError, AssertionError):
+        _logger.warning("Could not start a process pool, fitting in current process")
+        return None
+
+
+def _map_fits(times, curves, seeds, pool):
+
+    if not len(curves):
+        return np.zeros((0, FIT_SIZE))
+
+    if pool is None or len(curves) <= CHUNK_SIZE:
+        return np.array(_fit_curves((times, curves, seeds)))
+
+    tasks = [(times, curves[i: i + CHUNK_SIZE], seeds[i: i + CHUNK_SIZE])
+             for i in xrange(0, len(curves), CHUNK_SIZE)]
+    return np.vstack([np.array(fits) for fits in pool.map(_fit_curves, tasks)])
+
+
+def _get_good(fits):
+
+    with np.errstate(invalid='ignore'):
+        return np.isfinite(fits).all(axis=-1) & (fits[..., 0] >= GOOD_FIT) & (fits[..., 0] <= 1)
+
+
+def _get_seeds(fits, targets, fallback):
+    """Parameters of the nearest converged fit for each target position"""
+
+    known = np.array(np.where(_get_good(fits))).T
+    targets = np.array(targets).reshape(-1, 2)
+
+    if not known.size:
+        return np.array([fallback for _ in targets])
+
+    distances = np.square(targets[:, np.newaxis, :] - known[np.newaxis, :, :]).sum(axis=-1)
+    nearest = known[distances.argmin(axis=1)]
+    return fits[nearest[:, 0], nearest[:, 1], 1:]
+
+
+def fit_plate(times, log2_plate, positions=None, previous=None, pool=None):
+    """Fit the extended Chapman-Richards model to the curves of a plate.
+
+    Instead of starting every fit from the same parameters, every
+    `SEED_STRIDE` row and column is first fitted from the default
+    parameters. Each other fit starts from the parameters of the nearest
+    of these that fits well, or their median if none does. Curves that
+    still fit poorly are refitted from the median and the default
+    parameters and the best fit is kept.
+
+    A fit thus only depends on its own curve and the seeding curves, so
+    refitting some positions gives the same fits as fitting the whole
+    plate. The seeding curves are always fitted, which costs about a
+    `SEED_STRIDE` squared:th of fitting the whole plate.
+
+    Args:
+        times: The times of the curves
+        log2_plate: 3D array of log2 population sizes
+        positions: Optional 2D boolean array of curves to fit, default is all
+        previous: Optional 3D array of earlier fits as returned by this function
+        pool: Optional process pool to run the fits in
+
+    Returns: 3D float array with the fit followed by the five parameters per curve.
+        Positions not fitted keep their `previous` values.
+    """
+    shape = log2_plate.shape[:2]
+    if previous is not None and previous.shape == shape + (FIT_SIZE,):
+        fits = np.array(previous, dtype=np.float)
+    else:
+        fits = np.ones(shape + (FIT_SIZE,)) * np.nan
+
+    if positions is None:
+        positions = np.ones(shape, dtype=bool)
+    if not positions.any():
+        return fits
+
+    grid = np.zeros(shape, dtype=bool)
+    grid[::SEED_STRIDE, ::SEED_STRIDE] = True
+    seeding = np.ones(shape + (FIT_SIZE,)) * np.nan
+    seeding[grid] = _map_fits(
+        times, log2_plate[grid], np.array([CHAPMAN_RICHARDS_P0 for _ in range(grid.sum())]), pool)
+
+    good = _get_good(seeding)
+    median_p0 = np.median(seeding[good, 1:], axis=0) if good.any() else CHAPMAN_RICHARDS_P0
+
+    fits[positions & grid] = seeding[positions & grid]
+    targets = np.where(positions & ~grid)
+    fits[targets] = _map_fits(times, log2_plate[targets], _get_seeds(seeding, zip(*targets), median_p0), pool)
+
+    poor = positions & ~_get_good(fits) & np.isfinite(log2_plate).any(axis=-1)
+    if poor.any():
+        for p0 in (median_p0, CHAPMAN_RICHARDS_P0):
+            retry = _map_fits(times, log2_plate[poor], np.array([p0 for _ in range(poor.sum())]), pool)
+            better = np.nan_to_num(retry[:, 0]) > np.nan_to_num(fits[poor][:, 0])
+            improved = fits[poor]
+            improved[better] = retry[better]
+            fits[poor] = improved
+
+    return fits
+
+
+def fit_plates(times, log2_plates, positions=None, previous=None, processes=1):
+    """Fit the extended Chapman-Richards model to all curves of several plates
+
+    Args:
+        times: The times of the curves
+        log2_plates: List of 3D arrays of log2 population sizes (`None` for plates to skip)
+        positions: Optional list of 2D boolean arrays of the curves to fit
+        previous: Optional list of earlier fits, kept where not fitted
+        processes: Optional number of processes to use, default is to fit
+            in the current process. `None` uses one per cpu.
+
+    Returns: list of 3D arrays of fit followed by the parameters per curve
+
+    See Also:
+        fit_plate: How fits are started
+    """
+    curves = sum(
+        0 if log2_plate is None else
+        np.prod(log2_plate.shape[:2]) if positions is None or positions[id_plate] is None else
+        positions[id_plate].sum()
+        for id_plate, log2_plate in enumerate(log2_plates))
+
+    pool = get_pool(processes) if curves > CHUNK_SIZE else None
+    fits = []
+
+    try:
+        for id_plate, log2_plate in enumerate(log2_plates):
+
+            if log2_plate is None:
+                fits.append(None)
+                continue
+
+            plate_positions = None if positions is None else positions[id_plate]
+            if plate_positions is not None and not plate_positions.any() and previous is not None:
+                fits.append(previous[id_plate])
+                continue
+
+            fits.append(fit_plate(
+                times, log2_plate, positions=plate_positions,
+                previous=None if previous is None else previous[id_plate],
+                pool=pool))
+
+            _logger.info("Plate {0} Chapman-Richards fits done".format(id_plate + 1))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return fits
@@ -7,6 +7,8 @@ from scanomatic.io.logger import Logger
 
 _logger = Logger("Growth Phenotypes")
 
+CHAPMAN_RICHARDS_P0 = np.array([1.64, -0.1, -2.46, 0.1, 15.18], dtype=np.float)
+
 
 def _linreg_helper(X, Y):
     return linregress(X, Y)[0::4]
@@ -33,15 +35,17 @@ def get_derivative(curve_strided, times_strided):
 
 
 def get_preprocessed_data_for_phenotypes(curve, curve_strided, flat_times, times_strided, index_for_48h,
-                                         position_offset):
+                                         position_offset, chapman_richards_fit=None):
 
-    curve_logged = np.log2(curve)
     derivative_values_log2, derivative_errors = get_derivative(curve_strided, times_strided)
 
+    if chapman_richards_fit is None:
+        chapman_richards_fit = get_fit_r_square(flat_times, np.log2(curve))
+
     return {
         'curve_smooth_growth_data': np.ma.masked_invalid(curve),
         'index48h': index_for_48h,
-        'chapman_richards_fit': get_fit_r_square(flat_times, curve_logged),
+        'chapman_richards_fit': chapman_richards_fit,
         'derivative_values_log2': np.ma.masked_invalid(derivative_values_log2),
         'derivative_errors': np.ma.masked_invalid(derivative_errors),
         'linregress_extent': position_offset,
@@ -179,7 +183,7 @@ def get_chapman_richards_4parameter_extended_curve(x_data, b0, b1, b2, b3, d):
     return d + b0 * np.power(1.0 - b1 * np.exp(-b2 * x_data), 1.0 / (1.0 - b3))
 
 
-def get_fit_r_square(x_data, y_data, p0=np.array([1.64, -0.1, -2.46, 0.1, 15.18], dtype=np.float)):
+def get_fit_r_square(x_data, y_data, p0=CHAPMAN_RICHARDS_P0):
     """x_data and y_data must be 1D, y_data must be log2"""
 
     finite_y = np.isfinite(y_data)
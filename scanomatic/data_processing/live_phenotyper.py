@@ -0,0 +1,327 @@
+import json
+import os
+import time
+
+import numpy as np
+from scipy.ndimage import median_filter
+
+import scanomatic.io.paths as paths
+from scanomatic.data_processing.growth_phenotypes import Phenotypes
+from scanomatic.data_processing.phenotyper import Phenotyper, EdgeCondition
+
+
+class LivePhenotyper(Phenotyper):
+    """A `Phenotyper` that is kept up to date while an experiment is running.
+
+    Colony values from each new image are added as soon as the image analysis
+    has produced them. Images may arrive in any order, only the part of each
+    smoothed curve that the new time point reaches is smoothed again and then
+    the robust early phenotypes are updated for all curves. Nothing is
+    smoothed until there are enough images for the linear regression.
+
+    The early phenotypes are the growth lag, the current generation time and
+    the yield and population doublings so far. A lightweight summary of them
+    can be published as a json snapshot for the UI to poll.
+
+    <code>
+    live = LivePhenotyper.LoadFromImage(plates, time)
+    live.add_image(next_plates, next_time)
+    live.publish_snapshot(analysis_directory)
+    </code>
+    """
+
+    EARLY_PHENOTYPES = (
+        Phenotypes.GrowthLag,
+        Phenotypes.GenerationTime,
+        Phenotypes.ExperimentGrowthYield,
+        Phenotypes.ExperimentPopulationDoublings,
+    )
+
+    def __init__(self, raw_growth_data, times_data=None, power=3, time_delta=5.1, gauss_sigma=1.5,
+                 apply_median=True, edge_condition=EdgeCondition.Reflect, **kwargs):
+
+        super(LivePhenotyper, self).__init__(raw_growth_data, times_data=times_data, run_extraction=False, **kwargs)
+
+        self._power = power
+        self._time_delta = time_delta
+        self._gauss_sigma = gauss_sigma
+        self._apply_median = apply_median
+        self._edge_condition = edge_condition
+        self._updated = None
+
+        self._smooth_growth_data = np.array(
+            [None if plate is None else np.ones(plate.shape) * np.nan for plate in self._raw_growth_data])
+
+        if self._has_enough_images:
+            self._smoothen_all()
+
+        self._calculate_early_phenotypes()
+
+    @classmethod
+    def LoadFromImage(cls, plates, time_point, **kwargs):
+        """Start a live phenotyper from the first analysed image
+
+        Args:
+            plates: List of 2D arrays of colony values per plate (`None` for plates not analysed).
+            time_point: The time of the image in hours.
+
+        Returns: LivePhenotyper
+        """
+        return cls(
+            np.array([None if plate is None else np.asarray(plate, dtype=np.float)[..., np.newaxis]
+                      for plate in plates]),
+            np.array([time_point], dtype=np.float),
+            **kwargs)
+
+    @property
+    def updated(self):
+
+        return self._updated
+
+    @property
+    def _has_enough_images(self):
+
+        return self.times.size >= self._linear_regression_size
+
+    def _smoothen_all(self):
+
+        self._poly_smoothen_raw_growth_weighted(
+            power=self._power, time_delta=self._time_delta, gauss_sigma=self._gauss_sigma,
+            apply_median=self._apply_median, edge_condition=self._edge_condition)
+
+    def add_image(self, plates, time_point):
+        """Add the colony values of a newly analysed image
+
+        Args:
+            plates: List of 2D arrays of colony values per plate (`None` for plates not analysed).
+            time_point: The time of the image in hours.
+                If the time point already exists its values are replaced.
+        """
+        times = self.times
+        index = np.searchsorted(times, time_point)
+        inserted = index == times.size or times[index] != time_point
+
+        if inserted:
+            self.times = np.insert(times, index, time_point)
+
+        raw_data = []
+        previous_smooth = []
+        for id_plate, (plate, values) in enumerate(zip(self._raw_growth_data, plates)):
+
+            if plate is None:
+                if values is not None:
+                    self._logger.warning("Plate {0} was not included from the start, ignoring it".format(
+                        id_plate + 1))
+                raw_data.append(None)
+                previous_smooth.append(None)
+                continue
+
+            values = np.ones(plate.shape[:2]) * np.nan if values is None else np.asarray(values, dtype=np.float)
+
+            if inserted:
+                raw_data.append(np.insert(plate, index, values, axis=-1))
+                previous_smooth.append(
+                    np.insert(self._smooth_growth_data[id_plate], index, np.nan, axis=-1))
+            else:
+                plate[..., index] = values
+                raw_data.append(plate)
+                previous_smooth.append(self._smooth_growth_data[id_plate])
+
+        self._raw_growth_data = np.array(raw_data)
+        self._data = self._raw_growth_data
+        self._smooth_growth_data = np.array(previous_smooth)
+
+        if self._has_enough_images:
+            if inserted and self.times.size == self._linear_regression_size:
+                self._smoothen_all()
+            else:
+                self._update_smoothing_around(index)
+
+        self._calculate_early_phenotypes()
+
+    def _get_rows_to_update(self, index):
+        """The time points whose smoothed values may have been changed by new data at `index`.
+
+        The median filter spreads the change half its kernel size in each direction
+        and each smoothed value depends on data less than two time deltas away.
+        If the change reaches the data used for the edge condition at either end
+        of the curve the smoothed values that the edge condition reaches are included too.
+        """
+        times = self.times
+        delta = self._time_delta
+        tolerance = 1e-9
+        half_kernel = (self._median_kernel_size - 1) / 2 if self._apply_median else 0
+        first = times[max(index - half_kernel, 0)]
+        last = times[min(index + half_kernel, times.size - 1)]
+
+        rows = (times > first - 2 * delta - tolerance) & (times < last + 2 * delta + tolerance)
+
+        if self._edge_condition is not EdgeCondition.Valid:
+
+            if first < times[0] + delta + tolerance:
+                rows |= times < 2 * delta + tolerance
+
+            if last > times[-1] - delta - tolerance:
+                rows |= times > 2 * times[-1] - 3 * delta - tolerance
+
+        return rows
+
+    def _update_smoothing_around(self, index):
+
+        times, filt, left_filt, right_filt = self._get_weighted_smoothing_times(
+            self.times, self._time_delta, self._edge_condition)
+
+        rows = self._get_rows_to_update(index)
+        median_kernel = np.ones((1, self._median_kernel_size))
+
+        for plate, smooth_plate in zip(self._raw_growth_data, self._smooth_growth_data):
+
+            if plate is None:
+                continue
+
+            log2_data = np.log2(plate).reshape(np.prod(plate.shape[:2]), plate.shape[-1])
+
+            if self._apply_median:
+                log2_data[...] = median_filter(log2_data, footprint=median_kernel, mode='reflect')
+
+            smooth_flat = smooth_plate.reshape(log2_data.shape)
+
+            for id_curve, log2_curve in enumerate(log2_data):
+
+                smooth_curve = np.array(self._poly_smoothen_raw_growth_curve_weighted(
+                    times, log2_curve, self._power, filt, left_filt, right_filt, self._gauss_sigma,
+                    self._edge_condition, np.unravel_index(id_curve, plate.shape[:2]), rows=rows))
+
+                smooth_flat[id_curve, rows] = smooth_curve[rows]
+
+    def _get_plate_derivatives(self, plate):
+
+        times_strided = self.times_strided
+        log2_strided = np.log2(self._get_plate_linear_regression_strided(plate))
+        finites = np.isfinite(log2_strided)
+        n = finites.sum(axis=-1).astype(np.float)
+
+        x = np.where(finites, times_strided, 0)
+        y = np.where(finites, log2_strided, 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_mean = x.sum(axis=-1) / n
+            y_mean = y.sum(axis=-1) / n
+            x_delta = np.where(finites, x - x_mean[..., np.newaxis], 0)
+            y_delta = np.where(finites, y - y_mean[..., np.newaxis], 0)
+            slopes = (x_delta * y_delta).sum(axis=-1) / np.square(x_delta).sum(axis=-1)
+
+        slopes[n < self._linear_regression_size - 1] = np.nan
+        return slopes
+
+    def _calculate_early_phenotypes(self):
+
+        position_offset = (self._linear_regression_size - 1) / 2
+        has_regression = self._has_enough_images
+        all_phenotypes = []
+
+        for plate in self._smooth_growth_data:
+
+            if plate is None:
+                all_phenotypes.append(None)
+                continue
+
+            phenotypes = {p: np.ones(plate.shape[:2], dtype=np.float) * np.nan for p in self.EARLY_PHENOTYPES}
+            all_phenotypes.append(phenotypes)
+
+            if not has_regression:
+                continue
+
+            derivatives = self._get_plate_derivatives(plate)
+
+            for pos_index, derivative in enumerate(derivatives):
+
+                position = np.unravel_index(pos_index, plate.shape[:2])
+                curve = np.ma.masked_invalid(plate[position])
+
+                if curve.mask.all():
+                    continue
+
+                curve_data = {
+                    'curve_smooth_growth_data': curve,
+                    'derivative_values_log2': np.ma.masked_invalid(derivative),
+                    'flat_times': self.times,
+                    'linregress_extent': position_offset,
+                }
+
+                for phenotype in self.EARLY_PHENOTYPES:
+                    phenotypes[phenotype][position] = phenotype(**curve_data)
+
+        self._phenotypes = np.array(all_phenotypes)
+        self._init_remove_filter_and_undo_actions()
+        self._updated = time.time()
+
+    def get_snapshot(self):
+        """Get a summary of the current state that can be serialized to json
+
+        Returns: dict
+            With the number of images, the most recent time, when it was updated and
+            per plate the median of each early phenotype, the fraction of positions
+            that have grown beyond the no growth population doublings threshold and
+            the phenotype values per position (`None` where there's no value).
+        """
+        plates = []
+
+        for plate in self._phenotypes:
+
+            if plate is None:
+                plates.append(None)
+                continue
+
+            doublings = plate[Phenotypes.ExperimentPopulationDoublings]
+            plates.append({
+                'shape': list(doublings.shape),
+                'growing_fraction': float(
+                    (np.nan_to_num(doublings) >= self._no_growth_pop_doublings_threshold).mean()),
+                'medians': {
+                    p.name: (float(np.median(plate[p][np.isfinite(plate[p])]))
+                             if np.isfinite(plate[p]).any() else None)
+                    for p in self.EARLY_PHENOTYPES},
+                'phenotypes': {
+                    p.name: np.where(np.isfinite(plate[p]), plate[p], None).tolist()
+                    for p in self.EARLY_PHENOTYPES},
+            })
+
+        return {
+            'images': int(self.times.size),
+            'last_time': float(self.times.max()) if self.times.size else None,
+            'updated': self._updated,
+            'plates': plates,
+        }
+
+    def publish_snapshot(self, directory_path):
+        """Write the current snapshot so the UI can poll it.
+
+        The file is replaced atomically so readers never see partial snapshots.
+
+        Args:
+            directory_path: The analysis directory of the project
+        """
+        path = os.path.join(directory_path, paths.Paths().phenotypes_live_snapshot)
+        temporary_path = path + ".tmp"
+
+        with open(temporary_path, 'w') as fh:
+            json.dump(self.get_snapshot(), fh)
+
+        os.rename(temporary_path, path)
+        self._logger.info("Published live phenotypes for {0} images to '{1}'".format(self.times.size, path))
+
+
+def load_snapshot(directory_path):
+    """Load the most recently published live snapshot
+
+    Args:
+        directory_path: The analysis directory of the project
+
+    Returns: The snapshot dict or `None` if there is none
+    """
+    try:
+        with open(os.path.join(directory_path, paths.Paths().phenotypes_live_snapshot), 'r') as fh:
+            return json.load(fh)
+    except (IOError, ValueError):
+        return None
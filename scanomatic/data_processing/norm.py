@@ -3,10 +3,13 @@
 #
 
 from enum import Enum
+from itertools import izip
 import numpy as np
 from types import StringTypes
-from scipy.interpolate import griddata
-from scipy.ndimage import gaussian_filter, sobel, laplace, convolve, generic_filter, median_filter
+from scipy.interpolate import griddata, CloughTocher2DInterpolator
+from scipy.sparse import csr_matrix
+from scipy.spatial import Delaunay, cKDTree
+from scipy.ndimage import gaussian_filter, sobel, laplace, convolve, median_filter
 from scipy.stats import pearsonr
 
 #
@@ -120,7 +123,7 @@ def get_downsampled_plates(data, subsampling="BR"):
 
         d1, d2 = np.where(offset)
 
-        out.append(plate[d1::2, d2::2])
+        out.append(plate[d1[0]::2, d2[0]::2])
 
     return out
 
@@ -444,6 +447,157 @@ def get_normalisation_surface(control_positions_filtered_data, control_position_
 
     return out
 
+
+class NormalisationPlan(object):
+    """Reusable interpolation of normalisation surfaces for one plate.
+
+    The triangulation of the control positions, the barycentric weights
+    of the linear interpolation and the nearest control positions are
+    calculated once per set of control positions with finite values and
+    then reused for any number of phenotypes. Phenotypes that share the
+    same finite control positions are interpolated together.
+
+    The surfaces are the same as those of `get_normalisation_surface`
+    for two dimensional plates.
+
+    Args:
+        shape: The shape of the plate
+        offset: The control positions offset array, see `Offsets`
+        norm_sequence: Optional interpolation method order,
+            default is ('cubic', 'linear', 'nearest')
+    """
+    def __init__(self, shape, offset, norm_sequence=('cubic', 'linear', 'nearest')):
+
+        self._shape = tuple(shape[:2])
+        self._norm_sequence = norm_sequence
+        self._control_positions = np.where(np.tile(offset, [a / b for a, b in zip(self._shape, offset.shape)]))
+        self._grid = np.array(
+            np.mgrid[0:self._shape[0], 0:self._shape[1]].reshape(2, -1).T, dtype=np.float)
+        self._interpolations = {}
+
+    @property
+    def shape(self):
+
+        return self._shape
+
+    def _get_interpolation(self, anchors):
+
+        key = anchors.tostring()
+        if key not in self._interpolations:
+            self._interpolations[key] = {
+                'points': np.array(self._control_positions, dtype=np.float).T[anchors]}
+        return self._interpolations[key]
+
+    @staticmethod
+    def _get_triangulation(interpolation):
+
+        if 'triangulation' not in interpolation:
+            interpolation['triangulation'] = Delaunay(interpolation['points'])
+        return interpolation['triangulation']
+
+    def _get_linear_weights(self, interpolation):
+
+        if 'linear' not in interpolation:
+
+            triangulation = self._get_triangulation(interpolation)
+            simplices = triangulation.find_simplex(self._grid)
+            inside = simplices >= 0
+            transforms = triangulation.transform[simplices[inside]]
+            barycentric = np.einsum(
+                'ijk,ik->ij', transforms[:, :2, :], self._grid[inside] - transforms[:, 2, :])
+            weights = np.c_[barycentric, 1 - barycentric.sum(axis=1)]
+
+            interpolation['linear'] = (
+                csr_matrix(
+                    (weights.ravel(),
+                     (np.repeat(np.flatnonzero(inside), weights.shape[1]),
+                      triangulation.simplices[simplices[inside]].ravel())),
+                    shape=(self._grid.shape[0], interpolation['points'].shape[0])),
+                inside)
+
+        return interpolation['linear']
+
+    def _interpolate(self, interpolation, method, values):
+
+        if method == 'nearest':
+
+            if 'nearest' not in interpolation:
+                interpolation['nearest'] = cKDTree(interpolation['points']).query(self._grid)[1]
+            return values[interpolation['nearest']]
+
+        elif method == 'linear':
+
+            weights, inside = self._get_linear_weights(interpolation)
+            estimates = weights.dot(values)
+            estimates[inside == np.False_] = np.nan
+            return estimates
+
+        elif method == 'cubic':
+
+            return CloughTocher2DInterpolator(
+                self._get_triangulation(interpolation), values, fill_value=np.nan)(self._grid)
+
+        raise ValueError("Unknown interpolation method '{0}'".format(method))
+
+    def get_surfaces(self, plates):
+        """Construct the normalisation surfaces of several phenotypes
+
+        Args:
+            plates: The plates' control position filtered data,
+                one 2D array per phenotype.
+
+        Returns: list of normalisation surfaces
+        """
+        surfaces = np.array([np.array(plate, dtype=np.float).ravel() for plate in plates])
+        if not surfaces.size:
+            return []
+
+        control_indices = np.ravel_multi_index(self._control_positions, self._shape)
+        finite_anchors = np.isfinite(surfaces[:, control_indices])
+
+        groups = {}
+        for id_surface, anchors in enumerate(finite_anchors):
+            groups.setdefault(anchors.tostring(), []).append(id_surface)
+
+        for members in groups.itervalues():
+
+            anchors = finite_anchors[members[0]]
+            if anchors.sum() < 4:
+                continue
+
+            interpolation = self._get_interpolation(anchors)
+            values = surfaces[members][:, control_indices[anchors]].T
+            group_surfaces = surfaces[members].T
+
+            for method in self._norm_sequence:
+
+                missing = np.isnan(group_surfaces)
+                if not missing.any():
+                    break
+
+                group_surfaces[missing] = self._interpolate(interpolation, method, values)[missing]
+
+            surfaces[members] = group_surfaces.T
+
+        return [surface.reshape(self._shape) for surface in surfaces]
+
+
+def get_normalisation_plans(data, offsets=None, norm_sequence=('cubic', 'linear', 'nearest')):
+    """Construct reusable normalisation plans for each plate
+
+    Args:
+        data: The plates, only their shapes are used
+        offsets: Optional control position offsets, default is `Offsets.LowerRight` on all plates
+        norm_sequence: Optional interpolation method order
+
+    Returns: list of `NormalisationPlan` (`None` for plates without data)
+    """
+    if offsets is None:
+        offsets = [Offsets.LowerRight() for _ in range(len(data))]
+
+    return [None if plate is None else NormalisationPlan(plate.shape, offset, norm_sequence=norm_sequence)
+            for plate, offset in zip(data, offsets)]
+
 #
 #   METHODS: Apply functions
 #
@@ -451,6 +605,32 @@ def get_normalisation_surface(control_positions_filtered_data, control_position_
 #
 
 
+def _get_nan_filled(plate, size):
+    """Replace nans with the median of the finite values in the window around them.
+
+    Edges are extended with their nearest value.
+    """
+    nans = np.isnan(plate)
+    if not nans.any():
+        return plate
+
+    padding = tuple((v / 2, v / 2) for v in size)
+    padded = np.pad(plate, padding, mode='edge')
+    windows = np.lib.stride_tricks.as_strided(
+        padded, shape=plate.shape + tuple(size), strides=padded.strides + padded.strides)
+
+    candidates = windows[nans].reshape(nans.sum(), -1)
+    candidates = np.sort(np.where(np.isfinite(candidates), candidates, np.nan), axis=1)
+    n_finite = np.isfinite(candidates).sum(axis=1)
+    rows = np.arange(candidates.shape[0])
+    low = candidates[rows, np.clip((n_finite - 1) / 2, 0, None)]
+    high = candidates[rows, np.clip(n_finite / 2, 0, candidates.shape[1] - 1)]
+
+    filled = plate.copy()
+    filled[nans] = np.where(n_finite > 0, (low + high) / 2., np.nan)
+    return filled
+
+
 def apply_outlier_filter(data, median_filter_size=(3, 3), measure=None, k=2.0, p=10, max_iterations=10):
     """Checks all positions in each array and filters those outside
     set boundries based upon their peak/valey properties using
@@ -473,19 +653,8 @@ def apply_outlier_filter(data, median_filter_size=(3, 3), measure=None, k=2.0, p
                                 applied
     """
 
-    def nan_filler(item):
-        if np.isnan(item[kernel_center]):
-
-            return np.median(item[np.isfinite(item)])
-
-        else:
-
-            return item[kernel_center]
-
     if median_filter_size is not None:
 
-        kernel_center = (np.prod(median_filter_size) - 1) / 2
-
         assert np.array([v % 2 == 1 for v in median_filter_size]).all(), "nanFillSize can only have odd values"
 
     laplace_kernel = np.array([
@@ -512,7 +681,7 @@ def apply_outlier_filter(data, median_filter_size=(3, 3), measure=None, k=2.0, p
             if median_filter_size is not None:
 
                 # Apply median filter to fill nans
-                plate_copy = generic_filter(plate_copy, nan_filler, size=median_filter_size, mode="nearest")
+                plate_copy = _get_nan_filled(plate_copy, median_filter_size)
 
             # Apply laplace
             plate_copy = convolve(plate_copy, laplace_kernel, mode="nearest")
@@ -529,19 +698,26 @@ def apply_outlier_filter(data, median_filter_size=(3, 3), measure=None, k=2.0, p
             mu = plate_copy_ravel.mean()
             z_scores = np.abs(plate_copy_ravel.data - mu)
 
-            for pos in np.argsort(z_scores)[::-1]:
-                if np.isnan(plate_ravel[pos]) or \
-                        z_scores[pos] > k * sigma / np.exp(-(np.isfinite(plate_ravel).sum() /
-                                                             float(plate_ravel.size)) ** p):
+            # Positions are tested from the highest z-score until one passes.
+            # If the ravel is a view of the plate, each removal lowers the
+            # fraction of finite positions that the threshold is adjusted by.
+            order = np.argsort(z_scores)[::-1]
+            was_nan = np.isnan(plate_ravel[order])
+            finite_removed = np.zeros(order.size, dtype=np.int)
+            if np.may_share_memory(plate_ravel, plate):
+                finite_removed[1:] = np.cumsum(np.isfinite(plate_ravel[order]))[:-1]
 
-                    if measure is None:
-                        plate[pos / plate.shape[1], pos % plate.shape[1]] = np.nan
-                    else:
-                        plate[pos / plate.shape[1], pos % plate.shape[1], measure] = np.nan
+            finite_fraction = (np.isfinite(plate_ravel).sum() - finite_removed) / float(plate_ravel.size)
+            with np.errstate(invalid='ignore'):
+                removed = was_nan | (z_scores[order] > k * sigma / np.exp(-finite_fraction ** p))
 
-                else:
+            n_removed = order.size if removed.all() else removed.argmin()
+            positions = order[:n_removed]
 
-                    break
+            if measure is None:
+                plate[positions / plate.shape[1], positions % plate.shape[1]] = np.nan
+            else:
+                plate[positions / plate.shape[1], positions % plate.shape[1], measure] = np.nan
 
             if measure is None:
                 new_nans = np.isnan(plate).sum()
@@ -734,6 +910,60 @@ def get_normalized_data(data, offsets=None, method=norm_by_log2_diff):
     return normalisation(data, surface, method=method, std=std)
 
 
+def get_normalized_phenotypes(phenotypes_data, offsets=None, method=norm_by_log2_diff, plans=None):
+    """Normalize several phenotypes reusing the interpolation of the surfaces
+
+    The control positions are outlier filtered for each phenotype as in
+    `get_normalized_data`, but the surfaces of all phenotypes are
+    interpolated together using one `NormalisationPlan` per plate.
+
+    Args:
+        phenotypes_data: List with the plates of each phenotype
+        offsets: Optional control position offsets
+        method: Optional normalisation method
+        plans: Optional already constructed normalisation plans,
+            see `get_normalisation_plans`
+
+    Returns: list with the normalized plates of each phenotype
+    """
+    if not phenotypes_data:
+        return []
+
+    if offsets is None:
+        offsets = [Offsets.LowerRight() for _ in range(len(phenotypes_data[0]))]
+
+    if plans is None:
+        plans = get_normalisation_plans(phenotypes_data[0], offsets)
+
+    filtered_data = []
+    stds = []
+    for data in phenotypes_data:
+
+        surface = get_control_position_filtered_arrays(data, offsets=offsets)
+        pre_surface = get_downsampled_plates(surface, offsets)
+        apply_outlier_filter(pre_surface, measure=None)
+
+        filtered_data.append(surface)
+        stds.append(
+            [plate[np.isfinite(plate)].std() if plate is not None else None for plate in pre_surface]
+            if method == norm_by_signal_to_noise else [None] * len(data))
+
+    surfaces = [[] for _ in phenotypes_data]
+    for id_plate, plan in enumerate(plans):
+
+        if plan is None:
+            for phenotype_surfaces in surfaces:
+                phenotype_surfaces.append(None)
+            continue
+
+        for phenotype_surfaces, surface in izip(
+                surfaces, plan.get_surfaces([filtered[id_plate] for filtered in filtered_data])):
+            phenotype_surfaces.append(surface)
+
+    return [normalisation(data, surface, method=method, std=std)
+            for data, surface, std in izip(phenotypes_data, surfaces, stds)]
+
+
 def get_reference_positions(data, offsets, outlier_filter=True):
 
     surface = get_control_position_filtered_arrays(data, offsets=offsets)
@@ -1,11 +1,11 @@
 import numpy as np
 from enum import Enum
-from itertools import izip
+from itertools import izip, product
 
 from scanomatic.data_processing import growth_phenotypes
 from scanomatic.io.logger import Logger
 from scanomatic.data_processing.phases.analysis import CurvePhasePhenotypes, number_of_phenotypes, get_phenotypes_tuple
-from scanomatic.data_processing.phases.segmentation import CurvePhases, is_detected_non_linear
+from scanomatic.data_processing.phases.segmentation import CurvePhases, is_detected_non_linear, is_undetermined
 
 _l = Logger("Curve Phase Meta Phenotyping")
 
@@ -110,341 +110,526 @@ class VectorPhenotypes(Enum):
     """:type : VectorPhenotypes"""
 
 
-def filter_plate_custom_filter(
-        plate,
-        phase=CurvePhases.GrowthAcceleration,
-        measure=CurvePhasePhenotypes.AsymptoteIntersection,
-        phases_requirement=lambda phases: len(phases) == 1,
-        phase_selector=lambda phases: phases[0]):
+_PACKED_MASKED_PHASE = np.iinfo(np.int8).min
+_PACKED_PHASE_PHENOTYPES = tuple(CurvePhasePhenotypes)
 
-    def f(phenotype_vector):
 
-        try:
-            phases = tuple(d for t, d in phenotype_vector if t == phase)
-            if phases_requirement(phases):
-                return phase_selector(phases)[measure]
-        except TypeError:
-            pass
-        return np.nan
-
-    return np.frompyfunc(f, 1, 1)(plate).astype(float)
+def pack_phases_classifications(plate, length):
+    """Pack the phase classifications of a plate into a fixed shape numeric array
 
+    Args:
+        plate: 2D object array with a masked `CurvePhases` value array per position
+            (or `numpy.nan` where there is none).
+        length: The number of time points
 
-def filter_plate_on_phase_id(plate, phases_id, measure):
+    Returns: 3D int8 array with masked and missing values as `_PACKED_MASKED_PHASE`.
+    """
+    packed = np.ones(plate.shape + (length,), dtype=np.int8) * _PACKED_MASKED_PHASE
 
-    def f(phenotype_vector, phase_id):
-        if phase_id < 0:
-            return np.nan
+    for position in product(*(range(d) for d in plate.shape)):
+        phases = plate[position]
+        if isinstance(phases, np.ndarray):
+            packed[position] = np.ma.filled(phases, _PACKED_MASKED_PHASE)
 
-        try:
-            return phenotype_vector[phase_id][1][measure]
-        except (KeyError, TypeError):
-            return np.nan
+    return packed
 
-    return np.frompyfunc(f, 2, 1)(plate, phases_id).astype(np.float)
 
+def unpack_phases_classifications(packed, position):
+    """Get the phase classification of one position
 
-def _get_phase_id(plate, *phases):
+    Args:
+        packed: Array as created by `pack_phases_classifications`
+        position: The position on the plate
 
-    l = len(phases)
+    Returns: masked array or `None` if position has no classification
+    """
+    phases = packed[position]
+    mask = phases == _PACKED_MASKED_PHASE
+    if mask.all():
+        return None
+    return np.ma.masked_array(phases.astype(np.int), mask)
 
-    def f(v):
-        try:
-            v = zip(*v)[0]
-            i = 0
-            for id_phase, phase in enumerate(v):
-                if i < l:
-                    if phase is phases[i]:
-                        i += 1
-                        if i == l:
-                            return id_phase
-        except TypeError:
-            pass
-        return -1
 
-    return np.frompyfunc(f, 1, 1)(plate).astype(np.int)
+def pack_phases_phenotypes(plate, dtype=np.float32):
+    """Pack the phase phenotypes of a plate into a fixed shape numeric array
 
+    The last axis holds the `CurvePhases` value followed by the
+    `CurvePhasePhenotypes` values in `_PACKED_PHASE_PHENOTYPES` order.
+    Positions with fewer phases than the most segmented curve on the
+    plate are padded with `numpy.nan`.
 
-def _phase_finder(phase_vector, phase):
+    Args:
+        plate: 2D object array with a list of (`CurvePhases`, dict) per position
+            (or `numpy.nan` where there is none).
+        dtype: The numeric type to store
 
-    try:
-        return tuple(i for i, (p_type, p_data) in enumerate(phase_vector) if p_type == phase)
-    except TypeError:
-        return tuple()
+    Returns: 4D numeric array
+    """
+    def count(phases):
+        return len(phases) if isinstance(phases, list) else 0
 
-# REGION: Phase counters
+    max_phases = int(np.frompyfunc(count, 1, 1)(plate).max()) if plate.size else 0
+    packed = np.ones(plate.shape + (max_phases, len(_PACKED_PHASE_PHENOTYPES) + 1), dtype=dtype) * np.nan
 
+    for position in product(*(range(d) for d in plate.shape)):
 
-def _py_impulse_counter(phase_vector):
-    try:
-        return sum(1 for phase in phase_vector if phase[0] == CurvePhases.Impulse)
-    except TypeError:
-        return -1
+        phases = plate[position]
+        if not isinstance(phases, list):
+            continue
 
-_np_impulse_counter = np.frompyfunc(_py_impulse_counter, 1, 1)
+        for id_phase, (phase, phenotypes) in enumerate(phases):
+            packed[position][id_phase, 0] = phase.value
+            if phenotypes is None:
+                continue
+            for id_phenotype, phenotype in enumerate(_PACKED_PHASE_PHENOTYPES):
+                if phenotype in phenotypes:
+                    packed[position][id_phase, id_phenotype + 1] = phenotypes[phenotype]
 
+    return packed
 
-def _np_ma_impulse_counter(phases):
 
-    data = _np_impulse_counter(phases)
-    data[data < 0] = np.nan
-    return data
+def unpack_phases_phenotypes(packed, position):
+    """Get the phase phenotypes of one position
 
+    Args:
+        packed: Array as created by `pack_phases_phenotypes`
+        position: The position on the plate
 
-def _py_inner_impulse_counter(phase_vector):
+    Returns: list of (`CurvePhases`, dict) or `numpy.nan` if position has none
+    """
+    if isinstance(packed, RaggedPhases):
+        return packed.get_position(position)
 
-    try:
-        acc = _phase_finder(phase_vector, CurvePhases.GrowthAcceleration)
-        if not acc:
-            return -1
-        ret = _phase_finder(phase_vector, CurvePhases.GrowthRetardation)
-        if not ret:
-            return -1
-        return _py_impulse_counter(phase_vector[acc[0]: ret[-1]])
-    except TypeError:
-        return -1
+    phases = []
 
-_np_inner_impulse_counter = np.frompyfunc(_py_inner_impulse_counter, 1, 1)
+    for phase_data in packed[position]:
 
+        if np.isnan(phase_data[0]):
+            break
 
-def _np_ma_inner_impulse_counter(phases):
+        phase = CurvePhases(int(phase_data[0]))
+        if is_undetermined(phase):
+            phases.append((phase, None))
+        else:
+            phases.append((phase, {
+                phenotype: float(phase_data[id_phenotype + 1]) for id_phenotype, phenotype in
+                enumerate(_PACKED_PHASE_PHENOTYPES) if phenotype in get_phenotypes_tuple(phase)}))
 
-    data = _np_inner_impulse_counter(phases).astype(float)
-    data[data < 0] = np.nan
-    return data
+    return phases if phases else np.nan
 
 
-def _py_collapse_counter(phase_vector):
-    try:
-        return sum(1 for phase in phase_vector if phase[0] == CurvePhases.Collapse)
-    except TypeError:
-        return -1
+def unpack_plate(packed, phenotype):
+    """Expand a packed vector phenotype plate back into an object array
 
-_np_collapse_counter = np.frompyfunc(_py_collapse_counter, 1, 1)
+    Args:
+        packed: Array as created by `pack_phases_classifications` or `pack_phases_phenotypes`
+            or a `RaggedPhases`
+        phenotype: The `VectorPhenotypes` it holds
 
+    Returns: 2D object array
+    """
+    if isinstance(packed, RaggedPhases):
+        return packed.to_object_plate()
 
-def _np_ma_collapse_counter(phases):
+    unpack = unpack_phases_classifications if phenotype is VectorPhenotypes.PhasesClassifications else \
+        unpack_phases_phenotypes
 
-    data = _np_collapse_counter(phases)
-    data[data < 0] = np.nan
-    return data
+    plate = np.zeros(packed.shape[:2], dtype=np.object) * np.nan
+    for position in product(*(range(d) for d in plate.shape)):
+        value = unpack(packed, position)
+        if value is not None:
+            plate[position] = value
+    return plate
 
 
-def _py_phase_counter(phase_vector):
+def is_packed(plate):
 
-    return sum(1 for t, d in phase_vector if t is not CurvePhases.Undetermined)
+    return isinstance(plate, RaggedPhases) or isinstance(plate, np.ndarray) and plate.dtype != np.object
 
-_np_phase_counter = np.frompyfunc(_py_phase_counter, 1, 1)
 
-# END REGION: Phase counters
+class RaggedPhases(object):
+    """The phase phenotypes of all positions of a plate as flat typed columns.
 
-# REGION: Major pulse index
+    The phases of all curves are laid out one after the other in
+    row-major position order, the phases of the position with flat
+    index `i` being `offsets[i]:offsets[i + 1]` in the order of the curve.
 
+    Args:
+        shape: The shape of the plate
+        offsets: 1D int array with the start of each position's phases, and
+            the total number of phases last.
+        valid: 1D bool array, if each position has a phase segmentation
+        phases: 1D int array of the `CurvePhases` value of each phase
+        has_phenotypes: 1D bool array, if each phase has phenotypes
+        columns: dict of `CurvePhasePhenotypes` to 1D float arrays with the values
+            of each phase (`numpy.nan` where missing)
+    """
+    def __init__(self, shape, offsets, valid, phases, has_phenotypes, columns):
+
+        self.shape = shape
+        self.offsets = offsets
+        self.valid = valid
+        self.phases = phases
+        self.has_phenotypes = has_phenotypes
+        self.columns = columns
+
+        counts = np.diff(offsets)
+        self.curves = np.repeat(np.arange(counts.size), counts)
+        """The position index of each phase"""
+        self.local_index = np.arange(phases.size) - np.repeat(offsets[:-1], counts)
+        """The index of each phase in its curve"""
+
+    @classmethod
+    def FromPlate(cls, plate):
+        """Create from a plate of phase phenotypes
+
+        Args:
+            plate: object array with a list of (`CurvePhases`, dict) per position
+                (or `numpy.nan` where there is none) or an array as created by
+                `pack_phases_phenotypes`.
+
+        Returns: RaggedPhases
+        """
+        if isinstance(plate, RaggedPhases):
+            return plate
+        elif is_packed(plate):
+            return cls.FromPacked(plate)
+
+        valid = []
+        counts = []
+        phases = []
+        has_phenotypes = []
+        columns = {phenotype: [] for phenotype in CurvePhasePhenotypes}
+
+        for phase_vector in plate.ravel():
+
+            if not isinstance(phase_vector, (list, tuple)):
+                valid.append(False)
+                counts.append(0)
+                continue
 
-def _py_get_major_impulse_for_plate(phases):
-    """Locates major impulses
+            valid.append(True)
+            counts.append(len(phase_vector))
 
-    First the phases sort order based on yield is constructed
+            for phase, phenotypes in phase_vector:
+                phases.append(phase.value)
+                has_phenotypes.append(phenotypes is not None)
+                for phenotype, column in columns.iteritems():
+                    column.append(np.nan if phenotypes is None else phenotypes.get(phenotype, np.nan))
 
-    The indices and sort order of those that are impulses are
-    collected.
+        return cls(
+            plate.shape, np.r_[0, np.cumsum(counts, dtype=np.int)], np.array(valid, dtype=bool),
+            np.array(phases, dtype=np.int), np.array(has_phenotypes, dtype=bool),
+            {phenotype: np.array(column, dtype=np.float) for phenotype, column in columns.iteritems()})
 
-    Then the original index of the phase with the highest
-    sort order is returned.
+    @classmethod
+    def FromPacked(cls, packed):
+        """Create from an array as created by `pack_phases_phenotypes`"""
 
-    Args:
-        phases: Plate of phase data
+        shape = packed.shape[:-2]
+        packed = packed.reshape((-1, ) + packed.shape[-2:])
+        present = np.isfinite(packed[..., 0])
+        counts = present.sum(axis=-1)
+        phases = packed[..., 0][present].astype(np.int)
 
-    Returns: 2D numpy.ndarray with indices of the major
-        growth impulses in the vectors.
-    """
+        return cls(
+            shape, np.r_[0, np.cumsum(counts, dtype=np.int)], counts > 0, phases,
+            ~np.in1d(phases, [phase.value for phase in CurvePhases if is_undetermined(phase)]),
+            {phenotype: packed[..., id_phenotype + 1][present].astype(np.float)
+             for id_phenotype, phenotype in enumerate(_PACKED_PHASE_PHENOTYPES)})
 
-    try:
+    @property
+    def positions(self):
 
-        sort_order = np.argsort(tuple(
-            p_data[CurvePhasePhenotypes.PopulationDoublings] if
-            p_data is not None and p_data[CurvePhasePhenotypes.PopulationDoublings] else -np.inf
-            for p_type, p_data in phases
-        ))
+        return self.valid.size
 
-        impulses = np.array(tuple(
-            (i, v) for i, v in enumerate(sort_order) if
-            phases[i][VectorPhenotypes.PhasesClassifications.value] == CurvePhases.Impulse))
+    def get_position(self, position):
+        """The phases of one position
 
-        if impulses.any():
-            return impulses[np.argmax(impulses[:, -1])][0]
-    except TypeError:
-        pass
-    return -1
+        Args:
+            position: The position on the plate
 
-_np_get_major_impulse_for_plate = np.frompyfunc(_py_get_major_impulse_for_plate, 1, 1)
+        Returns: list of (`CurvePhases`, dict) or `numpy.nan` if position has none
+        """
+        index = np.ravel_multi_index(position, self.shape)
+        if not self.valid[index]:
+            return np.nan
 
+        phases = []
+        for id_phase in xrange(self.offsets[index], self.offsets[index + 1]):
+
+            phase = CurvePhases(int(self.phases[id_phase]))
+            if not self.has_phenotypes[id_phase]:
+                phases.append((phase, None))
+            else:
+                phases.append((phase, {
+                    phenotype: float(self.columns[phenotype][id_phase])
+                    for phenotype in get_phenotypes_tuple(phase)}))
+
+        return phases
+
+    def to_object_plate(self):
+        """Expand into a plate with a list of (`CurvePhases`, dict) per position
+
+        Returns: 2D object array with `numpy.nan` where there's no segmentation
+        """
+        plate = np.zeros(self.shape, dtype=np.object) * np.nan
+        for position in product(*(range(d) for d in self.shape)):
+            phases = self.get_position(position)
+            if isinstance(phases, list):
+                plate[position] = phases
+        return plate
+
+    def get_table(self, dtype=np.float64):
+        """The phase phenotypes as a 2D array of phases and `CurvePhasePhenotypes`
+
+        The columns are in the same order as in `pack_phases_phenotypes`.
+        """
+        table = np.empty((self.phases.size, len(_PACKED_PHASE_PHENOTYPES)), dtype=dtype)
+        for id_phenotype, phenotype in enumerate(_PACKED_PHASE_PHENOTYPES):
+            table[:, id_phenotype] = self.columns[phenotype]
+        return table
+
+    def to_plate(self, values, invalid=np.nan):
+        """Shape one value per position as the plate, with `invalid` where there's no segmentation"""
+
+        values = np.array(values, dtype=np.float)
+        values[~self.valid] = invalid
+        return values.reshape(self.shape)
+
+    def get_phase_counts(self, phase):
+        """The number of phases of a type per position"""
+
+        return np.bincount(self.curves[self.phases == phase.value], minlength=self.positions)
+
+    def get_phase_index(self, phase, last=False, after=None):
+        """The index in the flat layout of a curve's first (or last) phase of a type
+
+        Args:
+            phase: The `CurvePhases` sought
+            last: Optional, if the last rather than the first such phase is sought
+            after: Optional, per position only phases with larger flat index count
+
+        Returns: 1D int array per position, -1 where there is no such phase.
+        """
+        select = self.phases == phase.value
+        if after is not None:
+            select &= np.arange(self.phases.size) > after[self.curves]
+
+        selected = np.where(select)[0]
+        if last:
+            selected = selected[::-1]
+
+        index = np.ones(self.positions, dtype=np.int) * -1
+        curves, first = np.unique(self.curves[selected], return_index=True)
+        index[curves] = selected[first]
+        return index
+
+    def get_values(self, measure, index):
+        """The value of a measure of the phase at each index, `numpy.nan` for index -1"""
+
+        values = np.ones(index.shape) * np.nan
+        found = index >= 0
+        values[found] = self.columns[measure][index[found]]
+        return values
+
+    def get_sorted(self, keys, select):
+        """Sort the selected phases of each curve on a key.
+
+        Within each curve the order is that of `numpy.argsort` on the keys
+        of the curve, with `numpy.nan` sorted last. Its default sort isn't
+        stable, so curves with tied keys are sorted one by one with it to
+        keep the order of tied phases.
+
+        Args:
+            keys: 1D float array of sort key per phase
+            select: 1D bool array of phases to sort
+
+        Returns: tuple of the flat indices of the selected phases in curve
+            and then key order, and per position the first of its phases in
+            that order and the number of selected phases.
+        """
+        selected = np.where(select)[0]
+        keys = keys[selected]
+        curves = self.curves[selected]
+        is_nan = np.isnan(keys)
+
+        order = np.lexsort((self.local_index[selected], np.where(is_nan, 0, keys), is_nan, curves))
+        counts = np.bincount(curves, minlength=self.positions)
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+
+        sorted_keys = keys[order]
+        sorted_nan = is_nan[order]
+        tied = (curves[order][1:] == curves[order][:-1]) & (
+            (sorted_keys[1:] == sorted_keys[:-1]) | (sorted_nan[1:] & sorted_nan[:-1]))
+        for curve in np.unique(curves[order][1:][tied]):
+            curve_slice = slice(starts[curve], starts[curve] + counts[curve])
+            order[curve_slice] = starts[curve] + np.argsort(keys[curve_slice])
+
+        return selected[order], starts, counts
+
+    @property
+    def population_doublings_keys(self):
+        """The sort keys of phases on yield with missing and zero doublings as `-numpy.inf`"""
+
+        doublings = self.columns[CurvePhasePhenotypes.PopulationDoublings]
+        return np.where(self.has_phenotypes & (doublings != 0), doublings, -np.inf)
+
+    def get_ranked_impulse_index(self, rank=-1):
+        """The flat index of the impulse with a certain rank in yield per curve
+
+        Args:
+            rank: Optional, -1 for the largest yield, -2 for second largest etc.
+
+        Returns: 1D int array per position, -1 where there are too few impulses.
+        """
+        order, starts, counts = self.get_sorted(
+            self.population_doublings_keys, self.phases == CurvePhases.Impulse.value)
+
+        index = np.ones(self.positions, dtype=np.int) * -1
+        enough = counts >= -rank
+        index[enough] = order[starts[enough] + counts[enough] + rank]
+        return index
+
+    def get_major_impulse_index(self):
+        """The flat index of the major impulse per curve, -1 where there is none
+
+        Each impulse is scored with the index of the phase which has its
+        index in the yield sort order of the curve's phases and the
+        impulse with the highest score is the major impulse.
+        If a curve's only impulse is its first phase and it is also
+        the phase of least yield, the curve has no major impulse.
+        """
+        order, _, _ = self.get_sorted(self.population_doublings_keys, np.ones(self.phases.shape, dtype=bool))
+        score = self.local_index[order]
+        """Sort order of the curve's phases at each phase's place in the curve"""
+
+        impulses = np.where(self.phases == CurvePhases.Impulse.value)[0]
+        impulses = impulses[np.lexsort((score[impulses], self.curves[impulses]))][::-1]
+        curves, first = np.unique(self.curves[impulses], return_index=True)
+
+        index = np.ones(self.positions, dtype=np.int) * -1
+        index[curves] = impulses[first]
+
+        only_first = (self.get_phase_counts(CurvePhases.Impulse) == 1) & (index >= 0)
+        only_first[only_first] = (self.local_index[index[only_first]] == 0) & (score[index[only_first]] == 0)
+        index[only_first] = -1
+        return index
+
+
+def get_major_impulse_indices(plate):
+    """The index of the major impulse in each position's phases
 
-def _np_ma_get_major_impulse_indices(phases):
+    Args:
+        plate: Plate of phase phenotypes, see `RaggedPhases.FromPlate`
 
-    data = _np_get_major_impulse_for_plate(phases)
-    data[data < 0] = np.nan
-    return data
+    Returns: float array shaped as the plate, `numpy.nan` where there is no major impulse
 
-# END REGION: Major pulse index
+    See Also:
+        RaggedPhases.get_major_impulse_index: How the major impulse is selected
+    """
+    phases = RaggedPhases.FromPlate(plate)
+    index = phases.get_major_impulse_index()
+    local_index = np.where(index >= 0, phases.local_index[index], np.nan)
+    return phases.to_plate(local_index)
 
 
-def _py_get_flanking_angle_relation(phases, major_impulse_index):
+def _get_flank_angle(phases, flank, impulse, has_flank):
 
-    def _flank_angle(flank, impulse):
+    impulse_angle = np.arctan2(1, phases.columns[CurvePhasePhenotypes.LinearModelSlope][impulse])
+    flank = np.where(has_flank, flank, 0)
+    flank_phases = phases.phases[flank]
 
-        if flank is None:
+    return np.where(
+        ~has_flank, impulse_angle,
+        np.where(
+            flank_phases == CurvePhases.Flat.value,
+            np.pi - np.abs(impulse_angle - np.arctan2(1, phases.columns[CurvePhasePhenotypes.LinearModelSlope][flank])),
+            np.where(
+                np.in1d(flank_phases, [phase.value for phase in CurvePhases if is_detected_non_linear(phase)]),
+                phases.columns[CurvePhasePhenotypes.AsymptoteAngle][flank],
+                np.inf)))
 
-            return np.arctan2(1,
-                              impulse[VectorPhenotypes.PhasesPhenotypes.value][CurvePhasePhenotypes.LinearModelSlope])
 
-        elif flank[VectorPhenotypes.PhasesClassifications.value] is CurvePhases.Flat:
+def _get_flanking_angle_relation(phases):
 
-            return np.pi - np.abs(
-                np.arctan2(1, impulse[VectorPhenotypes.PhasesPhenotypes.value][CurvePhasePhenotypes.LinearModelSlope]) -
-                np.arctan2(1, flank[VectorPhenotypes.PhasesPhenotypes.value][CurvePhasePhenotypes.LinearModelSlope]))
+    relation = np.ones(phases.positions) * np.inf
+    index = phases.get_major_impulse_index()
+    found = np.where(index >= 0)[0]
+    impulse = index[found]
 
-        elif is_detected_non_linear(flank[VectorPhenotypes.PhasesClassifications.value]):
+    has_left = phases.local_index[impulse] > 0
+    has_right = impulse < phases.offsets[found + 1] - 1
 
-            return flank[VectorPhenotypes.PhasesPhenotypes.value][CurvePhasePhenotypes.AsymptoteAngle]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relation[found] = (
+            _get_flank_angle(phases, impulse + 1, impulse, has_right) /
+            _get_flank_angle(phases, impulse - 1, impulse, has_left))
 
-        else:
-            return np.inf
+    return relation.reshape(phases.shape)
 
-    if np.isnan(major_impulse_index) or \
-            phases[major_impulse_index][VectorPhenotypes.PhasesPhenotypes.value] is None:
-        return np.inf
-    if phases[major_impulse_index][VectorPhenotypes.PhasesClassifications.value] is not CurvePhases.Impulse:
-        _l.error("Got index {0} as Impulse but is {1} in {2}".format(
-            major_impulse_index,
-            phases[major_impulse_index][VectorPhenotypes.PhasesClassifications.value],
-            phases))
-        return np.inf
 
-    a1 = _flank_angle(phases[major_impulse_index - 1] if major_impulse_index > 0 else None,
-                      phases[major_impulse_index])
+def _get_lag(phases, flat, impulse):
 
-    a2 = _flank_angle(phases[major_impulse_index + 1] if major_impulse_index < len(phases) - 1 else None,
-                      phases[major_impulse_index])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lag = (
+            (phases.get_values(CurvePhasePhenotypes.LinearModelIntercept, impulse) -
+             phases.get_values(CurvePhasePhenotypes.LinearModelIntercept, flat)) /
+            (phases.get_values(CurvePhasePhenotypes.LinearModelSlope, flat) -
+             phases.get_values(CurvePhasePhenotypes.LinearModelSlope, impulse)))
 
-    return a2 / a1
+        lag[lag < 0] = np.nan
 
-_np_get_flanking_angle_relation = np.frompyfunc(_py_get_flanking_angle_relation, 2, 1)
+    return lag.reshape(phases.shape)
 
 
 def extract_phenotypes(plate, meta_phenotype, phenotypes):
+    """Extract a meta-phenotype from the phase phenotypes of a plate
 
-    if meta_phenotype == CurvePhaseMetaPhenotypes.MajorImpulseYieldContribution or \
-            meta_phenotype == CurvePhaseMetaPhenotypes.FirstMinorImpulseYieldContribution:
-
-        index = -1 if meta_phenotype == CurvePhaseMetaPhenotypes.MajorImpulseYieldContribution else -2
-        phase_need = 1 if meta_phenotype == CurvePhaseMetaPhenotypes.MajorImpulseYieldContribution else 2
-
-        return filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.Impulse,
-            measure=CurvePhasePhenotypes.PopulationDoublings,
-            phases_requirement=lambda phases: len(phases) >= phase_need,
-            phase_selector=lambda phases:
-            phases[np.argsort(tuple(
-                phase[CurvePhasePhenotypes.PopulationDoublings] if
-                phase[CurvePhasePhenotypes.PopulationDoublings] else -np.inf for phase in phases))[index]])
-
-    elif (meta_phenotype == CurvePhaseMetaPhenotypes.MajorImpulseAveragePopulationDoublingTime or
-            meta_phenotype == CurvePhaseMetaPhenotypes.FirstMinorImpulseAveragePopulationDoublingTime):
-
-        index = -1 if meta_phenotype == CurvePhaseMetaPhenotypes.MajorImpulseAveragePopulationDoublingTime else -2
-        phase_need = 1 if meta_phenotype == CurvePhaseMetaPhenotypes.MajorImpulseAveragePopulationDoublingTime else 2
-
-        return filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.Impulse,
-            measure=CurvePhasePhenotypes.PopulationDoublingTime,
-            phases_requirement=lambda phases: len(phases) >= phase_need,
-            phase_selector=lambda phases:
-            phases[np.argsort(tuple(
-                phase[CurvePhasePhenotypes.PopulationDoublings] if
-                phase[CurvePhasePhenotypes.PopulationDoublings] else -np.inf for phase in phases))[index]])
+    Args:
+        plate: Plate of phase phenotypes, preferably as `RaggedPhases` if
+            several meta-phenotypes are extracted, see `RaggedPhases.FromPlate`.
+        meta_phenotype: The `CurvePhaseMetaPhenotypes` to extract
+        phenotypes: The `Phenotypes` of the plate, needed by some meta-phenotypes
 
-    elif meta_phenotype == CurvePhaseMetaPhenotypes.InitialLag:
+    Returns: 2D float array
+    """
+    phases = RaggedPhases.FromPlate(plate)
 
-        flat_slope = filter_plate_custom_filter(
-            plate, phase=CurvePhases.Flat, measure=CurvePhasePhenotypes.LinearModelSlope,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases: phases[0])
+    if meta_phenotype in (
+            CurvePhaseMetaPhenotypes.MajorImpulseYieldContribution,
+            CurvePhaseMetaPhenotypes.FirstMinorImpulseYieldContribution,
+            CurvePhaseMetaPhenotypes.MajorImpulseAveragePopulationDoublingTime,
+            CurvePhaseMetaPhenotypes.FirstMinorImpulseAveragePopulationDoublingTime):
 
-        flat_intercept = filter_plate_custom_filter(
-            plate, phase=CurvePhases.Flat, measure=CurvePhasePhenotypes.LinearModelIntercept,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases: phases[0])
+        rank = -1 if meta_phenotype in (
+            CurvePhaseMetaPhenotypes.MajorImpulseYieldContribution,
+            CurvePhaseMetaPhenotypes.MajorImpulseAveragePopulationDoublingTime) else -2
 
-        impulses_phase = _get_phase_id(plate, CurvePhases.Flat, CurvePhases.Impulse)
+        measure = CurvePhasePhenotypes.PopulationDoublings if meta_phenotype in (
+            CurvePhaseMetaPhenotypes.MajorImpulseYieldContribution,
+            CurvePhaseMetaPhenotypes.FirstMinorImpulseYieldContribution) else \
+            CurvePhasePhenotypes.PopulationDoublingTime
 
-        impulse_slope = filter_plate_on_phase_id(
-            plate, impulses_phase, measure=CurvePhasePhenotypes.LinearModelSlope)
+        return phases.get_values(measure, phases.get_ranked_impulse_index(rank)).reshape(phases.shape)
 
-        impulse_intercept = filter_plate_on_phase_id(
-            plate, impulses_phase, measure=CurvePhasePhenotypes.LinearModelIntercept)
+    elif meta_phenotype == CurvePhaseMetaPhenotypes.InitialLag:
 
-        lag = (impulse_intercept - flat_intercept) / (flat_slope - impulse_slope)
-        lag[lag < 0] = np.nan
-        return lag
+        flat = phases.get_phase_index(CurvePhases.Flat)
+        return _get_lag(phases, flat, phases.get_phase_index(CurvePhases.Impulse, after=np.where(
+            flat >= 0, flat, phases.phases.size)))
 
     elif meta_phenotype == CurvePhaseMetaPhenotypes.TimeBeforeMajorGrowth:
 
-        flat_slope = filter_plate_custom_filter(
-            plate, phase=CurvePhases.Flat, measure=CurvePhasePhenotypes.LinearModelSlope,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases: phases[0])
-
-        flat_intercept = filter_plate_custom_filter(
-            plate, phase=CurvePhases.Flat, measure=CurvePhasePhenotypes.LinearModelIntercept,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases: phases[0])
-
-        impulses_phase = _np_ma_get_major_impulse_indices(plate)
-
-        impulse_slope = filter_plate_on_phase_id(
-            plate, impulses_phase, measure=CurvePhasePhenotypes.LinearModelSlope)
-
-        impulse_intercept = filter_plate_on_phase_id(
-            plate, impulses_phase, measure=CurvePhasePhenotypes.LinearModelIntercept)
-
-        lag = (impulse_intercept - flat_intercept) / (flat_slope - impulse_slope)
-        lag[lag < 0] = np.nan
-        return lag
+        return _get_lag(phases, phases.get_phase_index(CurvePhases.Flat), phases.get_major_impulse_index())
 
     elif meta_phenotype == CurvePhaseMetaPhenotypes.InitialLagAlternativeModel:
 
-        impulse_slope = filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.Impulse,
-            measure=CurvePhasePhenotypes.LinearModelSlope,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases:
-            phases[np.argsort(tuple(
-                phase[CurvePhasePhenotypes.PopulationDoublings] if
-                phase[CurvePhasePhenotypes.PopulationDoublings] else -np.inf for phase in phases))[-1]])
-
-        impulse_intercept = filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.Impulse,
-            measure=CurvePhasePhenotypes.LinearModelIntercept,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases:
-            phases[np.argsort(tuple(
-                phase[CurvePhasePhenotypes.PopulationDoublings] if
-                phase[CurvePhasePhenotypes.PopulationDoublings] else -np.inf for phase in phases))[-1]])
-
-        impulse_start = filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.Impulse,
-            measure=CurvePhasePhenotypes.Start,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases:
-            phases[np.argsort(tuple(
-                phase[CurvePhasePhenotypes.PopulationDoublings] if
-                phase[CurvePhasePhenotypes.PopulationDoublings] else -np.inf for phase in phases))[-1]])
+        impulse = phases.get_ranked_impulse_index()
+        impulse_slope = phases.get_values(CurvePhasePhenotypes.LinearModelSlope, impulse).reshape(phases.shape)
+        impulse_intercept = phases.get_values(CurvePhasePhenotypes.LinearModelIntercept, impulse).reshape(
+            phases.shape)
+        impulse_start = phases.get_values(CurvePhasePhenotypes.Start, impulse).reshape(phases.shape)
 
         flat_slope = 0
         flat_intercept = phenotypes[growth_phenotypes.Phenotypes.ExperimentLowPoint]
@@ -456,65 +641,60 @@ def extract_phenotypes(plate, meta_phenotype, phenotypes):
 
         return lag
 
-    elif meta_phenotype == CurvePhaseMetaPhenotypes.InitialAccelerationAsymptoteAngle:
-
-        return filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.GrowthAcceleration,
-            measure=CurvePhasePhenotypes.AsymptoteAngle,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases: phases[0]
-        )
-
-    elif meta_phenotype == CurvePhaseMetaPhenotypes.FinalRetardationAsymptoteAngle:
-
-        return filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.GrowthRetardation,
-            measure=CurvePhasePhenotypes.AsymptoteAngle,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases: phases[-1]
-        )
-
-    elif meta_phenotype == CurvePhaseMetaPhenotypes.InitialAccelerationAsymptoteIntersect:
-        return filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.GrowthAcceleration,
-            measure=CurvePhasePhenotypes.AsymptoteIntersection,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases: phases[0]
-        )
-
-    elif meta_phenotype == CurvePhaseMetaPhenotypes.FinalRetardationAsymptoteIntersect:
-
-        return filter_plate_custom_filter(
-            plate,
-            phase=CurvePhases.GrowthRetardation,
-            measure=CurvePhasePhenotypes.AsymptoteIntersection,
-            phases_requirement=lambda phases: len(phases) > 0,
-            phase_selector=lambda phases: phases[-1]
-        )
+    elif meta_phenotype in (
+            CurvePhaseMetaPhenotypes.InitialAccelerationAsymptoteAngle,
+            CurvePhaseMetaPhenotypes.FinalRetardationAsymptoteAngle,
+            CurvePhaseMetaPhenotypes.InitialAccelerationAsymptoteIntersect,
+            CurvePhaseMetaPhenotypes.FinalRetardationAsymptoteIntersect):
+
+        initial = meta_phenotype in (
+            CurvePhaseMetaPhenotypes.InitialAccelerationAsymptoteAngle,
+            CurvePhaseMetaPhenotypes.InitialAccelerationAsymptoteIntersect)
+
+        measure = CurvePhasePhenotypes.AsymptoteAngle if meta_phenotype in (
+            CurvePhaseMetaPhenotypes.InitialAccelerationAsymptoteAngle,
+            CurvePhaseMetaPhenotypes.FinalRetardationAsymptoteAngle) else CurvePhasePhenotypes.AsymptoteIntersection
+
+        index = phases.get_phase_index(
+            CurvePhases.GrowthAcceleration if initial else CurvePhases.GrowthRetardation, last=not initial)
+
+        return phases.get_values(measure, index).reshape(phases.shape)
 
     elif meta_phenotype == CurvePhaseMetaPhenotypes.Modalities:
 
-        return _np_ma_impulse_counter(plate)
+        return phases.to_plate(phases.get_phase_counts(CurvePhases.Impulse))
 
     elif meta_phenotype == CurvePhaseMetaPhenotypes.ModalitiesAlternativeModel:
 
-        return _np_ma_inner_impulse_counter(plate)
+        acceleration = phases.get_phase_index(CurvePhases.GrowthAcceleration)
+        retardation = phases.get_phase_index(CurvePhases.GrowthRetardation, last=True)
+        inner = (
+            (phases.phases == CurvePhases.Impulse.value) &
+            (np.arange(phases.phases.size) >= acceleration[phases.curves]) &
+            (np.arange(phases.phases.size) < retardation[phases.curves]))
+
+        counts = np.bincount(phases.curves[inner], minlength=phases.positions).astype(np.float)
+        counts[(acceleration < 0) | (retardation < 0)] = np.nan
+        return phases.to_plate(counts)
 
     elif meta_phenotype == CurvePhaseMetaPhenotypes.Collapses:
 
-        return _np_ma_collapse_counter(plate)
+        return phases.to_plate(phases.get_phase_counts(CurvePhases.Collapse))
 
     elif meta_phenotype == CurvePhaseMetaPhenotypes.MajorImpulseFlankAsymmetry:
 
-        indices = _np_ma_get_major_impulse_indices(plate)
-        return _np_get_flanking_angle_relation(plate, indices).astype(np.float)
+        return _get_flanking_angle_relation(phases)
 
     else:
         _l.error("Not implemented phenotype extraction: {0}".format(meta_phenotype))
-        return np.ones_like(plate) * np.nan
+        return np.ones(phases.shape) * np.nan
+
+
+def _py_phase_counter(phase_vector):
+
+    return sum(1 for t, d in phase_vector if t is not CurvePhases.Undetermined)
+
+_np_phase_counter = np.frompyfunc(_py_phase_counter, 1, 1)
 
 
 def get_phase_assignment_data(phenotypes, plate):
@@ -703,14 +883,14 @@ def get_phase_phenotypes_aligned(phenotypes, plate):
             return min((abs(v) for v in (phase_anchor - end, phase_anchor - start))) / float(end - start)
 
     end_time = phenotypes.times.max()
-    plate_data = phenotypes._vector_phenotypes[plate][VectorPhenotypes.PhasesPhenotypes]
+    plate_data = phenotypes._get_vector_phenotype_plate(plate, VectorPhenotypes.PhasesPhenotypes)
     filt = phenotypes.get_curve_qc_filter(plate)
     coords = _get_index_array(plate_data.shape)
 
     plate_data = plate_data[filt == np.False_]
     coords = coords[filt == np.False_]
 
-    major_idx = np.ma.masked_invalid(_np_ma_get_major_impulse_indices(plate_data).astype(np.float))
+    major_idx = np.ma.masked_invalid(get_major_impulse_indices(plate_data))
 
     plate_data = plate_data[major_idx.mask == np.False_]
     coords = coords[major_idx.mask == np.False_]
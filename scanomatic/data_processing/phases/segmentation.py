@@ -233,7 +233,7 @@ def get_data_needed_for_segmentation(phenotyper_object, plate, pos, thresholds,
 
     model.plate = plate
     model.pos = tuple(pos)
-    model.log2_curve = np.ma.masked_invalid(np.log2(phenotyper_object.smooth_growth_data[plate][pos]))
+    model.log2_curve = np.ma.masked_invalid(np.log2(phenotyper_object.smooth_growth_data[plate][pos], dtype=np.float))
     model.times = phenotyper_object.times
 
     # Smoothing kernel for derivatives
@@ -0,0 +1,210 @@
+import os
+import struct
+import zipfile
+from io import BytesIO
+
+import numpy as np
+
+from scanomatic.data_processing.phases.features import VectorPhenotypes, RaggedPhases, _PACKED_PHASE_PHENOTYPES, \
+    _PACKED_MASKED_PHASE, pack_phases_classifications, is_packed
+from scanomatic.data_processing.phases.segmentation import CurvePhases, is_undetermined
+
+_VECTOR_PHENOTYPES = tuple(VectorPhenotypes)
+_ZIP_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+"""Signature, version, flags, compression, time, date, crc, sizes, name and extra field lengths"""
+
+
+def get_columnar_vector_phenotypes(vector_phenotypes, length):
+    """Lay out the vector phenotypes of all plates as flat numeric arrays
+
+    The positions of all plates follow each other in plate and then
+    row-major order.
+
+    Args:
+        vector_phenotypes: Per plate a dict of `VectorPhenotypes` to plates
+            either as object arrays or packed, or `None` for plates without.
+        length: The number of time points
+
+    Returns: dict of
+        "plate_shapes": (plates, 2) int array, -1 for plates without vector phenotypes
+        "plate_phenotypes": (plates, `VectorPhenotypes`) bool array of which the plate has
+        "classifications": (positions, time) int8 array of the `CurvePhases` values
+            with masked values as `_PACKED_MASKED_PHASE`
+        "curve_offsets": (positions + 1) int array where each position's phases begin
+        "curve_valid": (positions) bool array of if the position has phase phenotypes
+        "phases": (phases) int8 array of the `CurvePhases` values of each phase
+        "phase_phenotypes": (phases, `CurvePhasePhenotypes`) float array in
+            `pack_phases_phenotypes` order with `numpy.nan` where missing.
+    """
+    shapes = []
+    has_phenotypes = []
+    classifications = []
+    curve_offsets = [np.zeros((1, ), dtype=np.int64)]
+    curve_valid = []
+    phases = []
+    tables = []
+
+    for plate in vector_phenotypes:
+
+        if not plate:
+            shapes.append((-1, -1))
+            has_phenotypes.append([False] * len(_VECTOR_PHENOTYPES))
+            continue
+
+        has_phenotypes.append([phenotype in plate for phenotype in _VECTOR_PHENOTYPES])
+        shape = next(
+            data.shape if isinstance(data, RaggedPhases) else data.shape[:2] for data in plate.itervalues())
+        shapes.append(shape)
+
+        plate_classifications = plate.get(VectorPhenotypes.PhasesClassifications)
+        if plate_classifications is None:
+            plate_classifications = np.ones(shape + (length, ), dtype=np.int8) * _PACKED_MASKED_PHASE
+        elif not is_packed(plate_classifications):
+            plate_classifications = pack_phases_classifications(plate_classifications, length)
+        classifications.append(plate_classifications.reshape(-1, length))
+
+        plate_phases = plate.get(VectorPhenotypes.PhasesPhenotypes)
+        if plate_phases is None:
+            plate_phases = RaggedPhases(
+                shape, np.zeros((np.prod(shape) + 1, ), dtype=np.int64), np.zeros((np.prod(shape), ), dtype=bool),
+                np.zeros((0, ), dtype=np.int8), np.zeros((0, ), dtype=bool),
+                {phenotype: np.zeros((0, )) for phenotype in _PACKED_PHASE_PHENOTYPES})
+        else:
+            plate_phases = RaggedPhases.FromPlate(plate_phases)
+
+        curve_offsets.append(plate_phases.offsets[1:] + curve_offsets[-1][-1])
+        curve_valid.append(plate_phases.valid)
+        phases.append(plate_phases.phases)
+        tables.append(plate_phases.get_table())
+
+    return {
+        "plate_shapes": np.array(shapes, dtype=np.int64).reshape(-1, 2),
+        "plate_phenotypes": np.array(has_phenotypes, dtype=bool).reshape(-1, len(_VECTOR_PHENOTYPES)),
+        "classifications": np.vstack(classifications).astype(np.int8) if classifications else
+        np.zeros((0, length), dtype=np.int8),
+        "curve_offsets": np.hstack(curve_offsets).astype(np.int64),
+        "curve_valid": np.hstack(curve_valid).astype(bool) if curve_valid else np.zeros((0, ), dtype=bool),
+        "phases": np.hstack(phases).astype(np.int8) if phases else np.zeros((0, ), dtype=np.int8),
+        "phase_phenotypes": np.vstack(tables) if tables else np.zeros((0, len(_PACKED_PHASE_PHENOTYPES))),
+    }
+
+
+def get_vector_phenotypes_from_columnar(columnar):
+    """Get the vector phenotypes of each plate from their columnar layout
+
+    The plates are views of the columnar arrays, the phase classifications
+    as packed by `pack_phases_classifications` and the phase phenotypes
+    as `RaggedPhases`.
+
+    Args:
+        columnar: dict as returned by `get_columnar_vector_phenotypes`
+
+    Returns: object array with a dict of `VectorPhenotypes` to plate per
+        plate, or `None` for plates without vector phenotypes.
+    """
+    length = columnar["classifications"].shape[1]
+    undetermined = [phase.value for phase in CurvePhases if is_undetermined(phase)]
+    plates = []
+    first = 0
+
+    for shape, has_phenotypes in zip(columnar["plate_shapes"], columnar["plate_phenotypes"]):
+
+        if not has_phenotypes.any():
+            plates.append(None)
+            continue
+
+        shape = tuple(int(d) for d in shape)
+        end = first + int(np.prod(shape))
+        plate = {}
+
+        if has_phenotypes[_VECTOR_PHENOTYPES.index(VectorPhenotypes.PhasesClassifications)]:
+            plate[VectorPhenotypes.PhasesClassifications] = columnar["classifications"][first: end].reshape(
+                shape + (length, ))
+
+        if has_phenotypes[_VECTOR_PHENOTYPES.index(VectorPhenotypes.PhasesPhenotypes)]:
+            first_phase = columnar["curve_offsets"][first]
+            end_phase = columnar["curve_offsets"][end]
+            phases = columnar["phases"][first_phase: end_phase]
+            table = columnar["phase_phenotypes"][first_phase: end_phase]
+
+            plate[VectorPhenotypes.PhasesPhenotypes] = RaggedPhases(
+                shape, columnar["curve_offsets"][first: end + 1] - first_phase, columnar["curve_valid"][first: end],
+                phases, ~np.in1d(phases, undetermined),
+                {phenotype: table[:, id_phenotype] for id_phenotype, phenotype in enumerate(_PACKED_PHASE_PHENOTYPES)})
+
+        plates.append(plate)
+        first = end
+
+    if not any(plate is not None for plate in plates):
+        return None
+
+    vector_phenotypes = np.empty((len(plates), ), dtype=np.object)
+    vector_phenotypes[:] = plates
+    return vector_phenotypes
+
+
+def write_columnar_vector_phenotypes(fh, columnar):
+    """Write the columnar arrays as an uncompressed npz-archive to a file object"""
+
+    np.savez(fh, **columnar)
+
+
+def save_columnar_vector_phenotypes(path, columnar):
+    """Save the columnar arrays as an uncompressed npz-archive
+
+    The archive is first written next to the path and then moved into place,
+    so that already memory-mapped arrays of the previous archive stay valid.
+
+    Args:
+        path: Path to the archive
+        columnar: dict as returned by `get_columnar_vector_phenotypes`
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as fh:
+        write_columnar_vector_phenotypes(fh, columnar)
+    os.rename(temp_path, path)
+
+
+def _load_member(fh, path, info, mmap_mode):
+
+    fh.seek(info.header_offset)
+    header = _ZIP_LOCAL_HEADER.unpack(fh.read(_ZIP_LOCAL_HEADER.size))
+    fh.seek(info.header_offset + _ZIP_LOCAL_HEADER.size + header[-2] + header[-1])
+
+    version = np.lib.format.read_magic(fh)
+    shape, fortran_order, dtype = getattr(np.lib.format, "read_array_header_{0}_{1}".format(*version))(fh)
+
+    if not np.prod(shape) or dtype.hasobject:
+        return np.zeros(shape, dtype=dtype)
+
+    return np.memmap(
+        path, dtype=dtype, mode=mmap_mode, offset=fh.tell(), shape=shape, order='F' if fortran_order else 'C')
+
+
+def load_columnar_vector_phenotypes(path, mmap_mode='r'):
+    """Load columnar vector phenotypes
+
+    Args:
+        path: Path to the npz-archive
+        mmap_mode: Optional, how to memory-map the arrays, default is read-only.
+            If `None` the arrays are read into memory.
+
+    Returns: dict as returned by `get_columnar_vector_phenotypes`
+    """
+    if mmap_mode is None:
+        archive = np.load(path)
+        try:
+            return {key: archive[key] for key in archive.files}
+        finally:
+            archive.close()
+
+    columnar = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as fh:
+        for info in archive.infolist():
+            key = info.filename[:-len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                columnar[key] = np.lib.format.read_array(BytesIO(archive.read(info)))
+            else:
+                columnar[key] = _load_member(fh, path, info, mmap_mode)
+
+    return columnar
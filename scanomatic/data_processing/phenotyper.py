@@ -1,5 +1,6 @@
 import csv
 import glob
+import hashlib
 import os
 
 from collections import deque
@@ -27,20 +28,48 @@ import scanomatic.io.logger as logger
 import scanomatic.io.paths as paths
 import scanomatic.io.image_data as image_data
 from scanomatic.data_processing.growth_phenotypes import Phenotypes, get_preprocessed_data_for_phenotypes, \
-    get_derivative, get_chapman_richards_4parameter_extended_curve
+    get_derivative, get_chapman_richards_4parameter_extended_curve, CHAPMAN_RICHARDS_P0
 from scanomatic.data_processing.phases.features import extract_phenotypes, \
-    CurvePhaseMetaPhenotypes, VectorPhenotypes
+    CurvePhaseMetaPhenotypes, VectorPhenotypes, pack_phases_classifications, pack_phases_phenotypes, \
+    unpack_phases_classifications, unpack_phases_phenotypes, unpack_plate, is_packed, RaggedPhases
 from scanomatic.data_processing.phases.analysis import get_phase_analysis
+from scanomatic.data_processing.phases.storage import get_columnar_vector_phenotypes, \
+    get_vector_phenotypes_from_columnar, load_columnar_vector_phenotypes, save_columnar_vector_phenotypes, \
+    write_columnar_vector_phenotypes
+from scanomatic.data_processing.chapman_richards import fit_plates
+from scanomatic.data_processing.undo_journal import UndoJournal
 from scanomatic.data_processing.phenotypes import PhenotypeDataType, infer_phenotype_from_name
 from scanomatic.generics.phenotype_filter import FilterArray, Filter
 from scanomatic.io.meta_data import MetaData2 as MetaData
 from scanomatic.data_processing.strain_selector import StrainSelector
-from scanomatic.data_processing.norm import Offsets, get_normalized_data, get_reference_positions, norm_by_log2_diff, \
-    norm_by_signal_to_noise, norm_by_log2_diff_corr_scaled, norm_by_diff
+from scanomatic.data_processing.plate_stack import PlateStack, stack_plates
+from scanomatic.data_processing.norm import Offsets, get_normalized_phenotypes, get_reference_positions, \
+    norm_by_log2_diff, norm_by_signal_to_noise, norm_by_log2_diff_corr_scaled, norm_by_diff
 
 
 _logger = logger.Logger("Phenotyper")
 
+CHAPMAN_RICHARDS_PHENOTYPES = (
+    Phenotypes.ChapmanRichardsFit,
+    Phenotypes.ChapmanRichardsParam1,
+    Phenotypes.ChapmanRichardsParam2,
+    Phenotypes.ChapmanRichardsParam3,
+    Phenotypes.ChapmanRichardsParam4,
+    Phenotypes.ChapmanRichardsParamXtra,
+)
+
+PHENOTYPE_DEPENDENCIES = dict(
+    [(meta_phenotype, (VectorPhenotypes.PhasesPhenotypes,)) for meta_phenotype in CurvePhaseMetaPhenotypes] + [
+        (VectorPhenotypes.PhasesClassifications, (Phenotypes.ExperimentPopulationDoublings,)),
+        (VectorPhenotypes.PhasesPhenotypes, (Phenotypes.ExperimentPopulationDoublings,)),
+        (CurvePhaseMetaPhenotypes.InitialLagAlternativeModel,
+         (VectorPhenotypes.PhasesPhenotypes, Phenotypes.ExperimentLowPoint, Phenotypes.ExperimentLowPointWhen)),
+    ])
+"""The phenotypes that must be calculated before each phenotype can be"""
+
+NO_GROWTH_PHENOTYPES = (Phenotypes.Monotonicity, Phenotypes.ExperimentPopulationDoublings)
+"""The phenotypes needed to mark curves as not growing in the QC filter"""
+
 
 def time_based_gaussian_weighted_mean(data, time, sigma=1):
     center = (time.size - time.size % 2) / 2
@@ -188,6 +217,27 @@ def merge_convolve(arr1, arr2, edge_condition_mode=EdgeCondition.Reflect, kernel
         edge_condition(arr2, mode=edge_condition_mode, kernel_size=kernel_size)))
 
 
+def get_curve_signatures(plate, length=None):
+    """Get a stable fingerprint for each curve on a plate.
+
+    Args:
+        plate: The growth data of a plate (rows x columns x time)
+        length: Optional, only include the first `length` time points
+
+    Returns: `numpy.ndarray` of `numpy.uint64` with the plate's 2D shape
+    """
+    if length is not None:
+        plate = plate[..., :length]
+
+    signatures = np.zeros(plate.shape[:2], dtype=np.uint64)
+    for pos in product(*(range(s) for s in plate.shape[:2])):
+        signatures[pos] = np.frombuffer(
+            hashlib.md5(np.ascontiguousarray(plate[pos], dtype=np.float).tobytes()).digest()[:8],
+            dtype=np.uint64)[0]
+
+    return signatures
+
+
 def get_phenotype(name):
 
     try:
@@ -232,6 +282,62 @@ def path_has_saved_project_state(directory_path, require_phenotypes=True):
     return True
 
 
+def _get_state_file_names(_p):
+    """The files of a saved state, except the phenotypes"""
+
+    return (_p.phenotypes_input_data, _p.phenotype_times, _p.phenotypes_input_smooth,
+            _p.phenotypes_extraction_params, _p.phenotypes_filter, _p.phenotypes_filter_undo,
+            _p.phenotypes_filter_undo_journal,
+            _p.phenotypes_meta_data, _p.normalized_phenotypes, _p.vector_phenotypes_raw,
+            _p.vector_phenotypes_columnar,
+            _p.vector_meta_phenotypes_raw, _p.phenotypes_reference_offsets,
+            _p.phenotypes_extraction_signatures, _p.phenotypes_chapman_richards)
+
+
+def get_state_signature(directory_path):
+    """Identify the current version of a saved state
+
+    Args:
+        directory_path: The directory of the state
+
+    Returns: tuple of name, modification time and size of each state file
+    """
+    _p = paths.Paths()
+    signature = []
+
+    for name in (_p.phenotypes_raw_npy, ) + _get_state_file_names(_p):
+
+        try:
+            stat_result = os.stat(os.path.join(directory_path, name))
+        except OSError:
+            continue
+        signature.append((name, stat_result.st_mtime, stat_result.st_size))
+
+    return tuple(signature)
+
+
+def signature_has_saved_project_state(signature, require_phenotypes=True):
+    """If a state signature has the files needed to load the state
+
+    The same as `path_has_saved_project_state` but without reading the
+    files, only checking that they exist.
+
+    Args:
+        signature: As given by `get_state_signature`
+        require_phenotypes: Optional, if the phenotypes must be saved too
+
+    Returns: bool
+    """
+    _p = paths.Paths()
+    names = set(name for name, _, _ in signature)
+    required = [_p.phenotypes_input_data, _p.phenotype_times, _p.phenotypes_input_smooth,
+                _p.phenotypes_extraction_params]
+    if require_phenotypes:
+        required.append(_p.phenotypes_raw_npy)
+
+    return names.issuperset(required)
+
+
 def get_project_dates(directory_path):
 
     def most_recent(stat_result):
@@ -250,10 +356,7 @@ def get_project_dates(directory_path):
 
     state_date = phenotype_date
 
-    for path in (_p.phenotypes_input_data, _p.phenotype_times, _p.phenotypes_input_smooth,
-                 _p.phenotypes_extraction_params, _p.phenotypes_filter, _p.phenotypes_filter_undo,
-                 _p.phenotypes_meta_data, _p.normalized_phenotypes, _p.vector_phenotypes_raw,
-                 _p.vector_meta_phenotypes_raw, _p.phenotypes_reference_offsets):
+    for path in _get_state_file_names(_p):
 
         try:
             state_date = max(state_date, most_recent(os.stat(os.path.join(directory_path, path))))
@@ -268,10 +371,7 @@ def remove_state_from_path(directory_path):
     _p = paths.Paths()
     n = 0
 
-    for path in (_p.phenotypes_input_data, _p.phenotype_times, _p.phenotypes_input_smooth,
-                 _p.phenotypes_extraction_params, _p.phenotypes_filter, _p.phenotypes_filter_undo,
-                 _p.phenotypes_meta_data, _p.normalized_phenotypes, _p.vector_phenotypes_raw,
-                 _p.vector_meta_phenotypes_raw, _p.phenotypes_reference_offsets):
+    for path in _get_state_file_names(_p) + (_p.phenotypes_live_snapshot, ):
 
         file_path = os.path.join(directory_path, path)
         try:
@@ -384,9 +484,25 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
     The matching lookup-keys for accessing specific phenotype indices in the
     phenotypes array are stored as static integers on the class following
     the pattern <code>Phenotyper.PHEN_*</code>. 
+
+    With <code>compact=True</code> growth data, scalar phenotypes and
+    normalized phenotypes are stored as float32 and the vector phenotypes
+    as fixed shape numeric arrays instead of object arrays. All smoothing
+    and phenotype calculations are still done in float64 on upcast copies
+    of the curves, only the stored results are rounded.
+
+    With <code>lazy=True</code> feature extraction only smooths the
+    curves. Each phenotype is calculated (together with the phenotypes
+    it depends on) per plate the first time it is requested and is then
+    kept and saved with the state like any extracted phenotype.
+
+    The Chapman-Richards models are fitted in the current process unless
+    <code>processes</code> is set to use a process pool, `None` using
+    one process per cpu.
     """
 
     UNDO_HISTORY_LENGTH = 50
+    COMPACT_DTYPE = np.float32
 
     def __init__(self, raw_growth_data, times_data=None,
                  median_kernel_size=5,
@@ -395,13 +511,21 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                  no_growth_monotonocity_threshold=0.6,
                  no_growth_pop_doublings_threshold=1.0,
                  base_name=None, run_extraction=False, phenotypes=None,
-                 phenotypes_inclusion=PhenotypeDataType.Trusted):
+                 phenotypes_inclusion=PhenotypeDataType.Trusted, compact=False, lazy=False, processes=1):
 
         self._logger = logger.Logger("Phenotyper")
         self._paths = paths.Paths()
+        self._compact = compact
+        self._lazy = lazy
+        self._processes = processes
+
+        if not isinstance(raw_growth_data, xml_reader_module.XML_Reader):
+            raw_growth_data = self._get_stored_plates(raw_growth_data)
 
         self._raw_growth_data = raw_growth_data
         self._smooth_growth_data = None
+        self._growth_data_changed = True
+        """If the growth data may differ from the saved state it was loaded from"""
 
         self._phenotypes = phenotypes
         self._vector_phenotypes = None
@@ -435,6 +559,8 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         self._no_growth_pop_doublings_threshold = no_growth_pop_doublings_threshold
 
         self._meta_data = None
+        self._extraction_signatures = None
+        self._chapman_richards = None
 
         self._normalizable_phenotypes = {
             Phenotypes.GenerationTime,
@@ -466,6 +592,113 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         if run_extraction:
             self.extract_phenotypes()
 
+    @property
+    def compact(self):
+        """If arrays are stored in the compact precision mode"""
+        return self._compact
+
+    @property
+    def lazy(self):
+        """If phenotypes are calculated when first requested"""
+        return self._lazy
+
+    @property
+    def _storage_dtype(self):
+
+        return self.COMPACT_DTYPE if self._compact else np.float
+
+    def _get_stored_plates(self, plates):
+        """The plates as they should be stored, float32 in compact mode.
+
+        Same shaped plates are stored as views of one stacked array,
+        see `stack_plates`.
+
+        Calculations must upcast the plates to float64 themselves.
+        """
+        if plates is None:
+            return None
+
+        if self._compact:
+            plates = [None if plate is None else np.asarray(plate, dtype=self.COMPACT_DTYPE) for plate in plates]
+
+        return stack_plates(plates if isinstance(plates, np.ndarray) else np.array(plates))
+
+    def _set_smooth_growth_data(self, plates):
+
+        self._smooth_growth_data = self._get_stored_plates(plates)
+        self._growth_data_changed = True
+
+    def _compact_stored_data(self):
+
+        self._smooth_growth_data = self._get_stored_plates(self._smooth_growth_data)
+
+        for plates in (self._phenotypes, self._vector_meta_phenotypes, self._normalized_phenotypes):
+
+            if plates is None:
+                continue
+
+            for plate in plates:
+                if plate is None:
+                    continue
+                for phenotype, data in plate.items():
+                    if data is not None:
+                        plate[phenotype] = data.astype(self.COMPACT_DTYPE)
+
+        if self._vector_phenotypes is not None:
+            for id_plate, plate in enumerate(self._vector_phenotypes):
+                if plate is not None:
+                    self._vector_phenotypes[id_plate] = self._get_stored_vector_phenotypes(plate)
+
+    def _get_stored_vector_phenotypes(self, vector_phenotypes):
+
+        if not self._compact:
+            return vector_phenotypes
+
+        packed = {}
+        for phenotype, plate in vector_phenotypes.iteritems():
+            if is_packed(plate):
+                packed[phenotype] = plate
+            elif phenotype is VectorPhenotypes.PhasesClassifications:
+                packed[phenotype] = pack_phases_classifications(plate, self._times_data.size)
+            else:
+                packed[phenotype] = pack_phases_phenotypes(plate, dtype=self.COMPACT_DTYPE)
+        return packed
+
+    def _get_saved_plates(self, plates):
+        """The plates as they should be saved, always float64.
+
+        Compact plates are upcast so saved states have the same types in
+        both modes, the precision lost in compact mode is not recovered.
+        """
+        if not self._compact or plates is None:
+            return plates
+
+        if isinstance(plates, np.ndarray) and plates.dtype != np.object:
+            return plates.astype(np.float)
+
+        saved = np.empty((len(plates), ), dtype=np.object)
+        for id_plate, plate in enumerate(plates):
+            saved[id_plate] = None if plate is None else np.asarray(plate, dtype=np.float)
+        return saved
+
+    def _get_saved_phenotypes(self, plates):
+
+        if not self._compact or plates is None:
+            return plates
+
+        saved = np.empty((len(plates), ), dtype=np.object)
+        for id_plate, plate in enumerate(plates):
+            saved[id_plate] = None if plate is None else {
+                phenotype: None if data is None else data.astype(np.float) for phenotype, data in plate.items()}
+        return saved
+
+    def _save_growth_data(self, path, plates, ask_if_overwrite):
+
+        if self._compact and os.path.isfile(path):
+            self._logger.info("Keeping the unchanged growth data in '{0}'".format(path))
+        elif not ask_if_overwrite or not os.path.isfile(path) or self._do_ask_overwrite(path):
+            np.save(path, self._get_saved_plates(plates))
+
     def __contains__(self, phenotype):
         """
 
@@ -530,7 +763,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                            chain(*(plate.keys() for plate in self._normalized_phenotypes
                                    if plate is not None)))
         else:
-            return tuple(p.name for p in self.phenotypes if p in self)
+            return tuple(p.name for p in self.phenotypes if p in self or self._can_calculate_lazily(p))
 
     @classmethod
     def LoadFromXML(cls, path, **kwargs):
@@ -555,7 +788,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         return cls(xml, base_name=path, run_extraction=True, **kwargs)
 
     @classmethod
-    def LoadFromState(cls, directory_path):
+    def LoadFromState(cls, directory_path, compact=False):
         """Creates an instance based on previously saved phenotyper state
         in specified directory.
 
@@ -564,6 +797,10 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             directory_path (str):
                 Path to the directory holding the relevant files
 
+            compact (bool):
+                Optional, if the loaded arrays should be kept in the
+                compact precision mode. Default is `False`.
+
         Returns:
 
             Phenotyper instance
@@ -574,7 +811,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
         times = unpickle_with_unpickler(np.load, os.path.join(directory_path, _p.phenotype_times))
 
-        phenotyper = cls(raw_growth_data, times, run_extraction=False, base_name=directory_path)
+        phenotyper = cls(raw_growth_data, times, run_extraction=False, base_name=directory_path, compact=compact)
 
         try:
             phenotypes = unpickle_with_unpickler(np.load, os.path.join(directory_path, _p.phenotypes_raw_npy))
@@ -583,13 +820,21 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                 "Could not load Phenotypes, probably too old extraction, please rerun!")
             phenotypes = None
 
-        try:
-            vector_phenotypes = unpickle_with_unpickler(
-                np.load, os.path.join(directory_path, _p.vector_phenotypes_raw))
-        except (IOError, ValueError):
-            phenotyper._logger.warning(
-                "Could not load Vector Phenotypes, probably too old extraction, please rerun!")
-            vector_phenotypes = None
+        vector_phenotypes_columnar_path = os.path.join(directory_path, _p.vector_phenotypes_columnar)
+        vector_phenotypes = None
+        if os.path.isfile(vector_phenotypes_columnar_path):
+            try:
+                vector_phenotypes = get_vector_phenotypes_from_columnar(
+                    load_columnar_vector_phenotypes(vector_phenotypes_columnar_path))
+            except (IOError, ValueError, KeyError, zipfile.BadZipfile):
+                phenotyper._logger.warning("Could not load Vector Phenotypes, file corrupt!")
+        else:
+            try:
+                vector_phenotypes = unpickle_with_unpickler(
+                    np.load, os.path.join(directory_path, _p.vector_phenotypes_raw))
+            except (IOError, ValueError):
+                phenotyper._logger.warning(
+                    "Could not load Vector Phenotypes, probably too old extraction, please rerun!")
 
         try:
             vector_meta_phenotypes = unpickle_with_unpickler(
@@ -668,8 +913,16 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                 phenotyper._logger.warning(
                     "Could not load Normalized Phenotypes, probably too old extraction, please rerun!")
 
+        filter_undo_journal_path = os.path.join(directory_path, _p.phenotypes_filter_undo_journal)
         filter_undo_path = os.path.join(directory_path, _p.phenotypes_filter_undo)
-        if os.path.isfile(filter_undo_path):
+        if os.path.isfile(filter_undo_journal_path):
+            try:
+                phenotyper.set("phenotype_filter_undo", UndoJournal.LoadFromFile(
+                    filter_undo_journal_path, len(phenotyper.raw_growth_data),
+                    max_length=phenotyper.UNDO_HISTORY_LENGTH))
+            except (ValueError, IndexError, IOError):
+                phenotyper._logger.warning("Could not load saved undo, file corrupt!")
+        elif os.path.isfile(filter_undo_path):
             try:
                 phenotyper.set("phenotype_filter_undo", unpickle(filter_undo_path))
             except EOFError:
@@ -682,6 +935,28 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             except EOFError:
                 phenotyper._logger.warning("Could not load saved meta-data, file corrupt!")
 
+        signatures_path = os.path.join(directory_path, _p.phenotypes_extraction_signatures)
+        if os.path.isfile(signatures_path):
+            try:
+                phenotyper.set("extraction_signatures", unpickle(signatures_path))
+            except EOFError:
+                phenotyper._logger.warning("Could not load saved extraction signatures, file corrupt!")
+
+        chapman_richards_path = os.path.join(directory_path, _p.phenotypes_chapman_richards)
+        if os.path.isfile(chapman_richards_path):
+            try:
+                phenotyper.set("chapman_richards", unpickle_with_unpickler(np.load, chapman_richards_path))
+            except (ValueError, IOError):
+                phenotyper._logger.warning("Could not load saved Chapman-Richards fits, file corrupt!")
+
+        if phenotyper._extraction_signatures is not None and phenotyper._extraction_signatures.get('lazy', False):
+            phenotyper._lazy = True
+            phenotyper._init_lazy_phenotypes()
+
+        if compact:
+            phenotyper._compact_stored_data()
+
+        phenotyper._growth_data_changed = False
         return phenotyper
 
     @classmethod
@@ -773,11 +1048,46 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
         return self._smooth_growth_data
 
+    @property
+    def stacked_raw_growth_data(self):
+        """The non-smooth growth data of same shaped plates as one array
+
+        Returns: PlateStack of plates x rows x columns x times, it is a view
+            of the stored growth data.
+        """
+        return PlateStack.FromPlates(self._raw_growth_data)
+
+    @property
+    def stacked_smooth_growth_data(self):
+        """The smooth growth data of same shaped plates as one array
+
+        Returns: PlateStack of plates x rows x columns x times, it is a view
+            of the stored growth data.
+        """
+        return PlateStack.FromPlates(self._smooth_growth_data)
+
+    def get_stacked_phenotype(self, phenotype, **kwargs):
+        """Get phenotype data of same shaped plates as one array
+
+        Args:
+            phenotype: The phenotype
+            kwargs: Further keyword arguments are passed along to `Phenotyper.get_phenotype`
+
+        Returns: PlateStack of plates x rows x columns, with the curve markings
+            as mask unless `filtered=False` is passed.
+
+        See Also:
+            Phenotyper.get_phenotype: Getting the phenotype data per plate
+        """
+        return PlateStack.FromPlates(
+            [plate.masked() if isinstance(plate, FilterArray) else plate
+             for plate in self.get_phenotype(phenotype, **kwargs)])
+
     @property
     def curve_segments(self):
 
         try:
-            return [self._vector_phenotypes[plate][VectorPhenotypes.PhasesClassifications] for
+            return [self._get_vector_phenotype_plate(plate, VectorPhenotypes.PhasesClassifications) for
                     plate in self.enumerate_plates]
 
         except (ValueError, IndexError, TypeError, KeyError):
@@ -854,8 +1164,11 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             "Iteration started, will extract {0} phenotypes".format(
                 self.get_number_of_phenotypes()))
 
+        smoothing, smoothing_coeffs = self._get_previous_smoothing()
+
         if not self.has_smooth_growth_data:
             self._smoothen()
+            smoothing, smoothing_coeffs = Smoothing.MedianGauss, {}
             self._logger.info("Smoothed")
             yield 0
         else:
@@ -868,6 +1181,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             yield x
 
         self._init_remove_filter_and_undo_actions()
+        self._set_extraction_signatures(smoothing, smoothing_coeffs)
 
     def wipe_extracted_phenotypes(self, keep_filter=False):
         """ This clears all extracted phenotypes but keeps the log2_curve data
@@ -888,6 +1202,8 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         if self._vector_meta_phenotypes is not None:
             self._logger.info("Removing previous vector meta phenotypes")
         self._vector_meta_phenotypes = None
+        self._extraction_signatures = None
+        self._chapman_richards = None
 
         if keep_filter:
             self._logger.warning("Keeping the filter may cause inconsistencies with what curves are marked as bad."
@@ -921,6 +1237,10 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                 Optional dict of key-value parameters for the smoothing
                 to override default values.
 
+        Notes:
+            In lazy mode only the smoothing is done, the phenotypes are
+            calculated when requested.
+
         See Also:
             Phenotyper.set_phenotype_inclusion_level:
                 How to change what phenotypes are extracted
@@ -929,6 +1249,8 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             Phenotyper.normalize_phenotypes:
                 Normalize phenotypes.
         """
+        previous_smoothing, previous_smoothing_coeffs = self._get_previous_smoothing()
+
         self.wipe_extracted_phenotypes(keep_filter)
 
         self._logger.info("Selecting smoothing.")
@@ -937,6 +1259,9 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             self._logger.warning(
                 "There was no previous smooth data but setting was to keep previous, will run default.")
             self._poly_smoothen_raw_growth_weighted(**smoothing_coeffs)
+            smoothing = Smoothing.PolynomialWeightedMulti
+        elif smoothing is Smoothing.Keep:
+            smoothing, smoothing_coeffs = previous_smoothing, previous_smoothing_coeffs
         elif smoothing is Smoothing.MedianGauss:
             self._smoothen()
         elif smoothing is Smoothing.Polynomial:
@@ -944,12 +1269,319 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         elif smoothing is Smoothing.PolynomialWeightedMulti:
             self._poly_smoothen_raw_growth_weighted(**smoothing_coeffs)
 
-        for _ in self._calculate_phenotypes():
-            pass
+        if self._lazy:
+            self._init_lazy_phenotypes()
+        else:
+            for _ in self._calculate_phenotypes():
+                pass
 
         self._init_remove_filter_and_undo_actions()
+        self._set_extraction_signatures(smoothing, smoothing_coeffs)
+
+        self._logger.info("Phenotypes will be calculated when requested" if self._lazy else "Phenotypes extracted")
+
+    def update_phenotypes(self, raw_growth_data=None, times_data=None, smoothing=Smoothing.Keep,
+                          smoothing_coeffs=None):
+        """Update phenotypes only for the curves that changed since last extraction
+
+        Curves are tracked by their raw growth data together with the time series,
+        the smoothing and the extraction settings used. Curves with edited raw data
+        are smoothed anew, while if time points only were appended to the experiment
+        just the end of each smoothed curve that could be affected is recalculated
+        (this is limited to the default `Smoothing.PolynomialWeightedMulti`, other
+        smoothings redo the entire curves).
+
+        The phenotypes of all changed curves are extracted again and merged into the
+        existing phenotypes. Curve marks (the QC filter) on curves that didn't change
+        are kept, changed curves get their marks reset. Any undo history is cleared
+        for plates with changed curves.
+
+        If the changes can't be resolved per curve, e.g. because the plate layout, the
+        smoothing or the phenotype inclusion level changed or because there were no
+        previous extraction to compare with, a full extraction is run.
+
+        Args:
+            raw_growth_data: Optional, the new raw growth data, if omitted the current is used.
+            times_data: Optional, the new time series, if omitted the current is used.
+            smoothing: Optional, the smoothing to be used. Default is `Smoothing.Keep`, which
+                uses the smoothing of the previous extraction.
+            smoothing_coeffs: Optional dict of key-value parameters for the smoothing,
+                default is to use the same as the previous extraction.
+
+        Returns: tuple with a boolean array per plate (`None` for plates without data)
+            of the curves that were updated.
+
+        See Also:
+            Phenotyper.get_dirty_curves: What curves would be updated
+            Phenotyper.extract_phenotypes: Full feature extraction
+        """
+        if times_data is not None:
+            self.times = times_data
+
+        if raw_growth_data is not None:
+            self._raw_growth_data = self._get_stored_plates(raw_growth_data)
+            self._data = self._raw_growth_data
+            self._growth_data_changed = True
+
+        smoothing, smoothing_coeffs = self._resolve_smoothing(smoothing, smoothing_coeffs)
+        changes = self._get_curve_changes(smoothing, smoothing_coeffs)
+
+        if changes is None:
+            self._logger.info("Changes can't be resolved per curve, running full phenotype extraction")
+            self.extract_phenotypes(smoothing=smoothing, smoothing_coeffs=smoothing_coeffs)
+            return tuple(None if plate is None else np.ones(plate.shape[:2], dtype=bool)
+                         for plate in self._raw_growth_data)
+
+        edited, first_new_index = changes
+        if first_new_index is None:
+            dirty = edited
+        else:
+            dirty = tuple(None if plate is None else np.ones_like(plate) for plate in edited)
+
+        if not any(plate.any() for plate in dirty if plate is not None):
+            self._logger.info("No curves changed since last extraction, nothing to update")
+            return dirty
+
+        self._update_smooth_growth_data(edited, first_new_index, smoothing, smoothing_coeffs)
+
+        if self._lazy:
+            self._update_lazy_phenotypes(dirty)
+        else:
+            for _ in self._calculate_phenotypes(dirty=dirty):
+                pass
+
+        self._reset_filter_positions(dirty)
+        self._set_extraction_signatures(smoothing, smoothing_coeffs)
+
+        self._logger.info("Phenotypes updated for {0} curves".format(
+            sum(plate.sum() for plate in dirty if plate is not None)))
+
+        return dirty
+
+    def get_dirty_curves(self, smoothing=Smoothing.Keep, smoothing_coeffs=None):
+        """Get which curves have changed since the last extraction
+
+        Args:
+            smoothing: Optional, the smoothing that would be used, default is `Smoothing.Keep`.
+            smoothing_coeffs: Optional dict of smoothing parameters, default is those previously used.
+
+        Returns: tuple with a boolean array per plate (`None` for plates without data) where
+            curves that need a new extraction are `True`.
+
+        See Also:
+            Phenotyper.update_phenotypes: Updating the changed curves
+        """
+        smoothing, smoothing_coeffs = self._resolve_smoothing(smoothing, smoothing_coeffs)
+        changes = self._get_curve_changes(smoothing, smoothing_coeffs)
+
+        if changes is None:
+            return tuple(None if plate is None else np.ones(plate.shape[:2], dtype=bool)
+                         for plate in self._raw_growth_data)
+
+        edited, first_new_index = changes
+        if first_new_index is None:
+            return edited
+        return tuple(None if plate is None else np.ones_like(plate) for plate in edited)
+
+    def _get_previous_smoothing(self):
+
+        if self._extraction_signatures is None:
+            return None, {}
+
+        return Smoothing[self._extraction_signatures['smoothing']], self._extraction_signatures['smoothing_coeffs']
+
+    def _resolve_smoothing(self, smoothing, smoothing_coeffs):
+
+        if smoothing is Smoothing.Keep:
+            previous_smoothing, previous_smoothing_coeffs = self._get_previous_smoothing()
+            if previous_smoothing is None:
+                smoothing = Smoothing.PolynomialWeightedMulti
+            else:
+                smoothing = previous_smoothing
+                if smoothing_coeffs is None:
+                    smoothing_coeffs = previous_smoothing_coeffs
+
+        return smoothing, dict() if smoothing_coeffs is None else dict(smoothing_coeffs)
+
+    def _get_extraction_settings(self):
+
+        return (self._median_kernel_size,
+                self._gaussian_filter_sigma,
+                self._linear_regression_size,
+                None if self._phenotypes_inclusion is None else self._phenotypes_inclusion.name)
+
+    def _set_extraction_signatures(self, smoothing, smoothing_coeffs):
+
+        if self._phenotypes is None or smoothing is None:
+            self._extraction_signatures = None
+            return
+
+        self._extraction_signatures = {
+            'smoothing': smoothing.name,
+            'smoothing_coeffs': dict(smoothing_coeffs),
+            'settings': self._get_extraction_settings(),
+            'times': self._times_data.copy(),
+            'curves': [None if plate is None else get_curve_signatures(plate) for plate in self._raw_growth_data],
+            'lazy': self._lazy,
+        }
+
+    def _get_curve_changes(self, smoothing, smoothing_coeffs):
+        """Compare current data to that of the previous extraction.
+
+        Returns: `None` if changes can't be resolved per curve, else a tuple of the edited curves
+            per plate and the first appended time index (`None` if no time points were appended).
+        """
+        previous = self._extraction_signatures
+
+        if (previous is None or self._phenotypes is None or self._smooth_growth_data is None or
+                previous['smoothing'] != smoothing.name or
+                previous['smoothing_coeffs'] != smoothing_coeffs or
+                previous['settings'] != self._get_extraction_settings() or
+                len(previous['curves']) != len(self._raw_growth_data)):
+
+            return None
+
+        previous_times = previous['times']
+        n_previous = previous_times.size
+
+        if self._times_data.size < n_previous or not np.array_equal(self._times_data[:n_previous], previous_times):
+            return None
+
+        edited = []
+        for previous_plate, plate in izip(previous['curves'], self._raw_growth_data):
+
+            if previous_plate is None and plate is None:
+                edited.append(None)
+            elif previous_plate is None or plate is None or previous_plate.shape != plate.shape[:2]:
+                return None
+            else:
+                edited.append(get_curve_signatures(plate, n_previous) != previous_plate)
+
+        return tuple(edited), n_previous if self._times_data.size > n_previous else None
+
+    def _update_smooth_growth_data(self, edited, first_new_index, smoothing, smoothing_coeffs):
+
+        smooth_data = []
+
+        for id_plate, (plate, plate_edited) in enumerate(izip(self._raw_growth_data, edited)):
+
+            if plate is None:
+                smooth_data.append(None)
+                continue
+
+            previous_plate = self._smooth_growth_data[id_plate]
+            smooth_plate = np.ones(plate.shape, dtype=np.float) * np.nan
+            smooth_plate[..., :previous_plate.shape[-1]] = previous_plate
+            smooth_data.append(smooth_plate)
+
+            if first_new_index is None and not plate_edited.any():
+                continue
+
+            if smoothing is Smoothing.PolynomialWeightedMulti:
+                self._poly_smoothen_raw_growth_weighted_curves(
+                    plate, smooth_plate, plate_edited, first_new_index, **smoothing_coeffs)
+            else:
+                resmooth = plate_edited if first_new_index is None else np.ones_like(plate_edited)
+                if smoothing is Smoothing.Polynomial:
+                    self._poly_smoothen_raw_growth_curves(plate, smooth_plate, resmooth, **smoothing_coeffs)
+                else:
+                    self._smoothen_curves(plate, smooth_plate, resmooth)
+
+            self._logger.info("Plate {0} smoothing updated".format(id_plate + 1))
+
+        self._set_smooth_growth_data(smooth_data)
+
+    def _poly_smoothen_raw_growth_weighted_curves(self, plate, smooth_plate, edited, first_new_index, power=3,
+                                                  time_delta=5.1, gauss_sigma=1.5, apply_median=True,
+                                                  edge_condition=EdgeCondition.Reflect):
+
+        times, filt, left_filt, right_filt = self._get_weighted_smoothing_times(self.times, time_delta, edge_condition)
+
+        if first_new_index is None:
+            rows = None
+            resmooth = edited
+        else:
+            # The median filter reaches half its kernel size back from the previous last time point and
+            # each smoothed value only depends on data less than two time deltas away from it.
+            first_changed = max(first_new_index - ((self._median_kernel_size - 1) / 2 if apply_median else 0), 0)
+            rows = self.times >= self.times[first_changed] - 2 * time_delta
+            resmooth = np.ones_like(edited)
+
+        log2_data = np.log2(plate[resmooth], dtype=np.float)
+
+        if apply_median:
+            log2_data[...] = median_filter(log2_data, footprint=np.ones((1, self._median_kernel_size)),
+                                           mode='reflect')
+
+        for log2_curve, position in izip(log2_data, izip(*np.where(resmooth))):
+
+            curve_rows = None if edited[position] else rows
+            smooth_curve = np.array(self._poly_smoothen_raw_growth_curve_weighted(
+                times, log2_curve, power, filt, left_filt, right_filt, gauss_sigma, edge_condition, position,
+                rows=curve_rows))
+
+            if curve_rows is None:
+                smooth_plate[position] = smooth_curve
+            else:
+                smooth_plate[position][curve_rows] = smooth_curve[curve_rows]
+
+    def _poly_smoothen_raw_growth_curves(self, plate, smooth_plate, resmooth, power=3, time_delta=5.1):
+
+        times = self.times
+        time_diffs = np.subtract.outer(times, times)
+        filt = (time_diffs < time_delta) & (time_diffs > -time_delta)
+
+        for position in izip(*np.where(resmooth)):
+            smooth_plate[position] = tuple(
+                self._poly_smoothen_raw_growth_curve(times, np.log2(plate[position], dtype=np.float), power, filt))
+
+    def _smoothen_curves(self, plate, smooth_plate, resmooth):
+
+        curves = median_filter(
+            plate[resmooth].astype(np.float), footprint=np.ones((1, self._median_kernel_size)), mode='reflect')
+
+        smooth_plate[resmooth] = tuple(
+            merge_convolve(v, self.times, func_kwargs=self._get_gauss_kwargs()) for v in curves)
 
-        self._logger.info("Phenotypes extracted")
+    def _reset_filter_positions(self, dirty):
+
+        if self._phenotype_filter is None or self._phenotype_filter_undo is None:
+            self._init_remove_filter_and_undo_actions()
+            return
+
+        growth_filter = self._get_no_growth_filter()
+
+        for phenotype in self.phenotypes:
+
+            if phenotype not in self:
+                continue
+
+            phenotype_data = self._get_abs_phenotype(phenotype, False)
+
+            for plate_index, plate_dirty in enumerate(dirty):
+
+                if plate_dirty is None or not plate_dirty.any() or phenotype_data[plate_index] is None:
+                    continue
+
+                plate_filter = self._phenotype_filter[plate_index].get(phenotype, None)
+
+                if plate_filter is None or plate_filter.shape != plate_dirty.shape:
+                    self._init_plate_filter(plate_index, phenotype, phenotype_data[plate_index],
+                                            growth_filter[plate_index])
+                    continue
+
+                plate_filter[plate_dirty] = Filter.OK.value
+                plate_filter[plate_dirty & (np.isfinite(phenotype_data[plate_index]) == np.False_)] = \
+                    Filter.UndecidedProblem.value
+
+                if len(growth_filter[plate_index]):
+                    plate_filter[plate_dirty & growth_filter[plate_index]] = Filter.NoGrowth.value
+
+        for plate_index, plate_dirty in enumerate(dirty):
+
+            if plate_dirty is not None and plate_dirty.any() and self._phenotype_filter_undo[plate_index]:
+                self._logger.info("Undo cleared for plate {0} because of updated curves".format(plate_index + 1))
+                self._phenotype_filter_undo[plate_index].clear()
 
     @property
     def has_smooth_growth_data(self):
@@ -985,7 +1617,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                 self._logger.info("Plate {0} has no data".format(id_plate + 1))
                 continue
 
-            log2_data = np.log2(plate).reshape(np.prod(plate.shape[:2]), plate.shape[-1])
+            log2_data = np.log2(plate, dtype=np.float).reshape(np.prod(plate.shape[:2]), plate.shape[-1])
             smooth_plate = np.array(tuple(
                 tuple(self._poly_smoothen_raw_growth_curve(times, log2_curve, power, filt))
                 for log2_curve in log2_data))
@@ -994,7 +1626,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
             smooth_data.append(smooth_plate.reshape(plate.shape))
 
-        self._smooth_growth_data = np.array(smooth_data)
+        self._set_smooth_growth_data(smooth_data)
 
         self._logger.info("Completed Polynomial smoothing")
 
@@ -1012,18 +1644,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
         median_kernel = np.ones((1, self._median_kernel_size))
         smooth_data = []
-        times = self.times
-        left_filt, right_filt = get_edge_condition_timed_filter(times, time_delta, edge_condition)
-        left = left_filt.sum()
-        right = right_filt.sum()
-
-        times = filter_edge_condition(times, left_filt, right_filt, edge_condition,
-                                      extrapolate_values=True,
-                                      logger=self._logger)
-
-        self._logger.info("Data with edge condition has length {0}, ({1} {2})".format(times.size, left, right))
-        time_diffs = np.subtract.outer(times, times)
-        filt = (time_diffs < time_delta) & (time_diffs > -time_delta)
+        times, filt, left_filt, right_filt = self._get_weighted_smoothing_times(self.times, time_delta, edge_condition)
 
         for id_plate, plate in enumerate(self._raw_growth_data):
             if plate is None:
@@ -1031,50 +1652,89 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                 self._logger.info("Plate {0} has no data".format(id_plate + 1))
                 continue
 
-            log2_data = np.log2(plate).reshape(np.prod(plate.shape[:2]), plate.shape[-1])
-            epsilon = np.finfo(log2_data.dtype).eps
+            log2_data = np.log2(plate, dtype=np.float).reshape(np.prod(plate.shape[:2]), plate.shape[-1])
 
             if apply_median:
                 log2_data[...] = median_filter(log2_data, footprint=median_kernel, mode='reflect')
 
-            smooth_plate = [None] * log2_data.shape[0]
-            for id_curve, log2_curve in enumerate(log2_data):
+            smooth_plate = [
+                self._poly_smoothen_raw_growth_curve_weighted(
+                    times, log2_curve, power, filt, left_filt, right_filt, gauss_sigma, edge_condition,
+                    np.unravel_index(id_curve, plate.shape[:2]))
+                for id_curve, log2_curve in enumerate(log2_data)]
 
-                log2_curve = filter_edge_condition(
-                    log2_curve, left_filt, right_filt, edge_condition, logger=self._logger)
+            self._logger.info("Plate {0} data polynomial smoothed ({1} curves, {2} data-points per curve)".format(
+                id_plate + 1, len(smooth_plate), len(smooth_plate[0])))
 
-                p, r, r0 = zip(*self._poly_estimate_raw_growth_curve(times, log2_curve, power, filt))
+            smooth_data.append(np.array(smooth_plate).reshape(plate.shape))
 
-                if any(r0val < epsilon for r0val in r0):
+        self._set_smooth_growth_data(smooth_data)
 
-                    self._logger.warning(
-                        "Curve {0} has long stretches of (near) identical data and is probably corrupt".format(
-                            np.unravel_index(id_curve, plate.shape[:2])
-                        ))
+        self._logger.info("Completed Weighted Multi-Polynomial smoothing")
 
-                if any(rval == 0 for rval in r):
-                    self._logger.warning(
-                        "Curve {0} is probably overfitted somewhere because polynomial residual was 0".format(
-                            np.unravel_index(id_curve, plate.shape[:2])
-                    ))
+    def _get_weighted_smoothing_times(self, times, time_delta, edge_condition):
 
-                smooth_plate[id_curve] = tuple(self._multi_poly_smooth(
-                    times, p, np.array(r), np.array(r0), filt, gauss_sigma))[left: -right if right else None]
+        left_filt, right_filt = get_edge_condition_timed_filter(times, time_delta, edge_condition)
 
-            self._logger.info("Plate {0} data polynomial smoothed ({1} curves, {2} data-points per curve)".format(
-                id_plate + 1, len(smooth_plate), len(smooth_plate[0])))
+        times = filter_edge_condition(times, left_filt, right_filt, edge_condition,
+                                      extrapolate_values=True,
+                                      logger=self._logger)
 
-            smooth_data.append(np.array(smooth_plate).reshape(plate.shape))
+        self._logger.info("Data with edge condition has length {0}, ({1} {2})".format(
+            times.size, left_filt.sum(), right_filt.sum()))
+        time_diffs = np.subtract.outer(times, times)
+        filt = (time_diffs < time_delta) & (time_diffs > -time_delta)
 
-        self._smooth_growth_data = np.array(smooth_data)
+        return times, filt, left_filt, right_filt
 
-        self._logger.info("Completed Weighted Multi-Polynomial smoothing")
+    def _poly_smoothen_raw_growth_curve_weighted(self, times, log2_curve, power, filt, left_filt, right_filt,
+                                                 gauss_sigma, edge_condition, position, rows=None):
+        """Smooth one log2 curve with the weighted multi-polynomial method
+
+        Args:
+            times: The edge condition extended times
+            log2_curve: The (median filtered) log2 curve
+            rows: Optional boolean array over the curve's time points, if supplied only
+                those smoothed values are calculated and the rest are `numpy.nan`.
+
+        Returns: tuple of smoothed values
+        """
+        left = left_filt.sum()
+        right = right_filt.sum()
+        epsilon = np.finfo(log2_curve.dtype).eps
+
+        if rows is not None:
+            rows = np.hstack((np.zeros((left,), dtype=bool), rows, np.zeros((right,), dtype=bool)))
+
+        log2_curve = filter_edge_condition(
+            log2_curve, left_filt, right_filt, edge_condition, logger=self._logger)
+
+        p, r, r0 = zip(*self._poly_estimate_raw_growth_curve(
+            times, log2_curve, power, filt, rows=None if rows is None else filt[rows].any(axis=0)))
+
+        if any(r0val < epsilon for r0val in r0):
+
+            self._logger.warning(
+                "Curve {0} has long stretches of (near) identical data and is probably corrupt".format(position))
+
+        if any(rval == 0 for rval in r):
+            self._logger.warning(
+                "Curve {0} is probably overfitted somewhere because polynomial residual was 0".format(position))
+
+        smooth_curve = tuple(self._multi_poly_smooth(times, p, np.array(r), np.array(r0), filt, gauss_sigma, rows=rows))
+
+        if rows is None:
+            return smooth_curve[left: -right if right else None]
+
+        smooth_rows = np.ones(times.shape) * np.nan
+        smooth_rows[rows] = smooth_curve
+        return tuple(smooth_rows[left: -right if right else None])
 
     @staticmethod
-    def _multi_poly_smooth(times, polys, r, r0, filt, gauss_sigma):
+    def _multi_poly_smooth(times, polys, r, r0, filt, gauss_sigma, rows=None):
 
         included = [v is not None for v in r]
-        for f in filt:
+        for f in (filt if rows is None else filt[rows]):
 
             f2 = f & included
             t = times[f2].mean()
@@ -1083,11 +1743,16 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             w = w1 * w2
             yield (w * tuple(np.power(2, p(t)) for p, i in izip(polys, f2) if i)).sum() / w.sum()
 
-    def _poly_estimate_raw_growth_curve(self, times, log2_data, power, filt):
+    def _poly_estimate_raw_growth_curve(self, times, log2_data, power, filt, rows=None):
 
         finites = np.isfinite(log2_data)
 
-        for t, f in izip(times, filt):
+        for idx, (t, f) in enumerate(izip(times, filt)):
+
+            if rows is not None and not rows[idx]:
+                # Not needed by any of the requested smoothed values
+                yield None, np.nan, np.nan
+                continue
 
             f2 = f & finites
             x = times[f2]
@@ -1136,195 +1801,447 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             else:
                 yield np.power(2, np.poly1d(p)(t))
 
+    def _get_gauss_kwargs(self):
+
+        # This conversion is done to reflect that previous filter worked on
+        # indices and expected ratio to hours is 1:3.
+        return {
+            'sigma':
+                self._gaussian_filter_sigma / 3.0 if self._gaussian_filter_sigma == 5 else self._gaussian_filter_sigma}
+
     def _smoothen(self):
 
-        self.set("smooth_growth_data", self._raw_growth_data.copy())
-        self._logger.info("Smoothing Started")
-        median_kernel = np.ones((1, self._median_kernel_size))
-        times = self.times
+        self.set("smooth_growth_data", np.array(
+            [None if plate is None else plate.astype(np.float) for plate in self._raw_growth_data]))
+        self._logger.info("Smoothing Started")
+        median_kernel = np.ones((1, self._median_kernel_size))
+        times = self.times
+
+        gauss_kwargs = self._get_gauss_kwargs()
+
+        for plate_id, plate in enumerate(self._smooth_growth_data):
+
+            if plate is None:
+                self._logger.info("Plate {0} has no data, skipping".format(plate_id + 1))
+                continue
+
+            plate_as_flat = np.lib.stride_tricks.as_strided(
+                plate,
+                shape=(plate.shape[0] * plate.shape[1], plate.shape[2]),
+                strides=(plate.strides[1], plate.strides[2]))
+
+            plate_as_flat[...] = median_filter(
+                plate_as_flat, footprint=median_kernel, mode='reflect')
+
+            plate_as_flat[...] = tuple(
+                merge_convolve(v, times, func_kwargs=gauss_kwargs) for v in plate_as_flat
+            )
+
+            self._logger.info("Smoothing of plate {0} done".format(plate_id + 1))
+
+        self._set_smooth_growth_data(self._smooth_growth_data)
+        self._logger.info("Smoothing Done")
+
+    def _calculate_phenotypes(self, dirty=None):
+
+        if self._times_data.shape[0] - (self._linear_regression_size - 1) <= 0:
+            self._logger.error(
+                "Refusing phenotype extractions since number of scans are less than used in the linear regression")
+            return
+
+        all_phenotypes = []
+        all_vector_phenotypes = []
+        all_vector_meta_phenotypes = []
+
+        phenotypes_count = self.get_number_of_phenotypes()
+
+        if dirty is None:
+            total_curves = float(self.number_of_curves)
+        else:
+            total_curves = float(sum(plate_dirty.sum() for plate_dirty in dirty if plate_dirty is not None))
+
+        self._logger.info("Phenotypes (N={0}), extraction started for {1} curves".format(
+            phenotypes_count, int(total_curves)))
+
+        curves_in_completed_plates = 0
+        phenotypes_inclusion = self._phenotypes_inclusion
+        chapman_richards = self._fit_chapman_richards(dirty)
+
+        if phenotypes_inclusion is not PhenotypeDataType.Trusted:
+            self._logger.warning("Will extract phenotypes beyond those that are trusted, this is not recommended!" +
+                                 " It is your responsibility to verify the validity of those phenotypes!")
+
+        scalar_phenotypes = [p for p in Phenotypes if phenotypes_inclusion(p)]
+        meta_phenotypes = [p for p in CurvePhaseMetaPhenotypes if phenotypes_inclusion(p)]
+        if meta_phenotypes and not phenotypes_inclusion(VectorPhenotypes.PhasesPhenotypes):
+            self._logger.warning("Can't extract {0} because {1} has not been included.".format(
+                ", ".join(phenotype.name for phenotype in meta_phenotypes), VectorPhenotypes.PhasesPhenotypes))
+            meta_phenotypes = []
+
+        for id_plate, plate in enumerate(self._smooth_growth_data):
+
+            if plate is None:
+                all_phenotypes.append(None)
+                all_vector_phenotypes.append(None)
+                all_vector_meta_phenotypes.append(None)
+                continue
+
+            plate_dirty = None if dirty is None else dirty[id_plate]
+
+            if dirty is not None and (plate_dirty is None or not plate_dirty.any()):
+                all_phenotypes.append(self._phenotypes[id_plate])
+                all_vector_phenotypes.append(
+                    None if self._vector_phenotypes is None else self._vector_phenotypes[id_plate])
+                all_vector_meta_phenotypes.append(
+                    None if self._vector_meta_phenotypes is None else self._vector_meta_phenotypes[id_plate])
+                self._logger.info("Plate {0} has no changed curves, keeping its phenotypes".format(id_plate + 1))
+                continue
+
+            plate = np.asarray(plate, dtype=np.float)
+            plate_flat_regression_strided = self._get_plate_linear_regression_strided(plate)
+
+            plate_size = np.prod(plate.shape[:2])
+            self._logger.info("Plate {0} has {1} curves".format(id_plate + 1, plate_size))
+
+            if plate_dirty is None:
+
+                phenotypes = {
+                    p: np.zeros(plate.shape[:2], dtype=self._storage_dtype) * np.nan
+                    for p in Phenotypes if phenotypes_inclusion(p)}
+
+                vector_phenotypes = {
+                    p: np.zeros(plate.shape[:2], dtype=np.object) * np.nan
+                    for p in VectorPhenotypes if phenotypes_inclusion(p)}
+
+            else:
+
+                self._logger.info("Plate {0} will update {1} changed curves".format(id_plate + 1, plate_dirty.sum()))
+
+                phenotypes = self._phenotypes[id_plate]
+                vector_phenotypes = {
+                    p: unpack_plate(data, p) if is_packed(data) else data
+                    for p, data in self._vector_phenotypes[id_plate].iteritems()}
+
+                for phenotype_data in chain(phenotypes.itervalues(), vector_phenotypes.itervalues()):
+                    phenotype_data[plate_dirty] = np.nan
+
+            vector_meta_phenotypes = {}
+
+            all_phenotypes.append(phenotypes)
+            all_vector_meta_phenotypes.append(vector_meta_phenotypes)
+
+            for pos_index in xrange(plate_size):
+
+                id1 = pos_index % plate.shape[1]
+                id0 = pos_index / plate.shape[1]
+
+                if plate_dirty is not None and not plate_dirty[id0, id1]:
+                    continue
+
+                self._calculate_curve_phenotypes(
+                    id_plate, (id0, id1), plate, plate_flat_regression_strided, chapman_richards,
+                    scalar_phenotypes, phenotypes, vector_phenotypes)
+
+                if id1 == 0:
+
+                    self._logger.debug("Done plate {0} pos {1} {2}".format(id_plate, id0, id1))
+
+                    self._logger.info("Plate {1} growth phenotypes {0:.1f}% done".format(
+                        100.0 * (pos_index + 1.0) / plate_size,
+                        id_plate + 1,
+                    ))
+
+                    yield (curves_in_completed_plates + pos_index + 1.0) / total_curves
+
+            self._extract_meta_phenotypes(
+                id_plate, meta_phenotypes, vector_phenotypes.get(VectorPhenotypes.PhasesPhenotypes), phenotypes,
+                vector_meta_phenotypes)
+
+            all_vector_phenotypes.append(self._get_stored_vector_phenotypes(vector_phenotypes))
+
+            self._logger.info("Plate {0} Done".format(id_plate + 1))
+            if plate_dirty is None:
+                curves_in_completed_plates += plate_flat_regression_strided.shape[0]
+            else:
+                curves_in_completed_plates += plate_dirty.sum()
+
+        self._phenotypes = np.array(all_phenotypes)
+        self._vector_phenotypes = np.array(all_vector_phenotypes)
+        self._vector_meta_phenotypes = np.array(all_vector_meta_phenotypes)
+        self._normalized_phenotypes = None
+        self._logger.info("Phenotype Extraction Done")
+
+    def _calculate_curve_phenotypes(self, id_plate, position, plate, plate_flat_regression_strided,
+                                    chapman_richards, scalar_phenotypes, phenotypes, vector_phenotypes):
+        """Calculate the phenotypes of one curve
+
+        Args:
+            id_plate: The plate index
+            position: The position on the plate
+            plate: The smooth growth data of the plate as float64
+            plate_flat_regression_strided: The plate as made by `_get_plate_linear_regression_strided`
+            chapman_richards: The Chapman-Richards fits of all plates, or `None`
+            scalar_phenotypes: The `Phenotypes` to calculate
+            phenotypes: dict of the plate's `Phenotypes` to set the values in,
+                including `Phenotypes.ExperimentPopulationDoublings` if phases
+                should be analysed.
+            vector_phenotypes: dict of the plate's `VectorPhenotypes` to set the
+                phase analysis in, nothing is analysed if it is empty.
+        """
+        id0, id1 = position
+
+        curve_data = get_preprocessed_data_for_phenotypes(
+            curve=plate[id0, id1],
+            curve_strided=plate_flat_regression_strided[id0 * plate.shape[1] + id1],
+            flat_times=self._times_data,
+            times_strided=self.times_strided,
+            index_for_48h=np.abs(np.subtract.outer(self._times_data, [48])).argmin(),
+            position_offset=(self._linear_regression_size - 1) / 2,
+            chapman_richards_fit=self._get_chapman_richards_fit(chapman_richards, id_plate, (id0, id1)))
+
+        if curve_data['curve_smooth_growth_data'].mask.all():
+            self._logger.warning("Position ({0}, {1}) on plate {2} seems void of data".format(id0, id1, id_plate + 1))
+            return
+
+        for phenotype in scalar_phenotypes:
+            if PhenotypeDataType.Scalar(phenotype):
+                phenotypes[phenotype][id0, id1] = phenotype(**curve_data)
+
+        if not vector_phenotypes:
+            return
+
+        phases, phases_phenotypes = get_phase_analysis(
+            self, id_plate, (id0, id1),
+            experiment_doublings=phenotypes[Phenotypes.ExperimentPopulationDoublings][id0, id1])
+
+        if VectorPhenotypes.PhasesClassifications in vector_phenotypes:
+            vector_phenotypes[VectorPhenotypes.PhasesClassifications][id0, id1] = phases
+        if VectorPhenotypes.PhasesPhenotypes in vector_phenotypes:
+            vector_phenotypes[VectorPhenotypes.PhasesPhenotypes][id0, id1] = phases_phenotypes
+
+    def _extract_meta_phenotypes(self, id_plate, meta_phenotypes, phases_phenotypes, phenotypes,
+                                 vector_meta_phenotypes):
+
+        phases = None
+
+        for phenotype in meta_phenotypes:
+
+            self._logger.info("Extracting {0} for plate {1}".format(phenotype.name, id_plate + 1))
+
+            if phases is None:
+                phases = RaggedPhases.FromPlate(phases_phenotypes)
+
+            vector_meta_phenotypes[phenotype] = extract_phenotypes(
+                phases, phenotype, phenotypes).astype(self._storage_dtype)
+
+    def _fit_chapman_richards(self, dirty=None):
+
+        if not any(self._phenotypes_inclusion(p) for p in CHAPMAN_RICHARDS_PHENOTYPES):
+            self._chapman_richards = None
+            return None
+
+        self._logger.info("Fitting Chapman-Richards models")
 
-        # This conversion is done to reflect that previous filter worked on
-        # indices and expected ratio to hours is 1:3.
-        gauss_kwargs = {
-            'sigma':
-                self._gaussian_filter_sigma / 3.0 if self._gaussian_filter_sigma == 5 else self._gaussian_filter_sigma}
+        previous = self._chapman_richards
+        log2_plates = [
+            None if plate is None else np.log2(plate, dtype=np.float) for plate in self._smooth_growth_data]
 
-        for plate_id, plate in enumerate(self._smooth_growth_data):
+        self._chapman_richards = np.array(fit_plates(
+            self._times_data, log2_plates, positions=None if previous is None else dirty, previous=previous,
+            processes=self._processes))
 
-            if plate is None:
-                self._logger.info("Plate {0} has no data, skipping".format(plate_id + 1))
-                continue
+        return self._chapman_richards
 
-            plate_as_flat = np.lib.stride_tricks.as_strided(
-                plate,
-                shape=(plate.shape[0] * plate.shape[1], plate.shape[2]),
-                strides=(plate.strides[1], plate.strides[2]))
+    @staticmethod
+    def _get_chapman_richards_fit(chapman_richards, id_plate, position):
 
-            plate_as_flat[...] = median_filter(
-                plate_as_flat, footprint=median_kernel, mode='reflect')
+        if chapman_richards is None or chapman_richards[id_plate] is None:
+            return np.nan, CHAPMAN_RICHARDS_P0 * np.nan
 
-            plate_as_flat[...] = tuple(
-                merge_convolve(v, times, func_kwargs=gauss_kwargs) for v in plate_as_flat
-            )
+        fit = chapman_richards[id_plate][position]
+        return fit[0], fit[1:]
 
-            self._logger.info("Smoothing of plate {0} done".format(plate_id + 1))
+    def _get_plate_linear_regression_strided(self, plate):
 
-        self._logger.info("Smoothing Done")
+        if plate is None:
+            return None
 
-    def _calculate_phenotypes(self):
+        return np.lib.stride_tricks.as_strided(
+            plate,
+            shape=(plate.shape[0] * plate.shape[1],
+                   plate.shape[2] - (self._linear_regression_size - 1),
+                   self._linear_regression_size),
+            strides=(plate.strides[1],
+                     plate.strides[2], plate.strides[2]))
 
-        if self._times_data.shape[0] - (self._linear_regression_size - 1) <= 0:
-            self._logger.error(
-                "Refusing phenotype extractions since number of scans are less than used in the linear regression")
-            return
+    def _init_lazy_phenotypes(self):
 
-        times_strided = self.times_strided
+        def empty_plates(plates):
 
-        flat_times = self._times_data
+            if plates is not None:
+                return plates
+            return np.array([None if plate is None else {} for plate in self._smooth_growth_data], dtype=np.object)
 
-        index_for_48h = np.abs(np.subtract.outer(self._times_data, [48])).argmin()
+        self._phenotypes = empty_plates(self._phenotypes)
+        self._vector_phenotypes = empty_plates(self._vector_phenotypes)
+        self._vector_meta_phenotypes = empty_plates(self._vector_meta_phenotypes)
 
-        all_phenotypes = []
-        all_vector_phenotypes = []
-        all_vector_meta_phenotypes = []
+    def _resolve_lazy_phenotypes(self, phenotypes):
+        """The included phenotypes with their dependencies, each listed after what it depends on.
 
-        regression_size = self._linear_regression_size
-        position_offset = (regression_size - 1) / 2
-        phenotypes_count = self.get_number_of_phenotypes()
+        Phenotypes that depend on a phenotype that isn't included are left out.
+        """
+        resolved = []
 
-        total_curves = float(self.number_of_curves)
+        def add(phenotype):
 
-        self._logger.info("Phenotypes (N={0}), extraction started for {1} curves".format(
-            phenotypes_count, int(total_curves)))
+            if phenotype in resolved:
+                return True
 
-        curves_in_completed_plates = 0
-        phenotypes_inclusion = self._phenotypes_inclusion
+            if not self._phenotypes_inclusion(phenotype):
+                return False
 
-        if phenotypes_inclusion is not PhenotypeDataType.Trusted:
-            self._logger.warning("Will extract phenotypes beyond those that are trusted, this is not recommended!" +
-                                 " It is your responsibility to verify the validity of those phenotypes!")
+            if not all([add(dependency) for dependency in PHENOTYPE_DEPENDENCIES.get(phenotype, tuple())]):
+                self._logger.warning("Can't calculate {0} because what it depends on has not been included".format(
+                    phenotype))
+                return False
 
-        for id_plate, plate in enumerate(self._smooth_growth_data):
+            resolved.append(phenotype)
+            return True
 
-            if plate is None:
-                all_phenotypes.append(None)
-                all_vector_phenotypes.append(None)
-                all_vector_meta_phenotypes.append(None)
-                continue
+        for phenotype in phenotypes:
+            add(phenotype)
 
-            plate_flat_regression_strided = self._get_plate_linear_regression_strided(plate)
+        return resolved
 
-            phenotypes = {
-                p: np.zeros(plate.shape[:2], dtype=np.float) * np.nan
-                for p in Phenotypes if phenotypes_inclusion(p)}
+    def _is_calculated(self, id_plate, phenotype):
 
-            plate_size = np.prod(plate.shape[:2])
-            self._logger.info("Plate {0} has {1} curves".format(id_plate + 1, plate_size))
+        if isinstance(phenotype, Phenotypes):
+            plates = self._phenotypes
+        elif isinstance(phenotype, VectorPhenotypes):
+            plates = self._vector_phenotypes
+        else:
+            plates = self._vector_meta_phenotypes
 
-            vector_phenotypes = {
-                p: np.zeros(plate.shape[:2], dtype=np.object) * np.nan
-                for p in VectorPhenotypes if phenotypes_inclusion(p)}
+        return plates is not None and plates[id_plate] is not None and phenotype in plates[id_plate]
 
-            vector_meta_phenotypes = {}
+    def _can_calculate_lazily(self, phenotype):
 
-            all_phenotypes.append(phenotypes)
-            all_vector_phenotypes.append(vector_phenotypes)
-            all_vector_meta_phenotypes.append(vector_meta_phenotypes)
+        return self._lazy and self._phenotypes is not None and phenotype in self._resolve_lazy_phenotypes([phenotype])
 
-            for pos_index, pos_data in enumerate(plate_flat_regression_strided):
+    def _ensure_phenotype(self, phenotype, plate=None):
+        """Calculate the phenotype in lazy mode if it hasn't been already
 
-                id1 = pos_index % plate.shape[1]
-                id0 = pos_index / plate.shape[1]
+        Args:
+            phenotype: The phenotype
+            plate: Optional, the plate index, default is all plates
+        """
+        if not self._lazy or self._phenotypes is None:
+            return
 
-                curve_data = get_preprocessed_data_for_phenotypes(
-                    curve=plate[id0, id1],
-                    curve_strided=pos_data,
-                    flat_times=flat_times,
-                    times_strided=times_strided,
-                    index_for_48h=index_for_48h,
-                    position_offset=position_offset)
+        if plate is not None and not 0 <= plate < len(self._phenotypes):
+            return
 
-                curve_has_data = True
+        for id_plate in (self.enumerate_plates if plate is None else (plate,)):
 
-                if curve_data['curve_smooth_growth_data'].mask.all():
+            if self._smooth_growth_data[id_plate] is None or self._is_calculated(id_plate, phenotype):
+                continue
 
-                    self._logger.warning("Position ({0}, {1}) on plate {2} seems void of data".format(
-                        id0, id1, id_plate + 1
-                    ))
-                    curve_has_data = False
+            self._calculate_lazy_phenotypes(id_plate, (phenotype,))
 
-                else:
+    def _update_lazy_phenotypes(self, dirty):
 
-                    for phenotype in Phenotypes:
+        for id_plate, plate_dirty in enumerate(dirty):
 
-                        if not phenotypes_inclusion(phenotype):
-                            continue
+            if plate_dirty is None or not plate_dirty.any():
+                continue
 
-                        if PhenotypeDataType.Scalar(phenotype):
-                            phenotypes[phenotype][id0, id1] = phenotype(**curve_data)
+            calculated = [
+                phenotype for plates in (self._phenotypes, self._vector_phenotypes, self._vector_meta_phenotypes)
+                if plates is not None and plates[id_plate] is not None for phenotype in plates[id_plate]]
 
-                if curve_has_data and (
-                            phenotypes_inclusion(VectorPhenotypes.PhasesClassifications) or
-                            phenotypes_inclusion(VectorPhenotypes.PhasesPhenotypes)):
+            self._calculate_lazy_phenotypes(id_plate, calculated, positions=plate_dirty)
 
-                    phases, phases_phenotypes = get_phase_analysis(
-                        self, id_plate, (id0, id1),
-                        experiment_doublings=phenotypes[Phenotypes.ExperimentPopulationDoublings][id0, id1])
+    def _fit_chapman_richards_plate(self, id_plate, positions=None):
 
-                    if phenotypes_inclusion(VectorPhenotypes.PhasesClassifications):
-                        vector_phenotypes[VectorPhenotypes.PhasesClassifications][id0, id1] = phases
-                    if phenotypes_inclusion(VectorPhenotypes.PhasesPhenotypes):
-                        vector_phenotypes[VectorPhenotypes.PhasesPhenotypes][id0, id1] = phases_phenotypes
+        if self._chapman_richards is None:
+            self._chapman_richards = np.array([None for _ in self._smooth_growth_data], dtype=np.object)
 
-                if id1 == 0:
+        previous = self._chapman_richards[id_plate]
+        self._chapman_richards[id_plate] = fit_plates(
+            self._times_data, [np.log2(self._smooth_growth_data[id_plate], dtype=np.float)],
+            positions=None if previous is None or positions is None else [positions],
+            previous=None if previous is None else [previous], processes=self._processes)[0]
 
-                    self._logger.debug("Done plate {0} pos {1} {2}".format(id_plate, id0, id1))
+    def _calculate_lazy_phenotypes(self, id_plate, phenotypes, positions=None):
+        """Calculate phenotypes and what they depend on for one plate
 
-                    self._logger.info("Plate {1} growth phenotypes {0:.1f}% done".format(
-                        100.0 * (pos_index + 1.0) / plate_size,
-                        id_plate + 1,
-                    ))
+        Args:
+            id_plate: The plate index
+            phenotypes: The requested phenotypes
+            positions: Optional 2D boolean array of the curves to calculate.
+                Default is all curves, and then phenotypes that have already
+                been calculated for the plate are kept as they are. If given,
+                the normalized phenotypes are no longer valid and are dropped.
+        """
+        if self._times_data.shape[0] - (self._linear_regression_size - 1) <= 0:
+            self._logger.error(
+                "Refusing phenotype extractions since number of scans are less than used in the linear regression")
+            return
 
-                    yield (curves_in_completed_plates + pos_index + 1.0) / total_curves
+        resolved = self._resolve_lazy_phenotypes(chain(NO_GROWTH_PHENOTYPES, phenotypes))
+        if positions is None:
+            resolved = [phenotype for phenotype in resolved if not self._is_calculated(id_plate, phenotype)]
 
-            for phenotype in CurvePhaseMetaPhenotypes:
+        if not resolved:
+            return
 
-                self._logger.info("Extracting {0} for plate {1}".format(phenotype.name, id_plate + 1))
+        self._logger.info("Calculating {0} on plate {1}".format(
+            ", ".join(phenotype.name for phenotype in resolved), id_plate + 1))
 
-                if not phenotypes_inclusion(phenotype):
-                    continue
+        plate = np.asarray(self._smooth_growth_data[id_plate], dtype=np.float)
+        plate_flat_regression_strided = self._get_plate_linear_regression_strided(plate)
+        plate_phenotypes = self._phenotypes[id_plate]
+        scalar_phenotypes = [phenotype for phenotype in resolved if isinstance(phenotype, Phenotypes)]
+        meta_phenotypes = [phenotype for phenotype in resolved if isinstance(phenotype, CurvePhaseMetaPhenotypes)]
 
-                if not phenotypes_inclusion(VectorPhenotypes.PhasesPhenotypes):
-                    self._logger.warning("Can't extract {0} because {1} has not been included.".format(
-                        phenotype, VectorPhenotypes.PhasesPhenotypes))
-                    continue
+        if any(phenotype in CHAPMAN_RICHARDS_PHENOTYPES for phenotype in scalar_phenotypes) and (
+                positions is not None or self._chapman_richards is None or self._chapman_richards[id_plate] is None):
+            self._fit_chapman_richards_plate(id_plate, positions)
 
-                phenotype_data = extract_phenotypes(
-                    vector_phenotypes[VectorPhenotypes.PhasesPhenotypes], phenotype, phenotypes)
+        recalculated = positions is not None
+        if positions is None:
+            positions = np.ones(plate.shape[:2], dtype=bool)
 
-                vector_meta_phenotypes[phenotype] = phenotype_data.astype(np.float)
+        for phenotype in scalar_phenotypes:
+            if phenotype in plate_phenotypes:
+                plate_phenotypes[phenotype][positions] = np.nan
+            else:
+                plate_phenotypes[phenotype] = np.zeros(plate.shape[:2], dtype=self._storage_dtype) * np.nan
+
+        vector_phenotypes = {}
+        for phenotype in resolved:
+            if isinstance(phenotype, VectorPhenotypes):
+                if self._is_calculated(id_plate, phenotype):
+                    vector_phenotypes[phenotype] = self._get_vector_phenotype_plate(id_plate, phenotype)
+                    vector_phenotypes[phenotype][positions] = np.nan
+                else:
+                    vector_phenotypes[phenotype] = np.zeros(plate.shape[:2], dtype=np.object) * np.nan
 
-            self._logger.info("Plate {0} Done".format(id_plate + 1))
-            curves_in_completed_plates += 0 if plate is None else plate_flat_regression_strided.shape[0]
+        for id0, id1 in izip(*np.where(positions)):
 
-        self._phenotypes = np.array(all_phenotypes)
-        self._vector_phenotypes = np.array(all_vector_phenotypes)
-        self._vector_meta_phenotypes = np.array(all_vector_meta_phenotypes)
-        self._normalized_phenotypes = None
-        self._logger.info("Phenotype Extraction Done")
+            self._calculate_curve_phenotypes(
+                id_plate, (id0, id1), plate, plate_flat_regression_strided, self._chapman_richards,
+                scalar_phenotypes, plate_phenotypes, vector_phenotypes)
 
-    def _get_plate_linear_regression_strided(self, plate):
+        self._vector_phenotypes[id_plate].update(self._get_stored_vector_phenotypes(vector_phenotypes))
 
-        if plate is None:
-            return None
+        self._extract_meta_phenotypes(
+            id_plate, meta_phenotypes, self._vector_phenotypes[id_plate].get(VectorPhenotypes.PhasesPhenotypes),
+            plate_phenotypes, self._vector_meta_phenotypes[id_plate])
 
-        return np.lib.stride_tricks.as_strided(
-            plate,
-            shape=(plate.shape[0] * plate.shape[1],
-                   plate.shape[2] - (self._linear_regression_size - 1),
-                   self._linear_regression_size),
-            strides=(plate.strides[1],
-                     plate.strides[2], plate.strides[2]))
+        if recalculated:
+            self._normalized_phenotypes = None
 
     def add_phenotype_to_normalization(self, phenotype):
         """ Add a phenotype to the set of phenotypes that are normalized.
@@ -1376,10 +2293,27 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
         return self._normalizable_phenotypes
 
+    def _get_columnar_vector_phenotypes(self):
+
+        columnar = get_columnar_vector_phenotypes(
+            [] if self._vector_phenotypes is None else self._vector_phenotypes, self._times_data.size)
+        if self._compact:
+            columnar["phase_phenotypes"] = columnar["phase_phenotypes"].astype(np.float)
+        return columnar
+
+    def _get_vector_phenotype_plate(self, plate, phenotype):
+
+        data = self._vector_phenotypes[plate][phenotype]
+        return unpack_plate(data, phenotype) if is_packed(data) else data
+
     def get_curve_phases(self, plate, outer, inner):
 
+        self._ensure_phenotype(VectorPhenotypes.PhasesClassifications, plate=plate)
         try:
-            val = self._vector_phenotypes[plate][VectorPhenotypes.PhasesClassifications][outer, inner]
+            val = self._vector_phenotypes[plate][VectorPhenotypes.PhasesClassifications]
+            if is_packed(val):
+                return unpack_phases_classifications(val, (outer, inner))
+            val = val[outer, inner]
             if isinstance(val, np.ma.masked_array):
                 return val
             return None
@@ -1388,8 +2322,11 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
     def get_curve_phases_at_time(self, plate, time_index):
 
+        self._ensure_phenotype(VectorPhenotypes.PhasesClassifications, plate=plate)
         try:
             p = self._vector_phenotypes[plate][VectorPhenotypes.PhasesClassifications]
+            if is_packed(p):
+                p = p[..., 0]
 
             # The init value is illegal, no phase has that value. On purpose
             arr = np.ones(p.shape, dtype=int) * -2
@@ -1403,8 +2340,12 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
     def get_curve_phase_data(self, plate, outer, inner):
 
+        self._ensure_phenotype(VectorPhenotypes.PhasesPhenotypes, plate=plate)
         try:
-            return self._vector_phenotypes[plate][VectorPhenotypes.PhasesPhenotypes][outer, inner]
+            val = self._vector_phenotypes[plate][VectorPhenotypes.PhasesPhenotypes]
+            if is_packed(val):
+                return unpack_phases_phenotypes(val, (outer, inner))
+            return val[outer, inner]
         except (ValueError, IndexError, TypeError, KeyError):
             return None
 
@@ -1469,6 +2410,9 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             norm_method = norm_by_diff
             self._logger.warning("Using {0} to normalize hasn't been fully vetted".format(method))
 
+        phenotypes = []
+        phenotypes_data = []
+
         for phenotype in self._normalizable_phenotypes:
 
             if self._phenotypes_inclusion(phenotype) is False:
@@ -1485,12 +2429,19 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                 self._logger.info("{0} had not been extracted, so skipping it".format(phenotype))
                 continue
 
-            data = [None if plate is None else plate.filled() for plate in data]
+            phenotypes.append(phenotype)
+            phenotypes_data.append([None if plate is None else plate.filled() for plate in data])
 
-            for id_plate, plate in enumerate(get_normalized_data(
-                    data, self._reference_surface_positions, method=norm_method)):
+        if not phenotypes:
+            return
+
+        for phenotype, normalized_data in izip(phenotypes, get_normalized_phenotypes(
+                phenotypes_data, self._reference_surface_positions, method=norm_method)):
 
-                self._normalized_phenotypes[id_plate][phenotype] = plate
+            for id_plate, plate in enumerate(normalized_data):
+
+                self._normalized_phenotypes[id_plate][phenotype] = \
+                    None if plate is None else plate.astype(self._storage_dtype)
 
     @property
     def number_of_curves(self):
@@ -1521,7 +2472,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             plate, offset in zip(plates, self._reference_surface_positions))
 
     def get_phenotype(self, phenotype, filtered=True, norm_state=NormState.Absolute,
-                      reference_values=None, **kwargs):
+                      reference_values=None, plate=None, **kwargs):
         """Getting phenotype data
 
         Args:
@@ -1538,6 +2489,11 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                 Optional, tuple of the means of all comparable plates-medians
                 of their reference positions.
                 One value per plate in the current project.
+            plate:
+                Optional, in lazy mode only calculate the phenotype for this
+                plate if it is missing. Plates where the phenotype has not
+                yet been calculated are `None`.
+                Default is to calculate it for all plates.
 
         Returns:
             List of plate-wise phenotype data. Depending on the `filtered` argument this is either `FilteredArrays`
@@ -1547,6 +2503,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             Phenotyper.get_reference_median:
                 Produces reference values for plates.
         """
+        self._ensure_phenotype(phenotype, plate=plate)
 
         if phenotype not in self:
 
@@ -1618,7 +2575,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
     def _get_phenotype_data(self, phenotype):
 
         if isinstance(phenotype, CurvePhaseMetaPhenotypes) and self._vector_meta_phenotypes is not None:
-            return [None if p is None else p[phenotype] for p in self._vector_meta_phenotypes]
+            return [None if p is None or phenotype not in p else p[phenotype] for p in self._vector_meta_phenotypes]
         return [None for _ in self.enumerate_plates]
 
     def _restructure_growth_phenotype(self, phenotype):
@@ -1650,7 +2607,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             else:
                 return _plate_type_converter_scalar(plate)
 
-        return [None if (p is None or phenotype not in self) else _plate_type_converter(p[phenotype])
+        return [None if (p is None or phenotype not in p) else _plate_type_converter(p[phenotype])
                 for p in self._phenotypes]
 
     @property
@@ -1733,18 +2690,21 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         if self._phenotypes is None or self._phenotypes[plate] is None:
             return np.array([]), None, None, None
 
-        try:
-            p1 = self.get_phenotype(Phenotypes.ChapmanRichardsParam1)[plate][position]
-            p2 = self.get_phenotype(Phenotypes.ChapmanRichardsParam2)[plate][position]
-            p3 = self.get_phenotype(Phenotypes.ChapmanRichardsParam3)[plate][position]
-            p4 = self.get_phenotype(Phenotypes.ChapmanRichardsParam4)[plate][position]
-            d = self.get_phenotype(Phenotypes.ChapmanRichardsParamXtra)[plate][position]
-            fit = self.get_phenotype(Phenotypes.ChapmanRichardsFit)[plate][position]
-        except TypeError:
-            return np.array([]), None, None, None
+        if self._chapman_richards is not None and self._chapman_richards[plate] is not None:
+            fit, p1, p2, p3, p4, d = self._chapman_richards[plate][position]
+        else:
+            try:
+                p1 = self.get_phenotype(Phenotypes.ChapmanRichardsParam1)[plate][position]
+                p2 = self.get_phenotype(Phenotypes.ChapmanRichardsParam2)[plate][position]
+                p3 = self.get_phenotype(Phenotypes.ChapmanRichardsParam3)[plate][position]
+                p4 = self.get_phenotype(Phenotypes.ChapmanRichardsParam4)[plate][position]
+                d = self.get_phenotype(Phenotypes.ChapmanRichardsParamXtra)[plate][position]
+                fit = self.get_phenotype(Phenotypes.ChapmanRichardsFit)[plate][position]
+            except TypeError:
+                return np.array([]), None, None, None
 
         log2_model_y_data = get_chapman_richards_4parameter_extended_curve(self.times, p1, p2, p3, p4, d)
-        log2_y_data = np.log2(self.smooth_growth_data[plate][position])
+        log2_y_data = np.log2(self.smooth_growth_data[plate][position], dtype=np.float)
 
         dydt = convolve(log2_y_data, [-1, 1], mode='valid')
         dydt_model = convolve(log2_model_y_data, [-1, 1], mode='valid')
@@ -1847,12 +2807,14 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
             if isinstance(data, np.ndarray) and (data.size == 0 or not data.any()):
                 self._smooth_growth_data = None
             else:
-                self._smooth_growth_data = data
+                self._set_smooth_growth_data(data)
 
         elif data_type == "phenotype_filter_undo":
 
-            if isinstance(data, tuple) and all(isinstance(q, deque) for q in data):
+            if isinstance(data, UndoJournal):
                 self._phenotype_filter_undo = data
+            elif isinstance(data, tuple) and all(isinstance(q, deque) for q in data):
+                self._phenotype_filter_undo = UndoJournal.LoadFromDeques(data, max_length=self.UNDO_HISTORY_LENGTH)
             else:
                 self._logger.warning("Not a proper undo history")
 
@@ -1869,6 +2831,20 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
             self._init_remove_filter_and_undo_actions()
 
+        elif data_type == "chapman_richards":
+
+            if isinstance(data, np.ndarray) and (data.size == 0 or data.size == 1 and not data.shape):
+                self._chapman_richards = None
+            else:
+                self._chapman_richards = data
+
+        elif data_type == "extraction_signatures":
+
+            if isinstance(data, dict) or data is None:
+                self._extraction_signatures = data
+            else:
+                self._logger.warning("Not valid extraction signatures")
+
         elif data_type == "meta_data":
 
             if isinstance(data, MetaData) or data is None:
@@ -2001,34 +2977,14 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
             self._logger.warning("Filter doesn't match number of plates. Rewriting...")
             self._phenotype_filter = np.array([{} for _ in self._phenotypes], dtype=np.object)
-            self._phenotype_filter_undo = tuple(deque() for _ in self._phenotypes)
+            self._phenotype_filter_undo = UndoJournal(len(self._phenotypes), max_length=self.UNDO_HISTORY_LENGTH)
 
         elif self._phenotype_filter_undo is None or len(self._phenotypes) != len(self._phenotype_filter_undo):
 
             self._logger.warning("Undo doesn't match number of plates. Rewriting...")
-            self._phenotype_filter_undo = tuple(deque() for _ in self._phenotypes)
-
-        if Phenotypes.Monotonicity in self and Phenotypes.ExperimentPopulationDoublings in self:
-            growth_filter = [
-                ((plate[Phenotypes.Monotonicity] < self._no_growth_monotonicity_threshold) |
-                 (np.isfinite(plate[Phenotypes.Monotonicity]) == np.False_)) &
-                ((plate[Phenotypes.ExperimentPopulationDoublings] <
-                  self._no_growth_pop_doublings_threshold) |
-                 (np.isfinite(plate[Phenotypes.ExperimentPopulationDoublings]) == np.False_))
-                for plate in self._phenotypes]
-        elif Phenotypes.Monotonicity in self:
-            growth_filter = [
-                ((plate[Phenotypes.Monotonicity] < self._no_growth_monotonicity_threshold) |
-                 (np.isfinite(plate[Phenotypes.Monotonicity]) == np.False_))
-                for plate in self._phenotypes]
-        elif Phenotypes.ExperimentPopulationDoublings in self:
-            growth_filter = [
-                ((plate[Phenotypes.ExperimentPopulationDoublings] <
-                  self._no_growth_pop_doublings_threshold) |
-                 (np.isfinite(plate[Phenotypes.ExperimentPopulationDoublings]) == np.False_))
-                for plate in self._phenotypes]
-        else:
-            growth_filter = [[] for _ in self._phenotypes]
+            self._phenotype_filter_undo = UndoJournal(len(self._phenotypes), max_length=self.UNDO_HISTORY_LENGTH)
+
+        growth_filter = self._get_no_growth_filter()
 
         for phenotype in self.phenotypes:
 
@@ -2056,6 +3012,28 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                                             phenotype_data[plate_index],
                                             growth_filter[plate_index])
 
+    def _get_no_growth_filter(self):
+
+        def no_growth(plate):
+
+            if plate is None:
+                return []
+
+            filt = None
+            if Phenotypes.Monotonicity in plate:
+                filt = ((plate[Phenotypes.Monotonicity] < self._no_growth_monotonicity_threshold) |
+                        (np.isfinite(plate[Phenotypes.Monotonicity]) == np.False_))
+
+            if Phenotypes.ExperimentPopulationDoublings in plate:
+                doublings_filt = (
+                    (plate[Phenotypes.ExperimentPopulationDoublings] < self._no_growth_pop_doublings_threshold) |
+                    (np.isfinite(plate[Phenotypes.ExperimentPopulationDoublings]) == np.False_))
+                filt = doublings_filt if filt is None else filt & doublings_filt
+
+            return [] if filt is None else filt
+
+        return [no_growth(plate) for plate in self._phenotypes]
+
     def infer_filter(self, template, *phenotypes):
         """Transfer all marks on one phenotype to other phenotypes.
 
@@ -2159,9 +3137,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
     def _add_undo(self, plate, position_list, phenotype, previous_state):
 
-        self._phenotype_filter_undo[plate].append((position_list, phenotype, previous_state))
-        while len(self._phenotype_filter_undo[plate]) > self.UNDO_HISTORY_LENGTH:
-            self._phenotype_filter_undo[plate].popleft()
+        self._phenotype_filter_undo[plate].append(position_list, phenotype, previous_state)
 
     def undo(self, plate):
         """Undo most recent position mark that was undoable on plate
@@ -2243,6 +3219,79 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         path = os.path.join(dir_path, self._paths.phenotypes_csv_pattern)
         return path.format(save_data.name, plate_index + 1)
 
+    def get_columnar_file_name(self, dir_path, save_data):
+
+        path = os.path.join(dir_path, self._paths.phenotypes_columnar_pattern)
+        return path.format(save_data.name)
+
+    def _get_export_data_source(self, save_data, reference_values):
+
+        phenotypes = self.phenotypes_that_normalize if save_data in (
+            NormState.NormalizedAbsoluteBatched, NormState.NormalizedAbsoluteNonBatched,
+            NormState.NormalizedRelative) else self.phenotypes
+
+        phenotypes = tuple(p for p in phenotypes if PhenotypeDataType.Scalar(p) and p in self)
+
+        return {p: self.get_phenotype(
+            p, norm_state=save_data,
+            reference_values=reference_values.get(p) if isinstance(reference_values, dict) else reference_values)
+            for p in phenotypes}
+
+    @staticmethod
+    def _get_export_values(plate_data):
+        """The data and mask of a plate as returned by `get_phenotype`"""
+
+        if isinstance(plate_data, FilterArray):
+            plate_data = plate_data.masked()
+
+        return np.ma.getdata(plate_data), np.ma.getmaskarray(plate_data)
+
+    def _get_export_meta_data_columns(self, plate_index):
+
+        if self._meta_data is None:
+            return []
+
+        return [column.ravel() for column in self._meta_data.get_plate_columns(plate_index)]
+
+    def _get_csv_table(self, plate_index, data_source):
+        """Build the rows of a plate's csv export as one object array.
+
+        The phenotype values keep their numpy scalar types so they are
+        written exactly as they would be one by one, filtered positions
+        get the name of their filter from a lookup table.
+        """
+        filt = self._phenotype_filter[plate_index]
+        shape = data_source.values()[0][plate_index].shape[:2]
+        rows, columns = np.indices(shape)
+        meta_data = self._get_export_meta_data_columns(plate_index)
+
+        table = np.empty((rows.size, 3 + len(meta_data) + len(data_source)), dtype=np.object)
+        table[:, 0] = plate_index
+        table[:, 1] = rows.ravel()
+        table[:, 2] = columns.ravel()
+
+        for id_column, column in enumerate(meta_data):
+            table[:, 3 + id_column] = column
+
+        filter_names = np.array([f.name for f in sorted(Filter, key=lambda f: f.value)], dtype=np.object)
+        masked_value = str(np.ma.masked)
+        offset = 3 + len(meta_data)
+
+        for id_column, phenotype in enumerate(data_source):
+
+            values, mask = self._get_export_values(data_source[phenotype][plate_index])
+            phenotype_filter = filt[phenotype].ravel()
+
+            column = np.empty((values.size, ), dtype=np.object)
+            column[:] = list(values.ravel())
+            column[mask.ravel()] = masked_value
+
+            filtered = phenotype_filter != 0
+            column[filtered] = filter_names[phenotype_filter[filtered]]
+            table[:, offset + id_column] = column
+
+        return table
+
     def save_phenotypes(self, dir_path=None, save_data=NormState.Absolute,
                         dialect=csv.excel, ask_if_overwrite=True, reference_values=None):
         """Exporting phenotypes to csv format.
@@ -2260,6 +3309,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                 needed for using non-batched saving
                 of their reference positions.
                 One value per plate in the current project.
+                May also be a dict with such a tuple per phenotype.
         """
         if dir_path is None and self._base_name is not None:
             dir_path = self._base_name
@@ -2269,20 +3319,9 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
         dir_path = os.path.abspath(dir_path)
 
-        phenotypes = self.phenotypes_that_normalize if save_data in (
-            NormState.NormalizedAbsoluteBatched, NormState.NormalizedAbsoluteNonBatched,
-            NormState.NormalizedRelative) else self.phenotypes
-
-        phenotypes = tuple(p for p in phenotypes if PhenotypeDataType.Scalar(p) and p in self)
-
-        data_source = {p: self.get_phenotype(p, norm_state=save_data, reference_values=reference_values)
-                       for p in phenotypes}
-
+        data_source = self._get_export_data_source(save_data, reference_values)
         default_meta_data = ('Plate', 'Row', 'Column')
 
-        meta_data = self._meta_data
-        no_metadata = tuple()
-
         for plate_index in self.enumerate_plates:
 
             if any(data_source[p][plate_index] is None for p in data_source):
@@ -2296,10 +3335,7 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
 
             with open(plate_path, 'wb') as fh:
 
-                try:
-                    # DATA
-                    plate = data_source[data_source.keys()[0]][plate_index]
-                except IndexError:
+                if not data_source:
                     self._logger.warning("Output empty file because there were no phenotypes")
                 else:
                     # HEADER ROW
@@ -2313,22 +3349,147 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                             meta_data_headers,
                             data_source.keys())))
 
-                    filt = self._phenotype_filter[plate_index]
+                    # DATA
+                    cw.writerows(self._get_csv_table(plate_index, data_source).tolist())
+
+                    self._logger.info("Saved {0}, plate {1} to {2}".format(save_data, plate_index + 1, plate_path))
+
+        return True
 
-                    for idX, X in enumerate(plate):
+    @staticmethod
+    def _get_columnar_meta_data_column(values):
 
-                        for idY, Y in enumerate(X):
+        known = [v for v in values if v is not None]
+        if all(isinstance(v, (int, long, float, np.number)) and not isinstance(v, bool) for v in known):
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float)
 
-                            cw.writerow(
-                                tuple(self._make_csv_row(
-                                    (plate_index, idX, idY),
-                                    no_metadata if meta_data is None else meta_data(plate_index, idX, idY),
-                                    tuple(data_source[p][plate_index][idX, idY] if filt[p][idX, idY] == 0 else
-                                     Filter(filt[p][idX, idY]).name
-                                     for p in data_source))))
+        return np.array([u'' if v is None else unicode(v) for v in values], dtype=np.unicode)
 
-                    self._logger.info("Saved {0}, plate {1} to {2}".format(save_data, plate_index + 1, plate_path))
+    def _get_columnar_meta_data(self, plates):
+
+        headers = []
+        values = {}
+        if self._meta_data is None:
+            return headers, values
+
+        for plate_index, shape in plates:
+
+            plate_headers = self.meta_data_headers(plate_index) or ()
+            columns = self._get_export_meta_data_columns(plate_index)
+
+            for id_column, column in enumerate(columns):
 
+                header = plate_headers[id_column] if id_column < len(plate_headers) else None
+                header = u"Column {0}".format(id_column) if header is None else unicode(header)
+                if header not in values:
+                    headers.append(header)
+                    values[header] = {}
+                values[header][plate_index] = column
+
+        return headers, {
+            header: self._get_columnar_meta_data_column(list(chain(*(
+                values[header].get(plate_index, [None] * np.prod(shape)) for plate_index, shape in plates))))
+            for header in headers}
+
+    def get_columnar_phenotypes(self, save_data=NormState.Absolute, reference_values=None):
+        """Get the phenotypes of all plates as one table with typed columns.
+
+        Each row is a position with its plate, row and column index, the
+        meta-data (numeric columns are floats, others are text) and
+        for each phenotype its value and the filter of the value.
+        Filtered values are `nan`.
+
+        Args:
+            save_data: Optional, what data to get. One of the `NormState` values.
+                Default is raw absolute phenotypes.
+            reference_values: Optional, as for `Phenotyper.save_phenotypes`
+
+        Returns: numpy.ndarray with a structured dtype or `None` if there is nothing to export.
+        """
+        data_source = self._get_export_data_source(save_data, reference_values)
+        plates = [(plate_index, data_source.values()[0][plate_index].shape[:2])
+                  for plate_index in self.enumerate_plates
+                  if data_source and all(data_source[p][plate_index] is not None for p in data_source)]
+
+        if not plates:
+            return None
+
+        columns = [
+            ('plate', np.concatenate([np.ones(np.prod(shape), dtype=np.int16) * plate_index
+                                      for plate_index, shape in plates])),
+            ('row', np.concatenate([np.indices(shape)[0].ravel().astype(np.int16) for _, shape in plates])),
+            ('column', np.concatenate([np.indices(shape)[1].ravel().astype(np.int16) for _, shape in plates])),
+        ]
+
+        headers, meta_data = self._get_columnar_meta_data(plates)
+        columns += [(header, meta_data[header]) for header in headers]
+
+        for phenotype in data_source:
+
+            values = []
+            filters = []
+            for plate_index, _ in plates:
+
+                plate_values, mask = self._get_export_values(data_source[phenotype][plate_index])
+                plate_values = np.array(
+                    plate_values, dtype=plate_values.dtype if plate_values.dtype.kind == 'f' else np.float)
+                plate_values[mask] = np.nan
+                values.append(plate_values.ravel())
+                filters.append(self._phenotype_filter[plate_index][phenotype].ravel().astype(np.uint8))
+
+            values = np.concatenate(values)
+            filters = np.concatenate(filters)
+            values[filters != Filter.OK.value] = np.nan
+            columns += [(phenotype.name, values), ("{0}.filter".format(phenotype.name), filters)]
+
+        names = []
+        for name, _ in columns:
+            name = name.encode('utf-8')
+            while name in names:
+                name += "_"
+            names.append(name)
+
+        table = np.empty((columns[0][1].size, ), dtype=[
+            (column_name, column.dtype) for column_name, (_, column) in izip(names, columns)])
+
+        for name, (_, column) in izip(names, columns):
+            table[name] = column
+
+        return table
+
+    def save_phenotypes_columnar(self, dir_path=None, save_data=NormState.Absolute, ask_if_overwrite=True,
+                                 reference_values=None):
+        """Export the phenotypes of all plates to a single binary file.
+
+        The file is a numpy `.npy` file holding the table from
+        `Phenotyper.get_columnar_phenotypes` and is loaded with `numpy.load`.
+
+        Args:
+            dir_path: The directory where to put the data, the file name is
+                automatically generated
+            save_data: Optional, what data to save. One of the `NormState` values.
+            ask_if_overwrite: Optional, if warning before overwriting the file, defaults to `True`.
+            reference_values: Optional, as for `Phenotyper.save_phenotypes`
+
+        Returns: If the phenotypes were saved
+        """
+        if dir_path is None and self._base_name is not None:
+            dir_path = self._base_name
+        elif dir_path is None:
+            self._logger.error("Needs somewhere to save the phenotype")
+            return False
+
+        path = self.get_columnar_file_name(os.path.abspath(dir_path), save_data)
+        if ask_if_overwrite and os.path.isfile(path) and not self._do_ask_overwrite(path):
+            return False
+
+        table = self.get_columnar_phenotypes(save_data=save_data, reference_values=reference_values)
+        if table is None:
+            self._logger.warning("There were no phenotypes to save")
+            return False
+
+        np.save(path, table)
+        self._logger.info("Saved {0} to {1}".format(save_data, path))
         return True
 
     @staticmethod
@@ -2339,36 +3500,50 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
     def save_state(self, dir_path, ask_if_overwrite=True):
         """Save the `Phenotyper` instance's state for future work.
 
+        All arrays are saved in float64. In compact mode the raw and smooth
+        growth data are only saved if the directory has none, so that the
+        original data is never replaced by the compact copy.
+
         Args:
             dir_path: Directory where state should be saved
             ask_if_overwrite: Optional, default is `True`
+
+        Raises:
+            ValueError: If in compact mode the growth data has changed
+                since loading and the directory already has growth data,
+                since saving would either lose precision or leave the
+                phenotypes out of sync with the saved curves.
         """
+        growth_data_paths = tuple(
+            os.path.join(dir_path, name) for name in
+            (self._paths.phenotypes_input_data, self._paths.phenotypes_input_smooth))
+
+        if self._compact and self._growth_data_changed and any(os.path.isfile(p) for p in growth_data_paths):
+            raise ValueError(
+                "Can't save changed compact growth data over the state in '{0}', load it without compact "
+                "to change its growth data".format(dir_path))
+
         if not os.path.isdir(dir_path):
             os.makedirs(dir_path)
 
         p = os.path.join(dir_path, self._paths.phenotypes_raw_npy)
         if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
-            np.save(p, self._phenotypes)
+            np.save(p, self._get_saved_phenotypes(self._phenotypes))
 
-        p = os.path.join(dir_path, self._paths.vector_phenotypes_raw)
+        p = os.path.join(dir_path, self._paths.vector_phenotypes_columnar)
         if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
-            np.save(p, self._vector_phenotypes)
+            save_columnar_vector_phenotypes(p, self._get_columnar_vector_phenotypes())
 
         p = os.path.join(dir_path, self._paths.vector_meta_phenotypes_raw)
         if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
-            np.save(p, self._vector_meta_phenotypes)
+            np.save(p, self._get_saved_phenotypes(self._vector_meta_phenotypes))
 
         p = os.path.join(dir_path, self._paths.normalized_phenotypes)
         if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
-            np.save(p, self._normalized_phenotypes)
-
-        p = os.path.join(dir_path, self._paths.phenotypes_input_data)
-        if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
-            np.save(p, self._raw_growth_data)
+            np.save(p, self._get_saved_phenotypes(self._normalized_phenotypes))
 
-        p = os.path.join(dir_path, self._paths.phenotypes_input_smooth)
-        if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
-            np.save(p, self._smooth_growth_data)
+        for p, plates in zip(growth_data_paths, (self._raw_growth_data, self._smooth_growth_data)):
+            self._save_growth_data(p, plates, ask_if_overwrite)
 
         p = os.path.join(dir_path, self._paths.phenotypes_filter)
         if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
@@ -2378,11 +3553,11 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
             np.save(p, self._reference_surface_positions)
 
-        p = os.path.join(dir_path, self._paths.phenotypes_filter_undo)
-        if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
+        p = os.path.join(dir_path, self._paths.phenotypes_filter_undo_journal)
+        if self._phenotype_filter_undo is not None and (
+                not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p)):
 
-            with open(p, 'w') as fh:
-                pickle.dump(self._phenotype_filter_undo, fh)
+            self._phenotype_filter_undo.save(p)
 
         p = os.path.join(dir_path, self._paths.phenotype_times)
         if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
@@ -2404,8 +3579,33 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                  self._no_growth_monotonicity_threshold,
                  self._no_growth_pop_doublings_threshold])
 
+        p = os.path.join(dir_path, self._paths.phenotypes_extraction_signatures)
+        if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
+            with open(p, 'w') as fh:
+                pickle.dump(self._extraction_signatures, fh)
+
+        p = os.path.join(dir_path, self._paths.phenotypes_chapman_richards)
+        if not ask_if_overwrite or not os.path.isfile(p) or self._do_ask_overwrite(p):
+            np.save(p, self._chapman_richards)
+
+        self._growth_data_changed = False
         self._logger.info("State saved to '{0}'".format(dir_path))
 
+    def save_normalization_state(self, dir_path):
+        """Save only the normalized phenotypes and the reference offsets.
+
+        The growth data, phenotypes and other parts of a saved state are
+        left as they are, e.g. after normalizing a compact instance.
+
+        Args:
+            dir_path: Directory of the saved state
+        """
+        np.save(os.path.join(dir_path, self._paths.normalized_phenotypes),
+                self._get_saved_phenotypes(self._normalized_phenotypes))
+        np.save(os.path.join(dir_path, self._paths.phenotypes_reference_offsets), self._reference_surface_positions)
+
+        self._logger.info("Normalization saved to '{0}'".format(dir_path))
+
     def save_state_to_zip(self, target=None):
 
         def zipit(save_functions, data, zip_paths):
@@ -2448,32 +3648,32 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         # Phenotypes
         zip_paths.append(os.path.join(dir_path, self._paths.phenotypes_raw_npy))
         save_functions.append(np.save)
-        data.append(self._phenotypes)
+        data.append(self._get_saved_phenotypes(self._phenotypes))
 
         # Vector phenotypes
-        zip_paths.append(os.path.join(dir_path, self._paths.vector_phenotypes_raw))
-        save_functions.append(np.save)
-        data.append(self._vector_phenotypes)
+        zip_paths.append(os.path.join(dir_path, self._paths.vector_phenotypes_columnar))
+        save_functions.append(write_columnar_vector_phenotypes)
+        data.append(self._get_columnar_vector_phenotypes())
 
         # Meta phenotypes
         zip_paths.append(os.path.join(dir_path, self._paths.vector_meta_phenotypes_raw))
         save_functions.append(np.save)
-        data.append(self._vector_meta_phenotypes)
+        data.append(self._get_saved_phenotypes(self._vector_meta_phenotypes))
 
         # Normalized phenotypes
         zip_paths.append(os.path.join(dir_path, self._paths.normalized_phenotypes))
         save_functions.append(np.save)
-        data.append(self._normalized_phenotypes)
+        data.append(self._get_saved_phenotypes(self._normalized_phenotypes))
 
         # Raw growth data
         zip_paths.append(os.path.join(dir_path, self._paths.phenotypes_input_data))
         save_functions.append(np.save)
-        data.append(self._raw_growth_data)
+        data.append(self._get_saved_plates(self._raw_growth_data))
 
         # Smooth growth data
         zip_paths.append(os.path.join(dir_path, self._paths.phenotypes_input_smooth))
         save_functions.append(np.save)
-        data.append(self._smooth_growth_data)
+        data.append(self._get_saved_plates(self._smooth_growth_data))
 
         # Phenotypes filter (qc-markings)
         zip_paths.append(os.path.join(dir_path, self._paths.phenotypes_filter))
@@ -2486,9 +3686,10 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
         data.append(self._reference_surface_positions)
 
         # Undo filter (qc undo)
-        zip_paths.append(os.path.join(dir_path, self._paths.phenotypes_filter_undo))
-        save_functions.append(lambda x, y: pickle.dump(y, x))
-        data.append(self._phenotype_filter_undo)
+        if self._phenotype_filter_undo is not None:
+            zip_paths.append(os.path.join(dir_path, self._paths.phenotypes_filter_undo_journal))
+            save_functions.append(lambda x, y: y.write_to(x))
+            data.append(self._phenotype_filter_undo)
 
         # Time stamps
         zip_paths.append(os.path.join(dir_path, self._paths.phenotype_times))
@@ -2511,6 +3712,16 @@ class Phenotyper(mock_numpy_interface.NumpyArrayInterface):
                  self._no_growth_monotonicity_threshold,
                  self._no_growth_pop_doublings_threshold])
 
+        # Extraction signatures (for updating phenotypes)
+        zip_paths.append(os.path.join(dir_path, self._paths.phenotypes_extraction_signatures))
+        save_functions.append(lambda x, y: pickle.dump(y, x))
+        data.append(self._extraction_signatures)
+
+        # Chapman-Richards fits (for drawing model curves)
+        zip_paths.append(os.path.join(dir_path, self._paths.phenotypes_chapman_richards))
+        save_functions.append(np.save)
+        data.append(self._chapman_richards)
+
         zip_stream = zipit(save_functions, data, zip_paths)
         if target:
             with open(target, 'wb') as fh:
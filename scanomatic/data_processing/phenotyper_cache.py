@@ -0,0 +1,198 @@
+import os
+from contextlib import contextmanager
+from threading import Lock, RLock
+from types import ModuleType
+
+import numpy as np
+
+from scanomatic.io.logger import Logger
+from scanomatic.generics.lru_cache import LeastRecentlyUsedCache
+from scanomatic.data_processing.phenotyper import (
+    Phenotyper, get_state_signature, signature_has_saved_project_state
+)
+
+_logger = Logger("Phenotyper Cache")
+
+
+def _get_array_base(array):
+
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def get_memory_size(obj, _counted=None):
+    """Estimate the memory used by the arrays held by an object
+
+    Arrays are followed into lists, tuples, dicts and the attributes of
+    objects. Views are counted as their base array, each base once, and
+    memory-mapped arrays are not counted.
+
+    Args:
+        obj: The object, e.g. a `Phenotyper`
+
+    Returns: Number of bytes
+    """
+    if _counted is None:
+        _counted = set()
+
+    if id(obj) in _counted:
+        return 0
+
+    if isinstance(obj, np.ndarray):
+
+        if obj.dtype == np.object:
+            _counted.add(id(obj))
+            return obj.nbytes + sum(get_memory_size(item, _counted) for item in obj.flat)
+
+        base = _get_array_base(obj)
+        if id(base) in _counted or isinstance(base, np.memmap):
+            return 0
+        _counted.add(id(base))
+        return base.nbytes
+
+    _counted.add(id(obj))
+
+    if isinstance(obj, (list, tuple)):
+        return sum(get_memory_size(item, _counted) for item in obj)
+    elif isinstance(obj, dict):
+        return sum(get_memory_size(item, _counted) for item in obj.itervalues())
+    elif hasattr(obj, '__dict__') and not isinstance(obj, (type, ModuleType)):
+        try:
+            attributes = vars(obj)
+        except TypeError:
+            return 0
+        return sum(get_memory_size(item, _counted) for item in attributes.itervalues())
+
+    return 0
+
+
+class PhenotyperCache(object):
+    """Least recently used cache of loaded project states.
+
+    A state is reloaded if any of its files have changed on disk since
+    it was loaded or saved through the cache. The least recently used
+    states are dropped when the estimated memory of all states exceeds
+    the budget, but the most recently used is always kept.
+
+    Note that the same `Phenotyper` instance is returned for all requests
+    of a project, so it should only be used while holding the project's
+    lock, see `PhenotyperCache.locked`, and changes to it should directly
+    be saved with `PhenotyperCache.save` so that the state on disk stays
+    in sync.
+
+    Args:
+        memory_budget: Optional, number of bytes the cached states may use
+    """
+    def __init__(self, memory_budget=1024 ** 3):
+
+        self._entries = LeastRecentlyUsedCache(
+            memory_budget, get_size=lambda entry: get_memory_size(entry[1]), on_drop=self._log_drop)
+        """Path to signature and `Phenotyper`"""
+        self._lock = Lock()
+        self._path_locks = {}
+
+    @property
+    def memory_budget(self):
+
+        return self._entries.memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, value):
+
+        self._entries.memory_budget = value
+
+    @property
+    def memory_size(self):
+        """The estimated memory used by the cached states"""
+
+        return self._entries.memory_size
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    def __contains__(self, path):
+
+        return os.path.abspath(path) in self._entries
+
+    @contextmanager
+    def locked(self, path):
+        """Hold the lock of a project's state
+
+        The lock is reentrant and held by one thread at a time. If an
+        exception is raised while holding it the cached state is dropped,
+        since it may have been changed without being saved.
+
+        Args:
+            path: The directory of the saved state
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            path_lock = self._path_locks.setdefault(path, RLock())
+
+        with path_lock:
+            try:
+                yield
+            except Exception:
+                self.invalidate(path)
+                raise
+
+    def has_state(self, path):
+        """If there is a saved state of a project
+
+        Only checks that the files of the state exist, which is far
+        cheaper than `phenotyper.path_has_saved_project_state`.
+
+        Args:
+            path: The directory of the saved state
+
+        Returns: bool
+        """
+        if not path:
+            return False
+
+        return signature_has_saved_project_state(get_state_signature(os.path.abspath(path)))
+
+    def get(self, path):
+        """Get the state of a project
+
+        Args:
+            path: The directory of the saved state
+
+        Returns: Phenotyper
+        """
+        path = os.path.abspath(path)
+        signature = get_state_signature(path)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        self._entries.pop(path)
+        phenotyper = Phenotyper.LoadFromState(path)
+        self._entries.set(path, (signature, phenotyper))
+        return phenotyper
+
+    def save(self, phenotyper, path):
+        """Save the state of a project and keep it as the cached state
+
+        Args:
+            phenotyper: The state
+            path: The directory of the saved state
+        """
+        phenotyper.save_state(path, ask_if_overwrite=False)
+        self._entries.set(os.path.abspath(path), (get_state_signature(path), phenotyper))
+
+    def invalidate(self, path=None):
+        """Forget the state of a project, or of all projects if `path` is omitted"""
+
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(os.path.abspath(path))
+
+    @staticmethod
+    def _log_drop(path):
+
+        _logger.info("Dropped cached state {0}".format(path))
@@ -0,0 +1,182 @@
+from collections import Counter
+
+import numpy as np
+
+
+def _is_stacked(plates):
+
+    return isinstance(plates, np.ndarray) and plates.dtype != np.object
+
+
+def _get_fill_value(dtype):
+
+    return np.nan if np.issubdtype(dtype, np.inexact) else 0
+
+
+class PlateStack(object):
+    """Same shaped plates of a project as one array.
+
+    The first axis is the plate index, followed by the rows and columns
+    of the plates and any further axes of the data (e.g. time). Plates
+    that are missing or have another shape than the stack are excluded
+    by the `plate_mask` and hold `numpy.nan` (or 0 for non-float data).
+
+    Positions on several plates can be selected with one fancy index,
+    e.g. `stack[plates, rows, columns]` with equal length index arrays.
+
+    Args:
+        data: The stacked array, may be a `numpy.ma.MaskedArray`
+        plate_mask: 1D bool array, if each plate is included
+    """
+    def __init__(self, data, plate_mask):
+
+        self.data = data
+        self.plate_mask = plate_mask
+
+    @classmethod
+    def FromPlates(cls, plates, shape=None):
+        """Stack plates
+
+        No data is copied if the plates already are one array or are
+        views of the plates of one array, as `stack_plates` stores them.
+
+        Args:
+            plates: Numeric array with the plates as first axis or a
+                sequence of plate arrays (`None` for missing plates).
+            shape: Optional, (rows, columns) of the plates to include.
+                Default is the most common plate shape. Plates must also
+                match in any further dimensions to be included.
+
+        Returns: PlateStack
+        """
+        if _is_stacked(plates):
+            if shape is None or tuple(shape) == plates.shape[1:3]:
+                return cls(plates, np.ones((len(plates), ), dtype=bool))
+            return cls(plates, np.zeros((len(plates), ), dtype=bool))
+
+        shapes = Counter(
+            plate.shape for plate in plates if plate is not None and (shape is None or plate.shape[:2] == tuple(shape)))
+
+        if not shapes:
+            return cls(np.zeros((len(plates), 0, 0)), np.zeros((len(plates), ), dtype=bool))
+
+        plate_shape = shapes.most_common(1)[0][0]
+        plate_mask = np.array([plate is not None and plate.shape == plate_shape for plate in plates], dtype=bool)
+
+        base = cls._get_common_base(plates, plate_mask)
+        if base is not None:
+            return cls(base, plate_mask)
+
+        included = [plate for plate, include in zip(plates, plate_mask) if include]
+        dtype = np.result_type(*(plate.dtype for plate in included))
+        data = np.empty((len(plates), ) + plate_shape, dtype=dtype)
+        data[~plate_mask] = _get_fill_value(dtype)
+
+        masked = any(isinstance(plate, np.ma.MaskedArray) for plate in included)
+        if masked:
+            mask = np.ones(data.shape, dtype=bool)
+
+        for id_plate, plate in enumerate(plates):
+            if plate_mask[id_plate]:
+                data[id_plate] = np.ma.getdata(plate)
+                if masked:
+                    mask[id_plate] = np.ma.getmaskarray(plate)
+
+        return cls(np.ma.masked_array(data, mask) if masked else data, plate_mask)
+
+    @staticmethod
+    def _get_common_base(plates, plate_mask):
+
+        base = None
+        for id_plate, plate in enumerate(plates):
+
+            if not plate_mask[id_plate]:
+                continue
+            elif base is None:
+                base = plate.base
+                if not isinstance(base, np.ndarray) or base.dtype == np.object or \
+                        base.shape[0] != len(plates) or base.shape[1:] != plate.shape:
+                    return None
+
+            if plate.base is not base or isinstance(plate, np.ma.MaskedArray) or \
+                    plate.strides != base.strides[1:] or \
+                    plate.__array_interface__['data'][0] != base[id_plate].__array_interface__['data'][0]:
+                return None
+
+        return base
+
+    @property
+    def shape(self):
+
+        return self.data.shape
+
+    @property
+    def plates(self):
+        """The indices of the included plates"""
+
+        return np.where(self.plate_mask)[0]
+
+    def __len__(self):
+
+        return len(self.data)
+
+    def __getitem__(self, key):
+
+        return self.data[key]
+
+    def get_plate(self, plate):
+        """The data of one plate, `None` if it is not included"""
+
+        return self.data[plate] if self.plate_mask[plate] else None
+
+    def get_positions(self, plates=None):
+        """All positions on the included plates
+
+        Args:
+            plates: Optional, only positions on these plates. Default is all included plates.
+
+        Returns: tuple of plate, row and column index arrays in plate and then row-major order
+        """
+        plates = self.plates if plates is None else np.intersect1d(self.plates, plates)
+        rows, columns = self.data.shape[1:3]
+        plate_index, row_index, column_index = np.meshgrid(plates, np.arange(rows), np.arange(columns), indexing='ij')
+        return plate_index.ravel(), row_index.ravel(), column_index.ravel()
+
+    def take(self, plates, rows, columns):
+        """The data at positions given as plate, row and column index arrays
+
+        Positions on excluded plates get `numpy.nan` (or 0 for non-float data).
+        """
+        return self.data[plates, rows, columns]
+
+    def to_plates(self):
+        """The plates as views of the stack, `None` where excluded
+
+        Returns: 1D object array
+        """
+        plates = np.empty((len(self.data), ), dtype=np.object)
+        for id_plate in self.plates:
+            plates[id_plate] = self.data[id_plate]
+        return plates
+
+
+def stack_plates(plates):
+    """Store same shaped plates as views of one stacked array
+
+    Plates of the most common shape are copied into one stacked array and
+    replaced by views of it so that `PlateStack.FromPlates` need not copy
+    them. Numeric arrays with the plates as first axis are returned as is.
+
+    Args:
+        plates: Sequence of plate arrays or `None` for missing plates
+
+    Returns: The plates as numeric array or 1D object array
+    """
+    if _is_stacked(plates):
+        return plates
+
+    stack = PlateStack.FromPlates(plates)
+    stacked = np.empty((len(plates), ), dtype=np.object)
+    for id_plate, plate in enumerate(plates):
+        stacked[id_plate] = stack.data[id_plate] if stack.plate_mask[id_plate] else plate
+    return stacked
@@ -0,0 +1,448 @@
+import json
+import os
+from bisect import bisect_left, insort
+from fnmatch import fnmatch
+from tempfile import mkstemp
+import time
+from threading import Lock, Thread
+
+import numpy as np
+
+from scanomatic.io.logger import Logger
+from scanomatic.io.paths import Paths
+from scanomatic.io.pickler import unpickle_with_unpickler
+from scanomatic.models.factories.scanning_factory import ScanningModelFactory
+from scanomatic.data_processing.phenotyper import get_project_dates, get_state_signature, _get_state_file_names
+
+_logger = Logger("Project Index")
+_default_index = []
+
+
+def get_project_index():
+    """The project index shared within the process"""
+
+    if not _default_index:
+        _default_index.append(ProjectIndex())
+    return _default_index[0]
+
+
+def _get_required_state_files(_p):
+
+    return (_p.phenotypes_raw_npy, _p.phenotypes_input_data, _p.phenotype_times, _p.phenotypes_input_smooth,
+            _p.phenotypes_extraction_params)
+
+
+def _get_plate_shapes(path):
+
+    try:
+        data = unpickle_with_unpickler(np.load, os.path.join(path, Paths().phenotypes_input_data))
+    except (IOError, ValueError):
+        return None
+
+    return [list(plate.shape[:2]) if getattr(plate, 'ndim', 0) >= 2 else None for plate in data]
+
+
+
+
+def _index_directory(path, mtime):
+
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return None
+
+    _p = Paths()
+    names = set(names)
+    state_files = (_p.phenotypes_raw_npy, ) + _get_state_file_names(_p)
+    entry = {
+        'mtime': mtime,
+        'subdirectories': sorted(name for name in names if os.path.isdir(os.path.join(path, name))),
+        'state_files': [name for name in state_files if name in names],
+        'is_project': all(name in names for name in _get_required_state_files(_p)),
+        'has_scan_instructions': False,
+        'project_name': None,
+        'signature': None,
+        'analysis_date': None,
+        'extraction_date': None,
+        'change_date': None,
+        'plate_shapes': None,
+    }
+
+    for name in sorted(names):
+        if fnmatch(name, _p.scan_project_file_pattern.format("*")):
+            model = ScanningModelFactory.serializer.load_first(os.path.join(path, name))
+            if model:
+                entry['has_scan_instructions'] = True
+                entry['project_name'] = model.project_name if model.project_name else None
+                break
+
+    return entry
+
+
+def _refresh_project(path, entry):
+
+    signature = [list(item) for item in get_state_signature(path)]
+    if signature == entry['signature']:
+        return
+
+    entry['signature'] = signature
+    entry['analysis_date'], entry['extraction_date'], entry['change_date'] = get_project_dates(path)
+    entry['plate_shapes'] = _get_plate_shapes(path)
+
+
+def _scan_directory(path, previous, refresh_project):
+    """The up to date entry of a directory
+
+    Args:
+        path: The directory
+        previous: The indexed entry or `None`, it is not modified
+        refresh_project: If the project information should be updated
+
+    Returns: dict or `None` if it isn't a directory
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+
+    if previous is None or previous['mtime'] != mtime:
+        entry = _index_directory(path, mtime)
+        if entry is None:
+            return None
+    else:
+        entry = dict(previous)
+
+    if refresh_project and entry['is_project']:
+        _refresh_project(path, entry)
+
+    return entry
+
+
+class ProjectIndex(object):
+    """Persistent index of the directories and projects below the projects root.
+
+    Each indexed directory records its subdirectories, the state files
+    present, the name of any scanning project in it and for projects also
+    the analysis, extraction and change dates and the plate shapes.
+
+    A directory is indexed again when its modification time changes, i.e.
+    when files or directories are added or removed in it. The dates and
+    plate shapes of a project are updated when the signature of its state
+    files change, which is checked by `get_project` and `refresh`.
+
+    The index is saved as json lines, a snapshot of all entries followed
+    by a journal of changed entries. Changes are appended to the journal
+    and what other processes appended is read, so each costs as much as
+    the changes. When the journal grows longer than the index it is
+    replaced by a new snapshot, changes another process appends to the
+    old file meanwhile are lost and will be indexed again when needed.
+
+    Args:
+        path: Optional, the index file, default is `Paths().project_index`
+    """
+    def __init__(self, path=None):
+
+        self._path = path
+        self._entries = {}
+        self._keys = []
+        self._file_id = None
+        self._file_offset = 0
+        """Bytes of the index file read"""
+        self._journal_length = 0
+        """Changes in the index file after its snapshot"""
+        self._changed = set()
+        self._lock = Lock()
+        self._refreshed = {}
+        self._refresher = None
+
+    @property
+    def path(self):
+
+        if self._path is None:
+            return Paths().project_index
+        return self._path
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    def get(self, path):
+        """The entry of a directory
+
+        Args:
+            path: The directory
+
+        Returns: dict or `None` if it isn't a directory
+        """
+        with self._lock:
+            self._load()
+            entry = self._get_entry(os.path.abspath(path))
+            self._save()
+            return entry
+
+    def get_project(self, path):
+        """The entry of a directory with up to date project information
+
+        Returns: dict or `None` if it isn't a directory
+        """
+        with self._lock:
+            self._load()
+            entry = self._get_entry(os.path.abspath(path), refresh_project=True)
+            self._save()
+            return entry
+
+    def get_subdirectories(self, path):
+        """Paths of the directories in a directory"""
+
+        entry = self.get(path)
+        if entry is None:
+            return tuple()
+        path = os.path.abspath(path)
+        return tuple(os.path.join(path, name) for name in entry['subdirectories'])
+
+    def get_project_name(self, path, root=None):
+        """The name of the scanning project a directory belongs to
+
+        The directory and then its parents are searched for scanning
+        instructions, but not above the `root` directory.
+
+        Returns: The name or `None`
+        """
+        path = os.path.abspath(path)
+        if root is not None:
+            root = os.path.abspath(root)
+
+        with self._lock:
+            self._load()
+            name = None
+            while root is None or path == root or path.startswith(root + os.sep):
+                entry = self._get_entry(path)
+                if entry is not None and entry['has_scan_instructions']:
+                    name = entry['project_name']
+                    break
+                parent = os.path.dirname(path)
+                if parent == path:
+                    break
+                path = parent
+            self._save()
+            return name
+
+    def get_projects(self, path):
+        """Entries of all indexed projects in or below a directory
+
+        Only the index is queried, see `refresh` to make it up to date.
+
+        Returns: list of (path, entry) tuples ordered by path
+        """
+        path = os.path.abspath(path)
+        prefix = path.rstrip(os.sep) + os.sep
+
+        with self._lock:
+            self._load()
+            projects = []
+            entry = self._entries.get(path)
+            if entry is not None and entry['is_project']:
+                projects.append((path, entry))
+            for key in self._keys[bisect_left(self._keys, prefix):]:
+                if not key.startswith(prefix):
+                    break
+                if self._entries[key]['is_project']:
+                    projects.append((key, self._entries[key]))
+            return projects
+
+    def update(self, path):
+        """Index a directory again, e.g. when a job wrote to it"""
+
+        path = os.path.abspath(path)
+        with self._lock:
+            self._load()
+            entry = _scan_directory(path, None, True)
+            self._set_entry(path, entry)
+            self._save()
+            return entry
+
+    def refresh(self, path):
+        """Update the index of a directory and all directories below it
+
+        Only directories that have changed are listed again. The lock is
+        only held while reading and merging entries, so other requests to
+        the index are served while the directories are walked.
+        """
+        with self._lock:
+            self._load()
+
+        stack = [os.path.abspath(path)]
+        while stack:
+            current = stack.pop()
+            with self._lock:
+                previous = self._entries.get(current)
+
+            entry = _scan_directory(current, previous, True)
+
+            with self._lock:
+                self._set_entry(current, entry)
+                self._save()
+
+            if entry is not None:
+                stack.extend(os.path.join(current, name) for name in entry['subdirectories'])
+
+        _logger.info("Refreshed index of {0}, {1} directories indexed".format(path, len(self._entries)))
+
+    def refresh_in_background(self, path, interval=60):
+        """Refresh a directory in a background thread
+
+        Nothing is done if the directory was refreshed within the interval
+        or if a refresh is already running.
+
+        Args:
+            path: The directory
+            interval: Minimum number of seconds between refreshes
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            if self._refresher is not None or time.time() - self._refreshed.get(path, 0) < interval:
+                return
+            self._refreshed[path] = time.time()
+            self._refresher = Thread(target=self._refresh_and_release, args=(path,), name="Project Index")
+            self._refresher.daemon = True
+            self._refresher.start()
+
+    def _refresh_and_release(self, path):
+
+        try:
+            self.refresh(path)
+        except (IOError, OSError):
+            _logger.exception("Failed to refresh index of {0}".format(path))
+        finally:
+            with self._lock:
+                self._refresher = None
+
+    def _get_entry(self, path, refresh_project=False):
+
+        entry = _scan_directory(path, self._entries.get(path), refresh_project)
+        self._set_entry(path, entry)
+        return entry
+
+    def _set_entry(self, path, entry):
+
+        if entry is None:
+            self._drop(path)
+            return
+
+        previous = self._entries.get(path)
+        if previous is not None:
+            if previous == entry:
+                return
+            for name in set(previous['subdirectories']).difference(entry['subdirectories']):
+                self._drop(os.path.join(path, name))
+        else:
+            insort(self._keys, path)
+
+        self._entries[path] = entry
+        self._changed.add(path)
+
+    def _drop(self, path):
+
+        prefix = path.rstrip(os.sep) + os.sep
+        start = bisect_left(self._keys, prefix)
+        end = start
+        while end < len(self._keys) and self._keys[end].startswith(prefix):
+            end += 1
+
+        dropped = self._keys[start: end]
+        del self._keys[start: end]
+        if path in self._entries:
+            dropped.append(path)
+            del self._keys[bisect_left(self._keys, path)]
+
+        for key in dropped:
+            del self._entries[key]
+        self._changed.update(dropped)
+
+    def _load(self):
+
+        try:
+            stat_result = os.stat(self.path)
+        except OSError:
+            self._file_id = None
+            self._file_offset = 0
+            return
+
+        file_id = (stat_result.st_dev, stat_result.st_ino)
+        if file_id != self._file_id or stat_result.st_size < self._file_offset:
+            self._entries = {}
+            self._keys = []
+            self._file_id = file_id
+            self._file_offset = 0
+            self._journal_length = 0
+        elif stat_result.st_size == self._file_offset:
+            return
+
+        try:
+            with open(self.path, 'r') as fh:
+                fh.seek(self._file_offset)
+                data = fh.read()
+        except IOError:
+            _logger.warning("Could not read project index {0}".format(self.path))
+            return
+
+        # A line may still be being written by another process
+        data = data[:data.rfind("\n") + 1]
+        self._file_offset += len(data)
+
+        for line in data.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                _logger.warning("Skipping corrupt line in project index {0}".format(self.path))
+                continue
+
+            if 'entries' in record:
+                self._entries = record['entries']
+                self._keys = sorted(self._entries)
+                self._journal_length = 0
+                continue
+
+            path = record['path']
+            if path in self._entries:
+                if record['entry'] is None:
+                    del self._keys[bisect_left(self._keys, path)]
+                    del self._entries[path]
+                else:
+                    self._entries[path] = record['entry']
+            elif record['entry'] is not None:
+                insort(self._keys, path)
+                self._entries[path] = record['entry']
+            self._journal_length += 1
+
+    def _save(self):
+
+        if not self._changed:
+            return
+
+        if not self._file_offset or self._journal_length + len(self._changed) > max(len(self._entries), 1000):
+            self._save_snapshot()
+        else:
+            lines = "".join(
+                json.dumps({'path': path, 'entry': self._entries.get(path)}) + "\n" for path in sorted(self._changed))
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, lines)
+            finally:
+                os.close(fd)
+
+        self._changed.clear()
+
+    def _save_snapshot(self):
+
+        directory = os.path.dirname(self.path)
+        fd, temp_path = mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'w') as fh:
+            json.dump({'entries': self._entries}, fh)
+            fh.write("\n")
+        os.rename(temp_path, self.path)
+
+        stat_result = os.stat(self.path)
+        self._file_id = (stat_result.st_dev, stat_result.st_ino)
+        self._file_offset = stat_result.st_size
+        self._journal_length = 0
@@ -1,5 +1,7 @@
 import numpy as np
 
+from scanomatic.generics.phenotype_filter import FilterArray
+
 
 def scan(plate_meta_data, column, value_function):
 
@@ -82,6 +84,80 @@ class StrainSelector(object):
 
         return self.__selection
 
+    @property
+    def positions(self):
+        """The selected positions of all plates as plate, row and column index arrays"""
+
+        selections = [(plate, selection) for plate, selection in enumerate(self.__selection) if selection]
+        if not selections:
+            return tuple(np.zeros((0, ), dtype=np.int) for _ in range(3))
+
+        return (
+            np.hstack([np.ones((len(selection[0]), ), dtype=np.int) * plate for plate, selection in selections]),
+            np.hstack([np.asarray(selection[0], dtype=np.int) for _, selection in selections]),
+            np.hstack([np.asarray(selection[1], dtype=np.int) for _, selection in selections]))
+
+    @property
+    def stacked_raw_growth_data(self):
+        """The non-smooth growth data of all selected positions as one 2D array
+
+        Positions are ordered as in `StrainSelector.positions`
+        """
+        return self.__take(self.__phenotyper.stacked_raw_growth_data, lambda: self.__phenotyper.raw_growth_data)
+
+    @property
+    def stacked_smooth_growth_data(self):
+        """The smooth growth data of all selected positions as one 2D array
+
+        Positions are ordered as in `StrainSelector.positions`
+        """
+        return self.__take(
+            self.__phenotyper.stacked_smooth_growth_data, lambda: self.__phenotyper.smooth_growth_data)
+
+    def get_stacked_phenotype(self, phenotype, **kwargs):
+        """Get the phenotype of all selected positions as one array.
+
+        Positions are ordered as in `StrainSelector.positions`.
+        For more information see `scanomatic.data_processing.phenotyper.Phenotyper.get_stacked_phenotype`.
+
+        Returns: 1D array, masked where curves are marked unless `filtered=False` is passed.
+        """
+        return self.__take(
+            self.__phenotyper.get_stacked_phenotype(phenotype, **kwargs),
+            lambda: [plate.masked() if isinstance(plate, FilterArray) else plate
+                     for plate in self.__phenotyper.get_phenotype(phenotype, **kwargs)])
+
+    def __take(self, stack, get_plates):
+        """The data of the selected positions from a `PlateStack`
+
+        Only plates of the most common shape are stacked, if any position
+        is on another plate the data is instead taken plate by plate.
+
+        Args:
+            stack: The `PlateStack` of the data
+            get_plates: Function returning the data per plate
+
+        Returns: The data of all selected positions as one array
+
+        Raises:
+            ValueError: If a position is on a plate without data
+        """
+        plates, rows, columns = self.positions
+        if stack.plate_mask[plates].all():
+            return stack.take(plates, rows, columns)
+
+        data = get_plates()
+        parts = []
+        for plate in np.unique(plates):
+            if data[plate] is None:
+                raise ValueError("Selection has positions on plate {0} which has no data".format(plate + 1))
+            on_plate = plates == plate
+            parts.append(data[plate][rows[on_plate], columns[on_plate]])
+
+        if any(isinstance(part, np.ma.MaskedArray) for part in parts):
+            return np.ma.concatenate(parts)
+        return np.concatenate(parts)
+
     @property
     def raw_growth_data(self):
 
@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+
+from scanomatic.data_processing.batch_normalization import find_project_states, normalize_projects, \
+    ReferenceValues
+from scanomatic.data_processing.growth_phenotypes import Phenotypes
+from scanomatic.data_processing.phenotyper import Phenotyper, NormState
+
+
+def build_project(path, seed, lazy=False):
+
+    np.random.seed(seed)
+    times = np.arange(60) / 3.
+    lags = np.random.uniform(2, 4, (6, 8))
+    log2_curves = np.minimum(17 + np.clip(times - lags[..., np.newaxis], 0, None) * 0.4, 23)
+    data = np.array([np.power(2, log2_curves + np.random.normal(0, 0.02, log2_curves.shape))])
+
+    phenotyper = Phenotyper(data, times, lazy=lazy)
+    phenotyper.extract_phenotypes()
+    phenotyper.save_state(path, ask_if_overwrite=False)
+
+
+def test_reference_values_are_running_means():
+
+    reference_values = ReferenceValues()
+    reference_values.add({'GenerationTime': [1.0, None]})
+    reference_values.add({'GenerationTime': [2.0, 3.0]})
+
+    assert reference_values.get('GenerationTime', 1) == 2.0
+    assert reference_values.get_project_values({'GenerationTime': [None, None]}) == \
+        {'GenerationTime': [2.0, 2.0]}
+
+    by_plate = ReferenceValues(group_by_plate=True)
+    by_plate.add({'GenerationTime': [1.0, None]})
+    by_plate.add({'GenerationTime': [2.0, 3.0]})
+
+    assert by_plate.get('GenerationTime', 0) == 1.5
+    assert by_plate.get('GenerationTime', 1) == 3.0
+
+
+def test_normalize_projects(tmpdir):
+
+    for seed in range(2):
+        build_project(str(tmpdir.join("project{0}".format(seed))), seed)
+
+    projects = find_project_states([str(tmpdir)])
+    assert len(projects) == 2
+
+    reference_values, status = normalize_projects(projects, processes=1)
+
+    assert all(status.values())
+
+    for path in projects:
+
+        phenotyper = Phenotyper.LoadFromState(path)
+        normalized = phenotyper.get_phenotype(Phenotypes.GenerationTime, norm_state=NormState.NormalizedRelative)[0]
+        assert np.isfinite(normalized.filled()).any()
+        assert os.path.isfile(
+            phenotyper.get_csv_file_name(path, NormState.NormalizedAbsoluteNonBatched, 0))
+
+    assert reference_values.get(Phenotypes.GenerationTime.name, 0) > 0
+
+
+def test_normalize_projects_keeps_growth_data(tmpdir):
+
+    path = str(tmpdir.join("project"))
+    build_project(path, 0)
+    before = Phenotyper.LoadFromState(path)
+
+    _, status = normalize_projects([path], processes=1)
+    assert status[path]
+
+    phenotyper = Phenotyper.LoadFromState(path)
+    assert phenotyper.raw_growth_data.dtype == np.float64
+    assert phenotyper.smooth_growth_data[0].dtype == np.float64
+    assert (phenotyper.raw_growth_data == before.raw_growth_data).all()
+    assert np.ma.allequal(
+        phenotyper.get_phenotype(Phenotypes.GenerationTime)[0], before.get_phenotype(Phenotypes.GenerationTime)[0])
+    assert (phenotyper._extraction_signatures['curves'][0] == before._extraction_signatures['curves'][0]).all()
+    assert not phenotyper.get_dirty_curves()[0].any()
+
+
+def test_normalize_lazy_projects(tmpdir):
+
+    path = str(tmpdir.join("project"))
+    build_project(path, 0, lazy=True)
+
+    _, status = normalize_projects([path], processes=1)
+    assert status[path]
+
+    phenotyper = Phenotyper.LoadFromState(path)
+    assert phenotyper.lazy
+    normalized = phenotyper.get_phenotype(Phenotypes.GenerationTime, norm_state=NormState.NormalizedRelative)[0]
+    assert np.isfinite(normalized.filled()).any()
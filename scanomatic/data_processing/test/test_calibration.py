@@ -134,3 +134,68 @@ class TestAccessToken:
             ccc[calibration.CellCountCalibration.identifier],
             access_token=ccc[
                 calibration.CellCountCalibration.edit_access_token]) is True
+
+
+@pytest.fixture
+def gridded_ccc_plate(ccc, tmpdir, monkeypatch):
+
+    paths = calibration.Paths()
+    monkeypatch.setattr(
+        paths, 'ccc_image_plate_transformed_slice_pattern',
+        str(tmpdir.join("{0}.{1}.{2}.slice.npy")))
+    monkeypatch.setattr(
+        paths, 'ccc_image_plate_grid_pattern',
+        str(tmpdir.join("{0}.{1}.{2}.grid.npy")))
+
+    identifier = ccc[calibration.CellCountCalibration.identifier]
+    image_identifier = 'CccImage0'
+    ccc[calibration.CellCountCalibration.images].append({
+        calibration.CCCImage.identifier: image_identifier,
+        calibration.CCCImage.plates: {0: {
+            calibration.CCCPlate.grid_cell_size: (20, 20),
+            calibration.CCCPlate.compressed_ccc_data: []}},
+        calibration.CCCImage.grayscale_source_values: range(10),
+        calibration.CCCImage.grayscale_target_values: range(10),
+    })
+
+    rows, columns = np.mgrid[:60, :80]
+    plate = np.full((60, 80), 10.)
+    grid = np.zeros((2, 3, 4))
+    for row, column in np.ndindex(3, 4):
+        grid[:, row, column] = 10 + 20 * row, 10 + 20 * column
+        plate[(rows - grid[0, row, column]) ** 2 +
+              (columns - grid[1, row, column]) ** 2 < 25] = 100. + row
+
+    np.save(paths.ccc_image_plate_transformed_slice_pattern.format(
+        identifier, image_identifier, 0), plate)
+    np.save(paths.ccc_image_plate_grid_pattern.format(
+        identifier, image_identifier, 0), grid)
+
+    yield identifier, image_identifier
+
+    ccc[calibration.CellCountCalibration.images].pop()
+
+
+def test_detect_colonies_in_parallel(gridded_ccc_plate):
+
+    identifier, image_identifier = gridded_ccc_plate
+    positions = [(x, y) for x in range(4) for y in range(1, 4)] + [(9, 9)]
+
+    detections = calibration.detect_colonies(
+        identifier, image_identifier, 0, positions, processes=2)
+    sequential = calibration.detect_colonies(
+        identifier, image_identifier, 0, positions, processes=1)
+
+    assert detections[-1] is None
+    assert all(detection['blob'].any() for detection in detections[:-1])
+    for detection, other in zip(detections[:-1], sequential[:-1]):
+        assert (detection['blob'] == other['blob']).all()
+        assert (detection['image'] == other['image']).all()
+
+
+def test_detect_colonies_requires_gridding(ccc):
+
+    with pytest.raises(ValueError):
+        calibration.detect_colonies(
+            ccc[calibration.CellCountCalibration.identifier],
+            'CccImage0', 0, [(0, 1)])
@@ -0,0 +1,54 @@
+import numpy as np
+
+from scanomatic.data_processing import chapman_richards
+from scanomatic.data_processing.growth_phenotypes import get_fit_r_square
+
+
+def build_log2_plate(rows=5, columns=6, n_times=90):
+
+    np.random.seed(7)
+    times = np.arange(n_times) / 3.
+    plate = np.array([[
+        np.minimum(17 + np.clip(times - 2 - 0.3 * i, 0, None) * (0.3 + 0.02 * j), 23) +
+        np.random.normal(0, 0.02, n_times) for j in range(columns)] for i in range(rows)])
+    return times, plate
+
+
+def test_fit_plate_converges():
+
+    times, plate = build_log2_plate()
+    fits = chapman_richards.fit_plate(times, plate)
+
+    assert fits.shape == plate.shape[:2] + (chapman_richards.FIT_SIZE,)
+    assert (fits[..., 0] > chapman_richards.GOOD_FIT).all()
+
+    fit, params = get_fit_r_square(times, plate[2, 3], fits[2, 3, 1:])
+    assert np.isclose(fit, fits[2, 3, 0])
+
+
+def test_fit_plate_only_refits_requested_positions():
+
+    times, plate = build_log2_plate()
+    previous = chapman_richards.fit_plate(times, plate)
+    positions = np.zeros(plate.shape[:2], dtype=bool)
+    positions[1, 1] = True
+    plate[1, 1] += 0.5
+
+    fits = chapman_richards.fit_plate(times, plate, positions=positions, previous=previous)
+
+    assert (fits[~positions] == previous[~positions]).all()
+    assert fits[1, 1, 0] > chapman_richards.GOOD_FIT
+    assert not np.allclose(fits[1, 1], previous[1, 1])
+
+
+def test_fit_plate_refits_as_whole_plate_fit():
+
+    times, plate = build_log2_plate()
+    previous = chapman_richards.fit_plate(times, plate)
+    positions = np.zeros(plate.shape[:2], dtype=bool)
+    positions[[0, 1, 3], [0, 1, 5]] = True
+    plate[positions] += 0.5
+
+    fits = chapman_richards.fit_plate(times, plate, positions=positions, previous=previous)
+
+    assert (fits == chapman_richards.fit_plate(times, plate))[positions].all()
@@ -0,0 +1,40 @@
+import numpy as np
+
+from scanomatic.data_processing.phenotyper import Phenotyper, Smoothing
+from scanomatic.data_processing.live_phenotyper import LivePhenotyper, load_snapshot
+from scanomatic.data_processing.test.test_phenotyper import build_growth_data
+
+
+def test_live_smoothing_in_analysis_order():
+
+    data, times = build_growth_data(n_times=60)
+
+    live = LivePhenotyper.LoadFromImage([data[0][..., -1]], times[-1])
+    for index in range(times.size - 1)[::-1]:
+        live.add_image([data[0][..., index]], times[index])
+
+    reference = Phenotyper(data.copy(), times.copy())
+    reference.extract_phenotypes(smoothing=Smoothing.PolynomialWeightedMulti)
+
+    assert np.allclose(live.times, times)
+    assert np.allclose(live.smooth_growth_data[0], reference.smooth_growth_data[0], equal_nan=True)
+
+    for phenotype in LivePhenotyper.EARLY_PHENOTYPES:
+        if phenotype not in reference._phenotypes[0]:
+            continue
+        assert np.allclose(
+            live._phenotypes[0][phenotype], reference._phenotypes[0][phenotype], equal_nan=True), \
+            "{0} differs".format(phenotype)
+
+
+def test_live_snapshot_roundtrip(tmpdir):
+
+    data, times = build_growth_data(n_times=20)
+    live = LivePhenotyper.LoadFromImage([data[0][..., 0]], times[0])
+    live.add_image([data[0][..., 1]], times[1])
+
+    live.publish_snapshot(str(tmpdir))
+    snapshot = load_snapshot(str(tmpdir))
+
+    assert snapshot['images'] == 2
+    assert snapshot['plates'][0]['shape'] == [2, 3]
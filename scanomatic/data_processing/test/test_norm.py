@@ -0,0 +1,74 @@
+import numpy as np
+from scipy.ndimage import generic_filter
+
+from scanomatic.data_processing.norm import Offsets, get_normalized_data, get_normalized_phenotypes, \
+    get_normalisation_surface, get_control_position_filtered_arrays, NormalisationPlan, apply_outlier_filter, \
+    _get_nan_filled
+
+
+def build_plates(n_phenotypes=3, shape=(16, 24)):
+
+    np.random.seed(42)
+    rows, columns = np.mgrid[0:shape[0], 0:shape[1]]
+    phenotypes_data = []
+    for id_phenotype in range(n_phenotypes):
+        plate = 2 + 0.05 * rows + 0.02 * columns * (id_phenotype + 1) + np.random.normal(0, 0.05, shape)
+        plate[np.random.random(shape) < 0.05] = np.nan
+        phenotypes_data.append(np.array([plate, plate[::-1].copy()]))
+    return phenotypes_data
+
+
+def test_plan_surface_same_as_griddata():
+
+    data = build_plates(n_phenotypes=1)[0]
+    offsets = [Offsets.LowerRight(), Offsets.UpperLeft()]
+    control_data = get_control_position_filtered_arrays(data.copy(), offsets=offsets)
+
+    expected = get_normalisation_surface(control_data, offsets=offsets)
+
+    for id_plate, plate in enumerate(control_data):
+        surface = NormalisationPlan(plate.shape, offsets[id_plate]).get_surfaces([plate])[0]
+        assert np.allclose(surface, expected[id_plate], equal_nan=True)
+
+
+def test_normalized_phenotypes_same_as_one_at_a_time():
+
+    phenotypes_data = build_plates()
+    offsets = [Offsets.LowerRight(), Offsets.LowerLeft()]
+
+    normalized = get_normalized_phenotypes([data.copy() for data in phenotypes_data], offsets)
+
+    for data, normalized_data in zip(phenotypes_data, normalized):
+        expected = get_normalized_data(data.copy(), offsets)
+        for plate, expected_plate in zip(normalized_data, expected):
+            assert np.allclose(plate, expected_plate, equal_nan=True)
+
+
+def test_nan_filling_same_as_generic_filter():
+
+    def nan_filler(item):
+        if np.isnan(item[4]):
+            return np.median(item[np.isfinite(item)])
+        return item[4]
+
+    np.random.seed(42)
+    plate = np.random.normal(10, 1, (32, 48))
+    plate[np.random.random(plate.shape) < 0.3] = np.nan
+    plate[:3, :3] = np.nan
+
+    expected = generic_filter(plate, nan_filler, size=(3, 3), mode="nearest")
+
+    assert np.allclose(_get_nan_filled(plate, (3, 3)), expected, rtol=0, atol=0, equal_nan=True)
+
+
+def test_outlier_filter_removes_outliers():
+
+    np.random.seed(42)
+    plate = np.random.normal(10, 0.1, (32, 48))
+    plate[10, 20] = 20
+    plate[5, 5] = np.nan
+
+    apply_outlier_filter([plate])
+
+    assert np.isnan(plate[10, 20])
+    assert np.isfinite(plate).sum() > 0.9 * plate.size
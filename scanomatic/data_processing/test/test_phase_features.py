@@ -0,0 +1,161 @@
+import numpy as np
+
+from scanomatic.data_processing.phases.analysis import CurvePhasePhenotypes
+from scanomatic.data_processing.phases.features import CurvePhaseMetaPhenotypes, RaggedPhases, VectorPhenotypes, \
+    extract_phenotypes, get_major_impulse_indices, pack_phases_phenotypes, unpack_phases_classifications
+from scanomatic.data_processing.phases.storage import get_columnar_vector_phenotypes, \
+    get_vector_phenotypes_from_columnar, load_columnar_vector_phenotypes, save_columnar_vector_phenotypes
+from scanomatic.data_processing.phases.segmentation import CurvePhases
+
+
+def phase(curve_phase, doublings=None, doubling_time=None, slope=1., intercept=0.):
+
+    if curve_phase is CurvePhases.Undetermined:
+        return curve_phase, None
+
+    return curve_phase, {
+        CurvePhasePhenotypes.PopulationDoublings: doublings,
+        CurvePhasePhenotypes.PopulationDoublingTime: doubling_time,
+        CurvePhasePhenotypes.LinearModelSlope: slope,
+        CurvePhasePhenotypes.LinearModelIntercept: intercept,
+    }
+
+
+def build_plate():
+
+    plate = np.zeros((1, 3), dtype=np.object) * np.nan
+    plate[0, 0] = [
+        phase(CurvePhases.Flat, 0.1, slope=0., intercept=17.),
+        phase(CurvePhases.Impulse, 1., 2.5, slope=0.5, intercept=15.),
+        phase(CurvePhases.Undetermined),
+        phase(CurvePhases.Impulse, 3., 1.5, slope=0.5, intercept=12.),
+        phase(CurvePhases.Flat, 0.2, slope=0., intercept=20.),
+    ]
+    plate[0, 2] = [
+        phase(CurvePhases.Flat, 0.1, slope=0., intercept=17.),
+        phase(CurvePhases.Impulse, 2., 2., slope=1., intercept=13.),
+    ]
+    return plate
+
+
+def build_segmented_plate(shape=(8, 12), seed=0):
+    """A plate of curves with many phases, trailing undetermined phases and tied yields"""
+
+    random = np.random.RandomState(seed)
+    curve_phases = (CurvePhases.Flat, CurvePhases.Impulse, CurvePhases.GrowthAcceleration, CurvePhases.Collapse)
+    plate = np.zeros(shape, dtype=np.object) * np.nan
+
+    for position in np.ndindex(*shape):
+        plate[position] = [
+            phase(curve_phases[random.randint(len(curve_phases))], random.choice([0., 1., random.uniform(0, 3)]))
+            for _ in range(random.randint(1, 30))] + [phase(CurvePhases.Undetermined)] * random.randint(0, 10)
+
+    return plate
+
+
+def get_major_impulse_index_per_curve(phases):
+    """The major impulse as found one curve at a time before the ragged layout"""
+
+    sort_order = np.argsort(tuple(
+        data[CurvePhasePhenotypes.PopulationDoublings] if
+        data is not None and data[CurvePhasePhenotypes.PopulationDoublings] else -np.inf for _, data in phases))
+
+    impulses = np.array(tuple(
+        (i, v) for i, v in enumerate(sort_order) if phases[i][0] is CurvePhases.Impulse))
+
+    if impulses.any():
+        return impulses[np.argmax(impulses[:, -1])][0]
+    return np.nan
+
+
+def get_ranked_impulse_yield_per_curve(phases, rank):
+
+    impulses = tuple(data for curve_phase, data in phases if curve_phase is CurvePhases.Impulse)
+    if len(impulses) < -rank:
+        return np.nan
+
+    return impulses[np.argsort(tuple(
+        impulse[CurvePhasePhenotypes.PopulationDoublings] if impulse[CurvePhasePhenotypes.PopulationDoublings]
+        else -np.inf for impulse in impulses))[rank]][CurvePhasePhenotypes.PopulationDoublings]
+
+
+def test_ragged_layout():
+
+    phases = RaggedPhases.FromPlate(build_plate())
+
+    assert phases.offsets.tolist() == [0, 5, 5, 7]
+    assert phases.valid.tolist() == [True, False, True]
+    assert phases.curves.tolist() == [0, 0, 0, 0, 0, 2, 2]
+    assert phases.local_index.tolist() == [0, 1, 2, 3, 4, 0, 1]
+    assert not phases.has_phenotypes[2]
+
+
+def test_meta_phenotypes():
+
+    plate = build_plate()
+
+    assert np.allclose(
+        extract_phenotypes(plate, CurvePhaseMetaPhenotypes.Modalities, None), [[2, np.nan, 1]], equal_nan=True)
+    assert np.allclose(
+        extract_phenotypes(plate, CurvePhaseMetaPhenotypes.MajorImpulseYieldContribution, None),
+        [[3., np.nan, 2.]], equal_nan=True)
+    assert np.allclose(
+        extract_phenotypes(plate, CurvePhaseMetaPhenotypes.FirstMinorImpulseAveragePopulationDoublingTime, None),
+        [[2.5, np.nan, np.nan]], equal_nan=True)
+    assert np.allclose(
+        extract_phenotypes(plate, CurvePhaseMetaPhenotypes.InitialLag, None), [[4., np.nan, 4.]], equal_nan=True)
+    assert np.allclose(get_major_impulse_indices(plate), [[3, np.nan, 1]], equal_nan=True)
+
+
+def test_meta_phenotypes_same_as_per_curve():
+
+    plate = build_segmented_plate()
+
+    assert np.allclose(
+        get_major_impulse_indices(plate),
+        np.frompyfunc(get_major_impulse_index_per_curve, 1, 1)(plate).astype(np.float), equal_nan=True)
+
+    for meta_phenotype, rank in ((CurvePhaseMetaPhenotypes.MajorImpulseYieldContribution, -1),
+                                 (CurvePhaseMetaPhenotypes.FirstMinorImpulseYieldContribution, -2)):
+        assert np.allclose(
+            extract_phenotypes(plate, meta_phenotype, None),
+            np.frompyfunc(get_ranked_impulse_yield_per_curve, 2, 1)(plate, rank).astype(np.float),
+            equal_nan=True), "{0} differs".format(meta_phenotype)
+
+
+def test_packed_plate_gives_same_meta_phenotypes():
+
+    plate = build_plate()
+    packed = pack_phases_phenotypes(plate, dtype=np.float64)
+
+    for meta_phenotype in CurvePhaseMetaPhenotypes:
+        if meta_phenotype is CurvePhaseMetaPhenotypes.InitialLagAlternativeModel:
+            continue
+        assert np.allclose(
+            extract_phenotypes(plate, meta_phenotype, None), extract_phenotypes(packed, meta_phenotype, None),
+            equal_nan=True), "{0} differs".format(meta_phenotype)
+
+
+def test_columnar_storage_round_trip(tmpdir):
+
+    plate = build_plate()
+    classifications = np.zeros((1, 3), dtype=np.object) * np.nan
+    classifications[0, 2] = np.ma.masked_array([1, 1, 4, 4], [False, False, False, True])
+    vector_phenotypes = [
+        None,
+        {VectorPhenotypes.PhasesPhenotypes: plate, VectorPhenotypes.PhasesClassifications: classifications}]
+
+    path = str(tmpdir.join("vectors.npz"))
+    save_columnar_vector_phenotypes(path, get_columnar_vector_phenotypes(vector_phenotypes, 4))
+    loaded = get_vector_phenotypes_from_columnar(load_columnar_vector_phenotypes(path))
+
+    assert loaded[0] is None
+    phases = loaded[1][VectorPhenotypes.PhasesPhenotypes]
+    assert isinstance(phases, RaggedPhases)
+    assert np.isnan(phases.get_position((0, 1)))
+    assert [p for p, _ in phases.get_position((0, 0))] == [p for p, _ in plate[0, 0]]
+    assert phases.get_position((0, 2))[1][1][CurvePhasePhenotypes.LinearModelIntercept] == 13.
+
+    loaded_classifications = loaded[1][VectorPhenotypes.PhasesClassifications]
+    assert unpack_phases_classifications(loaded_classifications, (0, 0)) is None
+    assert unpack_phases_classifications(loaded_classifications, (0, 2)).tolist() == [1, 1, 4, None]
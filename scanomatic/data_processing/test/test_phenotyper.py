@@ -0,0 +1,235 @@
+import csv
+
+import numpy as np
+import pytest
+
+from scanomatic.data_processing.phenotyper import Phenotyper, NormState
+from scanomatic.data_processing.growth_phenotypes import Phenotypes
+from scanomatic.generics.phenotype_filter import Filter
+
+
+def build_growth_data(n_times=120):
+
+    np.random.seed(42)
+    times = np.arange(n_times) / 3.
+
+    def curve(lag, rate):
+        log2_curve = np.minimum(17 + np.clip(times - lag, 0, None) * rate, 23)
+        return np.power(2, log2_curve + np.random.normal(0, 0.02, n_times))
+
+    data = np.array([np.array([[curve(3 + i, 0.3 + 0.05 * j) for j in range(3)] for i in range(2)])])
+    return data, times
+
+
+def assert_same_phenotypes(phenotyper_a, phenotyper_b):
+
+    assert np.allclose(
+        phenotyper_a.smooth_growth_data[0], phenotyper_b.smooth_growth_data[0], equal_nan=True)
+
+    for phenotype, data in phenotyper_b._phenotypes[0].iteritems():
+        assert np.allclose(phenotyper_a._phenotypes[0][phenotype], data, equal_nan=True), \
+            "{0} differs".format(phenotype)
+
+    for phenotype, data in phenotyper_b._vector_meta_phenotypes[0].iteritems():
+        assert np.allclose(phenotyper_a._vector_meta_phenotypes[0][phenotype], data, equal_nan=True), \
+            "{0} differs".format(phenotype)
+
+
+def test_update_phenotypes_with_appended_times():
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data[..., :90].copy(), times[:90].copy())
+    phenotyper.extract_phenotypes()
+
+    updated = phenotyper.update_phenotypes(raw_growth_data=data.copy(), times_data=times.copy())
+
+    assert updated[0].all()
+
+    reference = Phenotyper(data.copy(), times.copy())
+    reference.extract_phenotypes()
+
+    assert_same_phenotypes(phenotyper, reference)
+
+
+def test_update_phenotypes_with_edited_curve():
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data.copy(), times.copy())
+    phenotyper.extract_phenotypes()
+    phenotyper.add_position_mark(0, (0, 0), Phenotypes.GenerationTime)
+    phenotyper.add_position_mark(0, (1, 2), Phenotypes.GenerationTime)
+
+    data[0, 1, 2, 10:20] *= 1.5
+
+    assert not phenotyper.get_dirty_curves()[0].any()
+
+    updated = phenotyper.update_phenotypes(raw_growth_data=data.copy())
+
+    assert updated[0].sum() == 1 and updated[0][1, 2]
+    assert phenotyper._phenotype_filter[0][Phenotypes.GenerationTime][0, 0] == Filter.BadData.value
+    assert phenotyper._phenotype_filter[0][Phenotypes.GenerationTime][1, 2] == Filter.OK.value
+    assert not phenotyper.get_dirty_curves()[0].any()
+
+    reference = Phenotyper(data.copy(), times.copy())
+    reference.extract_phenotypes()
+
+    assert_same_phenotypes(phenotyper, reference)
+
+
+def test_compact_mode_keeps_phenotypes():
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data.copy(), times.copy())
+    phenotyper.extract_phenotypes()
+
+    compact = Phenotyper(data.copy(), times.copy(), compact=True)
+    compact.extract_phenotypes()
+
+    assert compact.raw_growth_data.dtype == np.float32
+    assert compact.smooth_growth_data.dtype == np.float32
+
+    for phenotype in (Phenotypes.GenerationTime, Phenotypes.ExperimentGrowthYield, Phenotypes.GrowthLag):
+        if phenotype not in phenotyper:
+            continue
+        values = compact.get_phenotype(phenotype)[0]
+        assert values.dtype == np.float32
+        assert np.allclose(values, phenotyper.get_phenotype(phenotype)[0], rtol=1e-5, equal_nan=True)
+
+    for phases in compact._vector_phenotypes[0].itervalues():
+        assert phases.dtype != np.object
+
+    assert (compact.get_curve_phases(0, 1, 1) == phenotyper.get_curve_phases(0, 1, 1)).all()
+    assert [phase for phase, _ in compact.get_curve_phase_data(0, 1, 1)] == \
+        [phase for phase, _ in phenotyper.get_curve_phase_data(0, 1, 1)]
+
+
+def test_compact_mode_saves_without_losing_precision(tmpdir):
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data.copy(), times.copy())
+    phenotyper.extract_phenotypes()
+    phenotyper.save_state(str(tmpdir), ask_if_overwrite=False)
+
+    compact = Phenotyper.LoadFromState(str(tmpdir), compact=True)
+    compact.save_state(str(tmpdir), ask_if_overwrite=False)
+
+    loaded = Phenotyper.LoadFromState(str(tmpdir))
+    assert loaded.raw_growth_data.dtype == np.float64
+    assert (loaded.raw_growth_data == phenotyper.raw_growth_data).all()
+    assert (loaded.smooth_growth_data[0] == phenotyper.smooth_growth_data[0]).all()
+    assert loaded.get_phenotype(Phenotypes.GenerationTime)[0].dtype == np.float64
+    assert not loaded.get_dirty_curves()[0].any()
+
+    new_dir = tmpdir.join("new")
+    compact.save_state(str(new_dir), ask_if_overwrite=False)
+    assert Phenotyper.LoadFromState(str(new_dir)).raw_growth_data.dtype == np.float64
+
+
+def test_compact_mode_refuses_to_save_changed_growth_data(tmpdir):
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data.copy(), times.copy())
+    phenotyper.extract_phenotypes()
+    phenotyper.save_state(str(tmpdir), ask_if_overwrite=False)
+
+    compact = Phenotyper.LoadFromState(str(tmpdir), compact=True)
+    edited = data.copy()
+    edited[0][1, 1] *= 2
+    compact.update_phenotypes(raw_growth_data=edited)
+
+    with pytest.raises(ValueError):
+        compact.save_state(str(tmpdir), ask_if_overwrite=False)
+
+    loaded = Phenotyper.LoadFromState(str(tmpdir))
+    assert (loaded.raw_growth_data == phenotyper.raw_growth_data).all()
+    assert not loaded.get_dirty_curves()[0].any()
+
+    new_dir = tmpdir.join("new")
+    compact.save_state(str(new_dir), ask_if_overwrite=False)
+    assert not Phenotyper.LoadFromState(str(new_dir)).get_dirty_curves()[0].any()
+
+
+def test_lazy_mode_calculates_requested_phenotypes(tmpdir):
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data.copy(), times.copy())
+    phenotyper.extract_phenotypes()
+
+    lazy = Phenotyper(data.copy(), times.copy(), lazy=True)
+    lazy.extract_phenotypes()
+
+    assert Phenotypes.GenerationTime not in lazy
+    assert Phenotypes.GenerationTime.name in lazy.phenotype_names()
+
+    assert np.allclose(
+        lazy.get_phenotype(Phenotypes.GenerationTime)[0], phenotyper.get_phenotype(Phenotypes.GenerationTime)[0],
+        equal_nan=True)
+    assert Phenotypes.ExperimentPopulationDoublings in lazy
+    assert Phenotypes.GrowthLag not in lazy
+
+    assert (lazy.get_curve_phases(0, 1, 1) == phenotyper.get_curve_phases(0, 1, 1)).all()
+    assert Phenotypes.GenerationTime in lazy._phenotype_filter[0]
+
+    lazy.save_state(str(tmpdir), ask_if_overwrite=False)
+    loaded = Phenotyper.LoadFromState(str(tmpdir))
+
+    assert loaded.lazy
+    assert Phenotypes.GenerationTime in loaded
+    assert np.allclose(
+        loaded.get_phenotype(Phenotypes.ExperimentGrowthYield)[0],
+        phenotyper.get_phenotype(Phenotypes.ExperimentGrowthYield)[0], equal_nan=True)
+
+
+def test_lazy_mode_normalizes_phenotypes():
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data.copy(), times.copy())
+    phenotyper.extract_phenotypes()
+    phenotyper.normalize_phenotypes()
+
+    lazy = Phenotyper(data.copy(), times.copy(), lazy=True)
+    lazy.extract_phenotypes()
+    lazy.normalize_phenotypes()
+
+    normalized = lazy.get_phenotype(Phenotypes.GenerationTime, norm_state=NormState.NormalizedRelative)[0]
+    assert np.allclose(
+        normalized,
+        phenotyper.get_phenotype(Phenotypes.GenerationTime, norm_state=NormState.NormalizedRelative)[0],
+        equal_nan=True)
+
+    lazy.get_phenotype(Phenotypes.GenerationTimeWhen)
+    assert np.allclose(
+        lazy.get_phenotype(Phenotypes.GenerationTime, norm_state=NormState.NormalizedRelative)[0], normalized,
+        equal_nan=True)
+
+
+def test_save_phenotypes_exports_filter_names_and_columns(tmpdir):
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data.copy(), times.copy())
+    phenotyper.extract_phenotypes()
+    phenotyper.add_position_mark(0, (1, 2), Phenotypes.GenerationTime)
+
+    assert phenotyper.save_phenotypes(str(tmpdir), ask_if_overwrite=False)
+
+    with open(phenotyper.get_csv_file_name(str(tmpdir), NormState.Absolute, 0), 'rb') as fh:
+        rows = list(csv.reader(fh))
+
+    header = rows[0]
+    generation_time = header.index(str(Phenotypes.GenerationTime))
+    assert header[:3] == ['Plate', 'Row', 'Column']
+    assert len(rows) == 7
+    assert rows[6][:3] == ['0', '1', '2']
+    assert rows[6][generation_time] == Filter.BadData.name
+    assert float(rows[1][generation_time]) == phenotyper.get_phenotype(Phenotypes.GenerationTime)[0][0, 0]
+
+    assert phenotyper.save_phenotypes_columnar(str(tmpdir), ask_if_overwrite=False)
+    table = np.load(phenotyper.get_columnar_file_name(str(tmpdir), NormState.Absolute))
+
+    assert table.shape == (6,)
+    assert (table['row'] == [0, 0, 0, 1, 1, 1]).all()
+    assert (table['column'] == [0, 1, 2, 0, 1, 2]).all()
+    assert np.isnan(table['GenerationTime'][5])
+    assert table['GenerationTime.filter'][5] == Filter.BadData.value
+    assert np.allclose(
+        table['GenerationTime'][:5], phenotyper.get_phenotype(Phenotypes.GenerationTime)[0].ravel()[:5])
@@ -0,0 +1,114 @@
+import os
+import time
+from threading import Thread
+
+import numpy as np
+
+from scanomatic.data_processing.phenotyper import Phenotyper
+from scanomatic.data_processing.phenotyper_cache import PhenotyperCache, get_memory_size
+from scanomatic.data_processing.growth_phenotypes import Phenotypes
+from scanomatic.data_processing.test.test_phenotyper import build_growth_data
+
+
+def save_project(path):
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data, times)
+    phenotyper.extract_phenotypes()
+    phenotyper.save_state(path, ask_if_overwrite=False)
+    return phenotyper
+
+
+def test_memory_size_counts_views_once():
+
+    stack = np.zeros((2, 10))
+    assert get_memory_size({'a': stack[0], 'b': [stack[1], stack]}) == stack.nbytes
+
+
+def test_cache_reuses_until_state_changes(tmpdir):
+
+    path = str(tmpdir)
+    save_project(path)
+    cache = PhenotyperCache()
+
+    state = cache.get(path)
+    assert cache.get(path) is state
+
+    state.add_position_mark(0, (0, 0), Phenotypes.GenerationTime)
+    cache.save(state, path)
+    assert cache.get(path) is state
+
+    other = Phenotyper.LoadFromState(path)
+    other.add_position_mark(0, (1, 1), Phenotypes.GenerationTime)
+    other.save_state(path, ask_if_overwrite=False)
+    filter_path = os.path.join(path, state._paths.phenotypes_filter)
+    os.utime(filter_path, (0, 0))
+
+    reloaded = cache.get(path)
+    assert reloaded is not state
+    assert reloaded.get_phenotype(Phenotypes.GenerationTime)[0].mask[1, 1]
+
+
+def test_has_state_checks_state_files(tmpdir):
+
+    path = str(tmpdir)
+    cache = PhenotyperCache()
+    assert not cache.has_state(path)
+    assert not cache.has_state("")
+
+    state = save_project(path)
+    assert cache.has_state(path)
+
+    os.remove(os.path.join(path, state._paths.phenotype_times))
+    assert not cache.has_state(path)
+
+
+def test_cache_drops_least_recently_used(tmpdir):
+
+    paths = [str(tmpdir.mkdir(name)) for name in ("a", "b", "c")]
+    for path in paths:
+        save_project(path)
+
+    cache = PhenotyperCache()
+    first = cache.get(paths[0])
+    cache.memory_budget = cache.memory_size * 2.5
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    assert len(cache) == 2
+    assert paths[1] not in cache
+    assert cache.get(paths[0]) is first
+
+
+def test_locked_serializes_and_drops_failed_edits(tmpdir):
+
+    path = str(tmpdir)
+    save_project(path)
+    cache = PhenotyperCache()
+    events = []
+
+    def edit():
+        with cache.locked(path):
+            events.append("start")
+            time.sleep(0.05)
+            events.append("end")
+
+    threads = [Thread(target=edit) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert events == ["start", "end", "start", "end"]
+
+    state = cache.get(path)
+    try:
+        with cache.locked(path):
+            state.add_position_mark(0, (0, 0), Phenotypes.GenerationTime)
+            raise IOError("Could not save")
+    except IOError:
+        pass
+
+    assert path not in cache
+    assert not cache.get(path).get_phenotype(Phenotypes.GenerationTime)[0].mask[0, 0]
@@ -0,0 +1,82 @@
+import numpy as np
+
+from scanomatic.data_processing.plate_stack import PlateStack, stack_plates
+from scanomatic.data_processing.phenotyper import Phenotyper
+from scanomatic.data_processing.strain_selector import StrainSelector
+from scanomatic.data_processing.growth_phenotypes import Phenotypes
+from scanomatic.data_processing.test.test_phenotyper import build_growth_data
+
+
+def build_plates():
+
+    return [np.arange(24.).reshape(2, 3, 4), None, np.ones((4, 6, 4)), np.arange(24.).reshape(2, 3, 4) + 100]
+
+
+def test_stack_excludes_missing_and_other_shapes():
+
+    stack = PlateStack.FromPlates(build_plates())
+
+    assert stack.shape == (4, 2, 3, 4)
+    assert stack.plate_mask.tolist() == [True, False, False, True]
+    assert stack.get_plate(2) is None
+    assert np.isnan(stack[1]).all()
+    assert stack.take([0, 3, 1], [1, 0, 0], [2, 1, 0])[:, 0].tolist()[:2] == [20., 104.]
+    assert [index.tolist()[::6] for index in stack.get_positions()] == [[0, 3], [0, 0], [0, 0]]
+
+
+def test_stacked_plates_are_not_copied():
+
+    plates = stack_plates(build_plates())
+
+    assert plates[2].shape == (4, 6, 4)
+    stack = PlateStack.FromPlates(plates)
+    stack.data[3, 1, 2] = -1
+
+    assert (plates[3][1, 2] == -1).all()
+
+
+def test_stack_keeps_masks():
+
+    plates = [np.ma.masked_array([[1., 2.]], [[False, True]]), np.ma.masked_array([[3., 4.]], [[True, False]])]
+    stack = PlateStack.FromPlates(plates)
+
+    assert stack.take([0, 1], [0, 0], [1, 1]).mask.tolist() == [True, False]
+
+
+def test_phenotyper_stacked_views():
+
+    data, times = build_growth_data()
+    phenotyper = Phenotyper(data, times)
+    phenotyper.extract_phenotypes()
+    phenotyper.add_position_mark(0, (1, 2), Phenotypes.GenerationTime)
+
+    assert np.may_share_memory(phenotyper.stacked_raw_growth_data.data, phenotyper.raw_growth_data[0])
+    assert np.may_share_memory(phenotyper.stacked_smooth_growth_data.data, phenotyper.smooth_growth_data[0])
+
+    generation_times = phenotyper.get_stacked_phenotype(Phenotypes.GenerationTime)
+    assert generation_times.shape == (1, 2, 3)
+    assert generation_times.data.mask[0, 1, 2] and generation_times.data.mask.sum() == 1
+
+
+def test_strain_selection_on_other_plate_shapes():
+
+    data, times = build_growth_data()
+    plates = np.empty((2, ), dtype=np.object)
+    plates[0] = data[0][:2]
+    plates[1] = np.vstack((data[0], data[0][::-1]))
+    phenotyper = Phenotyper(plates, times)
+    phenotyper.extract_phenotypes()
+    phenotyper.add_position_mark(0, (1, 2), Phenotypes.GenerationTime)
+
+    selection = StrainSelector(phenotyper, (((0, 1), (1, 2)), ((3, ), (0, ))))
+
+    assert np.allclose(selection.stacked_raw_growth_data, [plates[0][0, 1], plates[0][1, 2], plates[1][3, 0]])
+    assert np.allclose(
+        selection.stacked_smooth_growth_data,
+        [phenotyper.smooth_growth_data[0][0, 1], phenotyper.smooth_growth_data[0][1, 2],
+         phenotyper.smooth_growth_data[1][3, 0]])
+
+    generation_times = selection.get_stacked_phenotype(Phenotypes.GenerationTime)
+    expected = phenotyper.get_phenotype(Phenotypes.GenerationTime)
+    assert generation_times.mask.tolist() == [False, True, False]
+    assert generation_times[0] == expected[0][0, 1] and generation_times[2] == expected[1][3, 0]
@@ -0,0 +1,70 @@
+import os
+import shutil
+
+from scanomatic.data_processing.project_index import ProjectIndex
+from scanomatic.data_processing.test.test_phenotyper_cache import save_project
+
+
+def test_projects_indexed_and_listed(tmpdir):
+
+    root = str(tmpdir.join("projects"))
+    project = os.path.join(root, "experiment", "analysis")
+    os.makedirs(project)
+    os.makedirs(os.path.join(root, "other"))
+    phenotyper = save_project(project)
+
+    index = ProjectIndex(path=str(tmpdir.join("index.json")))
+    index.refresh(root)
+
+    assert [path for path, _ in index.get_projects(root)] == [project]
+    entry = index.get_project(project)
+    assert entry['plate_shapes'] == [list(plate.shape[:2]) for plate in phenotyper.raw_growth_data]
+    assert entry['extraction_date'] is not None
+    assert index.get_subdirectories(root) == (os.path.join(root, "experiment"), os.path.join(root, "other"))
+
+    reloaded = ProjectIndex(path=index.path)
+    assert [path for path, _ in reloaded.get_projects(os.path.join(root, "experiment"))] == [project]
+    assert reloaded.get_projects(os.path.join(root, "other")) == []
+
+
+def test_removed_directories_dropped(tmpdir):
+
+    root = str(tmpdir.join("projects"))
+    project = os.path.join(root, "experiment", "analysis")
+    os.makedirs(project)
+    save_project(project)
+
+    index = ProjectIndex(path=str(tmpdir.join("index.json")))
+    index.refresh(root)
+    shutil.rmtree(os.path.join(root, "experiment"))
+    os.utime(root, (0, 0))
+
+    assert index.get_subdirectories(root) == tuple()
+    assert index.get_projects(root) == []
+
+
+def test_changes_appended_and_read_by_other_processes(tmpdir):
+
+    root = str(tmpdir.join("projects"))
+    first = os.path.join(root, "first")
+    second = os.path.join(root, "second")
+    os.makedirs(first)
+    save_project(first)
+
+    index = ProjectIndex(path=str(tmpdir.join("index.json")))
+    index.refresh(root)
+    other = ProjectIndex(path=index.path)
+    assert [path for path, _ in other.get_projects(root)] == [first]
+
+    lines = open(index.path).read().splitlines()
+    os.makedirs(second)
+    save_project(second)
+    index.update(second)
+
+    assert open(index.path).read().splitlines()[:len(lines)] == lines
+    assert [path for path, _ in other.get_projects(root)] == [first, second]
+
+    shutil.rmtree(second)
+    index.update(second)
+    assert [path for path, _ in other.get_projects(root)] == [first]
+    assert [path for path, _ in ProjectIndex(path=index.path).get_projects(root)] == [first]
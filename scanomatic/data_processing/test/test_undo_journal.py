@@ -0,0 +1,62 @@
+from collections import deque
+
+import numpy as np
+
+from scanomatic.data_processing.growth_phenotypes import Phenotypes
+from scanomatic.data_processing.phases.features import CurvePhaseMetaPhenotypes
+from scanomatic.data_processing.undo_journal import UndoJournal, get_position_runs, get_positions_from_runs
+
+
+def assert_same_entry(entry, expected):
+
+    positions, phenotype, previous_state = entry
+    expected_positions, expected_phenotype, expected_state = expected
+
+    rows, columns = (np.ravel(a) for a in np.broadcast_arrays(*expected_positions))
+    assert (positions[0] == rows).all() and (positions[1] == columns).all()
+    assert phenotype is expected_phenotype
+    assert (np.ravel(previous_state) == np.ravel(expected_state)).all()
+
+
+def test_position_runs_keep_order():
+
+    positions = ((0, 0, 0, 3, 1, 1), (4, 5, 6, 0, 2, 2))
+    runs = get_position_runs(positions)
+
+    assert runs.tolist() == [[0, 4, 3], [3, 0, 1], [1, 2, 1], [1, 2, 1]]
+    assert [a.tolist() for a in get_positions_from_runs(runs)] == [list(a) for a in positions]
+
+
+def test_journal_replays_saved_changes(tmpdir):
+
+    path = str(tmpdir.join("undo.journal"))
+    journal = UndoJournal(2, max_length=5)
+    reference = deque(maxlen=5)
+    marks = [
+        ((1, 2), Phenotypes.GenerationTime, 0),
+        (((0, 0, 1), (0, 1, 0)), None, 0),
+        (((3, 3, 3), (4, 5, 6)), CurvePhaseMetaPhenotypes.InitialLag, np.array([0, 2, 4])),
+    ]
+
+    for i in range(8):
+        entry = marks[i % len(marks)]
+        journal[0].append(*entry)
+        reference.append(entry)
+
+        if i == 4:
+            journal.save(path)
+
+    journal[1].append(*marks[0])
+    journal[1].clear()
+    assert_same_entry(journal[0].pop(), reference.pop())
+    journal.save(path)
+
+    loaded = UndoJournal.LoadFromFile(path, 2, max_length=5)
+
+    assert len(loaded[0]) == len(reference) == 4
+    assert not loaded[1]
+
+    while reference:
+        assert_same_entry(loaded[0].pop(), reference.pop())
+
+    assert not loaded[0]
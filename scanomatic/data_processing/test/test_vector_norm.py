@@ -0,0 +1,30 @@
+import numpy as np
+
+from scanomatic.data_processing.vector_norm import get_best_reference_for_experiments, get_reference_distances
+
+
+def test_reference_distances():
+
+    curves = np.array([[0., 1., 2.], [1., 1., 1.], [0., np.nan, 0.]])
+    distances = get_reference_distances(curves, chunk_size=2)
+
+    assert distances[0, 1] == distances[1, 0] == 2
+    assert np.isnan(distances[0, 2]) and np.isnan(distances[2, 1])
+    assert (np.diag(distances) == 0).all()
+
+
+def test_unstable_references_are_not_selected():
+
+    np.random.seed(42)
+    plate = np.ones((8, 12, 20)) + np.random.normal(0, 0.01, (8, 12, 20))
+    plate[3, 3] += 5
+
+    references = get_best_reference_for_experiments(plate)
+
+    assert np.isnan(references[1::2, 1::2]).all()
+    experiments = references[0::2].reshape(-1, 20)
+    assert np.isfinite(experiments).all()
+
+    # With few references in the window the outlier can't be told apart
+    interior = references[2:6, 2:10].reshape(-1, 20)
+    assert not any(np.array_equal(curve, plate[3, 3]) for curve in interior)
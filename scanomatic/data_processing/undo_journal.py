@@ -0,0 +1,389 @@
+import os
+
+import numpy as np
+
+from scanomatic.data_processing.growth_phenotypes import Phenotypes
+from scanomatic.data_processing.phases.features import VectorPhenotypes, CurvePhaseMetaPhenotypes
+
+_PHENOTYPE_CLASSES = (Phenotypes, CurvePhaseMetaPhenotypes, VectorPhenotypes)
+_PHENOTYPE_CLASS_SIZE = 1024
+_NO_PHENOTYPE = -1
+
+_MARK = 0
+_UNDO = 1
+_CLEAR = 2
+_RECORD_HEADER_SIZE = 5
+"""Kind, plate, phenotype, number of position runs and number of states"""
+
+
+def _encode_phenotype(phenotype):
+
+    if phenotype is None:
+        return _NO_PHENOTYPE
+
+    return _PHENOTYPE_CLASSES.index(type(phenotype)) * _PHENOTYPE_CLASS_SIZE + phenotype.value
+
+
+def _decode_phenotype(code):
+
+    if code == _NO_PHENOTYPE:
+        return None
+
+    return _PHENOTYPE_CLASSES[code // _PHENOTYPE_CLASS_SIZE](code % _PHENOTYPE_CLASS_SIZE)
+
+
+def get_position_runs(positions):
+    """Run-length encode positions
+
+    Args:
+        positions: Tuple of row and column index, either as ints or as sequences
+            of the same length.
+
+    Returns: 2D int array of (row, first column, length) per run of positions on
+        the same row and in consecutive columns. The order of the positions is kept.
+    """
+    rows, columns = (np.ravel(a) for a in np.broadcast_arrays(*positions))
+    if not rows.size:
+        return np.zeros((0, 3), dtype=np.int32)
+
+    starts = np.ones(rows.shape, dtype=bool)
+    starts[1:] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1] + 1)
+    starts = np.where(starts)[0]
+
+    return np.c_[rows[starts], columns[starts], np.diff(np.r_[starts, rows.size])].astype(np.int32)
+
+
+def get_positions_from_runs(runs):
+    """The positions of run-length encoded positions
+
+    Args:
+        runs: As returned by `get_position_runs`
+
+    Returns: Tuple of row and column index arrays
+    """
+    lengths = runs[:, 2]
+    run_index = np.repeat(np.arange(len(runs)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return runs[run_index, 0], runs[run_index, 1] + offsets
+
+
+class _GrowingArray(object):
+
+    def __init__(self, shape, dtype):
+
+        self._data = np.zeros((16, ) + shape, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+
+        end = self.size + len(values)
+        if end > len(self._data):
+            data = np.zeros((max(end, 2 * len(self._data)), ) + self._data.shape[1:], dtype=self._data.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+
+        self._data[self.size: end] = values
+        self.size = end
+
+    def drop_start(self, count):
+
+        self._data[:self.size - count] = self._data[count: self.size].copy()
+        self.size -= count
+
+    def __getitem__(self, item):
+
+        return self._data[:self.size][item]
+
+    def __setitem__(self, item, value):
+
+        self._data[:self.size][item] = value
+
+
+def _get_states(previous_state):
+
+    states = np.ravel(previous_state).astype(np.int8)
+    if states.size > 1 and (states == states[0]).all():
+        return states[:1]
+    return states
+
+
+class PlateUndoJournal(object):
+    """The undoable curve marks of one plate, most recent last.
+
+    Each mark keeps its positions as runs of consecutive positions and the
+    states of the positions before the mark (one state if it was the same
+    for all). Marks are only appended and removed from the end, only the
+    `max_length` most recent marks can be undone.
+
+    Args:
+        plate: The plate index
+        max_length: Number of marks that can be undone
+        recorder: Optional function called with the kind of change, the plate
+            and the change's phenotype code, position runs and states
+    """
+    def __init__(self, plate, max_length, recorder=None):
+
+        self._plate = plate
+        self._max_length = max_length
+        self._recorder = recorder
+        self._entries = _GrowingArray((5, ), np.int32)
+        """Phenotype, first run, number of runs, first state and number of states per mark"""
+        self._runs = _GrowingArray((3, ), np.int32)
+        self._states = _GrowingArray((), np.int8)
+        self._first = 0
+
+    def __len__(self):
+
+        return self._entries.size - self._first
+
+    def __nonzero__(self):
+
+        return len(self) > 0
+
+    def __iter__(self):
+
+        for index in xrange(self._first, self._entries.size):
+            yield self._get_entry(index)
+
+    def append(self, positions, phenotype, previous_state):
+        """Add a mark
+
+        Args:
+            positions: The positions marked
+            phenotype: The phenotype marked or `None` for all
+            previous_state: The filter value(s) of the positions before the mark
+        """
+        runs = get_position_runs(positions)
+        phenotype_code = _encode_phenotype(phenotype)
+        states = _get_states(previous_state)
+
+        self._append_runs(runs, phenotype_code, states)
+        self._record(_MARK, phenotype_code, runs, states)
+
+    def _record(self, kind, phenotype_code=_NO_PHENOTYPE, runs=None, states=None):
+
+        if self._recorder is not None:
+            self._recorder(kind, self._plate, phenotype_code, runs, states)
+
+    def _append_runs(self, runs, phenotype_code, states):
+
+        self._entries.extend(
+            [(phenotype_code, self._runs.size, len(runs), self._states.size, states.size)])
+        self._runs.extend(runs)
+        self._states.extend(states)
+
+        if len(self) > self._max_length:
+            self._first += 1
+
+        if self._first > self._max_length:
+            self._drop_forgotten()
+
+    def _drop_forgotten(self):
+
+        first_run = self._entries[self._first][1]
+        first_state = self._entries[self._first][3]
+
+        self._entries.drop_start(self._first)
+        self._runs.drop_start(first_run)
+        self._states.drop_start(first_state)
+        self._entries[:, 1] -= first_run
+        self._entries[:, 3] -= first_state
+        self._first = 0
+
+    def _get_entry(self, index):
+
+        phenotype_code, first_run, n_runs, first_state, n_states = self._entries[index]
+        positions = get_positions_from_runs(self._runs[first_run: first_run + n_runs])
+        states = self._states[first_state: first_state + n_states]
+
+        return positions, _decode_phenotype(phenotype_code), states[0] if n_states == 1 else states.copy()
+
+    def _get_runs(self, index):
+
+        _, first_run, n_runs, _, _ = self._entries[index]
+        return self._runs[first_run: first_run + n_runs]
+
+    def pop(self):
+        """Remove the most recent mark
+
+        Returns: Tuple of the positions, the phenotype (`None` for all) and the previous state(s)
+        """
+        entry = self._pop()
+        self._record(_UNDO)
+        return entry
+
+    def _pop(self):
+
+        if not len(self):
+            raise IndexError("pop from an empty undo journal")
+
+        index = self._entries.size - 1
+        entry = self._get_entry(index)
+
+        _, first_run, _, first_state, _ = self._entries[index]
+        self._entries.size = index
+        self._runs.size = first_run
+        self._states.size = first_state
+
+        return entry
+
+    def clear(self):
+
+        self._clear()
+        self._record(_CLEAR)
+
+    def _clear(self):
+
+        self._entries.size = 0
+        self._runs.size = 0
+        self._states.size = 0
+        self._first = 0
+
+
+class UndoJournal(object):
+    """Undo history of the curve marks of all plates of a project.
+
+    The history is persisted as an append-only binary file of records of
+    32-bit ints. Each change (mark, undo or clear) is a record, so saving only
+    appends what happened since the last save. Loading replays the records.
+    When the file has grown much larger than the history it describes it is
+    rewritten with one record per mark that can still be undone.
+
+    Args:
+        plates: Number of plates
+        max_length: Optional, number of marks per plate that can be undone
+    """
+    def __init__(self, plates, max_length=50):
+
+        self._max_length = max_length
+        self._plates = tuple(PlateUndoJournal(plate, max_length, recorder=self._record) for plate in range(plates))
+        self._pending = []
+        self._saved_path = None
+        self._saved_size = 0
+        self._saved_records = 0
+
+    @classmethod
+    def LoadFromFile(cls, path, plates, max_length=50):
+        """Load a saved journal
+
+        Args:
+            path: Path to the journal file
+            plates: Number of plates
+            max_length: Optional, number of marks per plate that can be undone
+
+        Returns: UndoJournal
+        """
+        journal = cls(plates, max_length=max_length)
+        data = np.fromfile(path, dtype=np.int32)
+        records = 0
+        pos = 0
+
+        while pos + _RECORD_HEADER_SIZE <= data.size:
+
+            kind, plate, phenotype_code, n_runs, n_states = data[pos: pos + _RECORD_HEADER_SIZE]
+            pos += _RECORD_HEADER_SIZE
+            runs = data[pos: pos + 3 * n_runs].reshape(n_runs, 3)
+            pos += 3 * n_runs
+            states = data[pos: pos + n_states]
+            pos += n_states
+            records += 1
+
+            if plate >= plates:
+                continue
+            elif kind == _MARK:
+                journal._plates[plate]._append_runs(runs, phenotype_code, states)
+            elif kind == _UNDO and journal._plates[plate]:
+                journal._plates[plate]._pop()
+            elif kind == _CLEAR:
+                journal._plates[plate]._clear()
+
+        journal._saved_path = os.path.abspath(path)
+        journal._saved_size = os.path.getsize(path)
+        journal._saved_records = records
+        return journal
+
+    @classmethod
+    def LoadFromDeques(cls, deques, max_length=50):
+        """Convert an undo history of deques of (positions, phenotype, previous state) per plate"""
+
+        journal = cls(len(deques), max_length=max_length)
+        for plate, history in enumerate(deques):
+            for positions, phenotype, previous_state in history:
+                journal[plate].append(positions, phenotype, previous_state)
+
+        return journal
+
+    def __len__(self):
+
+        return len(self._plates)
+
+    def __getitem__(self, plate):
+
+        return self._plates[plate]
+
+    def __iter__(self):
+
+        return iter(self._plates)
+
+    def _record(self, kind, plate, phenotype_code, runs, states):
+
+        runs = np.zeros((0, 3), dtype=np.int32) if runs is None else runs
+        states = np.zeros((0, ), dtype=np.int32) if states is None else np.ravel(states)
+        self._pending.append(np.r_[kind, plate, phenotype_code, len(runs), states.size, runs.ravel(), states].astype(
+            np.int32))
+
+    def _get_records(self):
+
+        for plate, plate_journal in enumerate(self._plates):
+            for index in xrange(plate_journal._first, plate_journal._entries.size):
+
+                phenotype_code, _, _, first_state, n_states = plate_journal._entries[index]
+                yield np.r_[
+                    _MARK, plate, phenotype_code, plate_journal._entries[index][2], n_states,
+                    plate_journal._get_runs(index).ravel(),
+                    plate_journal._states[first_state: first_state + n_states]].astype(np.int32)
+
+    @property
+    def _live_records(self):
+
+        return sum(len(plate_journal) for plate_journal in self._plates)
+
+    def _can_append_to(self, path):
+
+        return (
+            path == self._saved_path and os.path.isfile(path) and os.path.getsize(path) == self._saved_size and
+            self._saved_records + len(self._pending) <= 4 * (self._live_records + self._max_length))
+
+    def save(self, path):
+        """Persist the journal
+
+        If the journal was loaded from or last saved to the same file, only the
+        changes since then are appended.
+
+        Args:
+            path: Path to the journal file
+        """
+        path = os.path.abspath(path)
+
+        if self._can_append_to(path):
+            records = self._pending
+            self._saved_records += len(records)
+            mode = 'ab'
+        else:
+            records = list(self._get_records())
+            self._saved_records = len(records)
+            mode = 'wb'
+
+        with open(path, mode) as fh:
+            for record in records:
+                record.tofile(fh)
+
+        self._pending = []
+        self._saved_path = path
+        self._saved_size = os.path.getsize(path)
+
+    def write_to(self, fh):
+        """Write all undoable marks to a file object, without changing where the journal is saved"""
+
+        for record in self._get_records():
+            fh.write(record.tostring())
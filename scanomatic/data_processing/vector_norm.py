@@ -1,7 +1,6 @@
 from scipy.signal import gaussian
 import numpy as np
 from enum import Enum
-import itertools
 
 
 class PositionOffset(Enum):
@@ -41,73 +40,95 @@ def get_reference_position_filter(plate_shape, position_selector=get_reference_p
         tuple(plate_shape[i] / position_selector.shape[i] for i in range(len(plate_shape))))
 
 
+def get_reference_distances(curves, chunk_size=32):
+    """The pairwise distances between reference curves
+
+    The distance is the sum of absolute differences over all time points,
+    it is `nan` if either curve has any `nan`.
+
+    Args:
+        curves: 2D array of the reference curves
+        chunk_size: Optional number of curves compared to all others at a time
+
+    Returns: 2D symmetric array of distances
+    """
+    distances = np.zeros((curves.shape[0], curves.shape[0]))
+
+    for start in range(0, curves.shape[0], chunk_size):
+        distances[start: start + chunk_size] = np.abs(
+            curves[start: start + chunk_size, np.newaxis, :] - curves[np.newaxis, :, :]).sum(axis=-1)
+
+    np.fill_diagonal(distances, 0)
+    return distances
+
+
 def get_best_reference_for_experiments(
         plate,
         reference_position_filter=None,
         distance_matrix=get_distance_matrix(),
         scale_references=False):
-
-    def most_stable(curves, reference_weights, reference_filter):
-
-        positions = np.array(zip(*np.where(reference_filter)))
-        sums = np.zeros((positions.shape[0],))
-        for i, pos in enumerate(positions):
-
-            pos = tuple(pos)
-            for other in positions[(positions != pos).any(axis=1)]:
-                try:
-                    sums[i] += np.abs(curves[pos] - curves[tuple(other)]).sum() * reference_weights[pos]
-                except IndexError, e:
-                    print "---"
-                    print "For position", (x, y), "on plate shape", curves.shape
-                    print "Comparing", pos, "and", tuple(other)
-                    print "Curves have shape", curves.shape
-                    print "weights have shape", reference_weights.shape
-                    print "Filter has shape", reference_filter.shape
-                    print "---"
-                    raise e
-
-        sums = np.ma.masked_invalid(sums)
-        if sums.any():
-            if scale_references:
-                return curves[tuple(positions[sums.argmin()])] * scale_vector
-            else:
-                return curves[tuple(positions[sums.argmin()])]
-        return np.zeros((curves.shape[-1], )) * np.nan
-
+    """Select the most stable local reference curve for each experiment position
+
+    Each reference position within the distance matrix window of an
+    experiment is scored by its summed distance to the other references
+    in the window, weighted by the distance matrix value of the
+    reference position. The reference with the lowest score is used.
+
+    Args:
+        plate: 3D array of curves
+        reference_position_filter: Optional 2D boolean array of the reference positions
+        distance_matrix: Optional 2D odd sized square array of position weights
+        scale_references: Optional, if references should be scaled by the ratio
+            of the mean experiment to the mean reference curve
+
+    Returns: 3D array with the selected reference curve for each experiment,
+        reference positions and experiments without references are `nan`
+    """
     if reference_position_filter is None:
         reference_position_filter = get_reference_position_filter(plate.shape[:2])
 
     distance_matrix_size = distance_matrix.shape[0]
     offset = int(np.floor(distance_matrix_size / 2))
     reference_plate = np.zeros_like(plate) * np.nan
-    dim_x, dim_y = plate.shape[:2]
+
+    reference_rows, reference_columns = np.where(reference_position_filter)
+    experiment_rows, experiment_columns = np.where(reference_position_filter == np.False_)
+    reference_curves = plate[reference_rows, reference_columns]
+
+    if not reference_rows.size or not experiment_rows.size:
+        return reference_plate
 
     if scale_references:
-        ravel_references = np.ma.masked_invalid(
-            plate[reference_position_filter].reshape(reference_position_filter.sum(), plate.shape[-1]))
-        ravel_experiments = np.ma.masked_invalid(
-            plate[reference_position_filter == False].reshape(
-                reference_position_filter.size - reference_position_filter.sum(), plate.shape[-1]))
+        ravel_references = np.ma.masked_invalid(reference_curves)
+        ravel_experiments = np.ma.masked_invalid(plate[experiment_rows, experiment_columns])
         scale_vector = ravel_experiments.mean(axis=0) / ravel_references.mean(axis=0)
 
-    for x, y in itertools.product(range(dim_x), range(dim_y)):
+    distances = get_reference_distances(reference_curves)
+    valid_distances = np.isfinite(distances)
+
+    window_rows = reference_rows[np.newaxis, :] - experiment_rows[:, np.newaxis] + offset
+    window_columns = reference_columns[np.newaxis, :] - experiment_columns[:, np.newaxis] + offset
+    in_window = ((window_rows >= 0) & (window_rows < distance_matrix_size) &
+                 (window_columns >= 0) & (window_columns < distance_matrix_size))
 
-        if reference_position_filter[x, y]:
-            continue
+    weights = np.where(
+        in_window,
+        distance_matrix[np.clip(window_rows, 0, distance_matrix_size - 1),
+                        np.clip(window_columns, 0, distance_matrix_size - 1)],
+        0)
 
-        lower_x = max(x - offset, 0)
-        upper_x = min(x + offset + 1, dim_x)
-        lower_y = max(y - offset, 0)
-        upper_y = min(y + offset + 1, dim_y)
+    in_window_float = in_window.astype(np.float)
+    sums = weights * in_window_float.dot(np.where(valid_distances, distances, 0).T)
+    valid = in_window & (in_window_float.dot((valid_distances == np.False_).T) == 0) & np.isfinite(sums)
 
-        local_reference_filter = reference_position_filter[lower_x: upper_x, lower_y: upper_y]
-        local_reference_curves = plate[lower_x: upper_x, lower_y: upper_y]
-        local_weights = distance_matrix[
-                        0 if x > offset else offset - x: min(distance_matrix_size, dim_x - (x - offset)),
-                        0 if y > offset else offset - y: min(distance_matrix_size, dim_y - (y - offset))]
+    has_reference = (valid & (sums != 0)).any(axis=1)
+    best = np.where(valid, sums, np.inf).argmin(axis=1)
+
+    selected = reference_curves[best[has_reference]]
+    if scale_references:
+        selected = selected * scale_vector
 
-        reference_plate[x, y] = most_stable(local_reference_curves, local_weights, local_reference_filter)
+    reference_plate[experiment_rows[has_reference], experiment_columns[has_reference]] = selected
 
     return reference_plate
 
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+def get_least_recently_used(entries, budget, keep=None):
+    """The entries to drop to get within a budget
+
+    The least recently used entries are dropped first.
+
+    Args:
+        entries: List of (key, size) from least to most recently used
+        budget: The total size allowed
+        keep: Optional, key that is never dropped, default is the most
+            recently used
+
+    Returns: list of the keys to drop
+    """
+    if keep is None and entries:
+        keep = entries[-1][0]
+
+    total = sum(size for _, size in entries)
+    dropped = []
+
+    for key, size in entries:
+
+        if total <= budget:
+            break
+        elif key == keep:
+            continue
+
+        dropped.append(key)
+        total -= size
+
+    return dropped
+
+
+class LeastRecentlyUsedCache(object):
+    """Thread safe cache of values within a memory budget.
+
+    When the values use more than the budget the least recently used are
+    dropped, but the most recently used value is always kept.
+
+    Args:
+        memory_budget: Number of bytes the values may use
+        get_size: Optional, function giving the bytes used by a value,
+            default is `len`
+        on_drop: Optional, function called with the key of each dropped value
+    """
+    def __init__(self, memory_budget, get_size=len, on_drop=None):
+
+        self._memory_budget = memory_budget
+        self._get_size = get_size
+        self._on_drop = on_drop
+        self._entries = OrderedDict()
+        """Key to value and size"""
+        self._memory_size = 0
+        self._lock = Lock()
+
+    @property
+    def memory_budget(self):
+
+        return self._memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, value):
+
+        with self._lock:
+            self._memory_budget = value
+            self._evict()
+
+    @property
+    def memory_size(self):
+        """The bytes used by the cached values"""
+
+        return self._memory_size
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    def __contains__(self, key):
+
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """The cached value, which is marked as the most recently used"""
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._entries[key] = entry
+            return entry[0]
+
+    def set(self, key, value):
+
+        size = self._get_size(value)
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, size)
+            self._memory_size += size
+            self._evict()
+
+    def pop(self, key, default=None):
+
+        with self._lock:
+            entry = self._remove(key)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self._memory_size = 0
+
+    def _remove(self, key):
+
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._memory_size -= entry[1]
+        return entry
+
+    def _evict(self):
+
+        for key in get_least_recently_used(
+                [(key, size) for key, (_, size) in self._entries.iteritems()], self._memory_budget):
+
+            self._remove(key)
+            if self._on_drop is not None:
+                self._on_drop(key)
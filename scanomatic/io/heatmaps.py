@@ -0,0 +1,117 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from scanomatic.generics.lru_cache import LeastRecentlyUsedCache
+
+_COLORMAP_ANCHORS = {
+    'RdBu_r': ("053061", "2166ac", "4393c3", "92c5de", "d1e5f0", "f7f7f7", "fddbc7", "f4a582", "d6604d", "b2182b",
+               "67001f"),
+    'viridis': ("440154", "472d7b", "3b528b", "2c728e", "21918c", "28ae80", "5ec962", "addc30", "fde725"),
+    'Greys': ("ffffff", "000000"),
+}
+
+COLORMAPS = tuple(sorted(_COLORMAP_ANCHORS))
+DEFAULT_COLORMAP = 'RdBu_r'
+MASKED_COLOR = (128, 128, 128)
+
+_lookup_tables = {}
+
+
+def get_lookup_table(colormap, size=256):
+    """Colors of a colormap
+
+    The colors are linearly interpolated between the anchor colors of
+    the colormap.
+
+    Args:
+        colormap: One of `COLORMAPS`
+        size: Number of colors
+
+    Returns: (size, 3) uint8 array of RGB colors
+
+    Raises:
+        KeyError: If the colormap is not known
+    """
+    key = (colormap, size)
+    if key not in _lookup_tables:
+
+        anchors = np.array(
+            [[int(color[i: i + 2], 16) for i in (0, 2, 4)] for color in _COLORMAP_ANCHORS[colormap]], dtype=np.float)
+        positions = np.linspace(0, 1, len(anchors))
+        values = np.linspace(0, 1, size)
+        _lookup_tables[key] = np.round(
+            np.column_stack([np.interp(values, positions, anchors[:, i]) for i in range(3)])).astype(np.uint8)
+
+    return _lookup_tables[key]
+
+
+def render_heatmap(data, vmin=None, vmax=None, colormap=DEFAULT_COLORMAP, scale=1, masked_color=MASKED_COLOR):
+    """Color a plate of values
+
+    Masked and non-finite values are given the `masked_color`.
+
+    Args:
+        data: 2D array or masked array of values
+        vmin: Optional, value of the first color, default is the smallest value
+        vmax: Optional, value of the last color, default is the largest value
+        colormap: Optional, one of `COLORMAPS`
+        scale: Optional, number of pixels per position along each axis
+        masked_color: Optional, RGB color of values without a color
+
+    Returns: (rows * scale, columns * scale, 3) uint8 array
+    """
+    lookup_table = get_lookup_table(colormap)
+    values = np.ma.getdata(data).astype(np.float)
+    valid = np.isfinite(values) & ~np.ma.getmaskarray(data)
+
+    if valid.any():
+        if vmin is None:
+            vmin = values[valid].min()
+        if vmax is None:
+            vmax = values[valid].max()
+
+    if vmin is None or vmax is None or vmax <= vmin:
+        indices = np.full(values.shape, len(lookup_table) // 2, dtype=np.intp)
+    else:
+        scaled = np.where(valid, values, vmin)
+        indices = np.clip(
+            np.round((scaled - vmin) * ((len(lookup_table) - 1) / (vmax - vmin))), 0, len(lookup_table) - 1
+        ).astype(np.intp)
+
+    image = lookup_table[indices]
+    image[~valid] = masked_color
+
+    if scale > 1:
+        image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+
+    return image
+
+
+def encode_png(image):
+    """Encode an RGB image as PNG
+
+    Args:
+        image: (rows, columns, 3) uint8 array
+
+    Returns: str of the PNG file
+    """
+    fh = BytesIO()
+    Image.fromarray(image, 'RGB').save(fh, 'PNG', compress_level=1)
+    return fh.getvalue()
+
+
+class HeatmapCache(LeastRecentlyUsedCache):
+    """Least recently used cache of encoded heatmaps.
+
+    The heatmaps are stored under any hashable key, which should
+    include everything that affects the image, e.g. the signature of the
+    project state it is made from.
+
+    Args:
+        memory_budget: Optional, number of bytes the cached images may use
+    """
+    def __init__(self, memory_budget=64 * 1024 ** 2):
+
+        super(HeatmapCache, self).__init__(memory_budget)
@@ -47,6 +47,28 @@ class ImageData(object):
             ImageData._LOGGER.warning("Image {0} had no data".format(image_index))
             return
 
+        plates = ImageData.get_plates_from_features(features, output_item, output_value)
+        if plates is False:
+            return False
+
+        ImageData._LOGGER.info("Saved Image Data '{0}' with {1} plates".format(
+            path, len(plates)))
+
+        np.save(path, plates)
+        return True
+
+    @staticmethod
+    def get_plates_from_features(features, output_item, output_value):
+        """Get the colony values of an image analysis per plate
+
+        Args:
+            features: The features of the image analysis
+            output_item: The compartment to use
+            output_value: The measure to use
+
+        Returns: list of 2D arrays (`None` for plates not analysed) or `False` if
+            the colony positions don't match the plates' shapes.
+        """
         number_of_plates = features.shape[0]
         plates = [None] * number_of_plates
         ImageData._LOGGER.info("Writing features for {0} plates ({1})".format(number_of_plates, features.shape))
@@ -87,11 +109,7 @@ class ImageData(object):
                         plate_features.index
                     ))
 
-        ImageData._LOGGER.info("Saved Image Data '{0}' with {1} plates".format(
-            path, len(plates)))
-
-        np.save(path, plates)
-        return True
+        return plates
 
     @staticmethod
     def iter_write_image_from_xml(path, xml_object, output_item, output_value):
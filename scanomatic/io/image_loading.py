@@ -7,8 +7,11 @@ from scanomatic.models.factories.compile_project_factory import CompileImageAnal
 from scanomatic.io import logger
 from scanomatic.io.pickler import unpickle_with_unpickler
 from scanomatic.image_analysis.image_basics import load_image_to_numpy
+from scanomatic.io.image_tiles import get_plate_image
 
 _logger = logger.Logger("Image loader")
+_compilation_results_cache = [None]
+"""The latest loaded compilation as a (signature, results) tuple"""
 
 
 def _get_project_compilation(analysis_directory, file_name=None):
@@ -42,29 +45,12 @@ def _get_project_compilation(analysis_directory, file_name=None):
     return project_compilation
 
 
-def _bound(bounds, a, b):
-
-    def bounds_check(bound, val):
-
-        if 0 <= val < bound:
-            return val
-        elif val < 0:
-            return 0
-        else:
-            return bound - 1
-
-    return ((bounds_check(bounds[0], a[0]),
-             bounds_check(bounds[0], a[1])),
-            (bounds_check(bounds[1], b[0]),
-             bounds_check(bounds[1], b[1])))
-
-
 def slice_im(plate_im, colony_position, colony_size):
 
-    lbound = colony_position - np.floor(colony_size / 2)
-    ubound = colony_position + np.ceil(colony_size / 2)
+    lbound = (colony_position - np.floor(colony_size / 2)).astype(int)
+    ubound = (colony_position + np.ceil(colony_size / 2)).astype(int)
     if (ubound - lbound != colony_size).any():
-        ubound += colony_size - (ubound - lbound)
+        ubound += (colony_size - (ubound - lbound)).astype(int)
 
     return plate_im[lbound[0]: ubound[0], lbound[1]: ubound[1]]
 
@@ -78,39 +64,79 @@ def _load_grid_info(analysis_directory, plate):
     return grid, grid_size
 
 
-def load_colony_image(position, compilation_result=None, analysis_directory=None, time_index=None,
-                      compilation_file_name=None, experiment_directory=None, grid=None, grid_size=None):
+def load_compilation_results(compilation_file):
+    """Load the compiled images of a project
+
+    The latest loaded compilation is kept in memory until the file changes.
+
+    Args:
+        compilation_file: Path to the project compilation
+
+    Returns: list of compiled image models
+    """
+    signature = (os.path.abspath(compilation_file), os.path.getmtime(compilation_file))
+    cached = _compilation_results_cache[0]
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    results = CompileImageAnalysisFactory.serializer.load(compilation_file)
+    _compilation_results_cache[0] = (signature, results)
+    return results
+
 
+def _get_image_path(compilation_result, experiment_directory):
+
+    if os.path.isfile(compilation_result.image.path) or not experiment_directory:
+        return compilation_result.image.path
+    return os.path.join(experiment_directory, os.path.basename(compilation_result.image.path))
+
+
+def load_plate_image(plate, compilation_result=None, analysis_directory=None, time_index=None,
+                     compilation_file_name=None, experiment_directory=None, tile_cache=None, zoom=0):
+    """Load a plate of a compiled image as oriented when gridded
+
+    Args:
+        plate: Index of the plate
+        compilation_result: Optional, the compiled image model, else it is
+            loaded using `analysis_directory` and `time_index`
+        tile_cache: Optional, `scanomatic.io.image_tiles.ImageTileCache` to
+            read pre-cut plate tiles from instead of the full image
+        zoom: Optional, zoom level, only used with a tile cache
+
+    Returns: numpy.ndarray
+    """
     if not compilation_result:
         compilation_file = _get_project_compilation(analysis_directory, file_name=compilation_file_name)
-        compilation_result = CompileImageAnalysisFactory.serializer.load(compilation_file)[time_index]
+        compilation_result = load_compilation_results(compilation_file)[time_index]
         if not experiment_directory:
             experiment_directory = os.path.dirname(compilation_file)
 
-    try:
-        im = load_image_to_numpy(compilation_result.image.path, dtype=np.uint8)
-    except IOError:
-        im = load_image_to_numpy(os.path.join(experiment_directory, os.path.basename(compilation_result.image.path)),
-                                 dtype=np.uint8)
+    image_path = _get_image_path(compilation_result, experiment_directory)
+
+    if tile_cache is not None:
+        return tile_cache.get_plate_tile(image_path, compilation_result.fixture.plates, plate, zoom=zoom)
+
+    im = load_image_to_numpy(image_path, dtype=np.uint8)
+    return get_plate_image(im, compilation_result.fixture.plates[plate])
 
-    if grid is None or grid_size is None:
-        grid, grid_size = _load_grid_info(analysis_directory, position[0])
 
-    plate_model = compilation_result.fixture.plates[position[0]]
-    x = sorted((plate_model.x1, plate_model.x2))
-    y = sorted((plate_model.y1, plate_model.y2))
+def load_colony_image(position, compilation_result=None, analysis_directory=None, time_index=None,
+                      compilation_file_name=None, experiment_directory=None, grid=None, grid_size=None,
+                      tile_cache=None):
 
-    y, x = _bound(im.shape, y, x)
+    im = load_plate_image(
+        position[0], compilation_result=compilation_result, analysis_directory=analysis_directory,
+        time_index=time_index, compilation_file_name=compilation_file_name,
+        experiment_directory=experiment_directory, tile_cache=tile_cache)
 
-    # As gridding is done on plates as seen in the scanner while plate positioning is done on plates
-    # as seen by the scanner the inverse direction of the short dimension is needed and needed after
-    # slicing out the plate
-    im = im[y[0]: y[1], x[0]: x[1]][:, ::-1]
+    if grid is None or grid_size is None:
+        grid, grid_size = _load_grid_info(analysis_directory, position[0])
 
-    return slice_im(im, grid[:, grid.shape[1] - position[2] - 1, position[1]], grid_size)
+    return np.array(slice_im(im, grid[:, grid.shape[1] - position[2] - 1, position[1]], grid_size))
 
 
-def load_colony_images_for_animation(analysis_directory, position, project_compilation=None, positioning="one-time"):
+def load_colony_images_for_animation(analysis_directory, position, project_compilation=None, positioning="one-time",
+                                     tile_cache=None):
     """
 
     :param analysis_directory: path to analysis directory
@@ -123,6 +149,8 @@ def load_colony_images_for_animation(analysis_directory, position, project_compi
     :param positioning: Type of positioning to simulate. Default is "one-time", which uses the gridding image
     positioning all through.Use "detected" for the position actually detected.
     :type positioning: str
+    :param tile_cache: Optional cache of plate tiles to read from instead of the full images
+    :type tile_cache: scanomatic.io.image_tiles.ImageTileCache
     :return: First array is a 1D time-vector, second array is a 3D image sequence vector where the last dimension
     is time, the third array is the 2D plate slice of the last image.
     :rtype : numpy.ndarray, numpy.ndarray, numpy.ndarray
@@ -158,6 +186,6 @@ def load_colony_images_for_animation(analysis_directory, position, project_compi
             raise ValueError("Positioning can't be '{0}'".format(positioning))
 
         images[..., i] = load_colony_image(position, grid=grid, grid_size=grid_size, compilation_result=entry,
-                                           experiment_directory=experiment_directory)
+                                           experiment_directory=experiment_directory, tile_cache=tile_cache)
 
     return times, images, im
@@ -0,0 +1,193 @@
+import os
+import shutil
+from hashlib import sha1
+from tempfile import mkstemp
+from threading import Lock
+
+import numpy as np
+
+from scanomatic.io.paths import Paths
+from scanomatic.io.logger import Logger
+from scanomatic.generics.lru_cache import get_least_recently_used
+from scanomatic.image_analysis.image_basics import load_image_to_numpy
+
+_logger = Logger("Image Tiles")
+
+
+def _get_key(*values):
+
+    return sha1(repr(values)).hexdigest()[:16]
+
+
+def _bound(bound, a, b):
+
+    return min(max(int(a), 0), bound - 1), min(max(int(b), 0), bound - 1)
+
+
+def get_plate_slice(plate_model, image_shape):
+    """The part of an image covered by a plate
+
+    Args:
+        plate_model: The fixture plate model with `x1`, `x2`, `y1` and `y2`
+        image_shape: The shape of the scanned image
+
+    Returns: tuple of row and column slices
+    """
+    y = _bound(image_shape[0], *sorted((plate_model.y1, plate_model.y2)))
+    x = _bound(image_shape[1], *sorted((plate_model.x1, plate_model.x2)))
+    return slice(*y), slice(*x)
+
+
+def get_plate_image(im, plate_model):
+    """Cut out a plate as it is oriented when gridded
+
+    As gridding is done on plates as seen in the scanner while plate positioning
+    is done on plates as seen by the scanner the inverse direction of the
+    short dimension is needed after slicing out the plate.
+    """
+    return im[get_plate_slice(plate_model, im.shape)][:, ::-1]
+
+
+def downscale(im, factor):
+    """Downscale an image by averaging blocks of `factor` x `factor` pixels
+
+    Any remaining pixels beyond whole blocks at the lower and right edges are
+    dropped.
+    """
+    if factor == 1:
+        return im
+    rows, columns = im.shape[0] // factor, im.shape[1] // factor
+    blocks = im[: rows * factor, : columns * factor].reshape(rows, factor, columns, factor)
+    return np.round(blocks.mean(axis=(1, 3))).astype(im.dtype)
+
+
+class ImageTileCache(object):
+    """On disk pyramid of plate tiles of scanned images.
+
+    The first time a plate of an image is requested, the image is read once
+    and all its plates are cut out and saved at each zoom level. Zoom level
+    `z` is downscaled by a factor of `2 ** z`. Tiles are keyed by the path and
+    modification time of the image so that a replaced image gets new tiles.
+
+    When the tiles on disk exceed the size limit, the tiles of the least
+    recently used images are removed, but the tiles of the image just
+    requested are always kept.
+
+    Args:
+        directory: Optional, where to keep tiles, default is `Paths().image_tiles`
+        size_limit: Optional, number of bytes the tiles may use on disk
+        zoom_levels: Optional, number of zoom levels
+    """
+    def __init__(self, directory=None, size_limit=2 * 1024 ** 3, zoom_levels=4):
+
+        self._directory = directory
+        self.size_limit = size_limit
+        self.zoom_levels = zoom_levels
+        self._lock = Lock()
+
+    @property
+    def directory(self):
+
+        if self._directory is None:
+            return Paths().image_tiles
+        return self._directory
+
+    @property
+    def size(self):
+        """Number of bytes used by the tiles on disk"""
+
+        return sum(size for _, _, size in self._get_image_directories())
+
+    def get_plate_tile(self, image_path, plate_models, plate, zoom=0):
+        """Get a plate of an image
+
+        Args:
+            image_path: Path to the scanned image
+            plate_models: The fixture plate models of the image
+            plate: Index of the plate
+            zoom: Optional, the zoom level
+
+        Returns: numpy.ndarray, memory mapped and read only
+        """
+        if not 0 <= zoom < self.zoom_levels:
+            raise ValueError("Zoom level {0} not in range 0 - {1}".format(zoom, self.zoom_levels - 1))
+
+        image_directory = self._get_image_directory(image_path)
+        tile_path = os.path.join(image_directory, self._get_tile_name(plate_models[plate], plate, zoom))
+
+        if not os.path.isfile(tile_path):
+            with self._lock:
+                if not os.path.isfile(tile_path):
+                    self._save_tiles(image_path, image_directory, plate_models)
+                    self._evict(image_directory)
+        else:
+            os.utime(image_directory, None)
+
+        return np.load(tile_path, mmap_mode='r')
+
+    def clear(self):
+        """Remove all tiles"""
+
+        with self._lock:
+            for path, _, _ in self._get_image_directories():
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _get_image_directory(self, image_path):
+
+        image_path = os.path.abspath(image_path)
+        return os.path.join(self.directory, _get_key(image_path, os.path.getmtime(image_path)))
+
+    @staticmethod
+    def _get_tile_name(plate_model, plate, zoom):
+
+        return "plate_{0}_{1}.zoom_{2}.npy".format(
+            plate, _get_key(plate_model.x1, plate_model.x2, plate_model.y1, plate_model.y2), zoom)
+
+    def _save_tiles(self, image_path, image_directory, plate_models):
+
+        if not os.path.isdir(image_directory):
+            os.makedirs(image_directory)
+
+        im = load_image_to_numpy(image_path, dtype=np.uint8)
+
+        for plate, plate_model in enumerate(plate_models):
+
+            plate_im = get_plate_image(im, plate_model)
+            for zoom in range(self.zoom_levels):
+
+                tile_path = os.path.join(image_directory, self._get_tile_name(plate_model, plate, zoom))
+                if os.path.isfile(tile_path):
+                    continue
+
+                fd, temp_path = mkstemp(dir=image_directory, suffix=".tmp")
+                with os.fdopen(fd, 'wb') as fh:
+                    np.save(fh, downscale(plate_im, 2 ** zoom))
+                os.rename(temp_path, tile_path)
+
+        _logger.info("Saved plate tiles of {0}".format(image_path))
+
+    def _get_image_directories(self):
+
+        if not os.path.isdir(self.directory):
+            return []
+
+        directories = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                size = sum(os.path.getsize(os.path.join(path, tile)) for tile in os.listdir(path))
+                directories.append((path, os.path.getmtime(path), size))
+            except OSError:
+                # Not a directory or removed by another process
+                continue
+        return directories
+
+    def _evict(self, keep):
+
+        directories = sorted(self._get_image_directories(), key=lambda entry: entry[1])
+
+        for path in get_least_recently_used(
+                [(path, size) for path, _, size in directories], self.size_limit, keep=keep):
+
+            shutil.rmtree(path, ignore_errors=True)
+            _logger.info("Removed plate tiles in {0}".format(path))
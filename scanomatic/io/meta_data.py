@@ -236,7 +236,11 @@ class MetaData2(object):
         self._loading_offset = []
         self._paths = paths
 
+        self._columns = None
+        self._indices = None
+
         self._load(*paths)
+        self._build_indices()
 
         if not self.loaded:
             self._logger.warning("Not enough meta-data to fill all plates")
@@ -267,24 +271,68 @@ class MetaData2(object):
     def __setstate__(self, state):
 
         self.__dict__.update(state)
+        self._logger = logger.Logger("MetaData")
 
-    def get_column_index_from_all_plates(self, index):
+        if self.__dict__.get("_indices") is None:
+            self._build_indices()
+
+    def _build_indices(self):
+        """Build the columnar arrays and the inverted indices of the meta-data.
 
-        plates = []
-        for id_plate, (outers, inners) in enumerate(self._plate_shapes):
+        For each plate, every column gets an object array of the plate's
+        shape and a dict from value to the coordinates (in row-major order)
+        where the column has that value. Columns with unhashable values
+        get no index and are searched by scanning their column array.
+        """
+        self._columns = []
+        self._indices = []
 
-            plate = []
-            plates.append(plate)
+        for data in self._data:
 
-            for id_outer in range(outers):
+            if data is None:
+                self._columns.append(None)
+                self._indices.append(None)
+                continue
 
-                data = []
-                plate.append(data)
+            n_columns = max([len(row) for row in data.ravel() if row is not None] or [0])
+            columns = [np.empty(data.shape, dtype=np.object) for _ in range(n_columns)]
+            indices = [{} for _ in range(n_columns)]
 
-                for id_inner in range(inners):
+            for coord, row in np.ndenumerate(data):
 
-                    data.append(self(id_plate, id_outer, id_inner)[index])
-        return plates
+                if row is None:
+                    continue
+
+                coord = tuple(int(c) for c in coord)
+                for id_column, value in enumerate(row):
+
+                    columns[id_column][coord] = value
+                    index = indices[id_column]
+                    if index is None:
+                        continue
+
+                    try:
+                        index.setdefault(value, []).append(coord)
+                    except TypeError:
+                        indices[id_column] = None
+
+            self._columns.append(columns)
+            self._indices.append(indices)
+
+    def get_plate_columns(self, plate):
+        """The meta-data of a plate as one array per column
+
+        Args:
+            plate: Plate index
+
+        Returns: list of object arrays with the shape of the plate
+        """
+        columns = self._columns[plate]
+        return [] if columns is None else columns
+
+    def get_column_index_from_all_plates(self, index):
+
+        return [None if columns is None else columns[index].tolist() for columns in self._columns]
 
     def get_header_row(self, plate):
         """
@@ -505,15 +553,33 @@ class MetaData2(object):
 
             if column < 0:
                 yield tuple()
+                return
+
+        columns = self._columns[plate]
+        if columns is None:
+            return
+
+        if column is None:
+            coords = set()
+            for id_column in range(len(columns)):
+                coords.update(self._find_in_column(plate, value, id_column))
+            coords = sorted(coords)
+        else:
+            coords = self._find_in_column(plate, value, column)
+
+        for coord in coords:
+            yield coord
+
+    def _find_in_column(self, plate, value, column):
+
+        index = self._indices[plate][column]
+        if index is not None:
+            try:
+                return index.get(value, [])
+            except TypeError:
+                pass
 
-        for id_plate, id_row, id_col in self.generate_coordinates(plate=plate):
-            data = self(id_plate, id_row, id_col)
-            if column is None:
-                if value in data:
-                    yield (id_row, id_col)
-            else:
-                if value == data[column]:
-                    yield (id_row, id_col)
+        return [tuple(int(c) for c in coord) for coord in zip(*np.where(self._columns[plate][column] == value))]
 
     def get_header_index(self, plate, header):
 
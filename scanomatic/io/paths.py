@@ -34,6 +34,9 @@ class Paths(SingeltonOneInit):
         self.fixtures = os.path.join(self.config, "fixtures")
         Paths._make_directory(self.fixtures)
         self.images = os.path.join(self.root, "images")
+        self.image_tiles = os.path.join(self.root, "image_tiles")
+        self.qc_films = os.path.join(self.root, "qc_films")
+        self.project_index = os.path.join(self.root, "project_index.json")
 
         self.source_location_file = os.path.join(self.root, "source_location.txt")
 
@@ -100,6 +103,7 @@ class Paths(SingeltonOneInit):
         self.log = os.path.join(self.root, "logs")
         Paths._make_directory(self.log)
         self.log_ui_server = os.path.join(self.log, "ui_server.log")
+        self.log_ui_server_requests = os.path.join(self.log, "ui_server.requests.log")
         self.log_server = os.path.join(self.log, "server.log")
         self.log_scanner_out = os.path.join(self.log, "scanner_{0}.stdout")
         self.log_scanner_err = os.path.join(self.log, "scanner_{0}.stderr")
@@ -145,18 +149,24 @@ class Paths(SingeltonOneInit):
 
         self.ui_server_phenotype_state_lock = "phenotypes_state.lock"
         self.phenotypes_csv_pattern = "phenotypes.{0}.plate_{1}.csv"
+        self.phenotypes_columnar_pattern = "phenotypes.{0}.npy"
         self.phenotypes_raw_npy = "phenotypes_raw.npy"
         self.vector_phenotypes_raw = "phenotypes_vectors_raw.npy"
+        self.vector_phenotypes_columnar = "phenotypes_vectors.columnar.npz"
         self.vector_meta_phenotypes_raw = "phenotypes_meta_vector_raw.npy"
         self.normalized_phenotypes = "normalized_phenotypes.npy"
         self.phenotypes_filter = "phenotypes_filter.npy"
         self.phenotypes_reference_offsets = "phenotypes_reference_offsets.npy"
         self.phenotypes_filter_undo = "phenotypes_filter.undo.pickle"
+        self.phenotypes_filter_undo_journal = "phenotypes_filter.undo.journal"
         self.phenotypes_meta_data = "meta_data.pickle"
         self.phenotypes_meta_data_original_file_patern = "meta_data_{0}.{1}"
         self.phenotypes_input_data = "curves_raw.npy"
         self.phenotypes_input_smooth = "curves_smooth.npy"
         self.phenotypes_extraction_params = "phenotype_params.npy"
+        self.phenotypes_extraction_signatures = "phenotype_signatures.pickle"
+        self.phenotypes_chapman_richards = "phenotypes_chapman_richards.npy"
+        self.phenotypes_live_snapshot = "phenotypes.live.json"
         self.phenotype_times = "phenotype_times.npy"
 
         self.phenotypes_extraction_log = "phenotypes.extraction.log"
@@ -0,0 +1,34 @@
+import numpy as np
+
+from scanomatic.io.heatmaps import HeatmapCache, MASKED_COLOR, get_lookup_table, render_heatmap
+
+
+def test_lookup_table_spans_anchor_colors():
+
+    lookup_table = get_lookup_table('Greys', size=3)
+    assert lookup_table.tolist() == [[255, 255, 255], [128, 128, 128], [0, 0, 0]]
+
+
+def test_render_heatmap_colors_and_masks():
+
+    data = np.ma.masked_array([[0., 1.], [np.nan, 0.5]], mask=[[False, False], [False, True]])
+    image = render_heatmap(data, colormap='Greys', scale=2)
+
+    assert image.shape == (4, 4, 3)
+    assert image[0, 0].tolist() == [255, 255, 255]
+    assert image[0, 2].tolist() == [0, 0, 0]
+    assert image[2, 0].tolist() == list(MASKED_COLOR)
+    assert image[3, 3].tolist() == list(MASKED_COLOR)
+
+
+def test_cache_drops_least_recently_used():
+
+    cache = HeatmapCache(memory_budget=10)
+    cache.set('a', b"12345")
+    cache.set('b', b"12345")
+    assert cache.get('a') is not None
+    cache.set('c', b"12345")
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b"12345"
+    assert cache.memory_size == 10
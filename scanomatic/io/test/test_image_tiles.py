@@ -0,0 +1,63 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+from scipy.misc import toimage
+
+from scanomatic.io.image_tiles import ImageTileCache, downscale
+
+PlateModel = namedtuple("PlateModel", ("x1", "x2", "y1", "y2"))
+
+PLATES = (PlateModel(2, 10, 4, 20), PlateModel(12, 20, 24, 8))
+
+
+def save_image(path, offset=0):
+
+    im = (np.arange(32 * 24).reshape(32, 24) + offset) % 256
+    toimage(im.astype(np.uint8), cmin=0, cmax=255).save(path)
+    return im
+
+
+def test_downscale():
+
+    im = np.arange(20, dtype=np.uint8).reshape(4, 5)
+    assert downscale(im, 2).tolist() == [[3, 5], [13, 15]]
+
+
+def test_tiles_are_cut_once_per_image(tmpdir):
+
+    image_path = str(tmpdir.join("scan.tiff"))
+    im = save_image(image_path)
+    cache = ImageTileCache(directory=str(tmpdir.join("tiles")), zoom_levels=2)
+
+    tile = cache.get_plate_tile(image_path, PLATES, 1)
+    assert tile.tolist() == im[8: 24, 12: 20][:, ::-1].tolist()
+    assert cache.get_plate_tile(image_path, PLATES, 0, zoom=1).shape == (8, 4)
+
+    size = cache.size
+    assert size > 0
+    cache.get_plate_tile(image_path, PLATES, 0)
+    assert cache.size == size
+
+    im = save_image(image_path, offset=1)
+    os.utime(image_path, (0, 0))
+    assert cache.get_plate_tile(image_path, PLATES, 1).tolist() == im[8: 24, 12: 20][:, ::-1].tolist()
+
+
+def test_least_recently_used_tiles_removed(tmpdir):
+
+    paths = [str(tmpdir.join("scan{0}.tiff".format(i))) for i in range(3)]
+    cache = ImageTileCache(directory=str(tmpdir.join("tiles")), zoom_levels=1)
+
+    for path in paths:
+        save_image(path)
+
+    cache.get_plate_tile(paths[0], PLATES, 0)
+    cache.size_limit = cache.size * 2.5
+    cache.get_plate_tile(paths[1], PLATES, 0)
+    os.utime(cache._get_image_directory(paths[0]), (1, 1))
+    os.utime(cache._get_image_directory(paths[1]), (0, 0))
+    cache.get_plate_tile(paths[2], PLATES, 0)
+
+    assert sorted(os.listdir(cache.directory)) == sorted(
+        os.path.basename(cache._get_image_directory(path)) for path in (paths[0], paths[2]))
@@ -1,4 +1,5 @@
 import os
+import pickle
 
 import pytest
 
@@ -44,3 +45,21 @@ class TestMetaDataXLSX:
 
         md = MetaData([[8, 12]], self.DATA_PATH)
         assert md[0][2][0] == [3, 1, 0.269]
+
+    def test_find_matches_scanning(self):
+
+        md = MetaData([[8, 12]], self.DATA_PATH)
+        expected = [(row, col) for row in range(8) for col in range(12) if md(0, row, col)[0] == 3]
+
+        assert expected
+        assert list(md.find_on_plate(0, 3, column=0)) == expected
+        assert set(expected).issubset(md.find_on_plate(0, 3))
+        assert list(md.find_on_plate(0, 'unknown value')) == []
+
+    def test_indices_are_pickled(self):
+
+        md = MetaData([[8, 12]], self.DATA_PATH)
+        loaded = pickle.loads(pickle.dumps(md))
+
+        assert loaded._indices == md._indices
+        assert list(loaded.find_on_plate(0, 0.269, column=2)) == list(md.find_on_plate(0, 0.269, column=2))
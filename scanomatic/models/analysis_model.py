@@ -59,7 +59,7 @@ class AnalysisModel(model.Model):
                  one_time_positioning=True, one_time_grayscale=False,
                  grid_images=None, grid_model=None, xml_model=None,
                  image_data_output_item=COMPARTMENTS.Blob, image_data_output_measure=MEASURES.Sum, chain=True,
-                 plate_image_inclusion=None):
+                 plate_image_inclusion=None, live_phenotypes=False):
 
         if grid_model is None:
             grid_model = GridModel()
@@ -86,6 +86,7 @@ class AnalysisModel(model.Model):
         self.image_data_output_measure = image_data_output_measure
         self.chain = chain
         self.plate_image_inclusion = plate_image_inclusion
+        self.live_phenotypes = live_phenotypes
         super(AnalysisModel, self).__init__()
 
 
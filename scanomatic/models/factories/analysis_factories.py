@@ -152,6 +152,7 @@ class AnalysisModelFactory(AbstractModelFactory):
         'image_data_output_item': analysis_model.COMPARTMENTS,
         'chain': bool,
         'plate_image_inclusion': (tuple, str),
+        'live_phenotypes': bool,
     }
 
     @classmethod
@@ -286,6 +287,16 @@ class AnalysisModelFactory(AbstractModelFactory):
             return True
         return model.FIELD_TYPES.animate_focal
 
+    @classmethod
+    def _validate_live_phenotypes(cls, model):
+        """
+
+        :type model: scanomatic.models.analysis_model.AnalysisModel
+        """
+        if isinstance(model.live_phenotypes, bool):
+            return True
+        return model.FIELD_TYPES.live_phenotypes
+
     @classmethod
     def _validate_grid_images(cls, model):
         """
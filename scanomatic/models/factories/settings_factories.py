@@ -66,6 +66,12 @@ class UIServerFactory(AbstractModelFactory):
         "port": int,
         "host": str,
         "master_key": str,
+        "state_cache_memory_mb": float,
+        "image_tile_cache_mb": float,
+        "compression_threshold_kb": float,
+        "workers": int,
+        "heatmap_cache_mb": float,
+        "status_interval": float,
     }
 
     @classmethod
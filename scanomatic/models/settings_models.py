@@ -47,11 +47,19 @@ class RPCServerModel(model.Model):
 
 class UIServerModel(model.Model):
 
-    def __init__(self, port=5000, host="0.0.0.0", master_key=None):
+    def __init__(self, port=5000, host="0.0.0.0", master_key=None, state_cache_memory_mb=1024,
+                 image_tile_cache_mb=2048, compression_threshold_kb=4, workers=1,
+                 heatmap_cache_mb=64, status_interval=5):
 
         self.port = port
         self.host = host
         self.master_key = master_key if master_key else str(uuid1())
+        self.state_cache_memory_mb = state_cache_memory_mb
+        self.image_tile_cache_mb = image_tile_cache_mb
+        self.compression_threshold_kb = compression_threshold_kb
+        self.workers = workers
+        self.heatmap_cache_mb = heatmap_cache_mb
+        self.status_interval = status_interval
         super(UIServerModel, self).__init__()
 
 
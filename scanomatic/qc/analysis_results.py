@@ -88,12 +88,12 @@ def set_axvspan_width(polygon, width):
 
 
 def animate_colony_growth(save_target, position, analysis_folder, fps=12, project_compilation=None, fig=None,
-                          cmap=plt.cm.gray, colony_title=None, positioning="one-time"):
+                          cmap=plt.cm.gray, colony_title=None, positioning="one-time", tile_cache=None):
 
     _logger.info("Loading colony images")
     times, images, _ = load_colony_images_for_animation(analysis_folder, position,
                                                         project_compilation=project_compilation,
-                                                        positioning=positioning)
+                                                        positioning=positioning, tile_cache=tile_cache)
 
     if fig is None:
         fig = plt.figure()
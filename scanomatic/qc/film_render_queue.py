@@ -0,0 +1,220 @@
+import os
+import re
+from collections import deque
+from glob import glob
+from hashlib import sha1
+from subprocess import Popen, PIPE, STDOUT
+from threading import Lock, Thread
+
+from enum import Enum
+
+from scanomatic.io.paths import Paths
+from scanomatic.io.logger import Logger
+
+_logger = Logger("Film Render Queue")
+
+FILM_TYPES = {'colony': 'animate_colony_growth("{save_target}", {pos}, "{path}", tile_cache=tile_cache)',
+              'detection': 'animate_blob_detection("{save_target}", {pos}, "{path}")',
+              '3d': 'animate_3d_colony("{save_target}", {pos}, "{path}")'}
+
+_FILM_CODE = "from scanomatic.qc import analysis_results;" + \
+             "from scanomatic.io.image_tiles import ImageTileCache;" + \
+             "tile_cache=ImageTileCache(size_limit={tile_cache_size});" + \
+             "analysis_results.{code}"
+
+_FRAME_PATTERN = re.compile(r"Frame (\d+)")
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+
+class FilmState(Enum):
+
+    Queued = 0
+    """:type: FilmState"""
+    Rendering = 1
+    """:type: FilmState"""
+    Done = 2
+    """:type: FilmState"""
+    Failed = 3
+    """:type: FilmState"""
+
+
+def _get_file_signature(path):
+
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return os.path.basename(path), None
+    return os.path.basename(path), stat_result.st_mtime, stat_result.st_size
+
+
+def get_film_key(film_type, position, path):
+    """Content address of a film
+
+    The key changes if any of the analysis files the film is made from
+    change, so that a re-analysed project gets new films.
+
+    Args:
+        film_type: One of `FILM_TYPES`
+        position: (plate, row, column) of the colony
+        path: The analysis directory
+
+    Returns: str
+    """
+    path = os.path.abspath(path)
+    _paths = Paths()
+    plate = position[0]
+    files = [os.path.join(path, name) for name in (
+        _paths.image_analysis_time_series, _paths.grid_pattern.format(plate + 1),
+        _paths.grid_size_pattern.format(plate + 1))]
+    files += sorted(glob(os.path.join(os.path.dirname(path), _paths.project_compilation_pattern.format("*"))))
+
+    return sha1(repr((film_type, tuple(position), path, tuple(_get_file_signature(f) for f in files)))).hexdigest()
+
+
+class FilmRenderQueue(object):
+    """Renders QC films one at a time in the background.
+
+    Each film is rendered in a separate process and saved under its
+    content address, see `get_film_key`. A film that has already been
+    rendered is not rendered again, also after a restart.
+
+    Args:
+        directory: Optional, where to keep films, default is `Paths().qc_films`
+        tile_cache_size: Optional, size limit in bytes of the image tile cache
+            used when rendering colony films.
+    """
+    def __init__(self, directory=None, tile_cache_size=2 * 1024 ** 3):
+
+        self._directory = directory
+        self.tile_cache_size = tile_cache_size
+        self._jobs = {}
+        """Key to dict with state, job parameters and frames rendered"""
+        self._queue = deque()
+        self._lock = Lock()
+        self._worker = None
+
+    @property
+    def directory(self):
+
+        if self._directory is None:
+            return Paths().qc_films
+        return self._directory
+
+    def get_film_path(self, key):
+
+        return os.path.join(self.directory, "{0}.avi".format(key))
+
+    def request(self, film_type, position, path, frames=None):
+        """Request a film, unless it is already rendered or queued
+
+        Args:
+            film_type: One of `FILM_TYPES`
+            position: (plate, row, column) of the colony
+            path: The analysis directory
+            frames: Optional, expected number of frames, used for progress
+
+        Returns: The key of the film
+        """
+        if film_type not in FILM_TYPES:
+            raise ValueError("Unknown film type '{0}'".format(film_type))
+
+        key = get_film_key(film_type, position, path)
+        if os.path.isfile(self.get_film_path(key)):
+            return key
+
+        with self._lock:
+
+            job = self._jobs.get(key)
+            if job is None or job['state'] is FilmState.Failed:
+                self._jobs[key] = {
+                    'state': FilmState.Queued, 'film_type': film_type, 'position': tuple(position),
+                    'path': os.path.abspath(path), 'frames': 0, 'total_frames': frames}
+                self._queue.append(key)
+
+            if self._worker is None:
+                self._worker = Thread(target=self._run, name="Film Renderer")
+                self._worker.daemon = True
+                self._worker.start()
+
+        return key
+
+    def get_status(self, key):
+        """The state and progress of a film
+
+        Args:
+            key: The key of the film
+
+        Returns: dict or `None` if the film is unknown
+        """
+        if not _KEY_PATTERN.match(key):
+            return None
+
+        with self._lock:
+
+            job = self._jobs.get(key)
+            if job is None or job['state'] is FilmState.Done:
+                if os.path.isfile(self.get_film_path(key)):
+                    return {'state': FilmState.Done, 'progress': 1.}
+                elif glob(os.path.join(self.directory, "{0}.*.rendering.avi".format(key))):
+                    # Rendered by another process serving the UI
+                    return {'state': FilmState.Rendering, 'progress': 0.}
+                return None
+
+            status = {'state': job['state'], 'progress': 0.}
+
+            if job['state'] is FilmState.Queued:
+                status['queue_position'] = list(self._queue).index(key)
+            elif job['state'] is FilmState.Rendering and job['total_frames']:
+                status['progress'] = min(1., job['frames'] / float(job['total_frames']))
+
+            return status
+
+    def _run(self):
+
+        while True:
+
+            with self._lock:
+                if not self._queue:
+                    self._worker = None
+                    return
+                key = self._queue.popleft()
+                job = self._jobs[key]
+                job['state'] = FilmState.Rendering
+
+            success = self._render(key, job)
+
+            with self._lock:
+                job['state'] = FilmState.Done if success else FilmState.Failed
+
+    def _render(self, key, job):
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        target = self.get_film_path(key)
+        save_target = os.path.join(self.directory, "{0}.{1}.rendering.avi".format(key, os.getpid()))
+        code = _FILM_CODE.format(
+            tile_cache_size=int(self.tile_cache_size),
+            code=FILM_TYPES[job['film_type']].format(save_target=save_target, pos=job['position'], path=job['path']))
+
+        _logger.info("Rendering {0} film of {1} in {2}".format(job['film_type'], job['position'], job['path']))
+
+        try:
+            proc = Popen(['python', '-u', '-c', code], stdout=PIPE, stderr=STDOUT)
+        except OSError:
+            _logger.exception("Could not start film rendering")
+            return False
+
+        for line in iter(proc.stdout.readline, b''):
+            match = _FRAME_PATTERN.search(line)
+            if match:
+                job['frames'] = int(match.group(1))
+
+        if proc.wait() != 0 or not os.path.isfile(save_target):
+            _logger.error("Failed to render film {0}".format(key))
+            if os.path.isfile(save_target):
+                os.remove(save_target)
+            return False
+
+        os.rename(save_target, target)
+        return True
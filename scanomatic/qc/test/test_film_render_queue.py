@@ -0,0 +1,58 @@
+import os
+import time
+
+from scanomatic.qc.film_render_queue import FilmRenderQueue, FilmState, get_film_key
+
+
+def wait_for(queue, key, timeout=5):
+
+    start = time.time()
+    while queue.get_status(key)['state'] in (FilmState.Queued, FilmState.Rendering):
+        assert time.time() - start < timeout
+        time.sleep(0.01)
+    return queue.get_status(key)
+
+
+def test_film_key_follows_analysis(tmpdir):
+
+    analysis = tmpdir.mkdir("analysis")
+    key = get_film_key('colony', (0, 1, 2), str(analysis))
+
+    assert key == get_film_key('colony', (0, 1, 2), str(analysis))
+    assert key != get_film_key('colony', (0, 1, 3), str(analysis))
+
+    analysis.join("time_data.npy").write("")
+    assert key != get_film_key('colony', (0, 1, 2), str(analysis))
+
+
+def test_films_are_rendered_once(tmpdir):
+
+    queue = FilmRenderQueue(directory=str(tmpdir.join("films")))
+    rendered = []
+
+    def render(key, job):
+        rendered.append(job['position'])
+        if not os.path.isdir(queue.directory):
+            os.makedirs(queue.directory)
+        open(queue.get_film_path(key), 'w').close()
+        return True
+
+    queue._render = render
+    analysis = str(tmpdir.mkdir("analysis"))
+
+    key = queue.request('colony', (0, 1, 2), analysis)
+    assert wait_for(queue, key)['state'] is FilmState.Done
+
+    assert queue.request('colony', (0, 1, 2), analysis) == key
+    assert FilmRenderQueue(directory=queue.directory).get_status(key)['state'] is FilmState.Done
+    assert rendered == [(0, 1, 2)]
+
+
+def test_failed_film(tmpdir):
+
+    queue = FilmRenderQueue(directory=str(tmpdir.join("films")))
+    queue._render = lambda key, job: False
+
+    key = queue.request('3d', (0, 0, 0), str(tmpdir))
+    assert wait_for(queue, key)['state'] is FilmState.Failed
+    assert queue.get_status("../../etc/passwd") is None
@@ -23,6 +23,7 @@ from scanomatic.models.factories.scanning_factory import ScanningModelFactory
 import scanomatic.io.first_pass_results as first_pass_results
 import scanomatic.io.rpc_client as rpc_client
 from scanomatic.data_processing.phenotyper import remove_state_from_path
+from scanomatic.data_processing.live_phenotyper import LivePhenotyper
 
 def get_label_from_analysis_model(analysis_model, id_hash):
     """Make a suitable label to show in status view
@@ -84,6 +85,8 @@ class AnalysisEffector(proc_effector.ProcessEffector):
         self._current_image_model = None
         """:type : scanomatic.models.compile_project_model.CompileImageAnalysisModel"""
         self._analysis_needs_init = True
+        self._live_phenotyper = None
+        """:type : scanomatic.data_processing.live_phenotyper.LivePhenotyper"""
 
     @property
     def current_image_index(self):
@@ -231,10 +234,37 @@ Scan-o-Matic""", self._analysis_job)
 
         self._xmlWriter.write_image_features(image_model, features)
 
+        if self._analysis_job.live_phenotypes:
+            self._update_live_phenotypes(image_model, features)
+
         self._logger.info("Image took {0} seconds".format(time.time() - scan_start_time))
 
         return True
 
+    def _update_live_phenotypes(self, image_model, features):
+
+        if features is None:
+            return
+
+        plates = image_data.ImageData.get_plates_from_features(
+            features, self._analysis_job.image_data_output_item, self._analysis_job.image_data_output_measure)
+
+        if not plates:
+            return
+
+        time_point = image_model.image.time_stamp / image_data._SECONDS_PER_HOUR
+
+        try:
+            if self._live_phenotyper is None:
+                self._live_phenotyper = LivePhenotyper.LoadFromImage(plates, time_point)
+            else:
+                self._live_phenotyper.add_image(plates, time_point)
+
+            self._live_phenotyper.publish_snapshot(self._analysis_job.output_directory)
+
+        except Exception:
+            self._logger.exception("Could not update live phenotypes, analysis continues without them")
+
     def _setup_first_iteration(self):
 
         self._start_time = time.time()
@@ -14,6 +14,7 @@ import scanomatic.io.paths as paths
 import scanomatic.io.image_data as image_data
 from scanomatic.io.app_config import Config as AppConfig
 import scanomatic.data_processing.phenotyper as phenotyper
+from scanomatic.data_processing.project_index import get_project_index
 from scanomatic.models.rpc_job_models import JOB_TYPE
 import scanomatic.models.factories.features_factory as feature_factory
 from scanomatic.models.factories.rpc_job_factory import RPC_Job_Model_Factory
@@ -134,6 +135,8 @@ class PhenotypeExtractionEffector(proc_effector.ProcessEffector):
                     dir_path=self._analysis_base_path,
                     ask_if_overwrite=False)
 
+                get_project_index().update(self._analysis_base_path)
+
             self._mail("Scan-o-Matic: Feature extraction of '{analysis_directory}' completed",
                        """This is an automated email, please don't reply!
 
@@ -6,8 +6,6 @@ from flask import jsonify, request, send_file
 import numpy as np
 
 from scanomatic.models.factories.analysis_factories import AnalysisModelFactory
-from scanomatic.models.analysis_model import COMPARTMENTS
-from scanomatic.image_analysis.grid_cell import GridCell
 from scanomatic.image_analysis.grid_array import GridArray
 from scanomatic.image_analysis.grayscale import getGrayscale
 from scanomatic.image_analysis.image_grayscale import (
@@ -25,6 +23,28 @@ from .general import (
 _VALID_CHARACTERS = letters + "-._1234567890"
 
 
+def _get_colony_detection_json(detection):
+
+    image = detection['image']
+    blob = detection['blob']
+    background = detection['background']
+    blob_exists = blob.any()
+    blob_pixels = image[blob]
+
+    return dict(
+        blob=blob.tolist(),
+        background=background.tolist(),
+        image=image.tolist(),
+        image_max=image.max(),
+        image_min=image.min(),
+        blob_max=blob_pixels.max() if blob_exists else -1,
+        blob_min=blob_pixels.min() if blob_exists else -1,
+        blob_exists=int(blob_exists),
+        background_exists=int(background.any()),
+        background_reasonable=int(background.sum() >= 20),
+    )
+
+
 def add_routes(app):
     """
 
@@ -619,20 +639,9 @@ def add_routes(app):
             )
 
         plate_json = image_json[calibration.CCCImage.plates][plate]
-        h, w = plate_json[calibration.CCCPlate.grid_cell_size]
-
-        px_y, px_x = grid[:, grid.shape[1] - y, x]
-
-        colony_im = image[
-            int(round(px_y - h / 2)): int(round(px_y + h / 2) + 1),
-            int(round(px_x - w / 2)): int(round(px_x + w / 2) + 1)
-        ]
 
-        # first plate, upper left colony (just need something):
-        identifier = ["unknown_image", 0, [0, 0]]
-
-        grid_cell = GridCell(identifier, None, save_extra_data=False)
-        grid_cell.source = colony_im.astype(np.float64)
+        colony_im, grid_position = calibration.get_colony_image(
+            image, grid, plate_json[calibration.CCCPlate.grid_cell_size], x, y)
 
         transpose_polynomial = image_basics.Image_Transpose(
             sourceValues=image_json[
@@ -641,33 +650,97 @@ def add_routes(app):
                 calibration.CCCImage.grayscale_target_values]
         )
 
-        grid_cell.source[...] = transpose_polynomial(grid_cell.source)
+        detection = calibration.detect_colony(
+            transpose_polynomial(colony_im.astype(np.float64)))
+
+        return jsonify(
+            success=True,
+            grid_position=grid_position,
+            **_get_colony_detection_json(detection)
+        )
+
+    @app.route(
+        "/api/data/calibration/<ccc_identifier>/image/<image_identifier>" +
+        "/plate/<int:plate>/detect/colonies", methods=["POST"])
+    def detect_colonies(ccc_identifier, image_identifier, plate):
+        """Detect many colonies of a plate at once
+
+        Request Keys:
+            "positions": list of [x, y] colony positions, as for
+                detecting a single colony
+            "compress": boolean for also setting the compressed
+                calibration entry of each colony with a detected blob
+                and background, requires "access_token"
+            "override_small_background": boolean for allowing less than
+                20 pixel backgrounds when compressing
+        Returns:
+            "colonies": list with the detection of each position, in
+                the same order, or `null` for positions outside the grid
+            "compressed": list of the positions that were compressed
+        """
+        data_object = request.get_json(silent=True, force=True)
+        if not data_object:
+            data_object = request.values
+
+        try:
+            positions = [
+                (int(x), int(y)) for x, y in data_object.get("positions", [])]
+        except (TypeError, ValueError):
+            return json_abort(
+                400,
+                success=False,
+                is_endpoint=True,
+                reason="Positions must be a list of x, y pairs"
+            )
+
+        try:
+            detections = calibration.detect_colonies(
+                ccc_identifier, image_identifier, plate, positions)
+        except ValueError as e:
+            return json_abort(
+                400,
+                success=False,
+                is_endpoint=True,
+                reason=str(e)
+            )
+
+        compressed = []
+        if data_object.get("compress", False):
+
+            min_background = 3 if data_object.get(
+                "override_small_background", False) else 20
 
-        grid_cell.attach_analysis(
-            blob=True, background=True, cell=True,
-            run_detect=False)
+            colonies = [
+                (x, y, detection['image'], detection['blob'],
+                 detection['background'])
+                for (x, y), detection in zip(positions, detections)
+                if detection is not None and detection['blob'].any() and
+                detection['background'].sum() >= min_background
+            ]
 
-        grid_cell.detect(remember_filter=False)
-        blob = grid_cell.get_item(COMPARTMENTS.Blob).filter_array
-        background = grid_cell.get_item(COMPARTMENTS.Background).filter_array
-        blob_exists = blob.any()
-        blob_pixels = grid_cell.source[blob]
-        background_exists = background.any()
-        background_reasonable = background.sum() >= 20
+            compressed = calibration.set_colonies_compressed_data(
+                ccc_identifier, image_identifier, plate, colonies,
+                access_token=data_object.get("access_token"))
+
+            if compressed is None:
+                return json_abort(
+                    401,
+                    success=False,
+                    is_endpoint=True,
+                    reason="Probably invalid access token"
+                )
 
         return jsonify(
             success=True,
-            blob=blob.tolist(),
-            background=background.tolist(),
-            image=grid_cell.source.tolist(),
-            image_max=grid_cell.source.max(),
-            image_min=grid_cell.source.min(),
-            blob_max=blob_pixels.max() if blob_exists else -1,
-            blob_min=blob_pixels.min() if blob_exists else -1,
-            blob_exists=int(blob_exists),
-            background_exists=int(background_exists),
-            background_reasonable=int(background_reasonable),
-            grid_position=(px_y, px_x),
+            is_endpoint=True,
+            colonies=[
+                None if detection is None else dict(
+                    x=x,
+                    y=y,
+                    grid_position=detection['grid_position'],
+                    **_get_colony_detection_json(detection))
+                for (x, y), detection in zip(positions, detections)],
+            compressed=compressed,
         )
 
     @app.route(
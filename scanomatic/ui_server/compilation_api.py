@@ -2,16 +2,30 @@ import os
 from itertools import chain
 from glob import glob
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 
 from scanomatic.ui_server.general import convert_url_to_path, convert_path_to_url, get_search_results, json_response, \
-    serve_numpy_as_image
+    serve_numpy_as_image, get_cache_validators, get_file_signature, is_not_modified, serve_not_modified, \
+    set_cache_validators
 
 from scanomatic.io.paths import Paths
+from scanomatic.io.app_config import Config
+from scanomatic.io.image_tiles import ImageTileCache
 from scanomatic.models.factories.compile_project_factory import CompileProjectFactory
 from scanomatic.io import image_loading
 from scanomatic.data_processing import phenotyper
 
+_TILE_CACHE = ImageTileCache()
+
+
+def _get_image_cache_validators(analysis_directory, plate):
+
+    paths = Paths()
+    files = [os.path.join(analysis_directory, pattern.format(plate + 1))
+             for pattern in (paths.grid_pattern, paths.grid_size_pattern)]
+    files += glob(os.path.join(os.path.dirname(analysis_directory), paths.project_compilation_pattern.format("*")))
+    return get_cache_validators(get_file_signature(*files), request.full_path)
+
 
 def add_routes(app):
     """
@@ -21,6 +35,8 @@ def add_routes(app):
     :return:
     """
 
+    _TILE_CACHE.size_limit = Config().ui_server.image_tile_cache_mb * 1024 ** 2
+
     @app.route("/api/compile/colony_image")
     @app.route("/api/compile/colony_image/")
     @app.route("/api/compile/colony_image/<int:time_index>/<int:plate>/<int:outer>/<int:inner>/<path:project>")
@@ -36,9 +52,44 @@ def add_routes(app):
             return jsonify(success=True, is_project=False, is_endpoint=False,
                            **get_search_results(path, base_url))
 
-        im = image_loading.load_colony_image((plate, outer, inner), analysis_directory=path, time_index=time_index)
+        validators = _get_image_cache_validators(path, plate)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
+        im = image_loading.load_colony_image(
+            (plate, outer, inner), analysis_directory=path, time_index=time_index, tile_cache=_TILE_CACHE)
+
+        return set_cache_validators(serve_numpy_as_image(im), validators)
+
+    @app.route("/api/compile/plate_image")
+    @app.route("/api/compile/plate_image/")
+    @app.route("/api/compile/plate_image/<int:time_index>/<int:plate>/<path:project>")
+    @app.route("/api/compile/plate_image/<int:plate>/<path:project>")
+    def get_plate_image(time_index=0, plate=None, project=None):
+        base_url = "/api/compile/plate_image"
+
+        path = convert_url_to_path(project)
+
+        is_project = phenotyper.path_has_saved_project_state(path)
+
+        if not is_project:
+            return jsonify(success=True, is_project=False, is_endpoint=False,
+                           **get_search_results(path, base_url))
+
+        validators = _get_image_cache_validators(path, plate)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
+        zoom = request.values.get('zoom', default=0, type=int)
+
+        try:
+            im = image_loading.load_plate_image(
+                plate, analysis_directory=path, time_index=time_index, tile_cache=_TILE_CACHE, zoom=zoom)
+        except (ValueError, IndexError):
+            return jsonify(success=False, reason="No plate {0} at zoom {1} for image {2}".format(
+                plate, zoom, time_index))
 
-        return serve_numpy_as_image(im)
+        return set_cache_validators(serve_numpy_as_image(im), validators)
 
     @app.route("/api/compile/instructions", defaults={'project': ''})
     @app.route("/api/compile/instructions/", defaults={'project': ''})
@@ -28,7 +28,8 @@ from scanomatic.models.factories.analysis_factories import AnalysisFeaturesFacto
 from .general import get_fixture_image_by_name, usable_markers, split_areas_into_grayscale_and_plates, \
     get_area_too_large_for_grayscale, get_grayscale_is_valid, usable_plates, image_is_allowed, \
     get_fixture_image, convert_url_to_path, get_fixture_image_from_data, \
-    get_2d_list, string_parse_2d_list, get_image_data_as_array
+    get_2d_list, string_parse_2d_list, get_image_data_as_array, get_cache_validators, get_file_signature, \
+    is_not_modified, serve_not_modified, set_cache_validators
 
 
 _logger = Logger("Data API")
@@ -319,16 +320,20 @@ def add_routes(app, rpc_client, is_debug_mode):
 
         path = os.path.join(convert_url_to_path(project), Paths().experiment_local_fixturename)
 
+        validators = get_cache_validators(get_file_signature(path), request.full_path)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
         try:
             fixture = FixtureFactory.serializer.load_first(path)
             if fixture is None:
                 return jsonify(
                     success=False,
                     reason="File is missing")
-            return jsonify(
+            return set_cache_validators(jsonify(
                 success=True, grayscale=dict(**fixture.grayscale),
                 plates=[dict(**plate) for plate in fixture.plates],
-                markers=zip(fixture.orientation_marks_x, fixture.orientation_marks_y))
+                markers=zip(fixture.orientation_marks_x, fixture.orientation_marks_y)), validators)
         except IndexError:
             return jsonify(success=False, reason="Fixture without data")
         except ConfigError:
@@ -354,6 +359,11 @@ def add_routes(app, rpc_client, is_debug_mode):
             return jsonify(success=False, reason="Scan-o-Matic server offline")
         elif name in rpc_client.get_fixtures():
             path = Paths().get_fixture_path(name)
+
+            validators = get_cache_validators(get_file_signature(path), request.full_path)
+            if is_not_modified(validators):
+                return serve_not_modified(validators)
+
             try:
                 fixture = FixtureFactory.serializer.load_first(path)
                 if fixture is None:
@@ -361,10 +371,10 @@ def add_routes(app, rpc_client, is_debug_mode):
                         success=False,
                         reason="File is missing"
                     )
-                return jsonify(
+                return set_cache_validators(jsonify(
                     success=True, grayscale=dict(**fixture.grayscale),
                     plates=[dict(**plate) for plate in fixture.plates],
-                    markers=zip(fixture.orientation_marks_x, fixture.orientation_marks_y))
+                    markers=zip(fixture.orientation_marks_x, fixture.orientation_marks_y)), validators)
             except IndexError:
                 return jsonify(success=False, reason="Fixture without data")
             except ConfigError:
@@ -1,4 +1,3 @@
-import glob
 import os
 import re
 from StringIO import StringIO
@@ -6,18 +5,23 @@ import io
 from scipy.misc import imread
 from itertools import chain
 from flask import (
-    send_file, jsonify, render_template)
+    send_file, jsonify, render_template, Response, request)
 from werkzeug.datastructures import FileStorage
+from werkzeug.http import is_resource_modified
 import numpy as np
 import zipfile
 from urllib import unquote, quote
 from types import StringTypes
 import base64
+import gzip
+import json
+from datetime import datetime
+from hashlib import sha1
 
 from scanomatic.io.app_config import Config
 from scanomatic.io.paths import Paths
 from scanomatic.io.logger import Logger, parse_log_file
-from scanomatic.models.factories.scanning_factory import ScanningModelFactory
+from scanomatic.data_processing.project_index import get_project_index
 from scipy.misc import toimage
 from scanomatic.image_analysis.first_pass_image import FixtureImage
 from scanomatic.models.fixture_models import (
@@ -30,6 +34,7 @@ _no_super = re.compile(r"/?\.{2}/")
 _logger = Logger("UI API helpers")
 _ALLOWED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.tiff'}
 _TOO_LARGE_GRAYSCALE_AREA = 300000
+_COMPRESSED_MIMETYPES = {'application/json', 'application/octet-stream'}
 
 
 def json_abort(status_code, *args, **kwargs):
@@ -197,33 +202,15 @@ def get_search_results(path, url_prefix):
 
 def _get_possible_paths(path):
 
-    dirs = tuple()
-    root = None
-    for root, dirs, _ in os.walk(path, followlinks=True):
-        break
-
-    if root is None:
-        return tuple()
-    return tuple(os.path.join(root, d) for d in dirs)
+    return get_project_index().get_subdirectories(path)
 
 
 def get_project_name(project_path):
-    no_name = None
 
     if not path_is_in_jail(project_path):
-        return no_name
-
-    candidates = glob.glob(os.path.join(project_path, Paths().scan_project_file_pattern.format("*")))
-    if candidates:
-        for candidate in candidates:
-            model = ScanningModelFactory.serializer.load_first(candidate)
-            if model:
-                return model.project_name if model.project_name else no_name
-
-    if project_path:
-        return get_project_name(os.path.dirname(project_path))
+        return None
 
-    return no_name
+    return get_project_index().get_project_name(project_path, root=Config().paths.projects_root)
 
 
 def strip_empty_exits(exits, data):
@@ -318,6 +305,132 @@ def serve_zip_file(zip_name, *file_list):
                      attachment_filename=str(zip_name))
 
 
+def get_binary_arrays(header, **arrays):
+    """Pack arrays as little-endian float32 behind a JSON header
+
+    The data starts with the byte length of the header as a little-endian
+    uint32, followed by the JSON header padded with spaces so the arrays
+    start at a multiple of four bytes. The arrays follow one after the other
+    in C-order, in the order listed by the header's "arrays".
+
+    Args:
+        header: dict of further information for the header
+        arrays: The arrays by name
+
+    Returns: str of the packed data
+    """
+    names = sorted(arrays)
+    arrays = [np.asarray(arrays[name], dtype='<f4') for name in names]
+    header = dict(
+        arrays=names, shapes=[array.shape for array in arrays], dtype='<f4', **header)
+
+    encoded_header = json.dumps(header)
+    encoded_header += " " * (-(len(encoded_header) + 4) % 4)
+
+    return "".join(
+        [np.array(len(encoded_header), dtype='<u4').tobytes(), encoded_header] +
+        [np.ascontiguousarray(array).tobytes() for array in arrays])
+
+
+def serve_binary_arrays(header, **arrays):
+    """Serves arrays as packed by `get_binary_arrays`"""
+
+    return Response(get_binary_arrays(header, **arrays), mimetype='application/octet-stream')
+
+
+def get_file_signature(*paths):
+    """Identify the current version of files
+
+    Returns: tuple of path, modification time and size of each file,
+        missing files only have the path
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            signature.append((path, ))
+        else:
+            signature.append((path, stat_result.st_mtime, stat_result.st_size))
+    return tuple(signature)
+
+
+def get_cache_validators(signature, *extra):
+    """Get the ETag and last modification of a response
+
+    Args:
+        signature: The files the response is built from, as given by
+            `get_file_signature`, or any sequence where the second
+            item of each entry is a modification time.
+        extra: Anything else that the response depends on, e.g. the
+            requested url.
+
+    Returns: tuple of ETag and `datetime.datetime` or `None`
+    """
+    etag = sha1(repr((tuple(signature), extra))).hexdigest()
+    modification_times = [entry[1] for entry in signature if len(entry) > 1]
+    if modification_times:
+        return etag, datetime.utcfromtimestamp(max(modification_times))
+    return etag, None
+
+
+def is_not_modified(validators):
+    """If the request is conditional and the client already has the response
+
+    Args:
+        validators: The ETag and last modification as given by `get_cache_validators`
+    """
+    etag, last_modified = validators
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+def set_cache_validators(response, validators):
+    """Set the ETag and last modification of a response
+
+    The ETag is weak as large responses may be compressed.
+    Clients are asked to revalidate before using a cached response.
+    """
+    etag, last_modified = validators
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def serve_not_modified(validators):
+
+    return set_cache_validators(Response(status=304), validators)
+
+
+def compress_response(response):
+    """Gzip-compress large json and binary responses
+
+    To be used as `after_request` handler of the app. Responses smaller
+    than `Config().ui_server.compression_threshold_kb` are not compressed.
+    """
+    if response.status_code != 200 or response.direct_passthrough or \
+            response.mimetype not in _COMPRESSED_MIMETYPES or 'Content-Encoding' in response.headers:
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    if 'gzip' not in request.accept_encodings:
+        return response
+
+    data = response.get_data()
+    if len(data) < Config().ui_server.compression_threshold_kb * 1024:
+        return response
+
+    compressed = io.BytesIO()
+    with gzip.GzipFile(fileobj=compressed, mode='wb', compresslevel=6) as fh:
+        fh.write(data)
+
+    response.set_data(compressed.getvalue())
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
 def serve_pil_image(pil_img):
     img_io = StringIO()
     pil_img.save(img_io, 'JPEG', quality=70)
@@ -0,0 +1,177 @@
+import os
+import signal
+import socket
+import time
+from datetime import datetime
+from threading import Lock
+
+from werkzeug.serving import make_server
+
+from scanomatic.io.logger import Logger
+
+_logger = Logger("UI Server Workers")
+
+
+class RequestTimingMiddleware(object):
+    """WSGI middleware logging how long each request takes.
+
+    Each request is logged as a tab separated line with the time it
+    ended, the process id, the method, the path, the status, the number
+    of milliseconds from the request being received until the last of the
+    response was sent and the size of the response in bytes.
+
+    Args:
+        app: The WSGI app, e.g. `Flask.wsgi_app`
+        log_path: The file to append to
+    """
+    def __init__(self, app, log_path):
+
+        self._app = app
+        self._log_path = log_path
+        self._lock = Lock()
+
+    def __call__(self, environ, start_response):
+
+        start_time = time.time()
+        status = []
+
+        def timed_start_response(response_status, headers, exc_info=None):
+            status[:] = [response_status.split(" ", 1)[0]]
+            return start_response(response_status, headers, exc_info)
+
+        size = 0
+        response = self._app(environ, timed_start_response)
+        try:
+            for data in response:
+                size += len(data)
+                yield data
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+            self._log(environ, status[0] if status else "-", time.time() - start_time, size)
+
+    def _log(self, environ, status, duration, size):
+
+        line = "{0}\t{1}\t{2}\t{3}\t{4}\t{5:.1f}\t{6}\n".format(
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"), os.getpid(), environ.get('REQUEST_METHOD'),
+            environ.get('PATH_INFO'), status, duration * 1000, size)
+
+        with self._lock:
+            try:
+                with open(self._log_path, 'a') as fh:
+                    fh.write(line)
+            except IOError:
+                pass
+
+
+class SerialRequestsMiddleware(object):
+    """WSGI middleware handling one request at a time.
+
+    The server handles requests in threads so that long lived responses,
+    such as event streams, don't block it, but most of the app isn't safe
+    to use from several threads at once. All other requests are therefore
+    handled one at a time, and their responses are read completely before
+    the next starts.
+
+    Args:
+        app: The WSGI app, e.g. `Flask.wsgi_app`
+        concurrent_paths: Paths that are safe to handle in parallel
+    """
+    def __init__(self, app, concurrent_paths=()):
+
+        self._app = app
+        self._concurrent_paths = frozenset(concurrent_paths)
+        self._lock = Lock()
+
+    def __call__(self, environ, start_response):
+
+        if environ.get('PATH_INFO') in self._concurrent_paths:
+            return self._app(environ, start_response)
+
+        with self._lock:
+            response = self._app(environ, start_response)
+            try:
+                return list(response)
+            finally:
+                if hasattr(response, 'close'):
+                    response.close()
+
+
+def _serve_worker(app, host, listener):
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server = make_server(host, 0, app, threaded=True, fd=listener.fileno())
+    server.serve_forever()
+
+
+def serve_prefork(app, host, port, workers):
+    """Serve an app with several worker processes
+
+    The socket is bound once and the workers are forked from this
+    process, so everything loaded before is shared by them until
+    changed. Each worker handles its requests in threads, so that long
+    lived responses such as event streams don't block it (see
+    `SerialRequestsMiddleware`), and workers that die are replaced. Returns when the process is asked to terminate,
+    which also terminates the workers.
+
+    Args:
+        app: The WSGI app
+        host: The host to bind to
+        port: The port to bind to
+        workers: Number of worker processes
+
+    Raises:
+        socket.error: If the socket could not be bound
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(128)
+
+    pids = set()
+    stopping = []
+
+    def spawn():
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _serve_worker(app, host, listener)
+            finally:
+                os._exit(1)
+        pids.add(pid)
+
+    def stop(signum, frame):
+
+        stopping.append(signum)
+        for pid in tuple(pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+
+    _logger.info("Serving with {0} workers on {1}:{2}".format(workers, host, port))
+
+    while pids:
+
+        try:
+            pid, _ = os.wait()
+        except OSError:
+            # Interrupted by a signal
+            continue
+
+        pids.discard(pid)
+        if not stopping:
+            _logger.warning("Worker {0} died, starting a new".format(pid))
+            spawn()
+
+    listener.close()
+    _logger.info("All workers stopped")
@@ -1,28 +1,36 @@
 import os
 import time
 from datetime import datetime
+from functools import wraps
 from dateutil import tz
-from flask import request, Flask, jsonify, send_from_directory
+from flask import request, Flask, jsonify, send_from_directory, Response
 from werkzeug.datastructures import FileStorage
 from itertools import chain, product
-from subprocess import call
 import uuid
 from enum import Enum
 from glob import glob
 import re
 from scanomatic.data_processing import phenotyper
+from scanomatic.data_processing import live_phenotyper
+from scanomatic.data_processing.phenotyper_cache import PhenotyperCache
+from scanomatic.data_processing.project_index import get_project_index
 from scanomatic.data_processing.phenotypes import get_sort_order, PhenotypeDataType, infer_phenotype_from_name
 from scanomatic.data_processing.norm import infer_offset, Offsets
 from scanomatic.generics.phenotype_filter import Filter
+from scanomatic.qc.film_render_queue import FILM_TYPES, FilmRenderQueue, FilmState
+from scanomatic.io.heatmaps import HeatmapCache, COLORMAPS, DEFAULT_COLORMAP, render_heatmap, encode_png
 from scanomatic.io.paths import Paths
 from scanomatic.io.app_config import Config
 from scanomatic.ui_server.general import convert_url_to_path, convert_path_to_url, get_search_results, \
-    get_project_name, json_response, serve_zip_file
+    get_project_name, json_response, serve_zip_file, serve_binary_arrays, get_cache_validators, is_not_modified, \
+    serve_not_modified, set_cache_validators
 
 RESERVATION_TIME = 60 * 5
-FILM_TYPES = {'colony': 'animate_colony_growth("{save_target}", {pos}, "{path}")',
-              'detection': 'animate_blob_detection("{save_target}", {pos}, "{path}")',
-              '3d': 'animate_3d_colony("{save_target}", {pos}, "{path}")'}
+_STATE_CACHE = PhenotyperCache()
+"""Loaded project states shared by all requests"""
+_FILM_QUEUE = FilmRenderQueue()
+_HEATMAP_CACHE = HeatmapCache()
+"""Rendered phenotype heatmaps shared by all requests"""
 
 
 class LockState(Enum):
@@ -42,10 +50,26 @@ def owns_lock(lock_state):
     return lock_state is LockState.LockedByMe or lock_state is LockState.LockedByMeTemporary
 
 
+def _holds_state_lock(route):
+    """Serve a route holding the lock of its project's state, see `PhenotyperCache.locked`"""
+
+    @wraps(route)
+    def locked_route(*args, **kwargs):
+
+        project = kwargs.get('project')
+        if not project:
+            return route(*args, **kwargs)
+
+        with _STATE_CACHE.locked(convert_url_to_path(project)):
+            return route(*args, **kwargs)
+
+    return locked_route
+
+
 def _get_state_update_response(path, response, success=None):
 
     try:
-        state = phenotyper.Phenotyper.LoadFromState(path)
+        state = _STATE_CACHE.get(path)
     except ImportError:
         name = None
         success = False
@@ -63,10 +87,27 @@ def _get_state_update_response(path, response, success=None):
     return state, name
 
 
-def _make_film(film_type, save_target=None, pos=None, path=None):
-    code = FILM_TYPES[film_type].format(save_target=save_target, pos=pos, path=path)
-    return_code = call(['python', '-c', 'from scanomatic.qc import analysis_results;analysis_results.{0}'.format(code)])
-    return return_code == 0
+def _get_state_cache_validators(path):
+
+    return get_cache_validators(phenotyper.get_state_signature(path), request.full_path)
+
+
+def _get_film_status_response(key, status, response):
+
+    response.update({
+        'film_state': status['state'].name,
+        'progress': status['progress'],
+        'status_url': "/api/results/movie/status/{0}".format(key),
+        'download_url': "/api/results/movie/download/{0}".format(key),
+    })
+
+    if 'queue_position' in status:
+        response['queue_position'] = status['queue_position']
+    if status['state'] is FilmState.Failed:
+        response['success'] = False
+        response['reason'] = "Error while producing film"
+
+    return response
 
 
 def _get_key():
@@ -172,7 +213,7 @@ def _validate_lock_key(path, key="", ip="", require_claim=True):
 def _discover_projects(path):
 
     dirs = tuple(chain(*tuple(tuple(os.path.join(root, d) for d in dirs) for root, dirs, _ in os.walk(path))))
-    return tuple(d for d in dirs if phenotyper.path_has_saved_project_state(d))
+    return tuple(d for d in dirs if _STATE_CACHE.has_state(d))
 
 
 def _get_new_metadata_file_name(project_path, suffix):
@@ -199,14 +240,21 @@ def merge_dicts(*dicts):
     return {k: v for k, v in chain(*(d.iteritems() for d in dicts))}
 
 
-def add_routes(app):
+def add_routes(app, workers=1):
 
     """
 
     Args:
         app (Flask): The flask app to decorate
+        workers (int): Number of processes serving the app,
+            each keeping its own states within an equal share
+            of the memory budget for states.
     """
 
+    _STATE_CACHE.memory_budget = Config().ui_server.state_cache_memory_mb * 1024 ** 2 / workers
+    _FILM_QUEUE.tile_cache_size = Config().ui_server.image_tile_cache_mb * 1024 ** 2
+    _HEATMAP_CACHE.memory_budget = Config().ui_server.heatmap_cache_mb * 1024 ** 2 / workers
+
     @app.route("/api/results/browse/<path:project>")
     @app.route("/api/results/browse")
     def browse_for_results(project=""):
@@ -218,7 +266,8 @@ def add_routes(app):
             zone = tz.gettz()
 
         path = convert_url_to_path(project)
-        is_project = phenotyper.path_has_saved_project_state(path)
+        entry = get_project_index().get_project(path)
+        is_project = entry is not None and entry['is_project']
 
         feature_logs = tuple(chain(((
             convert_path_to_url("/api/tools/logs/0/0", c),
@@ -226,7 +275,8 @@ def add_routes(app):
             glob(os.path.join(path, Paths().phenotypes_extraction_log)))))
 
         if is_project:
-            analysis_date, extraction_date, change_date = phenotyper.get_project_dates(path)
+            analysis_date, extraction_date, change_date = (
+                entry['analysis_date'], entry['extraction_date'], entry['change_date'])
         else:
 
             return jsonify(**json_response(
@@ -249,6 +299,7 @@ def add_routes(app):
                 project=project,
                 is_project=is_project,
                 project_name=name,
+                plate_shapes=entry['plate_shapes'],
                 add_lock=convert_path_to_url("/api/results/lock/add", path) if is_project else None,
                 remove_lock=convert_path_to_url("/api/results/lock/remove", path) if is_project else None,
                 add_meta_data=convert_path_to_url("/api/results/meta_data/add", path) if is_project else None,
@@ -283,11 +334,49 @@ def add_routes(app):
 
                 **get_search_results(path, "/api/results/browse"))))
 
+    @app.route("/api/results/projects/<path:project>")
+    @app.route("/api/results/projects")
+    def list_projects(project=""):
+        """All projects in or below a directory
+
+        The projects are listed from the project index, which is
+        refreshed in the background.
+        """
+        local_zone = tz.gettz()
+        zone = tz.gettz(request.values.get("time_zone"))
+        if not zone:
+            zone = local_zone
+
+        def as_date(timestamp):
+            return datetime.fromtimestamp(timestamp, local_zone).astimezone(zone).isoformat() if timestamp else ""
+
+        path = convert_url_to_path(project)
+        project_index = get_project_index()
+        if not len(project_index):
+            project_index.refresh(Config().paths.projects_root)
+        else:
+            project_index.refresh_in_background(Config().paths.projects_root)
+
+        projects = project_index.get_projects(path)
+        urls = [convert_path_to_url("/api/results/browse", p) for p, _ in projects]
+
+        return jsonify(**json_response(
+            ["urls"],
+            dict(
+                urls=[url for url in urls if url is not None],
+                projects=[dict(
+                    url=url,
+                    analysis_date=as_date(entry['analysis_date']),
+                    extraction_date=as_date(entry['extraction_date']),
+                    change_date=as_date(entry['change_date']),
+                    plate_shapes=entry['plate_shapes'])
+                    for url, (_, entry) in zip(urls, projects) if url is not None])))
+
     @app.route("/api/results/lock/add/<path:project>")
     def lock_project(project=""):
 
         path = convert_url_to_path(project)
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
             return jsonify(success=False, reason="Not a project")
 
         name = get_project_name(path)
@@ -307,7 +396,7 @@ def add_routes(app):
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
             return jsonify(success=False, is_project=False, is_endpoint=True, reason="Not a project")
 
         name = get_project_name(path)
@@ -323,11 +412,12 @@ def add_routes(app):
         return jsonify(**response)
 
     @app.route("/api/results/meta_data/add/<path:project>", methods=["POST"])
+    @_holds_state_lock
     def add_meta_data(project=None):
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(
                 ["urls"], dict(is_project=False, **get_search_results(path, "/api/results/meta_data/add"))))
@@ -378,7 +468,7 @@ def add_routes(app):
             return jsonify(reason="Failed to save file, contact server admin.", **response)
 
         if state.load_meta_data(meta_data_path):
-            state.save_state(path, ask_if_overwrite=False)
+            _STATE_CACHE.save(state, path)
         else:
             response['success'] = False
             response['reason'] = "Uploaded data doesn't match shapes of the plates"
@@ -391,12 +481,13 @@ def add_routes(app):
     @app.route("/api/results/meta_data/column_names/<int:plate>/<path:project>")
     @app.route("/api/results/meta_data/column_names/<path:project>")
     @app.route("/api/results/meta_data/column_names")
+    @_holds_state_lock
     def show_meta_data_headers(plate=None, project=None):
 
         base_url = "/api/results/meta_data/column_names"
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, base_url))))
 
@@ -422,12 +513,13 @@ def add_routes(app):
     @app.route("/api/results/meta_data/get/<int:plate>/<path:project>")
     @app.route("/api/results/meta_data/get/<path:project>")
     @app.route("/api/results/meta_data/get")
+    @_holds_state_lock
     def get_meta_data(plate=None, project=None):
 
         base_url = "/api/results/meta_data/get"
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, base_url))))
 
@@ -456,12 +548,13 @@ def add_routes(app):
 
     @app.route("/api/results/pinning", defaults={'project': ""})
     @app.route("/api/results/pinning/<path:project>")
+    @_holds_state_lock
     def get_pinning(project=None):
 
         path = convert_url_to_path(project)
         base_url = "/api/results/pinning"
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, base_url))))
 
@@ -478,16 +571,35 @@ def add_routes(app):
         pinnings = list(state.plate_shapes)
         return jsonify(pinnings=pinnings, plates=sum(1 for p in pinnings if p is not None), **response)
 
+    @app.route("/api/results/live", defaults={'project': ""})
+    @app.route("/api/results/live/<path:project>")
+    def get_live_phenotypes(project=None):
+
+        path = convert_url_to_path(project)
+        base_url = "/api/results/live"
+
+        snapshot = live_phenotyper.load_snapshot(path)
+
+        if snapshot is None:
+
+            return jsonify(**json_response(
+                ["urls"],
+                dict(reason="No live phenotypes published here", **get_search_results(path, base_url)),
+                success=False))
+
+        return jsonify(success=True, is_endpoint=True, **snapshot)
+
     @app.route("/api/results/gridding", defaults={'project': ""})
     @app.route("/api/results/gridding/<int:plate>", defaults={'project': ""})
     @app.route("/api/results/gridding/<int:plate>/<path:project>")
     @app.route("/api/results/gridding/<path:project>")
+    @_holds_state_lock
     def get_gridding(project=None, plate=None):
 
         base_url = "/api/results/gridding"
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, base_url))))
 
@@ -513,12 +625,13 @@ def add_routes(app):
 
     @app.route("/api/results/phenotype_names")
     @app.route("/api/results/phenotype_names/<path:project>")
+    @_holds_state_lock
     def get_phenotype_names(project=None):
 
         path = convert_url_to_path(project)
         base_url = "/api/results/phenotype_names"
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(
                 ["urls"], dict(is_project=False, **get_search_results(path, base_url))))
@@ -554,12 +667,13 @@ def add_routes(app):
 
     @app.route("/api/results/phenotype_normalizable/remove")
     @app.route("/api/results/phenotype_normalizable/remove/<phenotype>/<path:project>")
+    @_holds_state_lock
     def remove_normalizeable_phenotype(project=None, phenotype=""):
 
         path = convert_url_to_path(project)
         base_url = "/api/results/phenotype_normalizable/remove"
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(
                 ["urls"], dict(is_project=False, **get_search_results(path, base_url))))
@@ -598,7 +712,7 @@ def add_routes(app):
                 **response))
 
         state.remove_phenotype_from_normalization(pheno)
-        state.save_state(path, ask_if_overwrite=False)
+        _STATE_CACHE.save(state, path)
 
         if lock_state is LockState.LockedByMeTemporary:
             _remove_lock(path)
@@ -607,12 +721,13 @@ def add_routes(app):
 
     @app.route("/api/results/phenotype_normalizable/add")
     @app.route("/api/results/phenotype_normalizable/add/<phenotype>/<path:project>")
+    @_holds_state_lock
     def add_normalizeable_phenotype(project=None, phenotype=""):
 
         path = convert_url_to_path(project)
         base_url = "/api/results/phenotype_normalizable/add"
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(
                 ["urls"], dict(is_project=False, **get_search_results(path, base_url))))
@@ -651,7 +766,7 @@ def add_routes(app):
                 **response))
 
         state.add_phenotype_to_normalization(pheno)
-        state.save_state(path, ask_if_overwrite=False)
+        _STATE_CACHE.save(state, path)
 
         if lock_state is LockState.LockedByMeTemporary:
             _remove_lock(path)
@@ -660,12 +775,13 @@ def add_routes(app):
 
     @app.route("/api/results/phenotype_normalizable/names")
     @app.route("/api/results/phenotype_normalizable/names/<path:project>")
+    @_holds_state_lock
     def get_normalizeable_phenotype_names(project=None):
 
         path = convert_url_to_path(project)
         base_url = "/api/results/phenotype_normalizable/names"
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(
                 ["urls"], dict(is_project=False, **get_search_results(path, base_url))))
@@ -699,11 +815,12 @@ def add_routes(app):
     @app.route("/api/results/quality_index")
     @app.route("/api/results/quality_index/<int:plate>/<path:project>")
     @app.route("/api/results/quality_index/<path:project>")
+    @_holds_state_lock
     def get_quality_index(project=None, plate=None):
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(success=True,
                            is_project=False,
@@ -720,6 +837,10 @@ def add_routes(app):
                 _remove_lock(path)
             return jsonify(**response)
 
+        validators = _get_state_cache_validators(path)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
         if plate is None:
 
             urls = ["/api/results/quality_index/{0}/{1}".format(plate, project)
@@ -729,18 +850,20 @@ def add_routes(app):
             return jsonify(json_response(["urls"], dict(urls=urls, **response)))
 
         rows, cols = state.get_quality_index(plate)
-        return jsonify(dim1_rows=rows.tolist(), dim2_cols=cols.tolist(), **response)
+        return set_cache_validators(
+            jsonify(dim1_rows=rows.tolist(), dim2_cols=cols.tolist(), **response), validators)
 
     @app.route("/api/results/normalized_phenotype")
     @app.route("/api/results/normalized_phenotype/<phenotype>/<int:plate>/<path:project>")
     @app.route("/api/results/normalized_phenotype/<int:plate>/<path:project>")
     @app.route("/api/results/normalized_phenotype/<phenotype>/<path:project>")
+    @_holds_state_lock
     def get_normalized_phenotype_data(phenotype=None, project=None, plate=None):
 
         base_url = "/api/results/normalized_phenotype"
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(
                 ["urls"], dict(is_project=False, **get_search_results(path, base_url + "/_NONE_"))))
@@ -755,6 +878,10 @@ def add_routes(app):
                 _remove_lock(path)
             return jsonify(**response)
 
+        validators = _get_state_cache_validators(path)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
         if phenotype is None:
 
             phenotypes = state.phenotype_names()
@@ -801,7 +928,7 @@ def add_routes(app):
 
         qindex_rows, qindex_cols = state.get_quality_index(plate)
 
-        return jsonify(
+        return set_cache_validators(jsonify(
             data=plate_data.tojson(), plate=plate, phenotype=phenotype,
             is_segmentation_based=is_segmentation_based,
             qindex_rows=qindex_rows.tolist(),
@@ -809,17 +936,18 @@ def add_routes(app):
             **merge_dicts(
                 {filt.name: tuple(v.tolist() for v in plate_data.where_mask_layer(filt))
                  for filt in Filter if filt != Filter.OK},
-                response))
+                response)), validators)
 
     @app.route("/api/results/phenotype")
     @app.route("/api/results/phenotype/<phenotype>/<int:plate>/<path:project>")
     @app.route("/api/results/phenotype/<int:plate>/<path:project>")
     @app.route("/api/results/phenotype/<phenotype>/<path:project>")
+    @_holds_state_lock
     def get_phenotype_data(phenotype=None, project=None, plate=None):
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(
                 ["urls"], dict(is_project=False, **get_search_results(path, "/api/results/phenotype/_NONE_"))))
@@ -834,6 +962,10 @@ def add_routes(app):
                 _remove_lock(path)
             return jsonify(**response)
 
+        validators = _get_state_cache_validators(path)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
         if phenotype is None:
 
             phenotypes = state.phenotype_names()
@@ -867,7 +999,7 @@ def add_routes(app):
                     urls=urls, plate_indices=plate_indices, is_segmentation_based=is_segmentation_based, **response)))
 
         try:
-            plate_data = state.get_phenotype(phenotype_enum)[plate]
+            plate_data = state.get_phenotype(phenotype_enum, plate=plate)[plate]
         except ValueError:
             response['success'] = False
             return jsonify(
@@ -882,7 +1014,7 @@ def add_routes(app):
 
         qindex_rows, qindex_cols = state.get_quality_index(plate)
 
-        return jsonify(
+        return set_cache_validators(jsonify(
             data=plate_data.tojson(), plate=plate, phenotype=phenotype,
             qindex_rows=qindex_rows.tolist(),
             qindex_cols=qindex_cols.tolist(),
@@ -890,7 +1022,78 @@ def add_routes(app):
             **merge_dicts(
                 {filt.name: tuple(v.tolist() for v in plate_data.where_mask_layer(filt))
                  for filt in Filter if filt != Filter.OK},
-                response))
+                response)), validators)
+
+    @app.route("/api/results/heatmap/<phenotype>/<int:plate>/<path:project>")
+    @app.route("/api/results/normalized_heatmap/<phenotype>/<int:plate>/<path:project>",
+               defaults={'normalized': True})
+    @_holds_state_lock
+    def get_phenotype_heatmap(phenotype, plate, project, normalized=False):
+        """Heatmap of a phenotype on a plate as a PNG
+
+        Values:
+            colormap: Optional, one of the colormaps of
+                `scanomatic.io.heatmaps`, default is `RdBu_r`
+            vmin: Optional, value of the first color, default is the
+                smallest value on the plate
+            vmax: Optional, value of the last color, default is the
+                largest value on the plate
+            scale: Optional, pixels per position, default is 8
+
+        Returns: PNG image where masked and missing values are gray
+        """
+        path = convert_url_to_path(project)
+        entry = get_project_index().get(path)
+        if entry is None or not entry['is_project']:
+            return jsonify(success=False, is_project=False, is_endpoint=True, reason="Not a project")
+
+        colormap = request.values.get("colormap", DEFAULT_COLORMAP)
+        vmin = request.values.get("vmin", None, type=float)
+        vmax = request.values.get("vmax", None, type=float)
+        scale = min(max(request.values.get("scale", 8, type=int), 1), 32)
+
+        if colormap not in COLORMAPS:
+            return jsonify(
+                success=False, is_project=True, is_endpoint=True,
+                reason="Unknown colormap '{0}', use one of {1}".format(colormap, ", ".join(COLORMAPS)))
+
+        lock_key = request.values.get("lock_key")
+        lock_state, response = _validate_lock_key(path, lock_key, request.remote_addr, require_claim=False)
+
+        signature = phenotyper.get_state_signature(path)
+        validators = get_cache_validators(signature, request.full_path)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
+        key = (os.path.abspath(path), signature, phenotype, normalized, plate, colormap, vmin, vmax, scale)
+        image = _HEATMAP_CACHE.get(key)
+
+        if image is None:
+
+            state, name = _get_state_update_response(path, response, success=True)
+            if state is None:
+                if lock_state is LockState.LockedByMeTemporary:
+                    _remove_lock(path)
+                return jsonify(**response)
+
+            norm_state = phenotyper.NormState.NormalizedRelative if normalized else phenotyper.NormState.Absolute
+            try:
+                plate_data = state.get_phenotype(
+                    phenotyper.get_phenotype(phenotype), norm_state=norm_state, plate=plate)[plate]
+            except (ValueError, KeyError, IndexError):
+                plate_data = None
+
+            if plate_data is None:
+                response['success'] = False
+                return jsonify(
+                    reason="Phenotype hasn't been {0}".format("normalized" if normalized else "extracted"),
+                    plate=plate, phenotype=phenotype, **response)
+
+            image = encode_png(render_heatmap(
+                plate_data.filled(), vmin=vmin, vmax=vmax, colormap=colormap, scale=scale))
+            _HEATMAP_CACHE.set(key, image)
+
+        return set_cache_validators(Response(image, mimetype='image/png'), validators)
 
     @app.route("/api/results/curve_mark/names")
     def curve_mark_names():
@@ -918,6 +1121,7 @@ def add_routes(app):
     @app.route("/api/results/curve_mark/undo")
     @app.route("/api/results/curve_mark/undo/<int:plate>/<path:project>")
     @app.route("/api/results/curve_mark/undo/<path:project>")
+    @_holds_state_lock
     def undo_curve_mark(plate=None, project=None):
         """Undo last log2_curve mark
 
@@ -933,7 +1137,7 @@ def add_routes(app):
         """
         url_root = "/api/results/curve_mark/undo"
         path = convert_url_to_path(project)
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
 
@@ -965,7 +1169,7 @@ def add_routes(app):
             return jsonify(**json_response(["urls"], dict(urls=urls, **response)))
 
         had_effect = state.undo(plate)
-        state.save_state(path, ask_if_overwrite=False)
+        _STATE_CACHE.save(state, path)
 
         if lock_state is LockState.LockedByMeTemporary:
             _remove_lock(path)
@@ -979,6 +1183,7 @@ def add_routes(app):
     @app.route("/api/results/curve_mark/set/<mark>/<phenotype>/<int:plate>/<int:d1_row>/<int:d2_col>/<path:project>")
     @app.route("/api/results/curve_mark/set/<mark>/<phenotype>/<int:plate>/<path:project>", methods=["POST", "GET"])
     @app.route("/api/results/curve_mark/set/<path:project>")
+    @_holds_state_lock
     def set_curve_mark( mark=None, phenotype=None, plate=None, d1_row=None, d2_col=None, project=None):
         """Sets a log2_curve filter mark for a position or list of positions
 
@@ -1006,7 +1211,7 @@ def add_routes(app):
         """
         url_root = "/api/results/curve_mark/set"
         path = convert_url_to_path(project)
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
 
@@ -1133,23 +1338,90 @@ def add_routes(app):
                 reason="Setting mark refused, probably trying to set NoGrowth or Empty for individual phenotype.",
                 **response)
 
-        state.save_state(path, ask_if_overwrite=False)
+        _STATE_CACHE.save(state, path)
 
         if lock_state is LockState.LockedByMeTemporary:
             _remove_lock(path)
 
         return jsonify(**response)
 
+    @app.route("/api/results/plate_curves/<int:plate>/<path:project>")
+    @app.route("/api/results/plate_curves/<path:project>")
+    @app.route("/api/results/plate_curves")
+    @_holds_state_lock
+    def get_plate_growth_data(plate=None, project=None):
+        """Get all growth curves of a plate in one binary response
+
+        Args:
+            plate: int, index of the plate
+            project: the url-formatted path
+
+        Request Values:
+            lock_key: Optional, str, the key of the lock on the project
+            time_stride: Optional, int, only include every n:th time point
+
+        Returns: binary data as packed by `general.get_binary_arrays`
+            with the "raw" and "smooth" curves as rows x columns x times arrays
+            and the header also holding the "times" and the "time_stride".
+            If no plate is given the json-object of urls to the plates.
+        """
+        url_root = "/api/results/plate_curves"
+        path = convert_url_to_path(project)
+
+        if not _STATE_CACHE.has_state(path):
+
+            return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
+
+        lock_key = request.values.get("lock_key")
+        lock_state, response = _validate_lock_key(path, lock_key, request.remote_addr, require_claim=False)
+
+        state, name = _get_state_update_response(path, response, success=True)
+
+        if state is None:
+            if lock_state is LockState.LockedByMeTemporary:
+                _remove_lock(path)
+            return jsonify(**response)
+
+        validators = _get_state_cache_validators(path)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
+        if plate is None:
+
+            urls = ["{0}/{1}/{2}".format(url_root, i, project)
+                    for i, p in enumerate(state.plate_shapes) if p is not None]
+            response['is_endpoint'] = False
+            return jsonify(**json_response(["urls"], dict(urls=urls, **response)))
+
+        plate_shapes = tuple(state.plate_shapes)
+        if plate >= len(plate_shapes) or plate_shapes[plate] is None:
+            response['success'] = False
+            return jsonify(reason="Plate not included in project", **response)
+
+        time_stride = request.values.get("time_stride", default=1, type=int)
+        if time_stride is None or time_stride < 1:
+            response['success'] = False
+            return jsonify(reason="Time stride must be a positive integer", **response)
+
+        curves = {'raw': state.raw_growth_data[plate][..., ::time_stride]}
+        if state.smooth_growth_data is not None:
+            curves['smooth'] = state.smooth_growth_data[plate][..., ::time_stride]
+
+        return set_cache_validators(serve_binary_arrays(
+            dict(plate=plate, project_name=name, times=state.times[::time_stride].tolist(), time_stride=time_stride),
+            **curves), validators)
+
     @app.route("/api/results/curves")
     @app.route("/api/results/curves/<int:plate>/<int:d1_row>/<int:d2_col>/<path:project>")
     @app.route("/api/results/curves/<int:plate>/<path:project>")
     @app.route("/api/results/curves/<path:project>")
+    @_holds_state_lock
     def get_growth_data(plate=None, d1_row=None, d2_col=None, project=None):
 
         url_root = "/api/results/curves"
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
 
@@ -1163,6 +1435,10 @@ def add_routes(app):
                 _remove_lock(path)
             return jsonify(**response)
 
+        validators = _get_state_cache_validators(path)
+        if is_not_modified(validators):
+            return serve_not_modified(validators)
+
         if plate is None:
 
             urls = ["{0}/{1}/{2}".format(url_root, i, project)
@@ -1196,26 +1472,28 @@ def add_routes(app):
             "/api/results/curve_mark/set/{0}/{1}/{2}/{3}/{4}".format(m.name, plate, d1_row, d2_col, project)
             for m in phenotyper.Filter]
 
-        return jsonify(time_data=state.times.tolist(),
-                       smooth_data=state.smooth_growth_data[plate][d1_row, d2_col].tolist(),
-                       raw_data=state.raw_growth_data[plate][d1_row, d2_col].tolist(),
-                       segmentations=segmentations,
-                       **json_response(["film_urls", "colony_image", "mark_all_urls"],
-                                       dict(film_urls=film_url, colony_image=colony_image,
-                                            mark_all_urls=mark_all_urls, **response)))
+        return set_cache_validators(jsonify(
+            time_data=state.times.tolist(),
+            smooth_data=state.smooth_growth_data[plate][d1_row, d2_col].tolist(),
+            raw_data=state.raw_growth_data[plate][d1_row, d2_col].tolist(),
+            segmentations=segmentations,
+            **json_response(["film_urls", "colony_image", "mark_all_urls"],
+                            dict(film_urls=film_url, colony_image=colony_image,
+                                 mark_all_urls=mark_all_urls, **response))), validators)
 
     @app.route("/api/results/movie/make")
     @app.route("/api/results/movie/make/<film_type>/<int:plate>/<int:outer_dim>/<int:inner_dim>/<path:project>")
     @app.route("/api/results/movie/make/<int:plate>/<int:outer_dim>/<int:inner_dim>/<path:project>")
     @app.route("/api/results/movie/make/<int:plate>/<path:project>")
     @app.route("/api/results/movie/make/<path:project>")
+    @_holds_state_lock
     def get_film(project=None, film_type=None, plate=None, outer_dim=None, inner_dim=None):
 
         url_root = "/api/results/movie/make"
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
 
@@ -1261,16 +1539,35 @@ def add_routes(app):
 
             return jsonify(**json_response(["urls"], dict(urls=urls, **response)))
 
-        save_path = os.path.join(path, "qc_film_{0}_{1}_{2}.{3}.avi".format(plate, outer_dim, inner_dim, film_type))
-        if _make_film(film_type, save_target=save_path, pos=(plate, outer_dim, inner_dim), path=path):
+        key = _FILM_QUEUE.request(film_type, (plate, outer_dim, inner_dim), path, frames=len(state.times))
+        status = _FILM_QUEUE.get_status(key)
 
-            return send_from_directory(path, os.path.basename(save_path))
-        else:
-            response['success'] = False
-            return jsonify(reason="Error while producing film", **response)
+        if status['state'] is FilmState.Done:
+            return send_from_directory(_FILM_QUEUE.directory, os.path.basename(_FILM_QUEUE.get_film_path(key)))
+
+        return jsonify(**_get_film_status_response(key, status, response))
+
+    @app.route("/api/results/movie/status/<key>")
+    def get_film_status(key):
+
+        status = _FILM_QUEUE.get_status(key)
+        if status is None:
+            return jsonify(success=False, reason="Unknown film")
+
+        return jsonify(**_get_film_status_response(key, status, {'success': True}))
+
+    @app.route("/api/results/movie/download/<key>")
+    def get_film_download(key):
+
+        status = _FILM_QUEUE.get_status(key)
+        if status is None or status['state'] is not FilmState.Done:
+            return jsonify(success=False, reason="Film not available")
+
+        return send_from_directory(_FILM_QUEUE.directory, os.path.basename(_FILM_QUEUE.get_film_path(key)))
 
     @app.route("/api/results/normalize")
     @app.route("/api/results/normalize/<path:project>")
+    @_holds_state_lock
     def _do_normalize(project):
         """Preform normalization
 
@@ -1284,7 +1581,7 @@ def add_routes(app):
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
 
         name = get_project_name(path)
@@ -1304,7 +1601,7 @@ def add_routes(app):
             return jsonify(**response)
 
         state.normalize_phenotypes()
-        state.save_state(path, ask_if_overwrite=False)
+        _STATE_CACHE.save(state, path)
 
         if lock_state is LockState.LockedByMeTemporary:
             _remove_lock(path)
@@ -1320,6 +1617,7 @@ def add_routes(app):
 
     @app.route("/api/results/normalize/reference/set/<int:plate>/<offset>/<path:project>")
     @app.route("/api/results/normalize/reference/set/<offset>/<path:project>")
+    @_holds_state_lock
     def _set_normalization_offset(project, offset, plate=None):
         """Sets a normalization offset
 
@@ -1335,7 +1633,7 @@ def add_routes(app):
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
 
@@ -1377,7 +1675,7 @@ def add_routes(app):
                            **json_response(["urls"], dict(urls=urls, **response)))
 
         state.set_control_surface_offsets(offset, plate)
-        state.save_state(path, ask_if_overwrite=False)
+        _STATE_CACHE.save(state, path)
 
         if lock_state is LockState.LockedByMeTemporary:
             _remove_lock(path)
@@ -1385,6 +1683,7 @@ def add_routes(app):
         return jsonify(**response)
 
     @app.route("/api/results/normalize/reference/get/<int:plate>/<path:project>")
+    @_holds_state_lock
     def _get_normalization_offset(project, plate):
         """Gets the normalization offset of a plate
 
@@ -1398,7 +1697,7 @@ def add_routes(app):
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
 
@@ -1424,6 +1723,7 @@ def add_routes(app):
                        offset_pattern=offset().tolist(), **response)
 
     @app.route("/api/results/has_normalized/<path:project>")
+    @_holds_state_lock
     def _get_has_been_normed(project):
         """If the project has normalized data.
 
@@ -1437,7 +1737,7 @@ def add_routes(app):
 
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
 
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(path, url_root))))
 
@@ -1454,11 +1754,12 @@ def add_routes(app):
         return jsonify(has_normalized=state.has_normalized_data, **response)
 
     @app.route("/api/results/export/phenotypes/<save_data>/<path:project>")
+    @_holds_state_lock
     def export_phenotypes(project, save_data=""):
         url_root = "/api/results/export/phenotypes"
         path = convert_url_to_path(project)
 
-        if not phenotyper.path_has_saved_project_state(path):
+        if not _STATE_CACHE.has_state(path):
             return jsonify(**json_response(["urls"], dict(is_project=False, **get_search_results(
                 path, "{0}/{1}".format(url_root, save_data)))))
 
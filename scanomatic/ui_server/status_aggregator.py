@@ -0,0 +1,171 @@
+import json
+import socket
+import time
+import xmlrpclib
+from threading import Condition, Thread
+
+from scanomatic.io.logger import Logger
+
+_logger = Logger("Status Aggregator")
+
+SECTIONS = ('server', 'scanners', 'queue', 'jobs')
+
+
+def _format_event(event, data):
+
+    return "event: {0}\ndata: {1}\n\n".format(event, json.dumps(data))
+
+
+class StatusAggregator(object):
+    """Shares the status of the server among all requests of the UI.
+
+    The server is polled for its status, scanners, queue and jobs once
+    per interval, but only while the status has been requested recently,
+    and all requests are served from the latest snapshot. Thus the load
+    on the server doesn't depend on how many are watching the status.
+
+    A snapshot is a dict with `online`, `time` and `version` and, if the
+    server is online, each of `SECTIONS`. The version increases each time
+    any part of the status changes. Snapshots should not be modified.
+
+    Args:
+        rpc_client: The rpc-client bridge to the server
+        interval: Optional, seconds between polls
+        job_formatter: Optional, function applied to the job statuses
+        idle_timeout: Optional, seconds without requests before polling stops
+    """
+    def __init__(self, rpc_client, interval=5., job_formatter=None, idle_timeout=60.):
+
+        self._rpc_client = rpc_client
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._job_formatter = job_formatter
+        self._snapshot = None
+        self._last_request = 0
+        self._poller = None
+        self._condition = Condition()
+
+    def get_snapshot(self):
+        """The latest status, waits for the first poll if needed"""
+
+        with self._condition:
+            self._request_polling()
+            while self._snapshot is None:
+                self._condition.wait(self.interval)
+            return self._snapshot
+
+    def wait_for_change(self, version, timeout):
+        """Wait for the status to differ from a version
+
+        Args:
+            version: The version of the snapshot already known
+            timeout: Maximum number of seconds to wait
+
+        Returns: The latest snapshot, which may have the same version
+            if nothing changed before the timeout.
+        """
+        end_time = time.time() + timeout
+        with self._condition:
+            self._request_polling()
+            while self._snapshot is None or self._snapshot['version'] == version:
+                remaining = end_time - time.time()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return self._snapshot
+
+    def stream(self, keep_alive=15.):
+        """Server-sent events of the status
+
+        First each section of the status is sent as an event named as the
+        section, then only the sections that change. If the server goes
+        on- or offline an `online` event is sent.
+
+        Args:
+            keep_alive: Seconds between comments when nothing changes
+
+        Returns: Generator of event strings
+        """
+        snapshot = self.get_snapshot()
+        yield "retry: {0}\n\n".format(int(self.interval * 1000))
+        yield _format_event('online', snapshot['online'])
+        for section in SECTIONS:
+            if section in snapshot:
+                yield _format_event(section, snapshot[section])
+
+        while True:
+
+            current = self.wait_for_change(snapshot['version'], keep_alive)
+            if current['version'] == snapshot['version']:
+                yield ": keep-alive\n\n"
+                continue
+
+            if current['online'] != snapshot['online']:
+                yield _format_event('online', current['online'])
+            for section in SECTIONS:
+                if section in current and current[section] != snapshot.get(section):
+                    yield _format_event(section, current[section])
+
+            snapshot = current
+
+    def _request_polling(self):
+
+        self._last_request = time.time()
+        if self._poller is None:
+            self._poller = Thread(target=self._run, name="Status Aggregator")
+            self._poller.daemon = True
+            self._poller.start()
+
+    def _run(self):
+
+        try:
+            while True:
+
+                try:
+                    status = self._poll()
+                except Exception as e:
+                    _logger.exception("Could not get status of server: {0!r}".format(e))
+                    status = {'online': False}
+
+                with self._condition:
+                    self._update(status)
+                    if time.time() - self._last_request > self.idle_timeout:
+                        return
+
+                time.sleep(self.interval)
+        finally:
+            with self._condition:
+                self._poller = None
+
+    def _poll(self):
+
+        status = {'online': False}
+        client = self._rpc_client
+
+        try:
+            if client.online:
+                jobs = client.get_job_status()
+                status.update(
+                    server=client.get_status(),
+                    scanners=client.get_scanner_status(),
+                    queue=client.get_queue_status(),
+                    jobs=self._job_formatter(jobs) if self._job_formatter else jobs,
+                    online=True)
+        except (socket.error, xmlrpclib.Error, AttributeError):
+            _logger.warning("Lost connection to server while getting status")
+            status = {'online': False}
+
+        return status
+
+    def _update(self, status):
+
+        previous = self._snapshot
+        status['time'] = time.time()
+
+        if previous is not None and all(previous.get(key) == status.get(key) for key in ('online', ) + SECTIONS):
+            status['version'] = previous['version']
+        else:
+            status['version'] = 0 if previous is None else previous['version'] + 1
+            self._condition.notify_all()
+
+        self._snapshot = status
@@ -1,3 +1,8 @@
+import gzip
+import io
+import json
+
+import numpy as np
 import pytest
 
 from flask import Flask
@@ -32,3 +37,65 @@ class TestJsonAbort:
         with app.test_request_context():
             with pytest.raises(TypeError):
                 assert general.json_abort(600, *[42], **{'20': 21, '21': 20})
+
+
+class TestBinaryArrays:
+
+    def test_arrays_are_aligned_after_header(self):
+
+        raw = np.arange(24, dtype=float).reshape(2, 3, 4)
+        data = general.get_binary_arrays({'times': [0, 1, 2, 3]}, raw=raw, smooth=raw[..., ::2])
+
+        header_length = np.frombuffer(data[:4], dtype='<u4')[0]
+        header = json.loads(data[4: 4 + header_length])
+        assert (4 + header_length) % 4 == 0
+        assert header['arrays'] == ['raw', 'smooth']
+        assert header['shapes'] == [[2, 3, 4], [2, 3, 2]]
+        assert header['times'] == [0, 1, 2, 3]
+
+        values = np.frombuffer(data[4 + header_length:], dtype=header['dtype'])
+        assert (values[:24].reshape(2, 3, 4) == raw).all()
+        assert (values[24:].reshape(2, 3, 2) == raw[..., ::2]).all()
+
+
+class TestConditionalResponses:
+
+    @pytest.fixture
+    def client(self, tmpdir):
+
+        source = tmpdir.join("source.txt")
+        source.write("data")
+        _app = Flask("--conditional--")
+
+        @_app.route("/data")
+        def get_data():
+
+            validators = general.get_cache_validators(general.get_file_signature(str(source)), "/data")
+            if general.is_not_modified(validators):
+                return general.serve_not_modified(validators)
+            return general.set_cache_validators(general.jsonify(values=range(5000)), validators)
+
+        _app.after_request(general.compress_response)
+        return _app.test_client(), source
+
+    def test_not_modified_until_source_changes(self, client):
+
+        client, source = client
+        etag = client.get("/data").headers['ETag']
+
+        assert client.get("/data", headers={'If-None-Match': etag}).status_code == 304
+
+        source.write("other data")
+        response = client.get("/data", headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_large_responses_are_compressed(self, client):
+
+        client, _ = client
+        response = client.get("/data", headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        data = json.loads(gzip.GzipFile(fileobj=io.BytesIO(response.data)).read())
+        assert data['values'] == range(5000)
+        assert 'Content-Encoding' not in client.get("/data").headers
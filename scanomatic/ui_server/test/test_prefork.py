@@ -0,0 +1,70 @@
+from threading import Event, Thread
+
+from flask import Flask, Response
+
+from scanomatic.ui_server.prefork import RequestTimingMiddleware, SerialRequestsMiddleware
+
+
+def test_requests_are_timed(tmpdir):
+
+    log_path = str(tmpdir.join("requests.log"))
+    app = Flask("--timed--")
+
+    @app.route("/data")
+    def get_data():
+        return "0123456789"
+
+    app.wsgi_app = RequestTimingMiddleware(app.wsgi_app, log_path)
+    client = app.test_client()
+    assert client.get("/data").data == "0123456789"
+    client.get("/missing")
+
+    lines = [line.split("\t") for line in open(log_path).read().splitlines()]
+    assert [(line[2], line[3], line[4], line[6]) for line in lines] == [
+        ("GET", "/data", "200", "10"), ("GET", "/missing", "404", lines[1][6])]
+    assert float(lines[0][5]) >= 0
+
+
+def test_requests_are_serial_except_concurrent_paths():
+
+    app = Flask("--serial--")
+    entered = Event()
+    release = Event()
+
+    @app.route("/slow")
+    def get_slow():
+        entered.set()
+        release.wait(5)
+        return "slow"
+
+    @app.route("/fast")
+    def get_fast():
+        return "fast"
+
+    @app.route("/stream")
+    def get_stream():
+        return Response(iter(["a", "b"]))
+
+    app.wsgi_app = SerialRequestsMiddleware(app.wsgi_app, concurrent_paths=("/stream", ))
+    results = {}
+
+    def request(path):
+        results[path] = app.test_client().get(path).data
+
+    slow = Thread(target=request, args=("/slow", ))
+    slow.start()
+    entered.wait(5)
+
+    stream = Thread(target=request, args=("/stream", ))
+    stream.start()
+    stream.join(5)
+    fast = Thread(target=request, args=("/fast", ))
+    fast.start()
+    fast.join(0.2)
+
+    assert results == {"/stream": "ab"}
+
+    release.set()
+    slow.join(5)
+    fast.join(5)
+    assert results == {"/stream": "ab", "/slow": "slow", "/fast": "fast"}
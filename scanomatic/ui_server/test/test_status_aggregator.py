@@ -0,0 +1,92 @@
+import json
+import time
+
+from scanomatic.ui_server.status_aggregator import StatusAggregator
+
+
+class FakeClient(object):
+
+    def __init__(self):
+
+        self.online = True
+        self.calls = 0
+        self.queue = []
+
+    def get_status(self):
+
+        self.calls += 1
+        return {'ResourceCPU': True}
+
+    def get_scanner_status(self):
+
+        self.calls += 1
+        return []
+
+    def get_queue_status(self):
+
+        self.calls += 1
+        return list(self.queue)
+
+    def get_job_status(self):
+
+        self.calls += 1
+        return []
+
+
+def test_requests_share_polls():
+
+    client = FakeClient()
+    aggregator = StatusAggregator(client, interval=60)
+
+    snapshots = [aggregator.get_snapshot() for _ in range(10)]
+
+    assert client.calls == 4
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert snapshots[0]['online'] and snapshots[0]['queue'] == []
+
+
+def test_stream_sends_changes():
+
+    client = FakeClient()
+    aggregator = StatusAggregator(client, interval=0.01)
+    stream = aggregator.stream(keep_alive=5)
+
+    events = [next(stream) for _ in range(6)]
+    assert events[0].startswith("retry:")
+    assert [event.split("\n")[0] for event in events[1:]] == [
+        "event: online", "event: server", "event: scanners", "event: queue", "event: jobs"]
+
+    client.queue.append({'id': 'job'})
+    event, data = next(stream).split("\n")[:2]
+    assert event == "event: queue"
+    assert json.loads(data[len("data: "):]) == [{'id': 'job'}]
+
+    client.online = False
+    assert next(stream).split("\n")[:2] == ["event: online", "data: false"]
+
+
+def test_polling_survives_errors():
+
+    def job_formatter(jobs):
+        if client.calls < 12:
+            raise KeyError('type')
+        return jobs
+
+    client = FakeClient()
+    aggregator = StatusAggregator(client, interval=0.01, job_formatter=job_formatter)
+
+    assert aggregator.get_snapshot()['online'] is False
+    assert aggregator.wait_for_change(0, 5)['online']
+    assert aggregator._poller is not None and aggregator._poller.is_alive()
+
+
+def test_poller_is_cleared_when_idle():
+
+    client = FakeClient()
+    aggregator = StatusAggregator(client, interval=0.01, idle_timeout=0)
+
+    aggregator.get_snapshot()
+    end_time = time.time() + 5
+    while aggregator._poller is not None and time.time() < end_time:
+        time.sleep(0.01)
+    assert aggregator._poller is None
@@ -3,7 +3,7 @@ import requests
 import glob
 import time
 import webbrowser
-from flask import Flask, request, send_from_directory, redirect, jsonify, render_template
+from flask import Flask, request, send_from_directory, redirect, jsonify, render_template, Response
 from flask_cors import CORS
 
 from socket import error
@@ -33,9 +33,11 @@ from . import scan_api
 from . import management_api
 from . import tools_api
 from . import data_api
+from .prefork import RequestTimingMiddleware, SerialRequestsMiddleware, serve_prefork
+from .status_aggregator import StatusAggregator
 from .general import (
     get_2d_list, serve_log_as_html, convert_url_to_path, get_search_results,
-    convert_path_to_url
+    convert_path_to_url, compress_response
 )
 
 _url = None
@@ -54,7 +56,20 @@ def init_logging():
     _logger.resume()
 
 
-def launch_server(host, port, debug):
+def _format_job_status(jobs):
+
+    formatted = []
+    for item in jobs:
+        item = dict(item)
+        if item['type'] == "Feature Extraction Job":
+            item['label'] = convert_path_to_url("", item['label'])
+        if 'log_file' in item and item['log_file']:
+            item['log_file'] = convert_path_to_url("/logs/project", item['log_file'])
+        formatted.append(item)
+    return formatted
+
+
+def launch_server(host, port, debug, workers=None):
 
     global _url, _debug_mode
     _debug_mode = debug
@@ -65,10 +80,18 @@ def launch_server(host, port, debug):
     if rpc_client.local and rpc_client.online is False:
         rpc_client.launch_local()
 
+    status_aggregator = StatusAggregator(
+        rpc_client, interval=Config().ui_server.status_interval, job_formatter=_format_job_status)
+
     if port is None:
         port = Config().ui_server.port
     if host is None:
         host = Config().ui_server.host
+    if workers is None:
+        workers = Config().ui_server.workers
+    if workers > 1 and (debug or not hasattr(os, 'fork')):
+        _logger.warning("Can only serve with several workers on systems with fork and not in debug mode")
+        workers = 1
 
     _url = "http://{host}:{port}".format(host=host, port=port)
     init_logging()
@@ -184,29 +207,32 @@ def launch_server(host, port, debug):
     @app.route("/status/<status_type>")
     def _status(status_type=""):
 
-        if status_type != "" and not rpc_client.online:
+        if status_type == "":
+            return send_from_directory(Paths().ui_root, Paths().ui_status_file)
+
+        status = status_aggregator.get_snapshot()
+        if not status['online']:
             return jsonify(success=False, reason="Server offline")
 
         if status_type == 'queue':
-            return jsonify(success=True, data=rpc_client.get_queue_status())
+            return jsonify(success=True, data=status['queue'])
         elif 'scanner' in status_type:
-            return jsonify(success=True, data=rpc_client.get_scanner_status())
+            return jsonify(success=True, data=status['scanners'])
         elif 'job' in status_type:
-            data = rpc_client.get_job_status()
-            for item in data:
-                if item['type'] == "Feature Extraction Job":
-                    item['label'] = convert_path_to_url("", item['label'])
-                if 'log_file' in item and item['log_file']:
-                    item['log_file'] = convert_path_to_url("/logs/project", item['log_file'])
-            return jsonify(success=True, data=data)
+            return jsonify(success=True, data=status['jobs'])
         elif status_type == 'server':
-            return jsonify(success=True, data=rpc_client.get_status())
-        elif status_type == "":
-
-            return send_from_directory(Paths().ui_root, Paths().ui_status_file)
+            return jsonify(success=True, data=status['server'])
         else:
             return jsonify(succes=False, reason='Unknown status request')
 
+    @app.route("/status/stream")
+    def _status_stream():
+
+        response = Response(status_aggregator.stream(), mimetype="text/event-stream")
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
     @app.route("/settings", methods=['get', 'post'])
     def _config():
 
@@ -355,7 +381,8 @@ def launch_server(host, port, debug):
                     compile_instructions=path_compile_instructions,
                     output_directory=data_object.get("output_directory"),
                     one_time_positioning=bool(data_object.get('one_time_positioning', default=1, type=int)),
-                    chain=bool(data_object.get('chain', default=1, type=int)))
+                    chain=bool(data_object.get('chain', default=1, type=int)),
+                    live_phenotypes=bool(data_object.get('live_phenotypes', default=0, type=int)))
 
                 if "pinning_matrices" in data_object:
                     model.pinning_matrices = get_2d_list(
@@ -507,15 +534,18 @@ def launch_server(host, port, debug):
 
     @app.route("/scanners/<scanner_query>")
     def _scanners(scanner_query=None):
-        if scanner_query is None or scanner_query.lower() == 'all':
-            return jsonify(scanners=rpc_client.get_scanner_status(), success=True)
-        elif scanner_query.lower() == 'free':
+        if scanner_query is not None and scanner_query.lower() == 'free':
+            # Used for claiming a scanner, so it must be current
             return jsonify(scanners={s['socket']: s['scanner_name'] for s in rpc_client.get_scanner_status()
                                      if 'owner' not in s or not s['owner']},
                            success=True)
+
+        scanners = status_aggregator.get_snapshot().get('scanners', [])
+        if scanner_query is None or scanner_query.lower() == 'all':
+            return jsonify(scanners=scanners, success=True)
         else:
             try:
-                return jsonify(scanner=(s for s in rpc_client.get_scanner_status() if scanner_query
+                return jsonify(scanner=(s for s in scanners if scanner_query
                                         in s['scanner_name']).next(), success=True)
             except StopIteration:
                 return jsonify(scanner=None, success=False, reason="Unknown scanner or query '{0}'".format(
@@ -528,12 +558,15 @@ def launch_server(host, port, debug):
 
     management_api.add_routes(app, rpc_client)
     tools_api.add_routes(app)
-    qc_api.add_routes(app)
+    qc_api.add_routes(app, workers=workers)
     analysis_api.add_routes(app)
     compilation_api.add_routes(app)
     scan_api.add_routes(app)
     data_api.add_routes(app, rpc_client, debug)
     calibration_api.add_routes(app)
+    app.after_request(compress_response)
+    app.wsgi_app = SerialRequestsMiddleware(app.wsgi_app, concurrent_paths=("/status/stream", ))
+    app.wsgi_app = RequestTimingMiddleware(app.wsgi_app, Paths().log_ui_server_requests)
 
     if debug:
         CORS(app)
@@ -546,7 +579,10 @@ def launch_server(host, port, debug):
 
         )
     try:
-        app.run(port=port, host=host, debug=debug)
+        if workers > 1:
+            serve_prefork(app, host, port, workers)
+        else:
+            app.run(port=port, host=host, debug=debug, threaded=True)
     except error:
         _logger.warning(
             "Could not bind socket, probably server is already running and" +
@@ -571,14 +607,14 @@ def launch_webbrowser(delay=0.0):
         _logger.error("No server launched")
 
 
-def launch(host, port, debug, open_browser_url=True):
+def launch(host, port, debug, open_browser_url=True, workers=None):
     if open_browser_url:
         _logger.info("Getting ready to open browser")
         Thread(target=launch_webbrowser, kwargs={"delay": 2}).start()
     else:
         _logger.info("Will not open browser")
 
-    launch_server(host, port, debug)
+    launch_server(host, port, debug, workers=workers)
 
 
 def ui_server_responsive():